@@ -0,0 +1,67 @@
+"""
+Sorting of large arrays with np.sort() and np.argsort(), which use a
+radix sort for integers and floats, compared with the introsort that
+they use for small arrays.  The "python" entry point runs the introsort.
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import numpy as np
+from numba import njit
+from numba.targets.arrayobj import lt_floats
+from numba.targets.quicksort import make_jit_quicksort
+from numba.utils import benchmark
+
+
+_quicksort = make_jit_quicksort().run_quicksort
+_quicksort_floats = make_jit_quicksort(lt=lt_floats).run_quicksort
+_argquicksort = make_jit_quicksort(is_argsort=True).run_quicksort
+_argquicksort_floats = make_jit_quicksort(lt=lt_floats,
+                                          is_argsort=True).run_quicksort
+
+
+@njit
+def quicksort_ints(a):
+    res = a.copy()
+    _quicksort(res)
+    return res, _argquicksort(a)
+
+@njit
+def quicksort_floats(a):
+    res = a.copy()
+    _quicksort_floats(res)
+    return res, _argquicksort_floats(a)
+
+@njit
+def radixsort(a):
+    return np.sort(a), np.argsort(a)
+
+
+def make_arrays():
+    np.random.seed(42)
+    n = 10 ** 6
+    return [np.random.randint(-2 ** 31, 2 ** 31, n).astype(np.int32),
+            np.random.randint(-2 ** 62, 2 ** 62, n),
+            np.random.random(n)]
+
+ARRAYS = make_arrays()
+
+
+def python_main():
+    a32, a64, f64 = ARRAYS
+    quicksort_ints(a32)
+    quicksort_ints(a64)
+    quicksort_floats(f64)
+
+
+def numba_main():
+    for a in ARRAYS:
+        radixsort(a)
+
+
+if __name__ == '__main__':
+    # Compile first
+    python_main()
+    numba_main()
+    print(benchmark(python_main))
+    print(benchmark(numba_main))
@@ -8,8 +8,8 @@ import sys
 
 from . import config, errors, runtests, types
 
-# Re-export typeof
-from .special import typeof
+# Re-export typeof and prange
+from .special import typeof, prange, parallel_scan
 
 # Re-export error classes
 from .errors import *
@@ -23,7 +23,8 @@ from .smartarray import SmartArray
 from .decorators import autojit, cfunc, generated_jit, jit, njit
 
 # Re-export vectorize decorators
-from .npyufunc import vectorize, guvectorize
+from .npyufunc import (vectorize, guvectorize, threading_layer,
+                       parallel_pool_info)
 
 # Re-export Numpy helpers
 from .numpy_support import carray, farray, from_dtype
@@ -31,6 +32,9 @@ from .numpy_support import carray, farray, from_dtype
 # Re-export jitclass
 from .jitclass import jitclass
 
+# Re-export stencil
+from .stencil import stencil
+
 # Keep this for backward compatibility.
 test = runtests.main
 
@@ -43,6 +47,11 @@ __all__ = """
     jit
     jitclass
     njit
+    parallel_pool_info
+    parallel_scan
+    prange
+    stencil
+    threading_layer
     typeof
     vectorize
     """.split() + types.__all__ + errors.__all__
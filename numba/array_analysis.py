@@ -4,14 +4,79 @@ import numpy
 from numba import ir, analysis, types, config
 from numba.ir_utils import (mk_unique_var, replace_vars_inner, find_topo_order,
                             dprint_func_ir)
-from numba.typing import npydecl
+from numba.typing import npydecl, signature
+from numba.typing.templates import infer_global, AbstractTemplate
+from numba.targets.imputils import lower_builtin
 import collections
 import copy
+import math
 
 UNKNOWN_CLASS = -1
 CONST_CLASS = 0
 MAP_TYPES = [numpy.ufunc]
 
+def assert_equiv(*sizes):
+    """Runtime check inserted by array analysis where sizes of array
+    dimensions are assumed equal, e.g. for operands of element-wise array
+    operations, since parfors don't support broadcasting of size 1 dimensions
+    that are not known at compile time.
+    """
+    assert all(s == sizes[0] for s in sizes), "array sizes are not equivalent"
+
+@infer_global(assert_equiv)
+class AssertEquivTemplate(AbstractTemplate):
+    key = assert_equiv
+
+    def generic(self, args, kws):
+        assert not kws
+        if all(isinstance(a, types.Integer) for a in args):
+            return signature(types.none, *args)
+
+@lower_builtin(assert_equiv, types.VarArg(types.Integer))
+def assert_equiv_impl(context, builder, sig, args):
+    first = context.cast(builder, args[0], sig.args[0], types.intp)
+    for ty, val in zip(sig.args[1:], args[1:]):
+        val = context.cast(builder, val, ty, types.intp)
+        with builder.if_then(builder.icmp_signed('!=', first, val),
+                             likely=False):
+            msg = "array sizes are not equivalent"
+            context.call_conv.return_user_exc(builder, AssertionError, (msg,))
+    return context.get_dummy_value()
+
+def arange_size(*args):
+    """Number of elements of np.arange(*args), computed by array analysis
+    before arange() calls since parfors need the size to allocate the output.
+    """
+    return len(numpy.arange(*args))
+
+@infer_global(arange_size)
+class ArangeSizeTemplate(AbstractTemplate):
+    key = arange_size
+
+    def generic(self, args, kws):
+        assert not kws
+        if 1 <= len(args) <= 3 and all(isinstance(a, (types.Integer,
+                types.Float)) for a in args):
+            return signature(types.intp, *args)
+
+@lower_builtin(arange_size, types.VarArg(types.Number))
+def arange_size_impl(context, builder, sig, args):
+    # missing start and step arguments are 0 and 1
+    argtys = list(sig.args)
+    args = list(args)
+    if len(args) == 1:
+        argtys.insert(0, types.intp)
+        args.insert(0, context.get_constant(types.intp, 0))
+    if len(args) == 2:
+        argtys.append(types.intp)
+        args.append(context.get_constant(types.intp, 1))
+
+    def size_impl(start, stop, step):
+        return max(int(math.ceil((stop - start) / step)), 0)
+
+    return context.compile_internal(builder, size_impl,
+        signature(types.intp, *argtys), args)
+
 class ArrayAnalysis(object):
     """Analyzes Numpy array computations for properties such as shapes
     and equivalence classes.
@@ -50,6 +115,16 @@ class ArrayAnalysis(object):
         self.tuple_table = {}
         self.list_table = {}
         self.constant_table = {}
+        # keep shape attributes of arrays like s=A.shape as {s:A}
+        self.shape_attrs = {}
+        # keep variables of len() builtin to find len(A) calls
+        self.len_globals = []
+        # sizes assumed equal while analyzing the current statement, which
+        # are checked at runtime using assert_equiv calls
+        self.equiv_checks = []
+        # statements computing sizes of arrays created by the current
+        # statement, which are inserted before it
+        self.size_nodes = []
 
     def run(self):
         """run array shape analysis on the IR and save information in
@@ -88,6 +163,11 @@ class ArrayAnalysis(object):
             # if an array doesn't have a size variable for a dimension,
             # a size variable should be generated when the array is created
             generated_size_calls = self._analyze_inst(inst)
+            # size equivalences assumed for this instruction are checked
+            # before it runs
+            out_body.extend(self._gen_equiv_checks(block.scope, inst.loc))
+            out_body.extend(self.size_nodes)
+            self.size_nodes = []
             out_body.append(inst)
             for node in generated_size_calls:
                 out_body.append(node)
@@ -107,7 +187,11 @@ class ArrayAnalysis(object):
                     self.map_calls.append(lhs)
             if isinstance(rhs.value, pytypes.ModuleType) and rhs.value==numpy:
                 self.numpy_globals.append(lhs)
+            if rhs.value is len:
+                self.len_globals.append(lhs)
         if isinstance(rhs, ir.Expr) and rhs.op=='getattr':
+            if rhs.attr=='shape' and self._isarray(rhs.value.name):
+                self.shape_attrs[lhs] = rhs.value.name
             if rhs.value.name in self.numpy_globals:
                 self.numpy_calls[lhs] = rhs.attr
             elif rhs.value.name in self.numpy_calls:
@@ -125,6 +209,19 @@ class ArrayAnalysis(object):
             self.tuple_table[lhs] = rhs.value
         if isinstance(rhs, ir.Const): # and np.isscalar(rhs.value):
             self.constant_table[lhs] = rhs.value
+        # variables holding array sizes like n=A.shape[0] or n=len(A) are
+        # size variables of the array dimension's class
+        if (isinstance(rhs, ir.Expr) and rhs.op in ['getitem', 'static_getitem']
+                and rhs.value.name in self.shape_attrs):
+            dim = rhs.index
+            if rhs.op=='getitem':
+                dim = self.constant_table.get(rhs.index.name)
+            self._add_size_var(self.shape_attrs[rhs.value.name], dim,
+                assign.target)
+        if (isinstance(rhs, ir.Expr) and rhs.op=='call'
+                and rhs.func.name in self.len_globals and len(rhs.args)==1
+                and self._isarray(rhs.args[0].name)):
+            self._add_size_var(rhs.args[0].name, 0, assign.target)
 
         #rhs_class_out = self._analyze_rhs_classes(rhs)
         size_calls = []
@@ -165,6 +262,68 @@ class ArrayAnalysis(object):
         #print(self.array_shape_classes)
         return size_calls
 
+    def _add_size_var(self, arr, dim, size_var):
+        if arr not in self.array_shape_classes or not isinstance(dim, int):
+            return
+        ndims = self._get_ndims(arr)
+        if dim<0:
+            dim += ndims
+        if not 0<=dim<ndims:
+            return
+        c = self.array_shape_classes[arr][dim]
+        if c!=UNKNOWN_CLASS and c!=CONST_CLASS:
+            self.class_sizes.setdefault(c, []).append(size_var)
+
+    def _gen_equiv_checks(self, scope, loc):
+        """generate assert_equiv calls for pending size equivalence checks
+        """
+        out = []
+        for sizes in self.equiv_checks:
+            args = []
+            for size in sizes:
+                if not isinstance(size, ir.Var):
+                    size_var = ir.Var(scope, mk_unique_var("$equiv_size"), loc)
+                    self.typemap[size_var.name] = types.intp
+                    out.append(ir.Assign(ir.Const(size, loc), size_var, loc))
+                    size = size_var
+                args.append(size)
+            func_var = ir.Var(scope, mk_unique_var("$assert_equiv"), loc)
+            fnty = types.Function(AssertEquivTemplate)
+            self.typemap[func_var.name] = fnty
+            out.append(ir.Assign(ir.Global('assert_equiv', assert_equiv, loc),
+                func_var, loc))
+            call = ir.Expr.call(func_var, args, (), loc)
+            self.calltypes[call] = fnty.get_call_type(None,
+                [self.typemap[a.name] for a in args], {})
+            call_var = ir.Var(scope, mk_unique_var("$equiv_check"), loc)
+            self.typemap[call_var.name] = types.none
+            out.append(ir.Assign(call, call_var, loc))
+        self.equiv_checks = []
+        return out
+
+    def _add_equiv_check(self, c1, c2):
+        """record a runtime check that sizes of classes c1 and c2, which are
+        assumed to be equal, are actually equal.
+        """
+        sizes1 = self.class_sizes.get(c1, [])
+        sizes2 = self.class_sizes.get(c2, [])
+        if (c1==UNKNOWN_CLASS or c2==UNKNOWN_CLASS or len(sizes1)==0
+                or len(sizes2)==0):
+            return
+        keys1 = {self._size_key(s) for s in sizes1}
+        if any(self._size_key(s) in keys1 for s in sizes2):
+            return
+        self.equiv_checks.append((sizes1[0], sizes2[0]))
+
+    def _size_key(self, size):
+        """return a key for comparing size values. Variables with a single
+        definition are compared by name, other variables by identity.
+        """
+        if (isinstance(size, ir.Var)
+                and len(self.func_ir._definitions.get(size.name, []))==1):
+            return size.name
+        return size
+
     def _gen_size_call(self, var, i):
         out = []
         ndims = self._get_ndims(var.name)
@@ -460,9 +619,22 @@ class ArrayAnalysis(object):
             LINSPACE_DEFAULT_SIZE = 50
             size = LINSPACE_DEFAULT_SIZE
             if len(args)>=3:
-                size = args[2].name
+                size = args[2]
             new_class = self._get_next_class_with_size(size)
             return [new_class]
+        elif call_name=='arange':
+            # start, stop and step are positional, an optional fourth
+            # argument is the dtype
+            range_args = args[:3]
+            if (kws or len(args)==0 or not all(isinstance(self.typemap[a.name],
+                    (types.Integer, types.Float)) for a in range_args)):
+                return None
+            size_var = self._gen_arange_size(range_args)
+            return [self._get_next_class_with_size(size_var)]
+        elif call_name=='where':
+            # only the array form where(cond, x, y) has the shape of inputs
+            if len(args)==3 and all(self._isarray(a.name) for a in args):
+                return self._broadcast_and_match_shapes([a.name for a in args])
         elif call_name=='dot':
             # https://docs.scipy.org/doc/numpy/reference/generated/numpy.dot.html
             # for multi-dimensional arrays, last dimension of arg1 and second
@@ -499,6 +671,26 @@ class ArrayAnalysis(object):
             print("unknown numpy call:", call_name," ", args)
         return None
 
+    def _gen_arange_size(self, range_args):
+        """generate a call computing the number of elements of
+        np.arange(*range_args) before the current statement and return the
+        size variable.
+        """
+        scope = range_args[0].scope
+        loc = range_args[0].loc
+        func_var = ir.Var(scope, mk_unique_var("$arange_size"), loc)
+        fnty = types.Function(ArangeSizeTemplate)
+        self.typemap[func_var.name] = fnty
+        self.size_nodes.append(ir.Assign(ir.Global('arange_size', arange_size,
+            loc), func_var, loc))
+        call = ir.Expr.call(func_var, list(range_args), (), loc)
+        self.calltypes[call] = fnty.get_call_type(None,
+            [self.typemap[a.name] for a in range_args], {})
+        size_var = ir.Var(scope, mk_unique_var("$arange_size_var"), loc)
+        self.typemap[size_var.name] = types.intp
+        self.size_nodes.append(ir.Assign(call, size_var, loc))
+        return size_var
+
     def _get_second_arg_or_kw(self, args, kws, kw_name):
         arg_var = None
         if len(args)>1:
@@ -599,11 +791,41 @@ class ArrayAnalysis(object):
             changed = False
             for c1,sizes1 in curr_sizes.items():
                 for c2,sizes2 in curr_sizes.items():
-                    if c1!=c2 and set(sizes1) & set(sizes2)!=set():
+                    if (c1!=c2 and c1!=UNKNOWN_CLASS and c2!=UNKNOWN_CLASS
+                            and {self._size_key(s) for s in sizes1}
+                            & {self._size_key(s) for s in sizes2}!=set()):
                         changed = True
                         self._merge_classes(c1,c2)
+                        break
+                if changed:
+                    break
         return
 
+    def get_size_class(self, size):
+        """return the equivalence class with size variable or constant
+        size, or UNKNOWN_CLASS if not found.
+        """
+        key = self._size_key(size)
+        for c, sizes in self.class_sizes.items():
+            if (c!=UNKNOWN_CLASS and c!=CONST_CLASS
+                    and key in {self._size_key(s) for s in sizes}):
+                return c
+        return UNKNOWN_CLASS
+
+    def add_size_equivalence(self, arr, dim, size):
+        """record that dimension dim of array arr has the given size, e.g.
+        after a transformation allocates arr with this size, and return the
+        equivalence class of the dimension.
+        """
+        c = self.array_shape_classes[arr][dim]
+        if c==UNKNOWN_CLASS or c==CONST_CLASS:
+            return c
+        size_class = self.get_size_class(size)
+        if size_class!=UNKNOWN_CLASS:
+            return self._merge_classes(c, size_class)
+        self.class_sizes[c].append(size)
+        return c
+
     def _merge_classes(self, c1, c2):
         # no need to merge if equal classes already
         if c1==c2:
@@ -667,6 +889,7 @@ class ArrayAnalysis(object):
                     if c==CONST_CLASS:
                         c = e[i]
                     else:
+                        self._add_equiv_check(c, e[i])
                         c = self._merge_classes(c, e[i])
             out_eq[i] = c
 
@@ -69,7 +69,8 @@ CR_FIELDS = ["typing_context",
              "library",
              "call_helper",
              "environment",
-             "has_dynamic_globals"]
+             "has_dynamic_globals",
+             "parfor_diagnostics"]
 
 
 class CompileResult(namedtuple("_CompileResult", CR_FIELDS)):
@@ -108,6 +109,7 @@ class CompileResult(namedtuple("_CompileResult", CR_FIELDS)):
                  typing_error=None,
                  call_helper=None,
                  has_dynamic_globals=False,  # by definition
+                 parfor_diagnostics=None,
                  )
         return cr
 
@@ -284,6 +286,7 @@ class Pipeline(object):
         self.typemap = None
         self.calltypes = None
         self.type_annotation = None
+        self.parfor_diagnostics = None
 
         self.status = _CompileStatus(
             can_fallback=self.flags.enable_pyobject,
@@ -490,8 +493,9 @@ class Pipeline(object):
         # Ensure we have an IR and type information.
         assert self.func_ir
         parfor_pass = ParforPass(self.func_ir, self.type_annotation.typemap,
-            self.type_annotation.calltypes, self.return_type)
+            self.type_annotation.calltypes, self.return_type, self.typingctx)
         parfor_pass.run()
+        self.parfor_diagnostics = parfor_pass.diagnostics
 
     def stage_inline_pass(self):
         """
@@ -589,6 +593,7 @@ class Pipeline(object):
                                  fndesc=lowered.fndesc,
                                  environment=lowered.env,
                                  has_dynamic_globals=lowered.has_dynamic_globals,
+                                 parfor_diagnostics=self.parfor_diagnostics,
                                  )
 
     def stage_objectmode_backend(self):
@@ -242,6 +242,26 @@ class _EnvReloader(object):
         NUMBA_NUM_THREADS = _readenv("NUMBA_NUM_THREADS", int,
                                      NUMBA_DEFAULT_NUM_THREADS)
 
+        # Threading layer used by the parallel CPU target: 'tbb', 'omp',
+        # 'workqueue' or 'default' (the first one available in that order)
+        THREADING_LAYER = _readenv("NUMBA_THREADING_LAYER", str, "default")
+
+        # Size in bytes of the tiles of all operands evaluated together
+        # by numba.npyufunc.fuse()
+        UFUNC_TILE_SIZE = _readenv("NUMBA_UFUNC_TILE_SIZE", int, 256 * 1024)
+
+        # parallel loops whose estimated total work (number of iterations
+        # times estimated cost of an iteration) is below this value run on
+        # the calling thread, 0 always uses the thread pool
+        PARALLEL_SEQUENTIAL_THRESHOLD = _readenv(
+            "NUMBA_PARALLEL_SEQUENTIAL_THRESHOLD", int,
+            1000 * NUMBA_NUM_THREADS)
+
+        # count launches and iterations of parallel loops for
+        # Dispatcher.parallel_diagnostics() (disables caching)
+        PARALLEL_DIAGNOSTICS_INSTRUMENT = _readenv(
+            "NUMBA_PARALLEL_DIAGNOSTICS_INSTRUMENT", int, 0)
+
         # Debug Info
 
         # The default value for the `debug` flag
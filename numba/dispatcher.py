@@ -353,6 +353,35 @@ class _DispatcherBase(_dispatcher.Dispatcher):
             print(res.type_annotation, file=file)
             print('=' * 80, file=file)
 
+    def parallel_diagnostics(self, signature=None, level=1, file=None):
+        """
+        Print a report of the parallel loops of the function compiled with
+        ``parallel=True``: where each loop comes from, which loops were fused
+        and why others were not.  The *level* (1 to 3) controls the amount of
+        detail.  Launch and iteration counts of loops are included if
+        :envvar:`NUMBA_PARALLEL_DIAGNOSTICS_INSTRUMENT` was set at compile
+        time.
+
+        By default the report is printed for all compiled signatures.
+        """
+        if file is None:
+            file = sys.stdout
+
+        if signature is not None:
+            signatures = [signature]
+        else:
+            signatures = self.signatures
+        for ver in signatures:
+            res = self.overloads[ver]
+            print("%s %s" % (self.py_func.__name__, ver), file=file)
+            print('=' * 80, file=file)
+            if res.parfor_diagnostics is None:
+                print("No parallel diagnostics available, the function was "
+                      "not compiled with parallel=True.", file=file)
+            else:
+                res.parfor_diagnostics.dump(level, file)
+            print('=' * 80, file=file)
+
     def inspect_cfg(self, signature=None, show_wrapper=None):
         """
         For inspecting the CFG of the function.
@@ -348,7 +348,8 @@ def add_offset_to_labels(blocks, offset):
     """
     new_blocks = {}
     for l,b in blocks.items():
-        term = b.body[-1]
+        # some blocks (like the last block of a parfor body) can be empty
+        term = b.body[-1] if b.body else None
         if isinstance(term, ir.Jump):
             term.target += offset
         if isinstance(term, ir.Branch):
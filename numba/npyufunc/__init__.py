@@ -2,6 +2,8 @@
 from __future__ import print_function, division, absolute_import
 
 from .decorators import Vectorize, GUVectorize, vectorize, guvectorize
+from .parallel import threading_layer, parallel_pool_info
+from .fused import fuse, FusedExpression
 from ._internal import PyUFunc_None, PyUFunc_Zero, PyUFunc_One
 from . import _internal, array_exprs, parfor
 if hasattr(_internal, 'PyUFunc_ReorderableNone'):
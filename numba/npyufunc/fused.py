@@ -0,0 +1,181 @@
+"""
+Tiled evaluation of expressions made of ufunc calls.
+
+Evaluating ``u2(u1(a, b), c)`` on large arrays makes each ufunc sweep its
+whole operands, and the temporary result of ``u1`` goes to and back from
+memory.  A FusedExpression evaluates the expression on tiles of the inputs
+instead, sized so that a tile of every operand and temporary fits in the
+CPU cache, and writes each result tile into the output.
+"""
+from __future__ import print_function, division, absolute_import
+
+import itertools
+import os
+import threading
+
+import numpy as np
+
+from numba import config
+
+
+def _tile_indices(shape, elem_bytes, tile_size):
+    """
+    The indices of the tiles of the C-ordered iteration space *shape* with
+    *elem_bytes* bytes per element (of all operands), each taking about
+    *tile_size* bytes, or None if the whole space fits in one tile.
+
+    The trailing dimensions that fit in a tile are taken whole, and the
+    first dimension that doesn't is sliced, so that tiles are consecutive
+    ranges of the flattened space even if the leading dimensions are
+    short, e.g. a few very wide rows.
+    """
+    tile_elems = max(1, tile_size // max(1, elem_bytes))
+    if int(np.prod(shape)) <= tile_elems:
+        return None
+    # Find the dimension *axis* to slice
+    axis = len(shape) - 1
+    inner = 1
+    while axis > 0 and inner * shape[axis] <= tile_elems:
+        inner *= shape[axis]
+        axis -= 1
+    step = max(1, tile_elems // inner)
+    n = shape[axis]
+    slices = [slice(start, min(start + step, n))
+              for start in range(0, n, step)]
+    outer = itertools.product(*[range(d) for d in shape[:axis]])
+    return [prefix + (sl,) for prefix in outer for sl in slices]
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _get_thread_pool():
+    """
+    The thread pool evaluating tiles with target='parallel', created the
+    first time it is needed in each process and shared by all fused
+    expressions.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        # The threads of a pool don't survive a fork
+        if _pool is None or _pool_pid != os.getpid():
+            from multiprocessing.pool import ThreadPool
+            _pool = ThreadPool(config.NUMBA_NUM_THREADS,
+                               initializer=_init_worker)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _init_worker():
+    _worker_state.in_pool = True
+
+
+def _in_pool_worker():
+    # Fused expressions called from a tile of another one run sequentially,
+    # waiting for the pool from one of its threads could deadlock
+    return getattr(_worker_state, 'in_pool', False)
+
+
+class FusedExpression(object):
+    """
+    A function of arrays, typically a chain of ufunc calls (Numpy ufuncs,
+    DUFuncs or ufuncs built with @vectorize), evaluated tile by tile.
+    Array arguments are broadcast together and their iteration space is
+    split into tiles (views of the broadcast arrays), the function is
+    called on each tile and returns an array (or a tuple of arrays) of the
+    tile's shape.
+    """
+
+    def __init__(self, py_func, tile_size=None, target='cpu'):
+        if target not in ('cpu', 'parallel'):
+            raise ValueError("Unsupported target: %s" % target)
+        self.py_func = py_func
+        self.tile_size = tile_size
+        self.target = target
+        self.__name__ = getattr(py_func, '__name__', type(self).__name__)
+        self.__doc__ = py_func.__doc__
+
+    def _get_tile_size(self):
+        if self.tile_size is not None:
+            return self.tile_size
+        return config.UFUNC_TILE_SIZE
+
+    def __call__(self, *args):
+        is_array = [isinstance(a, np.ndarray) and a.ndim > 0 for a in args]
+        if not any(is_array):
+            return self.py_func(*args)
+        arrays = np.broadcast_arrays(*[a for a, isarr in zip(args, is_array)
+                                       if isarr])
+        shape = arrays[0].shape
+        # A tile of every array argument, plus an output tile
+        itemsizes = [a.dtype.itemsize for a in arrays]
+        tiles = _tile_indices(shape, sum(itemsizes) + max(itemsizes),
+                              self._get_tile_size())
+        if tiles is None:
+            return self.py_func(*args)
+
+        def eval_tile(index):
+            it = iter(arrays)
+            tile_args = [next(it)[index] if isarr else a
+                         for a, isarr in zip(args, is_array)]
+            return self.py_func(*tile_args)
+
+        # The first tile gives the output types
+        first = eval_tile(tiles[0])
+        is_tuple = isinstance(first, tuple)
+        firsts = first if is_tuple else (first,)
+        outs = tuple(np.empty(shape, np.asarray(res).dtype) for res in firsts)
+
+        def store_tile(index, res):
+            for out, r in zip(outs, res if is_tuple else (res,)):
+                out[index] = r
+
+        store_tile(tiles[0], first)
+        rest = tiles[1:]
+        if self.target == 'parallel' and not _in_pool_worker():
+            # Tiles run concurrently, the ufunc loops release the GIL
+            pool = _get_thread_pool()
+            chunksize = max(1, len(rest) // (4 * config.NUMBA_NUM_THREADS))
+            for index, res in zip(rest, pool.imap(eval_tile, rest,
+                                                  chunksize)):
+                store_tile(index, res)
+        else:
+            for index in rest:
+                store_tile(index, eval_tile(index))
+        return outs if is_tuple else outs[0]
+
+
+def fuse(func=None, tile_size=None, target='cpu'):
+    """fuse(func=None, tile_size=None, target='cpu')
+
+    A decorator evaluating a function of arrays made of ufunc calls tile by
+    tile, so that temporaries between the ufuncs of a chain stay in cache
+    instead of sweeping memory once per ufunc.
+
+    Args
+    -----
+    tile_size: int
+        The number of bytes of a tile of all array arguments and of the
+        output, defaults to :envvar:`NUMBA_UFUNC_TILE_SIZE`.
+
+    target: str
+        'cpu' evaluates tiles one after another, 'parallel' evaluates them
+        concurrently on a pool of threads.  With 'parallel', the function
+        must be safe to call from several threads at once and should not
+        call ufuncs built with target='parallel'.
+
+    Examples
+    -------
+        @fuse
+        def hypot_plus(a, b, c):
+            return np.add(np.hypot(a, b), c)
+    """
+    def wrap(func):
+        return FusedExpression(func, tile_size=tile_size, target=target)
+
+    if func is not None:
+        return wrap(func)
+    return wrap
@@ -0,0 +1,124 @@
+/*
+Implement parallel vectorize workqueue on top of OpenMP.
+
+Tasks added with add_task() are collected and run as the iterations of an
+OpenMP parallel loop when synchronize() is called.
+
+**WARNING**
+This module is not thread-safe.  Adding task to queue is not protected from
+race condition.
+
+Most OpenMP runtimes (e.g. GNU libgomp) hang when used in a child process
+after fork() if the parent has used them, so tasks run sequentially in such
+children, with a warning printed the first time.
+*/
+
+#include <omp.h>
+#include <string.h>
+#include <stdio.h>
+#include <vector>
+#ifndef _MSC_VER
+    #include <pthread.h>
+#endif
+#include "workqueue.h"
+#include "../_pymodule.h"
+#include "gufunc_scheduler.h"
+
+typedef struct {
+    void *fn;
+    void *args;
+    void *dims;
+    void *steps;
+    void *data;
+} task_t;
+
+static std::vector<task_t> tasks;
+static int num_threads = 0;
+/* Whether the OpenMP runtime has been used in this process */
+static int omp_used = 0;
+/* Whether this is a child forked from a process that used OpenMP */
+static int forked_child = 0;
+/* Whether the sequential fallback in forked children has been reported */
+static int forked_warned = 0;
+
+static void reset_after_fork(void) {
+    if (omp_used)
+        forked_child = 1;
+}
+
+static void
+add_task(void *fn, void *args, void *dims, void *steps, void *data) {
+    task_t task = {fn, args, dims, steps, data};
+    tasks.push_back(task);
+}
+
+static void launch_threads(int count) {
+    if (num_threads)
+        return;
+    if (count < 1)
+        count = omp_get_num_procs();
+    num_threads = count;
+#ifndef _MSC_VER
+    pthread_atfork(0, 0, reset_after_fork);
+#endif
+}
+
+static void synchronize(void) {
+    int ntasks = (int)tasks.size();
+    if (forked_child) {
+        if (!forked_warned) {
+            forked_warned = 1;
+            fprintf(stderr, "NumbaWarning: the 'omp' threading layer can't "
+                    "be used in a child process forked after the parent "
+                    "used it, parallel work runs sequentially in this "
+                    "process. Use NUMBA_THREADING_LAYER=workqueue or the "
+                    "'spawn' or 'forkserver' start methods to run it in "
+                    "parallel.\n");
+            fflush(stderr);
+        }
+        for (int i = 0; i < ntasks; i++) {
+            task_t *task = &tasks[i];
+            auto func = reinterpret_cast<void (*)(void *args, void *dims, void *steps, void *data)>(task->fn);
+            func(task->args, task->dims, task->steps, task->data);
+        }
+        tasks.clear();
+        return;
+    }
+    omp_used = 1;
+    #pragma omp parallel for num_threads(num_threads) schedule(static, 1)
+    for (int i = 0; i < ntasks; i++) {
+        task_t *task = &tasks[i];
+        auto func = reinterpret_cast<void (*)(void *args, void *dims, void *steps, void *data)>(task->fn);
+        func(task->args, task->dims, task->steps, task->data);
+    }
+    tasks.clear();
+}
+
+static void ready(void) {
+}
+
+static int is_launched(void) {
+    return num_threads && !forked_child;
+}
+
+MOD_INIT(omppool) {
+    PyObject *m;
+    MOD_DEF(m, "omppool", "No docs", NULL)
+    if (m == NULL)
+        return MOD_ERROR_VAL;
+
+    PyObject_SetAttrString(m, "launch_threads",
+                           PyLong_FromVoidPtr((void*)&launch_threads));
+    PyObject_SetAttrString(m, "synchronize",
+                           PyLong_FromVoidPtr((void*)&synchronize));
+    PyObject_SetAttrString(m, "ready",
+                           PyLong_FromVoidPtr((void*)&ready));
+    PyObject_SetAttrString(m, "add_task",
+                           PyLong_FromVoidPtr((void*)&add_task));
+    PyObject_SetAttrString(m, "do_scheduling",
+                           PyLong_FromVoidPtr((void*)&do_scheduling));
+    PyObject_SetAttrString(m, "is_launched",
+                           PyLong_FromVoidPtr((void*)&is_launched));
+
+    return MOD_SUCCESS_VAL(m);
+}
@@ -13,6 +13,7 @@ from __future__ import print_function, absolute_import
 
 import sys
 import os
+import warnings
 
 import numpy as np
 
@@ -21,7 +22,7 @@ import llvmlite.binding as ll
 
 from numba.npyufunc import ufuncbuilder
 from numba.numpy_support import as_dtype
-from numba import types, utils, cgutils, config
+from numba import types, utils, cgutils, config, errors
 
 def get_thread_count():
     """
@@ -228,8 +229,8 @@ class ParallelGUFuncBuilder(ufuncbuilder.GUFuncBuilder):
         _init()
 
         # Build wrapper for ufunc entry point
-        ptr, env, wrapper_name = build_gufunc_wrapper(self.py_func, cres, self.sin, self.sout,
-                                        cache=self.cache)
+        ptr, env, wrapper_name, _ = build_gufunc_wrapper(self.py_func, cres,
+                                        self.sin, self.sout, cache=self.cache)
 
         # Get dtypes
         dtypenums = []
@@ -244,6 +245,10 @@ class ParallelGUFuncBuilder(ufuncbuilder.GUFuncBuilder):
 
 
 def build_gufunc_wrapper(py_func, cres, sin, sout, cache):
+    """Build the gufunc wrapper of cres and a kernel that dispatches it to
+    the threads. Returns (kernel ptr, environment, kernel name, name of the
+    sequential gufunc wrapper).
+    """
     library = cres.library
     ctx = cres.target_context
     signature = cres.signature
@@ -255,7 +260,7 @@ def build_gufunc_wrapper(py_func, cres, sin, sout, cache):
 
     ptr, name = build_gufunc_kernel(library, ctx, innerfunc, signature, inner_ndim)
 
-    return ptr, env, name
+    return ptr, env, name, wrapper_name
 
 
 def build_gufunc_kernel(library, ctx, innerfunc, sig, inner_ndim):
@@ -404,27 +409,134 @@ def build_gufunc_kernel(library, ctx, innerfunc, sig, inner_ndim):
 # ---------------------------------------------------------------------------
 
 
+# Threading layers in order of preference when NUMBA_THREADING_LAYER is
+# 'default'.  TBB composes with other TBB based libraries (nested
+# parallelism doesn't oversubscribe the machine).  The workqueue is always
+# built and, unlike the OpenMP runtimes, is safe to use after fork(), so
+# 'omp' is only used when asked for explicitly.
+_threading_layer_priority = ('tbb', 'workqueue', 'omp')
+
+_threading_layer = None
+_threading_lib = None
+_launch_pid = None
+
+
+def _load_threading_lib(name):
+    """
+    Import the extension module implementing threading layer *name*,
+    return None if it wasn't built or its runtime library can't be loaded.
+    """
+    try:
+        if name == 'tbb':
+            from . import tbbpool as lib
+        elif name == 'omp':
+            from . import omppool as lib
+        elif name == 'workqueue':
+            from . import workqueue as lib
+        else:
+            return None
+    except ImportError:
+        return None
+    return lib
+
+
+def _select_threading_layer():
+    """
+    Choose the threading layer from NUMBA_THREADING_LAYER.  A requested
+    layer which isn't available falls back to the default order with a
+    warning.
+    """
+    requested = str(config.THREADING_LAYER).lower()
+    if requested != 'default':
+        if requested not in _threading_layer_priority:
+            raise ValueError("Invalid value for NUMBA_THREADING_LAYER: %r, "
+                             "expected one of %s" %
+                             (requested, ('default',) +
+                              _threading_layer_priority))
+        lib = _load_threading_lib(requested)
+        if lib is not None:
+            return requested, lib
+        warnings.warn("The %r threading layer requested by "
+                      "NUMBA_THREADING_LAYER is not available, falling back "
+                      "to the default threading layer" % (requested,),
+                      errors.NumbaWarning)
+    for name in _threading_layer_priority:
+        lib = _load_threading_lib(name)
+        if lib is not None:
+            return name, lib
+    raise ValueError("No threading layer could be loaded")
+
+
+def threading_layer():
+    """
+    Get the name of the threading layer used by the parallel CPU target,
+    one of 'tbb', 'omp' or 'workqueue'.  The threading layer is chosen
+    the first time parallel code is compiled, this raises ValueError if
+    that hasn't happened yet.
+    """
+    if _threading_layer is None:
+        raise ValueError("Threading layer is not initialized.")
+    return _threading_layer
+
+
+def parallel_pool_info():
+    """
+    Return a dict describing the thread pool of the parallel CPU target in
+    the current process:
+
+    - 'threading_layer': the name of the threading layer, None if it
+      hasn't been chosen yet
+    - 'num_threads': the number of threads parallel work is split into
+    - 'launched': whether the worker threads currently exist in this
+      process.  Child processes created with fork() inherit the threading
+      layer but not the threads, which are launched again on first use
+      (with the 'omp' layer, parallel work runs sequentially in such
+      children instead, as OpenMP runtimes aren't fork safe).
+    - 'pid': the id of the current process
+    - 'launch_pid': the id of the process in which the threading layer
+      was chosen, differs from 'pid' in forked children
+    """
+    from ctypes import CFUNCTYPE, c_int
+
+    launched = False
+    if _threading_lib is not None:
+        is_launched = CFUNCTYPE(c_int)(_threading_lib.is_launched)
+        launched = bool(is_launched())
+    return {'threading_layer': _threading_layer,
+            'num_threads': NUM_THREADS,
+            'launched': launched,
+            'pid': os.getpid(),
+            'launch_pid': _launch_pid,
+            }
+
+
 def _launch_threads():
     """
     Initialize work queues and workers
     """
-    from . import workqueue as lib
     from ctypes import CFUNCTYPE, c_int
 
-    launch_threads = CFUNCTYPE(None, c_int)(lib.launch_threads)
+    global _threading_layer, _threading_lib, _launch_pid
+    if _threading_lib is not None:
+        # Launched already, possibly in a parent process: the threading
+        # layers relaunch their threads after fork() by themselves.
+        return
+
+    _threading_layer, _threading_lib = _select_threading_layer()
+    _launch_pid = os.getpid()
+    launch_threads = CFUNCTYPE(None, c_int)(_threading_lib.launch_threads)
     launch_threads(NUM_THREADS)
 
 
 _is_initialized = False
 
 def _init():
-    from . import workqueue as lib
-    from ctypes import CFUNCTYPE, c_void_p
-
     global _is_initialized
     if _is_initialized:
         return
 
+    _launch_threads()
+    lib = _threading_lib
     ll.add_symbol('numba_add_task', lib.add_task)
     ll.add_symbol('numba_synchronize', lib.synchronize)
     ll.add_symbol('numba_ready', lib.ready)
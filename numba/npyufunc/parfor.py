@@ -4,7 +4,7 @@ import ast
 from collections import defaultdict, OrderedDict
 import sys
 
-from .. import compiler, ir, types, six, cgutils, sigutils
+from .. import compiler, ir, types, six, cgutils, sigutils, ir_utils
 from numba.ir_utils import (add_offset_to_labels, replace_var_names,
                             remove_dels, legalize_names, mk_unique_var, 
 			    rename_labels, get_name_var_table)
@@ -12,6 +12,7 @@ from ..typing import signature
 from numba import config
 import llvmlite.llvmpy.core as lc
 import numba
+import numpy
 import copy
 
 
@@ -26,7 +27,8 @@ def _lower_parfor_parallel(lowerer, parfor):
        to divide the iteration space for each thread, allocates
        reduction arrays, calls the gufunc function, and then invokes
        the reduction function across the reduction arrays to produce
-       the final reduction values.
+       the final reduction values. Iteration spaces that are too small
+       for the estimated cost of the body run on the calling thread.
     """
     typingctx = lowerer.context.typing_context
     targetctx = lowerer.context
@@ -44,10 +46,14 @@ def _lower_parfor_parallel(lowerer, parfor):
             print("lower init_block instr = ", instr)
         lowerer.lower_inst(instr)
 
+    if config.PARALLEL_DIAGNOSTICS_INSTRUMENT:
+        _add_parfor_counters(lowerer, parfor)
+
     # run get_parfor_outputs() and get_parfor_reductions() before gufunc creation
     # since Jumps are modified so CFG of loop_body dict will become invalid
     parfor_output_arrays = numba.parfor.get_parfor_outputs(parfor)
     parfor_redvars, parfor_reddict = numba.parfor.get_parfor_reductions(parfor)
+    seq_threshold = numba.parfor.get_sequential_threshold(parfor)
     # compile parfor body as a separate function to be used with GUFuncWrapper
     flags = compiler.Flags()
     flags.set('error_model', 'numpy')
@@ -62,7 +68,11 @@ def _lower_parfor_parallel(lowerer, parfor):
         print("num_inputs = ", num_inputs)
         print("parfor_outputs = ", parfor_output_arrays)
         print("parfor_redvars = ", parfor_redvars)
-    gu_signature = _create_shape_signature(array_shape_classes, num_inputs, num_reductions, func_args, func_sig)
+    # private copies of arrays reduced into have the shape of the arrays
+    array_redarrs = [var + "_arr" for var in parfor_redvars
+                     if isinstance(typemap[var], types.Array)]
+    gu_signature = _create_shape_signature(array_shape_classes, num_inputs,
+        num_reductions, func_args, func_sig, array_redarrs)
     if config.DEBUG_ARRAY_OPT:
         print("gu_signature = ", gu_signature)
 
@@ -74,7 +84,9 @@ def _lower_parfor_parallel(lowerer, parfor):
     array_size_vars = parfor.array_analysis.array_size_vars
     if config.DEBUG_ARRAY_OPT:
         print("array_size_vars = ", sorted(array_size_vars.items()))
-    call_parallel_gufunc(lowerer, func, gu_signature, func_sig, func_args, loop_ranges, array_size_vars, parfor_redvars, parfor_reddict, parfor.init_block)
+    call_parallel_gufunc(lowerer, func, gu_signature, func_sig, func_args,
+        loop_ranges, array_size_vars, parfor_redvars, parfor_reddict,
+        parfor.init_block, seq_threshold)
     if config.DEBUG_ARRAY_OPT:
         sys.stdout.flush()
 
@@ -82,12 +94,44 @@ def _lower_parfor_parallel(lowerer, parfor):
 numba.parfor.lower_parfor_parallel = _lower_parfor_parallel
 
 
-def _create_shape_signature(classes, num_inputs, num_reductions, args, func_sig):
+def _add_parfor_counters(lowerer, parfor):
+    '''Increment the runtime counters of parfor (number of launches and
+    total number of iterations) that are reported by parallel diagnostics.
+    '''
+    context = lowerer.context
+    builder = lowerer.builder
+    counters = numba.parfor.parfor_counters.setdefault(parfor.id,
+        numpy.zeros(2, numpy.intp))
+    zero = context.get_constant(types.intp, 0)
+    one = context.get_constant(types.intp, 1)
+
+    def load_range(v):
+        if isinstance(v, ir.Var):
+            return context.cast(builder, lowerer.loadvar(v.name),
+                                lowerer.fndesc.typemap[v.name], types.intp)
+        else:
+            return context.get_constant(types.intp, v)
+
+    iterations = one
+    for loop in parfor.loop_nests:
+        count = builder.sub(load_range(loop.stop), load_range(loop.start))
+        count = builder.select(builder.icmp_signed('>', count, zero), count,
+                               zero)
+        iterations = builder.mul(iterations, count)
+    ptr = context.add_dynamic_addr(builder, counters.ctypes.data,
+                                   info="parfor counters")
+    ptr = builder.bitcast(ptr, lc.Type.pointer(context.get_value_type(types.intp)))
+    builder.atomic_rmw('add', ptr, one, 'monotonic')
+    builder.atomic_rmw('add', builder.gep(ptr, [one]), iterations, 'monotonic')
+
+
+def _create_shape_signature(classes, num_inputs, num_reductions, args, func_sig,
+                            array_redarrs=()):
     '''Create shape signature for GUFunc
     '''
     num_inouts = len(args) - num_reductions
     # maximum class number for array shapes
-    max_shape_num = max(sum([list(x) for x in classes.values()], []))
+    max_shape_num = max(sum([list(x) for x in classes.values()], [0]))
     if config.DEBUG_ARRAY_OPT:
         print("create_shape_signature = ", max_shape_num)
     gu_sin = []
@@ -99,8 +143,13 @@ def _create_shape_signature(classes, num_inputs, num_reductions, args, func_sig)
         count = count + 1
         if isinstance(typ, types.Array):
             if var in classes:
-                var_shape = classes[var]
+                var_shape = list(classes[var])
                 assert len(var_shape) == typ.ndim
+                # dimensions of unknown size get their own symbols
+                for i in range(typ.ndim):
+                    if var_shape[i] == -1:
+                        max_shape_num = max_shape_num + 1
+                        var_shape[i] = max_shape_num
             else:
                 var_shape = []
                 for i in range(typ.ndim):
@@ -111,8 +160,9 @@ def _create_shape_signature(classes, num_inputs, num_reductions, args, func_sig)
         else:
             dim_syms = ()
         if (count > num_inouts):
-            # assume all reduction vars are scalar
-            gu_sout.append(())
+            # scalar reduction vars are passed as 1D arrays of partial
+            # results, array reduction vars as the private copy of a thread
+            gu_sout.append(dim_syms if var in array_redarrs else ())
         elif count > num_inputs and all([s in syms_sin for s in dim_syms]):
             # only when dim_syms are found in gu_sin, we consider this as output
             gu_sout.append(dim_syms)
@@ -168,11 +218,16 @@ def _create_gufunc_for_parfor_body(lowerer, parfor, typemap, typingctx, targetct
         print("parfor_redvars = ", parfor_redvars, " ", type(parfor_redvars))
 
     # Reduction variables are represented as arrays, so they go under different names.
+    # Arrays reduced into are replaced by the private copy of the thread.
     parfor_redarrs = []
     for var in parfor_redvars:
        arr = var + "_arr"
        parfor_redarrs.append(arr)
-       typemap[arr] = types.npytypes.Array(typemap[var], 1, "C")
+       vartyp = typemap[var]
+       if isinstance(vartyp, types.Array):
+           typemap[arr] = vartyp.copy(layout="C")
+       else:
+           typemap[arr] = types.npytypes.Array(vartyp, 1, "C")
 
     # Reorder all the params so that inputs go first then outputs.
     parfor_params = parfor_inputs + parfor_outputs + parfor_redarrs
@@ -231,7 +286,10 @@ def _create_gufunc_for_parfor_body(lowerer, parfor, typemap, typingctx, targetct
     gufunc_txt = "def " + gufunc_name + "(sched, " + (", ".join(parfor_params)) + "):\n"
     # Add initialization of reduction variables
     for arr, var in zip(parfor_redarrs, parfor_redvars):
-        gufunc_txt += "    " + param_dict[var] + "=" + param_dict[arr] + "[0]\n"
+        if isinstance(typemap[var], types.Array):
+            gufunc_txt += "    " + param_dict[var] + "=" + param_dict[arr] + "\n"
+        else:
+            gufunc_txt += "    " + param_dict[var] + "=" + param_dict[arr] + "[0]\n"
     # For each dimension of the parfor, create a for loop in the generated gufunc function.
     # Iterate across the proper values extracted from the schedule.
     # The form of the schedule is start_dim0, start_dim1, ..., start_dimN, end_dim0,
@@ -248,7 +306,8 @@ def _create_gufunc_for_parfor_body(lowerer, parfor, typemap, typingctx, targetct
     gufunc_txt += "__sentinel__ = 0\n"
     # Add assignments of reduction variables (for returning the value)
     for arr, var in zip(parfor_redarrs, parfor_redvars):
-        gufunc_txt += "    " + param_dict[arr] + "[0] = " + param_dict[var] + "\n"
+        if not isinstance(typemap[var], types.Array):
+            gufunc_txt += "    " + param_dict[arr] + "[0] = " + param_dict[var] + "\n"
     gufunc_txt += "    return None\n"
 
     if config.DEBUG_ARRAY_OPT:
@@ -324,6 +383,20 @@ def _create_gufunc_for_parfor_body(lowerer, parfor, typemap, typingctx, targetct
             continue
         break
 
+    # Scratch arrays of the body are allocated once per gufunc call
+    # instead of once per iteration.
+    if parfor.private_allocs:
+        _hoist_private_allocs(gufunc_ir, loop_body.keys(),
+                              parfor.private_allocs)
+
+    # Parfors nested in the body (e.g. prange loops that are not perfectly
+    # nested) run sequentially inside each thread.
+    if _has_parfor(gufunc_ir.blocks):
+        ir_utils._max_label = max(ir_utils._max_label,
+                                  max(gufunc_ir.blocks.keys()))
+        numba.parfor.lower_parfor_sequential(gufunc_ir, typemap,
+                                             lowerer.fndesc.calltypes)
+
     gufunc_ir.blocks = rename_labels(gufunc_ir.blocks)
     remove_dels(gufunc_ir.blocks)
 
@@ -341,10 +414,62 @@ def _create_gufunc_for_parfor_body(lowerer, parfor, typemap, typingctx, targetct
     return kernel_func, parfor_args, kernel_sig
 
 
+def _hoist_private_allocs(gufunc_ir, body_labels, private_allocs):
+    '''Move allocations of the given scratch arrays from the parfor body to
+    the entry block of the gufunc (see numba.parfor.hoist).  Definitions of
+    constants, globals and attributes used by the allocations are copied
+    along.
+    '''
+    defs = {}
+    allocs = []
+    for label in body_labels:
+        block = gufunc_ir.blocks[label]
+        new_body = []
+        for stmt in block.body:
+            if isinstance(stmt, ir.Assign):
+                rhs = stmt.value
+                if stmt.target.name in private_allocs:
+                    allocs.append(stmt)
+                    continue
+                if (isinstance(rhs, (ir.Const, ir.Global, ir.FreeVar))
+                        or (isinstance(rhs, ir.Expr) and rhs.op in
+                            ('getattr', 'static_getitem', 'build_tuple'))):
+                    defs.setdefault(stmt.target.name, stmt)
+            new_body.append(stmt)
+        block.body = new_body
+
+    hoisted = []
+    hoisted_names = set()
+    def add_stmt(stmt):
+        rhs = stmt.value
+        if isinstance(rhs, ir.Expr):
+            for v in rhs.list_vars():
+                if v.name in defs and v.name not in hoisted_names:
+                    hoisted_names.add(v.name)
+                    add_stmt(copy.copy(defs[v.name]))
+        hoisted.append(stmt)
+
+    for stmt in allocs:
+        add_stmt(stmt)
+    entry_block = gufunc_ir.blocks[min(gufunc_ir.blocks.keys())]
+    entry_block.body = entry_block.body[:-1] + hoisted + entry_block.body[-1:]
+
+
+def _has_parfor(blocks):
+    for block in blocks.values():
+        for inst in block.body:
+            if isinstance(inst, numba.parfor.Parfor):
+                return True
+    return False
+
+
 def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
-                    loop_ranges, array_size_vars, redvars, reddict, init_block):
+                    loop_ranges, array_size_vars, redvars, reddict, init_block,
+                    seq_threshold=0):
     '''
     Adds the call to the gufunc function from the main function.
+    If the number of iterations is less than seq_threshold, the gufunc is
+    called on the calling thread without launching the thread pool.
     '''
     context = lowerer.context
     builder = lowerer.builder
@@ -369,8 +494,8 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
     _launch_threads()
     _init()
 
-    wrapper_ptr, env, wrapper_name = build_gufunc_wrapper(llvm_func, cres, sin,
-                                                            sout, {})
+    wrapper_ptr, env, wrapper_name, seq_wrapper_name = build_gufunc_wrapper(
+        llvm_func, cres, sin, sout, {})
     cres.library._ensure_finalized()
 
     if config.DEBUG_ARRAY_OPT:
@@ -379,7 +504,8 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
     # loadvars for loop_ranges
     def load_range(v):
         if isinstance(v, ir.Var):
-            return lowerer.loadvar(v.name)
+            return context.cast(builder, lowerer.loadvar(v.name),
+                                lowerer.fndesc.typemap[v.name], types.intp)
         else:
             return context.get_constant(types.intp, v)
 
@@ -431,15 +557,6 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
     sched_size = get_thread_count() * num_dim * 2
     sched = cgutils.alloca_once(builder, intp_t,
             size = context.get_constant(types.intp, sched_size), name = "sched")
-    debug_flag = 1 if config.DEBUG_ARRAY_OPT else 0
-    scheduling_fnty = lc.Type.function(intp_ptr_t,
-        [intp_t, intp_ptr_t, intp_ptr_t, uintp_t, intp_ptr_t, intp_t])
-    do_scheduling = builder.module.get_or_insert_function(scheduling_fnty,
-                                                        name="do_scheduling")
-    builder.call(do_scheduling, [context.get_constant(types.intp, num_dim),
-        dim_starts, dim_stops,
-        context.get_constant(types.uintp, get_thread_count()), sched,
-        context.get_constant(types.intp, debug_flag)])
 
     # init reduction array allocation here.
     nredvars = len(redvars)
@@ -447,9 +564,21 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
     redarrs = []
     for i in range(nredvars):
         # arr = expr_args[-(nredvars - i)]
-        val = lowerer.loadvar(redvars[i])
+        # Each thread starts from the identity of the reduction operator,
+        # partial results are combined with the initial value at the end.
+        redtyp = lowerer.fndesc.typemap[redvars[i]]
+        op, imop = reddict[redvars[i]]
+        if isinstance(redtyp, types.Array):
+            redarrs.append(_alloc_private_copies(lowerer, redvars[i], redtyp,
+                numba.parfor._reduction_identities[imop], get_thread_count()))
+            continue
+        if imop in numba.parfor._reduction_identities:
+            val = context.get_constant(redtyp,
+                                       numba.parfor._reduction_identities[imop])
+        else:
+            val = lowerer.loadvar(redvars[i])
         # cgutils.printf(builder, "nredvar(" + redvars[i] + ") = %d\n", val)
-        typ = context.get_value_type(lowerer.fndesc.typemap[redvars[i]])
+        typ = context.get_value_type(redtyp)
         size = get_thread_count()
         arr = cgutils.alloca_once(builder, typ,
                                 size = context.get_constant(types.intp, size))
@@ -458,14 +587,6 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
             dst = builder.gep(arr, [ context.get_constant(types.intp, j) ])
             builder.store(val, dst)
 
-    if config.DEBUG_ARRAY_OPT:
-      for i in range(get_thread_count()):
-        cgutils.printf(builder, "sched[" + str(i) + "] = ")
-        for j in range(num_dim * 2):
-            cgutils.printf(builder, "%d ", builder.load(builder.gep(sched,
-                    [context.get_constant(types.intp, i * num_dim * 2 + j)])))
-        cgutils.printf(builder, "\n")
-
     # Prepare arguments: args, shapes, steps, data
     all_args = [ lowerer.loadvar(x) for x in expr_args[:ninouts] ] + redarrs
     num_args = len(all_args)
@@ -482,6 +603,13 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
         aty = outer_sig.args[i + 1] # skip first argument sched
         dst = builder.gep(args, [context.get_constant(types.intp, i + 1)])
         if i >= ninouts: # reduction variables
+            if isinstance(lowerer.fndesc.typemap[redvars[i - ninouts]],
+                          types.Array):
+                # private copies of an array, one per thread
+                strides = cgutils.unpack_tuple(builder, arg.strides,
+                                               aty.ndim + 1)
+                array_strides.extend(strides[1:])
+                arg = arg.data
             builder.store(builder.bitcast(arg, byte_ptr_t), dst)
         elif isinstance(aty, types.ArrayCompatible):
             ary = context.make_array(aty)(context, builder, arg)
@@ -511,30 +639,42 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
         if config.DEBUG_ARRAY_OPT:
             print("var = ", var, " gu_sig = ", gu_sig)
         i = 0
+        # arrays not tracked by array analysis get sizes from their shape
+        var_sizes = array_size_vars.get(var, [None] * len(gu_sig))
         for dim_sym in gu_sig:
-            dim = array_size_vars[var][i]
+            dim = var_sizes[i]
             if isinstance(dim, ir.Var):
                 sig_dim_dict[dim_sym] = lowerer.loadvar(dim.name)
-            elif isinstance(dim, int):
+            elif isinstance(dim, int) and dim >= 0:
                 sig_dim_dict[dim_sym] = context.get_constant(types.intp, dim)
             else:
                 # raise NotImplementedError("wrong dimension value encoutered: ", dim)
                 if config.DEBUG_ARRAY_OPT:
                     print("var = ", var, " type = ", aty)
                 ary = context.make_array(aty)(context, builder, arg)
-                shapes = cgutils.unpack_tuple(builder, ary.strides, aty.ndim)
+                shapes = cgutils.unpack_tuple(builder, ary.shape, aty.ndim)
                 sig_dim_dict[dim_sym] = shapes[i]
             if not (dim_sym in occurances):
                 if config.DEBUG_ARRAY_OPT:
                     print("dim_sym = ", dim_sym, ", size = ", array_size_vars[var][i])
                 occurances.append(dim_sym)
             i = i + 1
+    # the private copies of arrays reduced into have the shape of the arrays
+    for var, gu_sig in zip(redvars, sout[len(sout) - nredvars:]):
+        redtyp = lowerer.fndesc.typemap[var]
+        if not isinstance(redtyp, types.Array):
+            continue
+        ary = context.make_array(redtyp)(context, builder, lowerer.loadvar(var))
+        var_shape = cgutils.unpack_tuple(builder, ary.shape, redtyp.ndim)
+        for dim_sym, dim in zip(gu_sig, var_shape):
+            sig_dim_dict[dim_sym] = dim
+            if not (dim_sym in occurances):
+                occurances.append(dim_sym)
 
     # Prepare shapes, which is a single number (outer loop size), followed by the size of individual shape variables.
+    # The outer loop size is set before the call below.
     nshapes = len(sig_dim_dict) + 1
     shapes = cgutils.alloca_once(builder, intp_t, size = nshapes, name = "pshape")
-    # For now, outer loop size is the same as number of threads
-    builder.store(context.get_constant(types.intp, get_thread_count()), shapes)
     # Individual shape variables go next
     i = 1
     for dim_sym in occurances:
@@ -555,9 +695,15 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
     for i in range(num_args):
         if i >= ninouts: # steps for reduction vars are abi_sizeof(typ)
             j = i - ninouts
-            typ = context.get_value_type(lowerer.fndesc.typemap[redvars[j]])
-            sizeof = context.get_abi_sizeof(typ)
-            stepsize = context.get_constant(types.intp, sizeof)
+            redtyp = lowerer.fndesc.typemap[redvars[j]]
+            if isinstance(redtyp, types.Array):
+                # the size of the private copy of an array
+                stepsize = cgutils.unpack_tuple(builder, all_args[i].strides,
+                                                redtyp.ndim + 1)[0]
+            else:
+                typ = context.get_value_type(redtyp)
+                sizeof = context.get_abi_sizeof(typ)
+                stepsize = context.get_constant(types.intp, sizeof)
         else:
             # steps are strides
             stepsize = zero
@@ -572,21 +718,86 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
 
     fnty = lc.Type.function(lc.Type.void(), [byte_ptr_ptr_t, intp_ptr_t,
                                              intp_ptr_t, byte_ptr_t])
-    fn = builder.module.get_or_insert_function(fnty, name=wrapper_name)
-    if config.DEBUG_ARRAY_OPT:
-        cgutils.printf(builder, "before calling kernel %p\n", fn)
-    result = builder.call(fn, [args, shapes, steps, data])
-    if config.DEBUG_ARRAY_OPT:
-        cgutils.printf(builder, "after calling kernel %p\n", fn)
+
+    def call_parallel():
+        # Call do_scheduling to divide the iteration space among threads
+        debug_flag = 1 if config.DEBUG_ARRAY_OPT else 0
+        scheduling_fnty = lc.Type.function(intp_ptr_t,
+            [intp_t, intp_ptr_t, intp_ptr_t, uintp_t, intp_ptr_t, intp_t])
+        do_scheduling = builder.module.get_or_insert_function(scheduling_fnty,
+                                                            name="do_scheduling")
+        builder.call(do_scheduling, [context.get_constant(types.intp, num_dim),
+            dim_starts, dim_stops,
+            context.get_constant(types.uintp, get_thread_count()), sched,
+            context.get_constant(types.intp, debug_flag)])
+
+        if config.DEBUG_ARRAY_OPT:
+          for i in range(get_thread_count()):
+            cgutils.printf(builder, "sched[" + str(i) + "] = ")
+            for j in range(num_dim * 2):
+                cgutils.printf(builder, "%d ", builder.load(builder.gep(sched,
+                        [context.get_constant(types.intp, i * num_dim * 2 + j)])))
+            cgutils.printf(builder, "\n")
+
+        # For now, outer loop size is the same as number of threads
+        builder.store(context.get_constant(types.intp, get_thread_count()), shapes)
+        fn = builder.module.get_or_insert_function(fnty, name=wrapper_name)
+        if config.DEBUG_ARRAY_OPT:
+            cgutils.printf(builder, "before calling kernel %p\n", fn)
+        builder.call(fn, [args, shapes, steps, data])
+        if config.DEBUG_ARRAY_OPT:
+            cgutils.printf(builder, "after calling kernel %p\n", fn)
+
+    def call_sequential():
+        # A single schedule covers the whole iteration space, which the
+        # gufunc runs on the calling thread
+        for i in range(num_dim):
+            start, stop, step = loop_ranges[i]
+            builder.store(start, builder.gep(sched,
+                [context.get_constant(types.intp, i)]))
+            builder.store(builder.sub(stop, one), builder.gep(sched,
+                [context.get_constant(types.intp, num_dim + i)]))
+        builder.store(one, shapes)
+        fn = builder.module.get_or_insert_function(fnty, name=seq_wrapper_name)
+        builder.call(fn, [args, shapes, steps, data])
+
+    if seq_threshold > 0:
+        # Waking up the threads costs more than the work of small iteration
+        # spaces, which run sequentially instead
+        niters = one
+        for start, stop, step in loop_ranges:
+            count = builder.sub(stop, start)
+            count = builder.select(builder.icmp_signed('>', count, zero),
+                                   count, zero)
+            niters = builder.mul(niters, count)
+        is_small = builder.icmp_signed('<', niters,
+            context.get_constant(types.intp, seq_threshold))
+        with builder.if_else(is_small) as (sequential, parallel):
+            with sequential:
+                call_sequential()
+            with parallel:
+                call_parallel()
+    else:
+        call_parallel()
 
     scope = init_block.scope
     loc = init_block.loc
     calltypes = lowerer.fndesc.calltypes
+    # Combine the private copies of arrays reduced into with the arrays
+    scalar_redvars = []
+    for name, arr in zip(redvars, redarrs):
+        redtyp = lowerer.fndesc.typemap[name]
+        if isinstance(redtyp, types.Array):
+            _combine_private_copies(lowerer, name, redtyp, arr,
+                numba.parfor.get_reduction_combine_op(*reddict[name])[1])
+        else:
+            scalar_redvars.append((name, arr))
+
     # Accumulate all reduction arrays back to a single value
     for i in range(get_thread_count()):
-        for name, arr in zip(redvars, redarrs):
+        for name, arr in scalar_redvars:
             tmpname = mk_unique_var(name)
-            op, imop = reddict[name]
+            op, imop = numba.parfor.get_reduction_combine_op(*reddict[name])
             src = builder.gep(arr, [context.get_constant(types.intp, i)])
             val = builder.load(src)
             vty = lowerer.fndesc.typemap[name]
@@ -601,3 +812,50 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args,
 
     # TODO: scalar output must be assigned back to corresponding output variables
     return
+
+
+def _alloc_private_copies(lowerer, name, redtyp, identity, num_threads):
+    '''Allocate an array holding one copy per thread of the array *name*
+    that the parfor reduces into, initialized to the *identity* of the
+    reduction operator.
+    '''
+    from numba.targets.arrayobj import _empty_nd_impl
+    context = lowerer.context
+    builder = lowerer.builder
+    ary = context.make_array(redtyp)(context, builder, lowerer.loadvar(name))
+    shapes = ([context.get_constant(types.intp, num_threads)]
+              + cgutils.unpack_tuple(builder, ary.shape, redtyp.ndim))
+    copies_typ = types.Array(redtyp.dtype, redtyp.ndim + 1, "C")
+    copies = _empty_nd_impl(context, builder, copies_typ, shapes)
+    val = context.get_constant(redtyp.dtype, identity)
+    with cgutils.for_range(builder, copies.nitems) as loop:
+        builder.store(val, builder.gep(copies.data, [loop.index]))
+    return copies
+
+
+def _array_reduction_add(arr, copies):
+    for i in range(copies.shape[0]):
+        arr += copies[i]
+
+def _array_reduction_mul(arr, copies):
+    for i in range(copies.shape[0]):
+        arr *= copies[i]
+
+_array_reduction_combiners = {
+    '+': _array_reduction_add,
+    '*': _array_reduction_mul,
+}
+
+
+def _combine_private_copies(lowerer, name, redtyp, copies, op):
+    '''Combine the private copies of the threads into the array *name*
+    with the operator *op*, then release them.
+    '''
+    context = lowerer.context
+    builder = lowerer.builder
+    copies_typ = types.Array(redtyp.dtype, redtyp.ndim + 1, "C")
+    sig = signature(types.none, redtyp, copies_typ)
+    context.compile_internal(builder, _array_reduction_combiners[op], sig,
+                             [lowerer.loadvar(name), copies._getvalue()])
+    if context.enable_nrt:
+        context.nrt.decref(builder, copies_typ, copies._getvalue())
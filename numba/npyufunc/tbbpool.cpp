@@ -89,9 +89,13 @@ static void synchronize(void) {
 static void ready(void) {
 }
 
-MOD_INIT(workqueue) {
+static int is_launched(void) {
+    return tsi != NULL;
+}
+
+MOD_INIT(tbbpool) {
     PyObject *m;
-    MOD_DEF(m, "workqueue", "No docs", NULL)
+    MOD_DEF(m, "tbbpool", "No docs", NULL)
     if (m == NULL)
         return MOD_ERROR_VAL;
 #if PY_MAJOR_VERSION >= 3
@@ -111,6 +115,8 @@ MOD_INIT(workqueue) {
                            PyLong_FromVoidPtr((void*)&add_task));
     PyObject_SetAttrString(m, "do_scheduling",
                            PyLong_FromVoidPtr((void*)&do_scheduling));
+    PyObject_SetAttrString(m, "is_launched",
+                           PyLong_FromVoidPtr((void*)&is_launched));
 
 
     return MOD_SUCCESS_VAL(m);
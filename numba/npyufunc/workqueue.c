@@ -85,8 +85,6 @@ numba_new_thread(void *worker, void *arg)
     pthread_attr_t attr;
     pthread_t th;
 
-    pthread_atfork(0, 0, reset_after_fork);
-
     /* Create detached threads */
     pthread_attr_init(&attr);
     pthread_attr_setdetachstate(&attr, PTHREAD_CREATE_DETACHED);
@@ -219,10 +217,17 @@ queue_state_wait(Queue *queue, int old, int repl)
 static void
 add_task(void *fn, void *args, void *dims, void *steps, void *data) {
     void (*func)(void *args, void *dims, void *steps, void *data) = fn;
+    Queue *queue;
+    Task *task;
 
-    Queue *queue = &queues[queue_pivot];
+    /* The worker threads don't exist in a child process after fork(),
+       launch them again on first use. */
+    if (!queues)
+        launch_threads(queue_count);
 
-    Task *task = &queue->task;
+    queue = &queues[queue_pivot];
+
+    task = &queue->task;
     task->func = func;
     task->args = args;
     task->dims = dims;
@@ -255,6 +260,13 @@ void thread_worker(void *arg) {
 }
 
 static void launch_threads(int count) {
+#ifdef NUMBA_PTHREAD
+    static int atfork_registered = 0;
+    if (!atfork_registered) {
+        pthread_atfork(0, 0, reset_after_fork);
+        atfork_registered = 1;
+    }
+#endif
     if (!queues) {
         /* If queues are not yet allocated,
            create them, one for each thread. */
@@ -287,10 +299,17 @@ static void ready(void) {
     }
 }
 
+static int is_launched(void) {
+    return queues != NULL;
+}
+
 static void reset_after_fork(void)
 {
+    /* The queues may be in any state in the parent, start over with
+       fresh ones (and new threads) when the child first adds a task. */
     free(queues);
     queues = NULL;
+    queue_pivot = 0;
 }
 
 MOD_INIT(workqueue) {
@@ -309,6 +328,8 @@ MOD_INIT(workqueue) {
                            PyLong_FromVoidPtr(&add_task));
     PyObject_SetAttrString(m, "do_scheduling",
                            PyLong_FromVoidPtr(&do_scheduling));
+    PyObject_SetAttrString(m, "is_launched",
+                           PyLong_FromVoidPtr(&is_launched));
 
     return MOD_SUCCESS_VAL(m);
 }
@@ -350,8 +350,10 @@ class _GufuncWrapper(object):
             for syms in grp:
                 unique_syms |= set(syms)
 
+        # Symbols of the inputs go first, followed by those only found in
+        # outputs (e.g. the reduction arrays of parfors)
         sym_map = {}
-        for syms in self.sin:
+        for syms in self.sin + self.sout:
             for s in syms:
                 if s not in sym_map:
                     sym_map[s] = len(sym_map)
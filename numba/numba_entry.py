@@ -89,6 +89,14 @@ def get_sys_info():
             ("LLVM version", '.'.join(
                 [str(k) for k in llvmbind.llvm_version_info])))
 
+        print("")
+        print("__Threading Layer Information__")
+        from numba.npyufunc import parallel
+        for name in parallel._threading_layer_priority:
+            available = parallel._load_threading_lib(name) is not None
+            print(fmt % (name,
+                         "available" if available else "not available"))
+
         print("")
         print("__CUDA Information__")
         # Look for GPUs
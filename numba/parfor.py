@@ -11,8 +11,11 @@ from __future__ import print_function, division, absolute_import
 import types as pytypes # avoid confusion with numba.types
 import sys
 
+import numba
 from numba import ir, ir_utils, types, typing, rewrites, config, analysis
-from numba import array_analysis, postproc
+from numba import array_analysis, postproc, numpy_support
+from numba.stencil import inline_stencil_calls
+from numba.special import prange
 
 from numba.ir_utils import (mk_unique_var, next_label, mk_alloc,
     get_np_ufunc_typ, mk_range_block, mk_loop_header, find_op_typ,
@@ -27,6 +30,8 @@ from numba.typing import npydecl, signature
 from numba.types.functions import Function
 import copy
 import numpy
+from collections import OrderedDict, defaultdict
+from numba.io_support import StringIO
 # circular dependency: import numba.npyufunc.dufunc.DUFunc
 
 _reduction_ops = {
@@ -34,6 +39,37 @@ _reduction_ops = {
   'prod' : ('*=', '*', 1),
 }
 
+# identity values of reduction operators used to initialize per-thread
+# partial results
+_reduction_identities = {
+  '+' : 0,
+  '-' : 0,
+  '*' : 1,
+}
+
+# estimated cost of operations in parfor bodies relative to simple arithmetic,
+# used to run parfors with little work sequentially
+_op_costs = {
+  'binop'          : 1,
+  'inplace_binop'  : 1,
+  'unary'          : 1,
+  'static_getitem' : 1,
+  'getitem'        : 2,
+  'call'           : 10,
+}
+_setitem_cost = 2
+# assumed number of iterations of loops nested in parfor bodies
+_inner_loop_trip_count = 100
+
+def get_reduction_combine_op(fn, immutable_fn):
+    """return the operator that combines per-thread partial results of a
+    reduction with the given inplace operator, e.g. partial results of
+    s -= a[i] are negative and should be added.
+    """
+    if fn == '-=':
+        return '+=', '+'
+    return fn, immutable_fn
+
 class LoopNest(object):
     '''The LoopNest class holds information of a single loop including
     the index variable (of a non-negative integer value), and the
@@ -63,7 +99,7 @@ class Parfor(ir.Expr, ir.Stmt):
         )
 
         self.id = type(self).id_counter
-        type(self).id_counter =+ 1
+        type(self).id_counter += 1
         #self.input_info  = input_info
         #self.output_info = output_info
         self.loop_nests = loop_nests
@@ -71,6 +107,9 @@ class Parfor(ir.Expr, ir.Stmt):
         self.loop_body = loop_body
         self.array_analysis = array_analysis
         self.index_var = index_var
+        # scratch arrays allocated in the body that are allocated once per
+        # thread in parallel execution (see hoist)
+        self.private_allocs = set()
 
     def __repr__(self):
         return repr(self.loop_nests) + repr(self.loop_body) + repr(self.index_var)
@@ -101,30 +140,143 @@ class Parfor(ir.Expr, ir.Stmt):
     def dump(self,  file=None):
         file = file or sys.stdout
         print(("begin parfor {}".format(self.id)).center(20,'-'), file=file)
-        print("index_var = ", self.index_var)
+        print("index_var = ", self.index_var, file=file)
         for loopnest in self.loop_nests:
             print(loopnest, file=file)
         print("init block:", file=file)
-        self.init_block.dump()
+        self.init_block.dump(file)
         for offset, block in sorted(self.loop_body.items()):
             print('label %s:' % (offset,), file=file)
             block.dump(file)
         print(("end parfor").center(20,'-'), file=file)
 
 
+# runtime counters of instrumented parfors: parfor id -> array of
+# [number of launches, total number of iterations]
+parfor_counters = {}
+
+class ParforDiagnostics(object):
+    """ParforDiagnostics collects information about conversion and
+    optimization of parfors in a function, which is reported by
+    Dispatcher.parallel_diagnostics().
+    """
+    def __init__(self):
+        # parfor id -> (origin description, loc)
+        self.parfors = OrderedDict()
+        # (parfor1 id, parfor2 id, reason), reason is None if fused
+        self.fusion_attempts = []
+        # (outer parfor id, inner parfor id) of collapsed loop nests
+        self.collapses = []
+        # parfor id -> statements hoisted to the init block
+        self.hoisted = defaultdict(list)
+        # final parfors (including nested ones) after optimization
+        self.final_parfors = []
+
+    def add_parfor(self, parfor, origin):
+        self.parfors[parfor.id] = (origin, parfor.loc)
+
+    def add_fusion_attempt(self, parfor1, parfor2, reason=None):
+        self.fusion_attempts.append((parfor1.id, parfor2.id, reason))
+
+    def add_collapse(self, outer, inner):
+        self.collapses.append((outer.id, inner.id))
+
+    def add_hoisted(self, parfor, stmt, per_thread=False):
+        if per_thread:
+            self.hoisted[parfor.id].append("{} (per thread)".format(stmt))
+        else:
+            self.hoisted[parfor.id].append(str(stmt))
+
+    def set_final_parfors(self, blocks):
+        """record parfors remaining after optimization (including nested
+        ones), their allocations, reductions and IR.
+        """
+        self.final_parfors = []
+        for block in blocks.values():
+            for stmt in block.body:
+                if isinstance(stmt, Parfor):
+                    self._add_final_parfor(stmt)
+
+    def _add_final_parfor(self, parfor):
+        ir_dump = StringIO()
+        parfor.dump(ir_dump)
+        self.final_parfors.append((parfor.id,
+            sorted(get_parfor_allocs(parfor)),
+            get_parfor_reductions(parfor)[0], get_sequential_threshold(parfor),
+            ir_dump.getvalue()))
+        for block in parfor.loop_body.values():
+            for stmt in block.body:
+                if isinstance(stmt, Parfor):
+                    self._add_final_parfor(stmt)
+
+    def _origin(self, parfor_id):
+        if parfor_id not in self.parfors:
+            return "parfor {}".format(parfor_id)
+        origin, loc = self.parfors[parfor_id]
+        return "parfor {} ({}, line {})".format(parfor_id, origin, loc.line)
+
+    def dump(self, level=1, file=None):
+        """print the report. Level 1 lists parfors and fusions, level 2 adds
+        failed fusion attempts with reasons, hoisted statements, allocations,
+        reductions and sequential thresholds, and level 3 adds the IR of
+        final parfors.
+        """
+        file = file or sys.stdout
+        print(" Parallel loops ".center(80, '-'), file=file)
+        if not self.parfors:
+            print("No parallel loops found.", file=file)
+        for parfor_id in self.parfors:
+            print(self._origin(parfor_id), file=file)
+
+        print(" Fusion ".center(80, '-'), file=file)
+        for outer_id, inner_id in self.collapses:
+            print("{} collapsed into {}".format(self._origin(inner_id),
+                self._origin(outer_id)), file=file)
+        for id1, id2, reason in self.fusion_attempts:
+            if reason is None:
+                print("{} fused into {}".format(self._origin(id2),
+                    self._origin(id1)), file=file)
+            elif level>=2:
+                print("{} not fused into {}: {}".format(self._origin(id2),
+                    self._origin(id1), reason), file=file)
+
+        print(" Optimized parallel loops ".center(80, '-'), file=file)
+        for (parfor_id, allocs, redvars, seq_threshold,
+                ir_dump) in self.final_parfors:
+            print(self._origin(parfor_id), file=file)
+            if level>=2:
+                for stmt in self.hoisted.get(parfor_id, []):
+                    print("    hoisted: {}".format(stmt), file=file)
+                for arr in allocs:
+                    print("    allocation: {}".format(arr), file=file)
+                for redvar in redvars:
+                    print("    reduction: {}".format(redvar), file=file)
+                if seq_threshold > 0:
+                    print("    sequential below {} iterations".format(
+                        seq_threshold), file=file)
+            if parfor_id in parfor_counters:
+                launches, iterations = parfor_counters[parfor_id]
+                print("    launches: {}, iterations: {}".format(launches,
+                    iterations), file=file)
+            if level>=3:
+                print(ir_dump, file=file)
+
 class ParforPass(object):
     """ParforPass class is responsible for converting Numpy
     calls in Numba intermediate representation to Parfors, which
     will lower into either sequential or parallel loops during lowering
     stage.
     """
-    def __init__(self, func_ir, typemap, calltypes, return_type):
+    def __init__(self, func_ir, typemap, calltypes, return_type,
+                 typingctx=None):
         self.func_ir = func_ir
         self.typemap = typemap
         self.calltypes = calltypes
         self.return_type = return_type
+        self.typingctx = typingctx
         self.array_analysis = array_analysis.ArrayAnalysis(func_ir, typemap,
             calltypes)
+        self.diagnostics = ParforDiagnostics()
         ir_utils._max_label = max(func_ir.blocks.keys())
 
     def _has_known_shape(self, var):
@@ -140,7 +292,18 @@ class ParforPass(object):
         """run parfor conversion pass: replace Numpy calls
         with Parfors when possible and optimize the IR."""
 
+        # inline stencil calls so that their loops become parfors
+        if self.typingctx is not None:
+            inline_stencil_calls(self.func_ir, self.typemap,
+                self.calltypes, self.typingctx)
         self.array_analysis.run()
+        # remove Del statements for easier optimization
+        remove_dels(self.func_ir.blocks)
+        # convert user loops over prange() and comprehensions to parfors
+        if not self.func_ir.is_generator:
+            self._convert_comprehensions(self.func_ir.blocks)
+            self._convert_prange(self.func_ir.blocks)
+        self._convert_library_calls(self.func_ir.blocks)
         topo_order = find_topo_order(self.func_ir.blocks)
         # variables available in the program so far (used for finding map
         # functions in array_expr lowering)
@@ -156,16 +319,19 @@ class ParforPass(object):
                     if self._has_known_shape(lhs) and self._is_C_order(lhs.name):
                         if self._is_supported_npycall(expr):
                             instr = self._numpy_to_parfor(lhs, expr)
+                            self.diagnostics.add_parfor(instr, "np.{}".format(
+                                self.array_analysis.numpy_calls[expr.func.name]))
                         elif isinstance(expr, ir.Expr) and expr.op == 'arrayexpr':
                             instr = self._arrayexpr_to_parfor(lhs, expr, avail_vars)
+                            self.diagnostics.add_parfor(instr, "array expression")
                     elif self._is_supported_npyreduction(expr):
                         instr = self._reduction_to_parfor(lhs, expr)
+                        self.diagnostics.add_parfor(instr, "{} reduction".format(
+                            self._get_reduction_call(expr)[0]))
                     avail_vars.append(lhs.name)
                 new_body.append(instr)
             block.body = new_body
 
-        # remove Del statements for easier optimization
-        remove_dels(self.func_ir.blocks)
         dprint_func_ir(self.func_ir, "after parfor pass")
         # get copies in to blocks and out from blocks
         in_cps, out_cps = copy_propagate(self.func_ir.blocks, self.typemap)
@@ -177,18 +343,25 @@ class ParforPass(object):
         # remove dead code to enable fusion
         remove_dead(self.func_ir.blocks, self.func_ir.arg_names)
         #dprint_func_ir(self.func_ir, "after remove_dead")
+        # collapse perfectly nested prange loops into multi-dimensional parfors
+        collapse_parfors(self.func_ir.blocks, self.diagnostics)
         # reorder statements to maximize fusion
         maximize_fusion(self.func_ir.blocks)
-        fuse_parfors(self.func_ir.blocks)
+        fuse_parfors(self.func_ir.blocks, self.diagnostics)
         # remove dead code after fusion to remove extra arrays and variables
         remove_dead(self.func_ir.blocks, self.func_ir.arg_names)
         #dprint_func_ir(self.func_ir, "after second remove_dead")
+        # move loop-invariant computations out of parfor bodies
+        call_table, _ = get_call_table(self.func_ir.blocks, {}, {})
+        hoist_parfors(self.func_ir.blocks, self.typemap, call_table,
+            self.diagnostics)
         # push function call variables inside parfors so gufunc function
         # wouldn't need function variables as argument
         push_call_vars(self.func_ir.blocks, {}, {})
         remove_dead(self.func_ir.blocks, self.func_ir.arg_names)
         # after optimization, some size variables are not available anymore
         remove_dead_class_sizes(self.func_ir.blocks, self.array_analysis)
+        self.diagnostics.set_final_parfors(self.func_ir.blocks)
         dprint_func_ir(self.func_ir, "after optimization")
         if config.DEBUG_ARRAY_OPT==1:
             print("variable types: ",sorted(self.typemap.items()))
@@ -202,6 +375,534 @@ class ParforPass(object):
         #lower_parfor_sequential(self.func_ir, self.typemap, self.calltypes)
         return
 
+    def _convert_prange(self, blocks):
+        """convert loops over prange() into parfors. Inner loops are visited
+        first so that nested pranges become nested parfors, which are
+        collapsed later if perfectly nested.
+        """
+        call_table, _ = get_call_table(blocks, {}, {})
+        cfg = compute_cfg_from_blocks(blocks)
+        loops = sorted(cfg.loops().values(), key=lambda loop: len(loop.body))
+        for loop in loops:
+            if len(loop.entries) != 1 or len(loop.exits) != 1:
+                continue
+            entry = list(loop.entries)[0]
+            if entry not in blocks or loop.header not in blocks:
+                continue
+            range_args = self._find_prange_args(blocks[entry],
+                blocks[loop.header], call_table)
+            if range_args is None:
+                continue
+            start, stop, setup_stmts = range_args
+            parfor = self._prange_to_parfor(blocks, loop, entry, start, stop,
+                setup_stmts)
+            self.diagnostics.add_parfor(parfor, "prange loop")
+        return
+
+    def _convert_library_calls(self, blocks):
+        """replace np.sort(), np.argsort() and the sort() and argsort()
+        methods of 1D arrays with calls to a parallel merge sort, np.cumsum()
+        and np.cumprod() (and methods) with parallel scans, and
+        np.histogram(), np.bincount(), np.digitize() and np.searchsorted()
+        of 1D arrays, and reductions of multi-dimensional arrays over an
+        axis with their parallel implementations. Small arrays are still
+        processed sequentially.
+        """
+        for block in blocks.values():
+            new_body = []
+            for stmt in block.body:
+                if isinstance(stmt, ir.Assign):
+                    nodes = self._sort_to_parallel(stmt.target, stmt.value)
+                    if nodes is None:
+                        nodes = self._cumulative_to_parallel(stmt.target,
+                                                             stmt.value)
+                    if nodes is None:
+                        nodes = self._array_math_to_parallel(stmt.target,
+                                                             stmt.value)
+                    if nodes is None:
+                        nodes = self._axis_reduction_to_parallel(stmt.target,
+                                                                 stmt.value)
+                    if nodes is not None:
+                        new_body.extend(nodes)
+                        continue
+                new_body.append(stmt)
+            block.body = new_body
+        return
+
+    def _sort_to_parallel(self, lhs, expr):
+        """return the nodes calling the parallel sort for sort call expr
+        assigned to lhs, or None if expr is not a supported sort call.
+        """
+        if not (isinstance(expr, ir.Expr) and expr.op == 'call'):
+            return None
+        call_name, args = self._get_reduction_call(expr)
+        if call_name not in ('sort', 'argsort') or not args:
+            return None
+        arr = args[0]
+        is_method = expr.func.name in self.array_analysis.array_attr_calls
+        kws = dict(expr.kws)
+        if set(kws) - {'kind'}:
+            return None
+        kind_args = args[1:] + list(kws.values())
+        if len(kind_args) > 1:
+            return None
+        kind = 'quicksort'
+        if kind_args:
+            kind_typ = self.typemap[kind_args[0].name]
+            if not isinstance(kind_typ, types.Const):
+                return None
+            kind = kind_typ.value
+        arr_typ = self.typemap[arr.name]
+        if not (isinstance(arr_typ, types.Array) and arr_typ.ndim == 1
+                and isinstance(arr_typ.dtype, types.Number)):
+            return None
+        from numba.targets.arrayobj import get_parallel_sort_func
+        is_argsort = call_name == 'argsort'
+        impl = get_parallel_sort_func(isinstance(arr_typ.dtype, types.Float),
+            is_argsort, kind, arr_typ.dtype)
+        scope = lhs.scope
+        loc = lhs.loc
+        if call_name == 'sort' and is_method:
+            # arr.sort() sorts in place and returns None
+            nodes, _ = _gen_njit_call(self.typemap, self.calltypes,
+                impl.run_parallel_sort, [arr], scope, loc)
+            nodes.append(ir.Assign(ir.Const(None, loc), lhs, loc))
+            return nodes
+        nodes, out = _gen_njit_call(self.typemap, self.calltypes,
+            impl.run_parallel_sort_copy, [arr], scope, loc)
+        if self.typemap[out.name] != self.typemap[lhs.name]:
+            # e.g. np.sort() of a non-contiguous array returns its type
+            return None
+        nodes.append(ir.Assign(out, lhs, loc))
+        return nodes
+
+    def _cumulative_to_parallel(self, lhs, expr):
+        """return the nodes calling the parallel scan for the np.cumsum() or
+        np.cumprod() call expr (or method call) of a 1D array assigned to
+        lhs, or None if expr is not such a call.
+        """
+        if not (isinstance(expr, ir.Expr) and expr.op == 'call'):
+            return None
+        call_name, args = self._get_reduction_call(expr)
+        if (call_name not in ('cumsum', 'cumprod') or len(args) != 1
+                or expr.kws or expr.vararg is not None):
+            return None
+        arr_typ = self.typemap[args[0].name]
+        out_typ = self.typemap[lhs.name]
+        if not (isinstance(arr_typ, types.Array) and arr_typ.ndim == 1
+                and isinstance(arr_typ.dtype, types.Number)
+                and isinstance(out_typ, types.Array)):
+            return None
+        from numba.targets.parallel_arraymath import get_parallel_cumulative
+        impl = get_parallel_cumulative(call_name,
+                                       numpy_support.as_dtype(out_typ.dtype))
+        nodes, out = _gen_njit_call(self.typemap, self.calltypes, impl, args,
+                                    lhs.scope, lhs.loc)
+        if self.typemap[out.name] != out_typ:
+            return None
+        nodes.append(ir.Assign(out, lhs, lhs.loc))
+        return nodes
+
+    def _array_math_to_parallel(self, lhs, expr):
+        """return the nodes calling the parallel implementation of the
+        np.histogram(), np.bincount(), np.digitize(), np.searchsorted() or
+        np.take() call expr assigned to lhs, or None if expr is not such a
+        call on 1D arrays.
+        """
+        if not (isinstance(expr, ir.Expr) and expr.op == 'call'):
+            return None
+        call_name = self.array_analysis.numpy_calls.get(expr.func.name)
+        if call_name not in _parallel_array_math_args:
+            return None
+        arg_names = _parallel_array_math_args[call_name]
+        args = _fold_call_args(expr, arg_names)
+        if args is None:
+            return None
+        # optional arguments passed as None are left out
+        args = {name: var for name, var in args.items()
+                if self.typemap[var.name] != types.none}
+
+        def is_1d_array(name, dtype=types.Number):
+            typ = self.typemap[args[name].name] if name in args else None
+            return (isinstance(typ, types.Array) and typ.ndim == 1
+                    and isinstance(typ.dtype, dtype))
+
+        from numba.targets import parallel_arraymath
+        nodes = []
+        impl = None
+        if call_name == 'histogram' and is_1d_array('a'):
+            bins_typ = self.typemap[args['bins'].name] if 'bins' in args else None
+            if bins_typ is None:
+                args['bins'] = self._mk_const_var(10, types.intp, lhs.scope,
+                                                  lhs.loc, nodes)
+                bins_typ = types.intp
+            if isinstance(bins_typ, types.Integer):
+                impl = (parallel_arraymath.histogram_range if 'range' in args
+                        else parallel_arraymath.histogram_bins)
+            elif is_1d_array('bins') and 'range' not in args:
+                impl = parallel_arraymath.histogram_edges
+        elif call_name == 'bincount' and is_1d_array('a', types.Integer):
+            if 'weights' not in args:
+                impl = parallel_arraymath.bincount
+            elif is_1d_array('weights'):
+                impl = parallel_arraymath.bincount_weights
+        elif (call_name == 'digitize' and is_1d_array('x')
+                and is_1d_array('bins')):
+            impl = parallel_arraymath.digitize
+        elif (call_name == 'searchsorted' and is_1d_array('a')
+                and is_1d_array('v')):
+            impl = parallel_arraymath.searchsorted
+        elif (call_name == 'take' and 'axis' not in args
+                and isinstance(self.typemap[args['a'].name], types.Array)
+                and is_1d_array('indices', types.Integer)):
+            impl = parallel_arraymath.take
+        if impl is None:
+            return None
+
+        call_nodes, out = _gen_njit_call(self.typemap, self.calltypes, impl,
+            [args[name] for name in arg_names if name in args],
+            lhs.scope, lhs.loc)
+        if self.typemap[out.name] != self.typemap[lhs.name]:
+            return None
+        nodes += call_nodes
+        nodes.append(ir.Assign(out, lhs, lhs.loc))
+        return nodes
+
+    def _axis_reduction_to_parallel(self, lhs, expr):
+        """return the nodes calling the parallel implementation of the
+        reduction call expr (e.g. np.sum(A, axis=0) or A.sum(0)) over an
+        integer axis of a multi-dimensional array assigned to lhs, or None
+        if expr is not such a call.
+        """
+        if not (isinstance(expr, ir.Expr) and expr.op == 'call'):
+            return None
+        call_name, pos_args = self._get_reduction_call(expr)
+        if call_name not in _parallel_axis_reduction_args:
+            return None
+        args = _fold_call_args(expr, _parallel_axis_reduction_args[call_name],
+                               pos_args)
+        if args is None or 'axis' not in args:
+            return None
+        arr_typ = self.typemap[args['a'].name]
+        axis_typ = self.typemap[args['axis'].name]
+        out_typ = self.typemap[lhs.name]
+        if not (isinstance(arr_typ, types.Array) and arr_typ.ndim > 1
+                and isinstance(axis_typ, types.Integer)
+                and isinstance(out_typ, types.Array)):
+            return None
+        from numba.targets.parallel_arraymath import (
+            get_parallel_axis_reduction)
+        keepdims = out_typ.ndim == arr_typ.ndim
+        impl = get_parallel_axis_reduction(call_name,
+            numpy_support.as_dtype(out_typ.dtype), keepdims)
+        nodes, out = _gen_njit_call(self.typemap, self.calltypes, impl,
+            [args['a'], args['axis']], lhs.scope, lhs.loc)
+        if self.typemap[out.name] != out_typ:
+            return None
+        nodes.append(ir.Assign(out, lhs, lhs.loc))
+        return nodes
+
+    def _convert_comprehensions(self, blocks):
+        """convert list comprehensions over range() that are converted to
+        arrays, e.g. np.array([a[i]**2 for i in range(n)]), into parfors that
+        write elements of the output array directly.
+        """
+        call_table, _ = get_call_table(blocks, {}, {})
+        cfg = compute_cfg_from_blocks(blocks)
+        loops = sorted(cfg.loops().values(), key=lambda loop: len(loop.body))
+        for loop in loops:
+            if len(loop.entries) != 1 or len(loop.exits) != 1:
+                continue
+            entry = list(loop.entries)[0]
+            body_labels = [l for l in loop.body if l != loop.header]
+            # the body of comprehensions with simple expressions is a single
+            # block that appends one element in each iteration
+            if (entry not in blocks or loop.header not in blocks
+                    or len(body_labels) != 1 or body_labels[0] not in blocks):
+                continue
+            stop = self._find_comprehension_range(blocks[entry],
+                blocks[loop.header], call_table)
+            if stop is None:
+                continue
+            comprehension = self._match_comprehension(blocks, loop, entry,
+                body_labels[0], call_table)
+            if comprehension is None:
+                continue
+            parfor = self._comprehension_to_parfor(blocks, loop, entry, stop,
+                comprehension)
+            self.diagnostics.add_parfor(parfor, "list comprehension")
+        return
+
+    def _find_comprehension_range(self, entry_block, header_block, call_table):
+        """return the size of the range() that the loop iterates over, or None
+        if the loop is not over range(n). The range can be created outside
+        the entry block since comprehensions are inlined closures.
+        """
+        iternext = header_block.body[0]
+        if not (isinstance(iternext, ir.Assign)
+                and isinstance(iternext.value, ir.Expr)
+                and iternext.value.op == 'iternext'):
+            return None
+        defs = {stmt.target.name: stmt.value for stmt in entry_block.body
+                if isinstance(stmt, ir.Assign)}
+        var = iternext.value.value
+        while True:
+            if var.name in defs:
+                rhs = defs[var.name]
+            else:
+                try:
+                    rhs = self.func_ir.get_definition(var)
+                except KeyError:
+                    return None
+            if isinstance(rhs, ir.Var):
+                var = rhs
+            elif isinstance(rhs, ir.Expr) and rhs.op == 'getiter':
+                var = rhs.value
+            elif isinstance(rhs, ir.Expr) and rhs.op == 'call':
+                args = rhs.args
+                if call_table.get(rhs.func.name, []) != [range] or rhs.kws:
+                    return None
+                if len(args) == 1:
+                    return args[0]
+                if len(args) == 2 and self._is_zero(args[0]):
+                    return args[1]
+                return None
+            else:
+                return None
+
+    def _match_comprehension(self, blocks, loop, entry, body_label,
+            call_table):
+        """match the list that the loop body appends to and its conversion to
+        an array with np.array(). Returns (append call, append attribute,
+        list definition, np.array() call, list variable names) or None if the
+        list is used otherwise.
+        """
+        body_block = blocks[body_label]
+        append_attrs = {}
+        append_stmts = []
+        for stmt in body_block.body[:-1]:
+            # statements with side effects other than append are not
+            # parallelized
+            if not isinstance(stmt, ir.Assign):
+                return None
+            rhs = stmt.value
+            if (isinstance(rhs, ir.Expr) and rhs.op == 'getattr'
+                    and rhs.attr == 'append'):
+                append_attrs[stmt.target.name] = stmt
+            if (isinstance(rhs, ir.Expr) and rhs.op == 'call'
+                    and rhs.func.name in append_attrs):
+                append_stmts.append(stmt)
+        if len(append_stmts) != 1 or len(append_attrs) != 1:
+            return None
+        append_stmt = append_stmts[0]
+        if len(append_stmt.value.args) != 1 or append_stmt.value.kws:
+            return None
+        attr_stmt = append_attrs[append_stmt.value.func.name]
+        list_var = attr_stmt.value.value
+
+        # list is carried across blocks in copies of the list variable
+        list_names = {list_var.name}
+        changed = True
+        while changed:
+            changed = False
+            for block in blocks.values():
+                for stmt in block.body:
+                    if (isinstance(stmt, ir.Assign)
+                            and isinstance(stmt.value, ir.Var)):
+                        names = {stmt.target.name, stmt.value.name}
+                        if names & list_names and not names <= list_names:
+                            list_names |= names
+                            changed = True
+
+        list_def = None
+        array_stmt = None
+        for label, block in blocks.items():
+            for stmt in block.body:
+                if stmt is attr_stmt:
+                    continue
+                if (isinstance(stmt, ir.Assign)
+                        and stmt.target.name in list_names):
+                    if isinstance(stmt.value, ir.Var):
+                        continue
+                    if (list_def is None and label == entry
+                            and isinstance(stmt.value, ir.Expr)
+                            and stmt.value.op == 'build_list'
+                            and not stmt.value.items):
+                        list_def = stmt
+                        continue
+                    return None
+                if not {v.name for v in stmt.list_vars()} & list_names:
+                    continue
+                if (array_stmt is None and label not in loop.body
+                        and isinstance(stmt, ir.Assign)
+                        and isinstance(stmt.value, ir.Expr)
+                        and stmt.value.op == 'call'
+                        and call_table.get(stmt.value.func.name, [])
+                            == ['array', numpy]
+                        and len(stmt.value.args) == 1
+                        and not stmt.value.kws):
+                    array_stmt = stmt
+                    continue
+                return None
+        if list_def is None or array_stmt is None:
+            return None
+
+        # only lists of scalars are converted to 1D arrays
+        list_typ = self.typemap[list_var.name]
+        arr_typ = self.typemap[array_stmt.target.name]
+        if not (isinstance(list_typ, types.List)
+                and isinstance(list_typ.dtype, (types.Number, types.Boolean))
+                and arr_typ == types.Array(list_typ.dtype, 1, 'C')):
+            return None
+        return append_stmt, attr_stmt, list_def, array_stmt, list_names
+
+    def _comprehension_to_parfor(self, blocks, loop, entry, stop,
+            comprehension):
+        """replace a list comprehension loop with a parfor that allocates the
+        output array and writes each element instead of appending it.
+        """
+        append_stmt, attr_stmt, list_def, array_stmt, list_names = comprehension
+        arr = array_stmt.target
+        arr_typ = self.typemap[arr.name]
+        scope = blocks[entry].scope
+        loc = array_stmt.loc
+        parfor = self._prange_to_parfor(blocks, loop, entry, 0, stop, [])
+        corr = self.array_analysis.add_size_equivalence(arr.name, 0, stop)
+        parfor.loop_nests[0].correlation = corr
+        parfor.init_block.body = mk_alloc(self.typemap, self.calltypes, arr,
+            stop, arr_typ.dtype, scope, loc)
+
+        # arr[i] = value instead of list.append(value)
+        setitem_node = ir.SetItem(arr, parfor.index_var,
+            append_stmt.value.args[0], append_stmt.loc)
+        self.calltypes[setitem_node] = signature(types.none, arr_typ,
+            types.intp, arr_typ.dtype)
+        for block in list(blocks.values()) + list(parfor.loop_body.values()):
+            new_body = []
+            for stmt in block.body:
+                if stmt is append_stmt:
+                    new_body.append(setitem_node)
+                elif not (stmt is attr_stmt or stmt is list_def
+                        or stmt is array_stmt
+                        or (isinstance(stmt, ir.Assign)
+                            and stmt.target.name in list_names)):
+                    new_body.append(stmt)
+            block.body = new_body
+        if config.DEBUG_ARRAY_OPT==1:
+            print("generated parfor for list comprehension:")
+            parfor.dump()
+        return parfor
+
+    def _find_prange_args(self, entry_block, header_block, call_table):
+        """find the prange() call that produces the iterator of the loop
+        header. Returns (start, stop, loop setup statements) or None if the
+        loop is not a prange loop that can be parallelized.
+        """
+        iternext = header_block.body[0]
+        if not (isinstance(iternext, ir.Assign)
+                and isinstance(iternext.value, ir.Expr)
+                and iternext.value.op == 'iternext'):
+            return None
+        defs = {stmt.target.name: stmt for stmt in entry_block.body
+                if isinstance(stmt, ir.Assign)}
+        # follow $phi = $iter, $iter = getiter($range), $range = prange(...)
+        setup_stmts = []
+        var = iternext.value.value
+        while var.name in defs:
+            stmt = defs[var.name]
+            setup_stmts.append(stmt)
+            rhs = stmt.value
+            if isinstance(rhs, ir.Var):
+                var = rhs
+            elif isinstance(rhs, ir.Expr) and rhs.op == 'getiter':
+                var = rhs.value
+            elif isinstance(rhs, ir.Expr) and rhs.op == 'call':
+                if not _is_prange_call(rhs.func.name, call_table):
+                    return None
+                args = rhs.args
+                if rhs.kws or not 1 <= len(args) <= 2:
+                    # only unit step is supported, other loops run sequentially
+                    return None
+                if len(args) == 1:
+                    return 0, args[0], setup_stmts
+                return args[0], args[1], setup_stmts
+            else:
+                return None
+        return None
+
+    def _prange_to_parfor(self, blocks, loop, entry, start, stop, setup_stmts):
+        """replace loop blocks with a parfor that is appended to the entry
+        block of the loop.
+        """
+        entry_block = blocks[entry]
+        header_block = blocks[loop.header]
+        scope = entry_block.scope
+        loc = entry_block.loc
+        # the loop variable is pair_first(iternext(...)) in the header and its
+        # copies
+        iternext_var = header_block.body[0].target.name
+        loop_index = [stmt.target.name for stmt in header_block.body
+                      if isinstance(stmt, ir.Assign)
+                      and isinstance(stmt.value, ir.Expr)
+                      and stmt.value.op == 'pair_first'
+                      and stmt.value.value.name == iternext_var][0]
+        index_names = {loop_index}
+        for stmt in header_block.body:
+            if (isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Var)
+                    and stmt.value.name in index_names):
+                index_names.add(stmt.target.name)
+
+        body_labels = sorted(l for l in loop.body
+                             if l in blocks and l != loop.header)
+        loop_body = {l: blocks[l] for l in body_labels}
+        index_var = ir.Var(scope, mk_unique_var("parfor_index"), loc)
+        self.typemap[index_var.name] = types.intp
+        replace_vars(loop_body, {v: index_var for v in index_names})
+
+        # back edges jump to an empty latch block which ends the body
+        latch_label = next_label()
+        loop_body[latch_label] = ir.Block(scope, loc)
+        for b in loop_body.values():
+            if not b.body:
+                continue
+            term = b.body[-1]
+            if isinstance(term, ir.Jump) and term.target == loop.header:
+                term.target = latch_label
+            if isinstance(term, ir.Branch):
+                if term.truebr == loop.header:
+                    term.truebr = latch_label
+                if term.falsebr == loop.header:
+                    term.falsebr = latch_label
+
+        # loops over the whole size of an array dimension have the size
+        # class of the dimension so they can be fused with other parfors
+        corr = array_analysis.UNKNOWN_CLASS
+        if self._is_zero(start) and isinstance(stop, ir.Var):
+            corr = self.array_analysis.get_size_class(stop)
+        parfor = Parfor([LoopNest(index_var, start, stop, 1, corr)],
+            ir.Block(scope, loc), loop_body, header_block.loc,
+            self.array_analysis, index_var)
+
+        # entry block: remove iterator setup, run the parfor and skip the loop
+        jump = entry_block.body[-1]
+        entry_block.body = [stmt for stmt in entry_block.body[:-1]
+                            if stmt not in setup_stmts]
+        entry_block.body.append(parfor)
+        jump.target = list(loop.exits)[0]
+        entry_block.body.append(jump)
+        blocks.pop(loop.header)
+        for l in body_labels:
+            blocks.pop(l)
+        if config.DEBUG_ARRAY_OPT==1:
+            print("generated parfor for prange loop:")
+            parfor.dump()
+        return parfor
+
+    def _is_zero(self, val):
+        if isinstance(val, ir.Var):
+            val = self.array_analysis.constant_table.get(val.name)
+        return isinstance(val, int) and val==0
+
     def _is_C_order(self, arr_name):
         typ = self.typemap[arr_name]
         assert isinstance(typ, types.npytypes.Array)
@@ -283,6 +984,21 @@ class ParforPass(object):
         call_name = self.array_analysis.numpy_calls[expr.func.name]
         if call_name in ['zeros', 'ones', 'random.ranf']:
             return True
+        args = expr.args
+        if call_name=='full':
+            # fill value is second positional or keyword argument
+            return len(args)>=2 or 'fill_value' in dict(expr.kws)
+        if call_name=='arange':
+            # dtype can be the fourth argument
+            return (not expr.kws and 1<=len(args)<=4
+                and self._is_real_scalars(args[:3]))
+        if call_name=='linspace':
+            # size of the output is only known if num is given
+            return (not expr.kws and len(args)==3
+                and self._is_real_scalars(args))
+        if call_name=='where':
+            return (len(args)==3 and not expr.kws
+                and all(self._has_known_shape(a) for a in args))
         # TODO: add more calls
         if call_name=='dot':
             #only translate matrix/vector and vector/vector multiply to parfor
@@ -299,27 +1015,72 @@ class ParforPass(object):
         #return False # turn off for now
         if not (isinstance(expr, ir.Expr) and expr.op == 'call'):
             return False
-        if expr.func.name not in self.array_analysis.numpy_calls.keys():
-            return False
+        call_name, args = self._get_reduction_call(expr)
+        if call_name=='dot':
+            # vector/vector multiply is a sum reduction
+            return (len(args)==2 and not expr.kws
+                and all(self._has_known_shape(a) and self._get_ndims(a.name)==1
+                        for a in args))
         # TODO: add more calls
-        if self.array_analysis.numpy_calls[expr.func.name] in _reduction_ops:
-            for arg in expr.args:
+        if call_name in _reduction_ops and len(args)==1 and not expr.kws:
+            for arg in args:
                 if not self._has_known_shape(arg):
                     return False
             return True
         return False
 
+    def _get_reduction_call(self, expr):
+        """return call name and arguments of numpy reduction calls like
+        np.sum(A) and array method reductions like A.sum().
+        """
+        func_name = expr.func.name
+        if func_name in self.array_analysis.numpy_calls:
+            return self.array_analysis.numpy_calls[func_name], expr.args
+        if func_name in self.array_analysis.array_attr_calls:
+            call_name, arr = self.array_analysis.array_attr_calls[func_name]
+            return call_name, [arr] + expr.args
+        return None, []
+
     def _get_ndims(self, arr):
         #return len(self.array_analysis.array_shape_classes[arr])
         return self.typemap[arr].ndim
 
+    def _is_real_scalars(self, args):
+        return all(isinstance(self.typemap[a.name], (types.Integer, types.Float))
+                   for a in args)
+
+    def _mk_const_var(self, val, typ, scope, loc, out):
+        """assign constant val to a new variable of type typ, appending the
+        assignment to out.
+        """
+        const_var = ir.Var(scope, mk_unique_var("$const"), loc)
+        self.typemap[const_var.name] = typ
+        out.append(ir.Assign(ir.Const(val, loc), const_var, loc))
+        return const_var
+
+    def _mk_binop(self, op, arg1, arg2, scope, loc, out):
+        """compute arg1 op arg2 into a new variable, appending the assignment
+        to out.
+        """
+        func_typ = find_op_typ(op, [self.typemap[arg1.name],
+            self.typemap[arg2.name]])
+        binop = ir.Expr.binop(op, arg1, arg2, loc)
+        self.calltypes[binop] = func_typ
+        out_var = ir.Var(scope, mk_unique_var("$binop_out"), loc)
+        self.typemap[out_var.name] = func_typ.return_type
+        out.append(ir.Assign(binop, out_var, loc))
+        return out_var
+
     def _numpy_to_parfor(self, lhs, expr):
         assert isinstance(expr, ir.Expr) and expr.op == 'call'
         call_name = self.array_analysis.numpy_calls[expr.func.name]
         args = expr.args
         kws = dict(expr.kws)
-        if call_name in ['zeros', 'ones', 'random.ranf']:
+        if call_name in ['zeros', 'ones', 'random.ranf', 'full', 'arange',
+                'linspace']:
             return self._numpy_map_to_parfor(call_name, lhs, args, kws, expr)
+        if call_name=='where':
+            return self._where_to_parfor(lhs, args)
         if call_name=='dot':
             assert len(args)==2 or len(args)==3
             # if 3 args, output is allocated already
@@ -398,8 +1159,9 @@ class ParforPass(object):
                 parfor.loop_body = {range_label:range_block,
                     header_label:header_block, body_label:body_block,
                     out_label:out_block}
-            else: # self._get_ndims(in1.name)==1 (reduction)
-                NotImplementedError("no reduction for dot() "+expr)
+            else:
+                # vector/vector multiply is converted as a reduction
+                raise NotImplementedError("no map for dot() {}".format(expr))
             if config.DEBUG_ARRAY_OPT==1:
                 print("generated parfor for numpy call:")
                 parfor.dump()
@@ -449,8 +1211,36 @@ class ParforPass(object):
             self.calltypes.pop(expr)
             self.calltypes[expr] = self.typemap[expr.func.name].get_call_type(typing.Context(), [], {})
             value = expr
+        elif call_name=='full':
+            value = args[1] if len(args)>1 else kws['fill_value']
+        elif call_name=='arange':
+            # element i is start + i*step, computed independently for each
+            # element instead of accumulating the step
+            if len(args)==1:
+                start = self._mk_const_var(0, types.intp, scope, loc,
+                    init_block.body)
+            else:
+                start = args[0]
+            if len(args)>=3:
+                step = args[2]
+            else:
+                step = self._mk_const_var(1, types.intp, scope, loc,
+                    init_block.body)
+            offset = self._mk_binop('*', index_var, step, scope, loc,
+                body_block.body)
+            value = self._mk_binop('+', start, offset, scope, loc,
+                body_block.body)
+        elif call_name=='linspace':
+            start, stop, num = args
+            step_nodes, step = _gen_njit_call(self.typemap, self.calltypes,
+                _linspace_step, [start, stop, num], scope, loc)
+            init_block.body.extend(step_nodes)
+            item_nodes, value = _gen_njit_call(self.typemap, self.calltypes,
+                _linspace_item, [start, stop, num, step, index_var], scope,
+                loc)
+            body_block.body.extend(item_nodes)
         else:
-            NotImplementedError(
+            raise NotImplementedError(
             "Map of numpy.{} to parfor is not implemented".format(call_name))
 
         value_assign = ir.Assign(value, expr_out_var, loc)
@@ -468,11 +1258,83 @@ class ParforPass(object):
             parfor.dump()
         return parfor
 
+    def _where_to_parfor(self, lhs, args):
+        """generate parfor from np.where(cond, x, y) with array arguments,
+        which selects x or y elements in a branch of the loop body.
+        """
+        scope = lhs.scope
+        loc = lhs.loc
+        arr_typ = self.typemap[lhs.name]
+        el_typ = arr_typ.dtype
+
+        loopnests = []
+        size_vars = []
+        index_vars = []
+        for this_dim in range(arr_typ.ndim):
+            corr = self.array_analysis.array_shape_classes[lhs.name][this_dim]
+            size_var = self.array_analysis.array_size_vars[lhs.name][this_dim]
+            size_vars.append(size_var)
+            index_var = ir.Var(scope, mk_unique_var("parfor_index"), loc)
+            index_vars.append(index_var)
+            self.typemap[index_var.name] = types.intp
+            loopnests.append( LoopNest(index_var, 0, size_var, 1, corr) )
+
+        init_block = ir.Block(scope, loc)
+        init_block.body = mk_alloc(self.typemap, self.calltypes, lhs,
+            tuple(size_vars), el_typ, scope, loc)
+
+        # body structure: the first block reads elements of the inputs and
+        # branches on cond, the last block writes the selected value
+        cond_label = next_label()
+        true_label = next_label()
+        false_label = next_label()
+        out_label = next_label()
+        cond_block = ir.Block(scope, loc)
+        index_var, index_var_typ = self._make_index_var(scope, index_vars,
+            cond_block)
+        in_vals = []
+        for arg in args:
+            val = ir.Var(scope, mk_unique_var("$where_val"), loc)
+            arg_el_typ = self.typemap[arg.name].dtype
+            self.typemap[val.name] = arg_el_typ
+            getitem = _gen_arrayexpr_getitem(arg, index_var, index_vars,
+                arg_el_typ, self.calltypes, self.typemap,
+                self.array_analysis.array_shape_classes, cond_block.body)
+            cond_block.body.append(ir.Assign(getitem, val, loc))
+            in_vals.append(val)
+        cond_val, x_val, y_val = in_vals
+        cond_block.body.append(ir.Branch(cond_val, true_label, false_label,
+            loc))
+
+        expr_out_var = ir.Var(scope, mk_unique_var("$expr_out_var"), loc)
+        self.typemap[expr_out_var.name] = el_typ
+        true_block = ir.Block(scope, loc)
+        true_block.body = [ir.Assign(x_val, expr_out_var, loc),
+            ir.Jump(out_label, loc)]
+        false_block = ir.Block(scope, loc)
+        false_block.body = [ir.Assign(y_val, expr_out_var, loc),
+            ir.Jump(out_label, loc)]
+
+        out_block = ir.Block(scope, loc)
+        setitem_node = ir.SetItem(lhs, index_var, expr_out_var, loc)
+        self.calltypes[setitem_node] = signature(types.none, arr_typ,
+            index_var_typ, el_typ)
+        out_block.body.append(setitem_node)
+
+        parfor = Parfor(loopnests, init_block, {}, loc, self.array_analysis,
+            index_var)
+        parfor.loop_body = {cond_label: cond_block, true_label: true_block,
+            false_label: false_block, out_label: out_block}
+        if config.DEBUG_ARRAY_OPT==1:
+            print("generated parfor for numpy where:")
+            parfor.dump()
+        return parfor
+
     def _reduction_to_parfor(self, lhs, expr):
         assert isinstance(expr, ir.Expr) and expr.op == 'call'
-        call_name = self.array_analysis.numpy_calls[expr.func.name]
-        args = expr.args
-        kws = dict(expr.kws)
+        call_name, args = self._get_reduction_call(expr)
+        if call_name=='dot':
+            return self._dot_to_parfor(lhs, args, expr.loc)
         if call_name in _reduction_ops:
             acc_op, im_op, init_val = _reduction_ops[call_name]
             assert len(args)==1
@@ -534,28 +1396,148 @@ class ParforPass(object):
         # return error if we couldn't handle it (avoid rewrite infinite loop)
         raise NotImplementedError("parfor translation failed for ", expr)
 
+    def _dot_to_parfor(self, lhs, args, loc):
+        """generate a sum reduction parfor for np.dot() of two vectors.
+        """
+        in1, in2 = args
+        scope = lhs.scope
+        el_typ = self.typemap[lhs.name]
+        index_var = ir.Var(scope, mk_unique_var("parfor_index"), loc)
+        self.typemap[index_var.name] = types.intp
+        corr = self.array_analysis.array_shape_classes[in1.name][0]
+        size_var = self.array_analysis.array_size_vars[in1.name][0]
+        loopnests = [LoopNest(index_var, 0, size_var, 1, corr)]
+
+        # init block checks sizes like np.dot() and initializes the sum
+        init_block = ir.Block(scope, loc)
+        from numba.targets.linalg import dot_2_vv_check_args
+        check_nodes, _ = _gen_njit_call(self.typemap, self.calltypes,
+            dot_2_vv_check_args, [in1, in2], scope, loc)
+        init_block.body.extend(check_nodes)
+        init_block.body.append(ir.Assign(ir.Const(el_typ(0), loc), lhs, loc))
+
+        # loop body: lhs += in1[i] * in2[i]
+        acc_block = ir.Block(scope, loc)
+        vals = []
+        for arr in args:
+            val = ir.Var(scope, mk_unique_var("$"+arr.name+"_val"), loc)
+            arr_typ = self.typemap[arr.name]
+            self.typemap[val.name] = arr_typ.dtype
+            getitem_call = ir.Expr.getitem(arr, index_var, loc)
+            self.calltypes[getitem_call] = signature(arr_typ.dtype, arr_typ,
+                types.intp)
+            acc_block.body.append(ir.Assign(getitem_call, val, loc))
+            vals.append(val)
+        prod_var = self._mk_binop('*', vals[0], vals[1], scope, loc,
+            acc_block.body)
+        acc_call = ir.Expr.inplace_binop('+=', '+', lhs, prod_var, loc)
+        self.calltypes[acc_call] = find_op_typ('+', [el_typ,
+            self.typemap[prod_var.name]])
+        # acc is assigned through a temporary like other reductions
+        acc_tmp_var = ir.Var(scope, mk_unique_var("$acc"), loc)
+        self.typemap[acc_tmp_var.name] = el_typ
+        acc_block.body.append(ir.Assign(acc_call, acc_tmp_var, loc))
+        acc_block.body.append(ir.Assign(acc_tmp_var, lhs, loc))
+
+        parfor = Parfor(loopnests, init_block, {next_label(): acc_block}, loc,
+            self.array_analysis, index_var)
+        if config.DEBUG_ARRAY_OPT==1:
+            print("generated parfor for vector dot:")
+            parfor.dump()
+        return parfor
+
+def _is_prange_call(func_name, call_table):
+    """return True if func_name is a variable holding numba.prange"""
+    call_list = call_table.get(func_name, [])
+    return call_list == [prange] or call_list == ['prange', numba]
+
 def _gen_dotmv_check(typemap, calltypes, in1, in2, out, scope, loc):
     """compile dot() check from linalg module and insert a call to it"""
+    from numba.targets.linalg import dot_3_mv_check_args
+    nodes, _ = _gen_njit_call(typemap, calltypes, dot_3_mv_check_args,
+        [in1, in2, out], scope, loc)
+    return nodes
+
+# argument names of the reductions with parallel implementations over an
+# axis in numba.targets.parallel_arraymath
+_parallel_axis_reduction_args = {
+    'sum': ('a', 'axis', 'keepdims'),
+    'prod': ('a', 'axis', 'keepdims'),
+    'mean': ('a', 'axis', 'keepdims'),
+    'min': ('a', 'axis', 'keepdims'),
+    'max': ('a', 'axis', 'keepdims'),
+    'argmin': ('a', 'axis'),
+    'argmax': ('a', 'axis'),
+}
+
+# argument names of the numpy functions with parallel implementations in
+# numba.targets.parallel_arraymath
+_parallel_array_math_args = {
+    'histogram': ('a', 'bins', 'range'),
+    'bincount': ('a', 'weights'),
+    'digitize': ('x', 'bins', 'right'),
+    'searchsorted': ('a', 'v'),
+    'take': ('a', 'indices', 'axis'),
+}
+
+def _fold_call_args(expr, arg_names, pos_args=None):
+    """return a dict of the arguments of call expr by name, given the names
+    of the parameters of the function, or None if they don't match. The
+    positional arguments are those of expr unless pos_args is given (e.g.
+    the array and the arguments of an array method call).
+    """
+    if pos_args is None:
+        pos_args = expr.args
+    if expr.vararg is not None or len(pos_args) > len(arg_names):
+        return None
+    args = dict(zip(arg_names, pos_args))
+    for name, var in expr.kws:
+        if name not in arg_names or name in args:
+            return None
+        args[name] = var
+    return args
+
+def _gen_njit_call(typemap, calltypes, func, args, scope, loc):
+    """compile Python function func with njit (unless it is a jitted function
+    already) and generate a call to it with args. Returns the list of nodes
+    and the output variable of the call.
+    """
     # save max_label since pipeline is called recursively
     saved_max_label = ir_utils._max_label
     from numba import njit
-    from numba.targets.linalg import dot_3_mv_check_args
-    check_func = njit(dot_3_mv_check_args)
-    # g_var = Global(dot_3_mv_check_args)
-    g_var = ir.Var(scope, mk_unique_var("$check_mv"), loc)
-    func_typ = types.functions.Dispatcher(check_func)
+    from numba.dispatcher import Dispatcher
+    jit_func = func if isinstance(func, Dispatcher) else njit(func)
+    name = jit_func.py_func.__name__
+    # g_var = Global(func)
+    g_var = ir.Var(scope, mk_unique_var("$" + name), loc)
+    func_typ = types.functions.Dispatcher(jit_func)
     typemap[g_var.name] = func_typ
-    g_obj = ir.Global("dot_3_mv_check_args", check_func, loc)
+    g_obj = ir.Global(name, jit_func, loc)
     g_assign = ir.Assign(g_obj, g_var, loc)
-    # dummy_var = call g_var(in1, in2, out)
-    call_node = ir.Expr.call(g_var, [in1,in2,out], (), loc)
-    calltypes[call_node] = func_typ.get_call_type(typing.Context(),
-        [typemap[in1.name], typemap[in2.name], typemap[out.name]], {})
-    dummy_var = ir.Var(scope, mk_unique_var("$call_out_dummy"), loc)
-    typemap[dummy_var.name] = types.none
-    call_assign = ir.Assign(call_node, dummy_var, loc)
+    # out_var = call g_var(args)
+    call_node = ir.Expr.call(g_var, list(args), (), loc)
+    sig = func_typ.get_call_type(typing.Context(),
+        [typemap[a.name] for a in args], {})
+    calltypes[call_node] = sig
+    out_var = ir.Var(scope, mk_unique_var("$call_out"), loc)
+    typemap[out_var.name] = sig.return_type
+    call_assign = ir.Assign(call_node, out_var, loc)
     ir_utils._max_label = saved_max_label
-    return [g_assign, call_assign]
+    return [g_assign, call_assign], out_var
+
+def _linspace_step(start, stop, num):
+    """distance of consecutive elements of np.linspace(start, stop, num)"""
+    div = num - 1
+    if div <= 0:
+        return 0.0
+    return (stop - start) / div
+
+def _linspace_item(start, stop, num, step, i):
+    """element i of np.linspace(start, stop, num), the last one being stop
+    exactly like in Numpy"""
+    if i == num - 1 and num > 1:
+        return stop + 0.0
+    return start + i * step
 
 def _mk_mvdot_body(typemap, calltypes, phi_b_var, index_var, in1, in2, sum_var,
         scope, loc, el_typ):
@@ -876,8 +1858,114 @@ def get_parfor_reductions(parfor):
                 if name in parfor_params:
                     names.append(name)
                     reductions[name] = (stmt.value.fn, stmt.value.immutable_fn)
+    array_reductions = get_parfor_array_reductions(parfor, parfor_params)
+    names.extend(array_reductions.keys())
+    reductions.update(array_reductions)
     return sorted(names), reductions
 
+def get_parfor_array_reductions(parfor, parfor_params=None):
+    """get arrays that are only updated as a[j] = a[j] <op> v (or
+    a[j] <op>= v) inside the parfor, where j is not the parfor index, e.g.
+    the bins of a histogram. Threads accumulate into private copies of these
+    arrays, which are combined into the arrays after the parfor. Returns a
+    dict of array names to the (inplace operator, operator) combining the
+    partial results, see get_reduction_combine_op().
+    """
+    if parfor_params is None:
+        parfor_params = get_parfor_params(parfor)
+    params = set(parfor_params)
+    index_names = {l.index_variable.name for l in parfor.loop_nests}
+    index_names.add(parfor.index_var.name)
+    getitems = {}   # element variable -> (array, index)
+    updates = {}    # updated element variable -> (element variable, ops)
+    reductions = {}
+    num_reads = defaultdict(int)
+    num_updates = defaultdict(int)
+    invalid = set()
+
+    # a[b[i], 0] = a[b[i], 0] + v computes the index twice, indices are
+    # compared by their definitions in the body
+    defs = {}
+    written = set()
+    for blk in parfor.loop_body.values():
+        for stmt in blk.body:
+            if isinstance(stmt, ir.Assign):
+                defs[stmt.target.name] = stmt.value
+            elif isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
+                written.add(stmt.target.name)
+
+    def index_def(var, top_level=False):
+        # the parfor index is only a regular output index at the top level
+        # (a[i] or a[i, j]), not nested in a lookup like a[b[i]]
+        if var.name in index_names:
+            if top_level:
+                raise KeyError(var.name)
+            return var.name
+        value = defs.get(var.name)
+        if isinstance(value, ir.Const):
+            return ('const', value.value)
+        if isinstance(value, ir.Expr):
+            if value.op == 'build_tuple':
+                return tuple(index_def(v, top_level) for v in value.items)
+            if value.op == 'getitem' and value.value.name not in written:
+                return ('getitem', value.value.name, index_def(value.index))
+            if value.op == 'static_getitem' and value.value.name not in written:
+                return ('getitem', value.value.name, ('const', value.index))
+        return var.name
+
+    def index_key(expr_or_stmt, is_static):
+        if is_static:
+            return ('const', expr_or_stmt.index)
+        # None when indexing with the parfor index, i.e. a regular output
+        try:
+            return index_def(expr_or_stmt.index, top_level=True)
+        except KeyError:
+            return None
+
+    for blk in parfor.loop_body.values():
+        for stmt in blk.body:
+            if isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Expr):
+                expr = stmt.value
+                if (expr.op in ('getitem', 'static_getitem')
+                        and expr.value.name in params):
+                    key = index_key(expr, expr.op == 'static_getitem')
+                    if key is None:
+                        invalid.add(expr.value.name)
+                    getitems[stmt.target.name] = (expr.value.name, key)
+                    num_reads[expr.value.name] += 1
+                    continue
+                if (expr.op in ('binop', 'inplace_binop')
+                        and expr.lhs.name in getitems):
+                    if expr.op == 'binop':
+                        ops = (expr.fn + '=', expr.fn)
+                    else:
+                        ops = (expr.fn, expr.immutable_fn)
+                    if ops[1] in _reduction_identities:
+                        updates[stmt.target.name] = (expr.lhs.name, ops)
+            elif (isinstance(stmt, (ir.SetItem, ir.StaticSetItem))
+                    and stmt.target.name in params):
+                arr = stmt.target.name
+                is_static = isinstance(stmt, ir.StaticSetItem)
+                key = index_key(stmt, is_static)
+                if stmt.value.name not in updates or key is None:
+                    invalid.add(arr)
+                    continue
+                elem, ops = updates[stmt.value.name]
+                # e.g. += and -= updates of the same array are both
+                # combined with +
+                combine = get_reduction_combine_op(*ops)
+                if (getitems[elem] != (arr, key)
+                        or reductions.setdefault(arr, combine) != combine):
+                    invalid.add(arr)
+                num_updates[arr] += 1
+                continue
+            # any other use of the array makes it a regular parameter
+            invalid.update(v.name for v in stmt.list_vars()
+                           if v.name in params)
+
+    return {arr: ops for arr, ops in reductions.items()
+            if arr not in invalid and num_reads[arr] == num_updates[arr]}
+
 def visit_vars_parfor(parfor, callback, cbdata):
     if config.DEBUG_ARRAY_OPT==1:
         print("visiting parfor vars for:",parfor)
@@ -1003,7 +2091,7 @@ def get_parfor_writes(parfor):
                 writes.update(get_parfor_writes(stmt))
     return writes
 
-def fuse_parfors(blocks):
+def fuse_parfors(blocks, diagnostics=None):
     for block in blocks.values():
         fusion_happened = True
         while fusion_happened:
@@ -1014,7 +2102,7 @@ def fuse_parfors(blocks):
                 stmt = block.body[i]
                 next_stmt = block.body[i+1]
                 if isinstance(stmt, Parfor) and isinstance(next_stmt, Parfor):
-                    fused_node = try_fuse(stmt, next_stmt)
+                    fused_node = try_fuse(stmt, next_stmt, diagnostics)
                     if fused_node is not None:
                         fusion_happened = True
                         new_body.append(fused_node)
@@ -1026,28 +2114,40 @@ def fuse_parfors(blocks):
             block.body = new_body
     return
 
-def try_fuse(parfor1, parfor2):
-    """try to fuse parfors and return a fused parfor, otherwise return None
+def try_fuse(parfor1, parfor2, diagnostics=None):
+    """try to fuse parfors and return a fused parfor, otherwise return None.
+    The decision and its reason are recorded in diagnostics if provided.
     """
     dprint("try_fuse trying to fuse \n",parfor1,"\n",parfor2)
+    reason = get_fusion_failure(parfor1, parfor2)
+    if diagnostics is not None:
+        diagnostics.add_fusion_attempt(parfor1, parfor2, reason)
+    if reason is not None:
+        dprint("try_fuse", reason)
+        return None
+    return fuse_parfors_inner(parfor1, parfor2)
 
+def get_fusion_failure(parfor1, parfor2):
+    """return the reason parfor2 can't be fused into parfor1, or None if they
+    can be fused.
+    """
     # fusion of parfors with different dimensions not supported yet
-    if len(parfor1.loop_nests)!=len(parfor1.loop_nests):
-        dprint("try_fuse parfors number of dimensions mismatch")
-        return None
+    if len(parfor1.loop_nests)!=len(parfor2.loop_nests):
+        return "number of dimensions mismatch"
 
     ndims = len(parfor1.loop_nests)
     # all loops should be equal length
     for i in range(ndims):
+        if parfor1.loop_nests[i].correlation==array_analysis.UNKNOWN_CLASS:
+            return "size of dimension {} unknown".format(i)
         if parfor1.loop_nests[i].correlation!=parfor2.loop_nests[i].correlation:
-            dprint("try_fuse parfor dimension correlation mismatch", i)
-            return None
+            return "size of dimension {} not equivalent".format(i)
 
-    # TODO: make sure parfor1's reduction output is not used in parfor2
-    # only data parallel loops
-    if has_cross_iter_dep(parfor1) or has_cross_iter_dep(parfor2):
-        dprint("try_fuse parfor cross iteration dependency found")
-        return None
+    # values computed by one parfor should be used by the other only at the
+    # same iteration
+    dep = get_cross_iter_dep(parfor1, parfor2)
+    if dep is not None:
+        return "cross iteration dependency on {}".format(dep)
 
     # make sure parfor2's init block isn't using any output of parfor1
     parfor1_body_usedefs = compute_use_defs(parfor1.loop_body)
@@ -1056,10 +2156,8 @@ def try_fuse(parfor1, parfor2):
         parfor1_body_vardefs |= defs
     init2_uses = compute_use_defs({0:parfor2.init_block}).usemap[0]
     if not parfor1_body_vardefs.isdisjoint(init2_uses):
-        dprint("try_fuse parfor2 init block depends on parfor1 body")
-        return None
-
-    return fuse_parfors_inner(parfor1, parfor2)
+        return "init block depends on the body of the first parfor"
+    return None
 
 def fuse_parfors_inner(parfor1, parfor2):
     # fuse parfor2 into parfor1
@@ -1078,65 +2176,479 @@ def fuse_parfors_inner(parfor1, parfor2):
 
     # replace parfor2 indices with parfor1's
     ndims = len(parfor1.loop_nests)
-    index_dict = {parfor2.index_var.name:parfor1.index_var}
+    index_dict = {}
     for i in range(ndims):
         index_dict[parfor2.loop_nests[i].index_variable.name] = parfor1.loop_nests[i].index_variable
+    # index tuple variables are replaced only if both parfors have one
+    # (collapsed prange loops don't)
+    parfor1_indices = {l.index_variable.name for l in parfor1.loop_nests}
+    if (parfor2.index_var.name not in index_dict
+            and parfor1.index_var.name not in parfor1_indices):
+        index_dict[parfor2.index_var.name] = parfor1.index_var
     replace_vars(parfor1.loop_body, index_dict)
 
     return parfor1
 
-def has_cross_iter_dep(parfor):
-    # we consevatively assume there is cross iteration dependency when
-    # the parfor index is used in any expression since the expression could
-    # be used for indexing arrays
-    # TODO: make it more accurate using ud-chains
-    indices = { l.index_variable for l in parfor.loop_nests }
-    for b in parfor.loop_body.values():
-        for stmt in b.body:
-            # GetItem/SetItem nodes are fine since can't have expression inside
-            # and only simple indices are possible
-            if isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
+def collapse_parfors(blocks, diagnostics=None):
+    """collapse perfectly nested parfors (e.g. from nested prange loops) into
+    a single multi-dimensional parfor so that the scheduler can divide the
+    combined iteration space across threads.
+    """
+    for block in blocks.values():
+        for stmt in block.body:
+            if isinstance(stmt, Parfor):
+                while _try_collapse(stmt, diagnostics):
+                    pass
+    return
+
+# statements that can be hoisted out of an outer parfor when collapsing
+_collapse_hoist_ops = ['getattr', 'static_getitem', 'binop', 'unary',
+    'build_tuple']
+
+def _try_collapse(parfor, diagnostics=None):
+    """merge the inner parfor of a perfect loop nest into the loop nests of
+    parfor. Loop-invariant assignments around the inner parfor (e.g. computing
+    its bounds) are moved to the init block of parfor.
+    Returns True if collapse happened.
+    """
+    inner = None
+    hoisted = []
+    dependent = {l.index_variable.name for l in parfor.loop_nests}
+    for label in sorted(parfor.loop_body.keys()):
+        for stmt in parfor.loop_body[label].body:
+            if isinstance(stmt, ir.Jump):
                 continue
-            # tuples are immutable so no expression on parfor possible
-            if isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Expr):
-                op = stmt.value.op
-                if op in ['build_tuple', 'getitem', 'static_getitem']:
-                    continue
-            # other statements can have potential violations
-            if not indices.isdisjoint(stmt.list_vars()):
-                dprint("has_cross_iter_dep found", indices, stmt)
-                return True
+            if isinstance(stmt, Parfor) and inner is None:
+                inner = stmt
+                continue
+            if inner is not None or not _is_collapse_hoistable(stmt):
+                return False
+            if not dependent.isdisjoint({v.name for v in stmt.list_vars()}):
+                return False
+            hoisted.append(stmt)
+    if inner is None or len(inner.init_block.body) != 0:
+        return False
+    # bounds of the inner loop should be invariant in the outer loop
+    for l in inner.loop_nests:
+        for v in (l.start, l.stop, l.step):
+            if isinstance(v, ir.Var) and v.name in dependent:
+                return False
+    dprint("collapsing parfor", inner.id, "into parfor", parfor.id)
+    if diagnostics is not None:
+        diagnostics.add_collapse(parfor, inner)
+        for stmt in hoisted:
+            diagnostics.add_hoisted(parfor, stmt)
+    parfor.init_block.body.extend(hoisted)
+    parfor.loop_nests.extend(inner.loop_nests)
+    parfor.loop_body = inner.loop_body
+    return True
+
+def _is_collapse_hoistable(stmt):
+    if not isinstance(stmt, ir.Assign):
+        return False
+    rhs = stmt.value
+    if isinstance(rhs, (ir.Const, ir.Global, ir.FreeVar, ir.Var)):
+        return True
+    return isinstance(rhs, ir.Expr) and rhs.op in _collapse_hoist_ops
+
+def hoist_parfors(blocks, typemap, call_table, diagnostics=None):
+    """move loop-invariant computations out of the bodies of parfors
+    (see hoist).
+    """
+    for block in blocks.values():
+        for stmt in block.body:
+            if isinstance(stmt, Parfor):
+                hoist(stmt, typemap, call_table, diagnostics)
+    return
+
+# binary operators that can't raise exceptions on scalars
+_hoist_binops = ['+', '-', '*', '**', '&', '|', '^', '<<', '>>', '==', '!=',
+    '<', '<=', '>', '>=']
+
+# allocation calls that can be hoisted if the array is not written
+_hoist_allocs = [['empty', numpy], ['zeros', numpy], ['ones', numpy]]
+
+def hoist(parfor, typemap, call_table, diagnostics=None):
+    """move loop-invariant statements without side effects from the first
+    block of parfor's body to its init block, so that they run once instead
+    of in every iteration. Only scalars and arrays can be passed to the
+    gufunc of parfor, so other hoisted values that are still used in the body
+    (e.g. tuples) are recomputed there.
+    Allocations of scratch arrays with np.empty that are written in the body
+    can't be shared by threads, so they are listed in parfor.private_allocs
+    instead to be allocated once per thread in the gufunc.
+    """
+    first_label = min(parfor.loop_body.keys())
+    first_block = parfor.loop_body[first_label]
+    # number of definitions of variables in the body
+    def_counts = defaultdict(int)
+    for l in parfor.loop_nests:
+        def_counts[l.index_variable.name] += 1
+    for block in parfor.loop_body.values():
+        for stmt in block.body:
+            writes = get_stmt_writes(stmt)
+            if isinstance(stmt, Parfor):
+                writes |= get_parfor_writes(stmt)
+            for v in writes:
+                def_counts[v] += 1
+
+    hoisted = []
+    invariants = set()
+    used = set()
+    new_body = []
+    for stmt in first_block.body:
+        if (isinstance(stmt, ir.Assign) and def_counts[stmt.target.name]==1
+                and stmt.target.name not in used
+                and _is_invariant(stmt, def_counts, invariants)):
+            rhs = stmt.value
+            if _is_hoistable(rhs, typemap):
+                hoisted.append(stmt)
+                invariants.add(stmt.target.name)
+                continue
+            alloc = (isinstance(rhs, ir.Expr) and rhs.op=='call'
+                     and call_table.get(rhs.func.name) in _hoist_allocs)
+            if alloc and _is_array_read_only(stmt.target.name, parfor,
+                                                 typemap):
+                hoisted.append(stmt)
+                invariants.add(stmt.target.name)
+                continue
+            if (alloc and call_table[rhs.func.name]==['empty', numpy]
+                    and _is_array_local(stmt.target.name, parfor)):
+                dprint("hoisting allocation per thread", stmt)
+                parfor.private_allocs.add(stmt.target.name)
+                if diagnostics is not None:
+                    diagnostics.add_hoisted(parfor, stmt, per_thread=True)
+        used.update(v.name for v in stmt.list_vars())
+        new_body.append(stmt)
+
+    # recompute hoisted values that can't be gufunc parameters if needed
+    needed = set()
+    for block in parfor.loop_body.values():
+        stmts = new_body if block is first_block else block.body
+        for stmt in stmts:
+            needed.update(v.name for v in stmt.list_vars())
+    recomputed = []
+    for stmt in reversed(hoisted):
+        typ = typemap[stmt.target.name]
+        if (stmt.target.name in needed
+                and not isinstance(typ, (types.Number, types.Boolean,
+                                         types.Array))):
+            recomputed.insert(0, stmt)
+            needed.update(v.name for v in _get_rhs_vars(stmt.value))
+
+    for stmt in hoisted:
+        dprint("hoisting", stmt)
+        if diagnostics is not None and stmt not in recomputed:
+            diagnostics.add_hoisted(parfor, stmt)
+    parfor.init_block.body.extend(hoisted)
+    first_block.body = [copy.copy(stmt) for stmt in recomputed] + new_body
+    return
+
+def _is_invariant(stmt, def_counts, invariants):
+    """the value of assignment stmt is loop-invariant if its variables are not
+    defined in the body or are defined by hoisted statements.
+    """
+    return all(def_counts[v.name]==0 or v.name in invariants
+               for v in _get_rhs_vars(stmt.value))
+
+def _get_rhs_vars(rhs):
+    if isinstance(rhs, ir.Var):
+        return [rhs]
+    if isinstance(rhs, ir.Expr):
+        return rhs.list_vars()
+    return []
+
+def _is_hoistable(rhs, typemap):
+    """return True if computing rhs has no side effects and can't raise"""
+    if isinstance(rhs, (ir.Const, ir.Global, ir.FreeVar, ir.Var)):
+        return True
+    if not isinstance(rhs, ir.Expr):
+        return False
+    if rhs.op=='getattr':
+        return isinstance(typemap[rhs.value.name], (types.Array, types.Module))
+    if rhs.op=='static_getitem':
+        return isinstance(typemap[rhs.value.name], types.BaseTuple)
+    if rhs.op=='build_tuple':
+        return True
+    if rhs.op in ('binop', 'unary'):
+        if rhs.op=='binop' and rhs.fn not in _hoist_binops:
+            return False
+        return all(isinstance(typemap[v.name], (types.Number, types.Boolean))
+                   for v in rhs.list_vars())
     return False
 
+def _get_array_uses(arr, parfor):
+    """return statements in the body of parfor that use array arr, or None
+    if it is used in a nested parfor.
+    """
+    uses = []
+    for block in parfor.loop_body.values():
+        for stmt in block.body:
+            if arr in {v.name for v in stmt.list_vars()}:
+                if isinstance(stmt, Parfor):
+                    return None
+                uses.append(stmt)
+    return uses
+
+# attributes of arrays that don't give access to their data
+_read_only_array_attrs = ('shape', 'ndim', 'size', 'dtype')
+
+def _is_array_read_only(arr, parfor, typemap):
+    """array arr is only read in parfor, with getitems of scalars or
+    getattrs of attributes that don't give access to its data. Methods
+    (e.g. fill) and views (e.g. slices or T) could write to the array.
+    """
+    uses = _get_array_uses(arr, parfor)
+    if uses is None:
+        return False
+    for stmt in uses:
+        if isinstance(stmt, ir.Assign) and stmt.target.name==arr:
+            continue
+        if not (isinstance(stmt, ir.Assign)
+                and isinstance(stmt.value, ir.Expr)
+                and stmt.value.value.name==arr
+                and stmt.target.name!=arr):
+            return False
+        rhs = stmt.value
+        if rhs.op=='getattr':
+            if rhs.attr not in _read_only_array_attrs:
+                return False
+        elif rhs.op in ('getitem', 'static_getitem'):
+            # records are references to the array's data
+            if not isinstance(typemap[stmt.target.name],
+                              (types.Number, types.Boolean)):
+                return False
+        else:
+            return False
+    return True
+
+def _is_array_local(arr, parfor):
+    """array arr is only read and written with indexing in parfor, so its
+    contents can't outlive an iteration.
+    """
+    uses = _get_array_uses(arr, parfor)
+    if uses is None:
+        return False
+    for stmt in uses:
+        if (isinstance(stmt, (ir.SetItem, ir.StaticSetItem))
+                and stmt.target.name==arr and stmt.value.name!=arr):
+            continue
+        if isinstance(stmt, ir.Assign) and stmt.target.name==arr:
+            continue
+        if not (isinstance(stmt, ir.Assign)
+                and isinstance(stmt.value, ir.Expr)
+                and stmt.value.op in ('getitem', 'static_getitem', 'getattr')
+                and stmt.value.value.name==arr):
+            return False
+    return True
+
+def has_cross_iter_dep(parfor1, parfor2):
+    """return True if fusing parfor2 into parfor1 could violate a dependency
+    between them. Arrays written by one parfor and used by the other should
+    be accessed only at the parallel index (the tuple of loop indices) in
+    both, and scalars written by one parfor (e.g. reduction variables) should
+    not be used by the other.
+    """
+    return get_cross_iter_dep(parfor1, parfor2) is not None
+
+def get_cross_iter_dep(parfor1, parfor2):
+    """return the name of a variable that causes a cross iteration dependency
+    between parfor1 and parfor2 (see has_cross_iter_dep), or None.
+    """
+    par_arrays1, other_uses1 = get_parfor_accesses(parfor1)
+    par_arrays2, other_uses2 = get_parfor_accesses(parfor2)
+    writes1 = get_parfor_body_writes(parfor1)
+    writes2 = get_parfor_body_writes(parfor2)
+    uses1 = par_arrays1 | other_uses1
+    uses2 = par_arrays2 | other_uses2
+    for v in sorted((writes1 & uses2) | (writes2 & uses1)):
+        if v in other_uses1 or v in other_uses2:
+            return v
+    return None
+
+def get_parfor_accesses(parfor):
+    """return names of arrays accessed only at the parallel index in the body
+    of parfor, and names of variables used otherwise.
+    """
+    par_indices = get_parfor_par_indices(parfor)
+    par_arrays = set()
+    other_uses = set()
+    for block in parfor.loop_body.values():
+        for stmt in block.body:
+            if (isinstance(stmt, ir.SetItem)
+                    and stmt.index.name in par_indices):
+                par_arrays.add(stmt.target.name)
+                other_uses.add(stmt.value.name)
+                continue
+            if isinstance(stmt, ir.Assign):
+                rhs = stmt.value
+                if (isinstance(rhs, ir.Expr) and rhs.op=='getitem'
+                        and rhs.index.name in par_indices):
+                    par_arrays.add(rhs.value.name)
+                    continue
+                if ((isinstance(rhs, ir.Var) and rhs.name in par_indices)
+                        or stmt.target.name in par_indices):
+                    continue
+            other_uses.update(v.name for v in stmt.list_vars())
+    # arrays used in other ways are not only accessed at the parallel index
+    return par_arrays - other_uses, other_uses
+
+def get_parfor_par_indices(parfor):
+    """return names of variables holding the parallel index in the body of
+    parfor: the loop index for 1D parfors, tuples of all loop indices in
+    order, and their copies.
+    """
+    loop_indices = [l.index_variable.name for l in parfor.loop_nests]
+    par_indices = set()
+    if len(loop_indices)==1:
+        par_indices.add(loop_indices[0])
+    for block in parfor.loop_body.values():
+        for stmt in block.body:
+            if isinstance(stmt, ir.Assign):
+                rhs = stmt.value
+                if (isinstance(rhs, ir.Expr) and rhs.op=='build_tuple'
+                        and [v.name for v in rhs.items]==loop_indices):
+                    par_indices.add(stmt.target.name)
+                if isinstance(rhs, ir.Var) and rhs.name in par_indices:
+                    par_indices.add(stmt.target.name)
+    return par_indices
+
+def get_parfor_body_writes(parfor):
+    """return names of variables and arrays written in the body of parfor
+    """
+    writes = set()
+    for block in parfor.loop_body.values():
+        for stmt in block.body:
+            writes.update(get_stmt_writes(stmt))
+            if isinstance(stmt, Parfor):
+                writes.update(get_parfor_writes(stmt))
+    return writes
+
 def dprint(*s):
     if config.DEBUG_ARRAY_OPT==1:
         print(*s)
 
 def remove_dead_parfor(parfor, lives, args):
-    # remove dead get/sets in last block
-    # FIXME: I think that "in the last block" is not sufficient in general.  We might need to
-    # remove from any block.
-    last_label = max(parfor.loop_body.keys())
-    last_block = parfor.loop_body[last_label]
-
-    # save array values set to replace getitems
-    saved_values = {}
-    new_body = []
-    for stmt in last_block.body:
-        if (isinstance(stmt, ir.SetItem) and stmt.index.name==parfor.index_var.name
-                and stmt.target.name not in lives):
-            saved_values[stmt.target.name] = stmt.value
-        if isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Expr):
-            rhs = stmt.value
-            if rhs.op=='getitem' and rhs.index.name==parfor.index_var.name:
-                # replace getitem if value saved
-                stmt.value = saved_values.get(rhs.value.name, rhs)
-        new_body.append(stmt)
-    last_block.body = new_body
+    # contract temporary arrays so that their stores and allocations are
+    # removed as dead code
+    contract_parfor_arrays(parfor, lives)
     # process parfor body recursively
     remove_dead_parfor_recursive(parfor, lives, args)
     return
 
+def contract_parfor_arrays(parfor, lives):
+    """array contraction: replace loads of arrays that are allocated in the
+    init block of parfor, are not live after it, and are only accessed at the
+    parallel index, with the values stored to them in the same iteration.
+    Stores and allocations of these arrays become dead after replacement.
+    """
+    arrays = (get_parfor_accesses(parfor)[0] & get_parfor_allocs(parfor)) - lives
+    if not arrays:
+        return
+    par_indices = get_parfor_par_indices(parfor)
+    # find stores to arrays and definitions of variables in the loop body
+    stores = {}
+    defs = {}
+    for label, block in parfor.loop_body.items():
+        for i, stmt in enumerate(block.body):
+            if isinstance(stmt, ir.SetItem) and stmt.target.name in arrays:
+                stores.setdefault(stmt.target.name, []).append((label, i, stmt))
+            writes = get_stmt_writes(stmt)
+            if isinstance(stmt, Parfor):
+                writes |= get_parfor_writes(stmt)
+            for v in writes:
+                defs.setdefault(v, []).append((label, i))
+    blocks = wrap_parfor_blocks(parfor)
+    dominators = compute_cfg_from_blocks(blocks).dominators()
+    unwrap_parfor_blocks(parfor)
+
+    for label, block in parfor.loop_body.items():
+        for i, stmt in enumerate(block.body):
+            if not (isinstance(stmt, ir.Assign)
+                    and isinstance(stmt.value, ir.Expr)
+                    and stmt.value.op=='getitem'
+                    and stmt.value.value.name in arrays
+                    and stmt.value.index.name in par_indices):
+                continue
+            arr_stores = stores.get(stmt.value.value.name, [])
+            # the array should be stored once, before the load in all paths
+            if len(arr_stores)!=1:
+                continue
+            store_label, store_ind, store = arr_stores[0]
+            if store_label==label:
+                if store_ind>i:
+                    continue
+            elif store_label not in dominators[label]:
+                continue
+            # the stored value shouldn't change between the store and the
+            # load, so it should be defined outside the loop body or right
+            # before the store in the same block
+            value_defs = defs.get(store.value.name, [])
+            if len(value_defs)>1 or (len(value_defs)==1
+                    and (value_defs[0][0]!=store_label
+                         or value_defs[0][1]>store_ind)):
+                continue
+            dprint("contracting array", store.target.name, "in parfor",
+                parfor.id)
+            stmt.value = store.value
+    return
+
+def get_parfor_allocs(parfor):
+    """return names of arrays allocated with np.empty in the init block of
+    parfor.
+    """
+    call_table, _ = get_call_table({0: parfor.init_block}, {}, {})
+    allocs = set()
+    for stmt in parfor.init_block.body:
+        if (isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Expr)
+                and stmt.value.op=='call'
+                and call_table.get(stmt.value.func.name)==['empty', numpy]):
+            allocs.add(stmt.target.name)
+    return allocs
+
+def estimate_parfor_cost(parfor):
+    """estimate the cost of one iteration of the parfor body in units of
+    simple arithmetic operations. Blocks of sequential loops in the body and
+    nested parfors are assumed to run _inner_loop_trip_count iterations.
+    """
+    blocks = wrap_parfor_blocks(parfor)
+    cfg = compute_cfg_from_blocks(blocks)
+    unwrap_parfor_blocks(parfor)
+    first_label = min(parfor.loop_body.keys())
+    depths = defaultdict(int)
+    for loop in cfg.loops().values():
+        # the back edge of the parfor loop itself goes to the first block
+        if loop.header == first_label:
+            continue
+        for label in loop.body:
+            depths[label] += 1
+
+    cost = 0
+    for label, block in parfor.loop_body.items():
+        block_cost = 0
+        for stmt in block.body:
+            if isinstance(stmt, Parfor):
+                block_cost += (estimate_parfor_cost(stmt)
+                    * _inner_loop_trip_count ** len(stmt.loop_nests))
+            elif isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
+                block_cost += _setitem_cost
+            elif (isinstance(stmt, ir.Assign)
+                    and isinstance(stmt.value, ir.Expr)):
+                block_cost += _op_costs.get(stmt.value.op, 0)
+        cost += block_cost * _inner_loop_trip_count ** depths[label]
+    return max(cost, 1)
+
+def get_sequential_threshold(parfor):
+    """return the number of iterations below which the parfor runs on the
+    calling thread since waking up the thread pool would cost more than the
+    estimated work, or 0 if the parfor always runs in parallel.
+    """
+    work = config.PARALLEL_SEQUENTIAL_THRESHOLD
+    if work <= 0:
+        return 0
+    cost = estimate_parfor_cost(parfor)
+    return (work + cost - 1) // cost
+
 ir_utils.remove_dead_extensions[Parfor] = remove_dead_parfor
 
 def remove_dead_parfor_recursive(parfor, lives, args):
@@ -1146,9 +2658,7 @@ def remove_dead_parfor_recursive(parfor, lives, args):
     first_body_block = min(blocks.keys())
     assert first_body_block > 0 # we are using 0 for init block here
     last_label = max(blocks.keys())
-    if len(blocks[last_label].body) == 0:
-        return
-    loc = blocks[last_label].body[-1].loc
+    loc = blocks[last_label].loc
     scope = blocks[last_label].scope
 
     # add dummy jump in init_block for CFG to work
@@ -1203,7 +2713,7 @@ def wrap_parfor_blocks(parfor):
     first_body_block = min(blocks.keys())
     assert first_body_block > 0 # we are using 0 for init block here
     last_label = max(blocks.keys())
-    loc = blocks[last_label].body[-1].loc
+    loc = blocks[last_label].loc
 
     # add dummy jump in init_block for CFG to work
     blocks[0] = parfor.init_block
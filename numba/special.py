@@ -3,4 +3,109 @@ from __future__ import print_function, division, absolute_import
 from .typing.typeof import typeof
 
 
-__all__ = ['typeof']
+def prange(*args):
+    """
+    Provides a 1D parallel iterator that generates a sequence of integers.
+    In non-parallel contexts, prange is identical to range.
+    """
+    return range(*args)
+
+
+def parallel_scan(op, a, out=None):
+    """
+    Inclusive scan of the elements of the array *a*, flattened, with the
+    associative binary function *op*: out[0] = a[0] and
+    out[i] = op(out[i - 1], a[i]).  Results are stored in *out*, a 1D array
+    with as many elements as *a*, or a new array of the dtype of *a*.
+    In functions compiled by Numba, *op* must be a jitted function and
+    large arrays are scanned by the threads of the parallel thread pool.
+    """
+    import numpy as np
+    a = np.asarray(a).ravel()
+    if out is None:
+        out = np.empty(a.shape, a.dtype)
+    elif len(out) != len(a):
+        raise ValueError("parallel_scan(): out must have as many elements as a")
+    if len(a):
+        acc = a[0]
+        out[0] = acc
+        for i in range(1, len(a)):
+            acc = op(acc, a[i])
+            out[i] = acc
+    return out
+
+
+def _windows(a, window):
+    """
+    A view of the windows of *window* consecutive elements of
+    the 1D array *a*, one per row.
+    """
+    import numpy as np
+    a = np.asarray(a)
+    if a.ndim != 1:
+        raise ValueError("rolling functions need a one-dimensional array")
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    n = max(len(a) - window + 1, 0)
+    return np.lib.stride_tricks.as_strided(a, (n, window),
+                                           (a.strides[0], a.strides[0]))
+
+
+def rolling_sum(a, window):
+    """
+    Sums of the windows of *window* consecutive elements of the 1D array
+    *a*: out[i] = a[i:i + window].sum(), for the len(a) - window + 1
+    windows (none if *window* is larger than *a*).  In functions compiled
+    by Numba, the sums are updated in constant time as the window slides.
+    """
+    return _windows(a, window).sum(axis=1)
+
+
+def rolling_mean(a, window):
+    """
+    Means of the windows of *window* consecutive elements of the 1D array
+    *a*, like rolling_sum().
+    """
+    return _windows(a, window).mean(axis=1)
+
+
+def rolling_std(a, window, ddof=0):
+    """
+    Standard deviations of the windows of *window* consecutive elements of
+    the 1D array *a*, with *ddof* delta degrees of freedom, like
+    rolling_sum().
+    """
+    return _windows(a, window).std(axis=1, ddof=ddof)
+
+
+def _as_float(out):
+    """
+    *out* as a floating-point array: the rolling minimums and maximums of
+    integer arrays are floats, like the other rolling functions.
+    """
+    if out.dtype.kind != 'f':
+        out = out.astype('float64')
+    return out
+
+
+def rolling_min(a, window):
+    """
+    Minimums of the windows of *window* consecutive elements of the 1D
+    array *a*, like rolling_sum(), as floats for integer arrays.  In
+    functions compiled by Numba, the candidate minimums are kept in a
+    monotonic queue, so that each element is compared a constant number of
+    times on average.
+    """
+    return _as_float(_windows(a, window).min(axis=1))
+
+
+def rolling_max(a, window):
+    """
+    Maximums of the windows of *window* consecutive elements of the 1D
+    array *a*, like rolling_min().
+    """
+    return _as_float(_windows(a, window).max(axis=1))
+
+
+__all__ = ['typeof', 'prange', 'parallel_scan', 'rolling_sum', 'rolling_mean',
+           'rolling_std', 'rolling_min', 'rolling_max']
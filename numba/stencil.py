@@ -0,0 +1,538 @@
+"""
+Implementation of the @stencil decorator. A stencil kernel is written for a
+single point of the output and accesses its input arrays with indices
+relative to that point, e.g.::
+
+    @stencil
+    def kernel(a):
+        return 0.25 * (a[0, 1] + a[1, 0] + a[0, -1] + a[-1, 0])
+
+The kernel is turned into a function looping over all the points of the
+output for which the neighborhood is inside the input arrays. The loops use
+prange, so calling a stencil from a function compiled with parallel=True
+results in parfors of the calling function.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import ast
+import copy
+import inspect
+import textwrap
+
+import numpy as np
+
+from numba import ir, ir_utils, types, utils, config, numpy_support
+from numba.errors import TypingError
+from numba.ir_utils import (mk_unique_var, next_label, add_offset_to_labels,
+                            replace_vars, remove_dels)
+from numba.inline_closurecall import (_replace_args_with, _replace_returns,
+                                      _add_definition)
+from numba.special import prange
+from numba.targets.imputils import impl_ret_new_ref
+from numba.typing.templates import AbstractTemplate, signature
+from numba.typing.typeof import typeof
+
+
+_stencil_modes = ('constant', 'skip')
+
+class StencilFunc(object):
+    """
+    A callable object created by the @stencil decorator. It can be called
+    from Python and from jitted functions with the input arrays of the
+    kernel and an optional ``out`` keyword argument for the output array.
+    """
+    id_counter = 0
+
+    def __init__(self, kernel_func, mode, options):
+        if mode not in _stencil_modes:
+            raise ValueError("unsupported stencil mode '{}', expected one of "
+                             "{}".format(mode, _stencil_modes))
+        self.id = type(self).id_counter
+        type(self).id_counter += 1
+        self.kernel_func = kernel_func
+        self.mode = mode
+        self.options = options
+        self.cval = options.get('cval', 0)
+        self.standard_indexing = set(options.get('standard_indexing', ()))
+
+        self.kernel_def = _get_kernel_def(kernel_func)
+        self.kernel_args = [a.arg if hasattr(a, 'arg') else a.id
+                            for a in self.kernel_def.args.args]
+        if 'out' in self.kernel_args:
+            raise ValueError("stencil kernel arguments cannot be named 'out'")
+        unknown = self.standard_indexing - set(self.kernel_args)
+        if unknown:
+            raise ValueError("standard_indexing arguments {} are not "
+                             "arguments of the kernel".format(sorted(unknown)))
+        self.relative_args = [a for a in self.kernel_args
+                              if a not in self.standard_indexing]
+        if not self.relative_args:
+            raise ValueError("stencil kernel needs at least one argument "
+                             "with relative indexing")
+        self.neighborhood = _get_neighborhood(self.kernel_def,
+            self.relative_args, options.get('neighborhood'))
+
+        self._impls = {}
+        self._dispatchers = {}
+        self._lowered = set()
+        self._install_type()
+
+    @property
+    def ndim(self):
+        return len(self.neighborhood)
+
+    def __call__(self, *args, **kwargs):
+        from numba.decorators import njit
+        from numba.targets.registry import cpu_target
+        if set(kwargs) - {'out'}:
+            raise TypeError("unexpected keyword arguments {}".format(
+                            sorted(set(kwargs) - {'out'})))
+        out = kwargs.get('out')
+        argtys = tuple(typeof(a) for a in args)
+        out_type = typeof(out) if out is not None else None
+        typingctx = cpu_target.typing_context
+        typingctx.refresh()
+        impl, _ = self._get_impl(typingctx, argtys, out_type)
+        key = (argtys, out_type)
+        if key not in self._dispatchers:
+            self._dispatchers[key] = njit(impl)
+        if out is not None:
+            args = args + (out,)
+        return self._dispatchers[key](*args)
+
+    def _install_type(self):
+        """install a typing template for calls of this stencil function in
+        jitted code.
+        """
+        from numba.targets.registry import cpu_target
+        _ty_cls = type('StencilFuncTyping_' + str(self.id),
+                       (AbstractTemplate,),
+                       dict(key=self, generic=self._type_me))
+        cpu_target.typing_context.insert_user_function(self, _ty_cls)
+
+    def _type_me(self, argtys, kwtys):
+        """type a call of the stencil function and register the lowering
+        of the call for the given argument types.
+        """
+        from numba.targets.registry import cpu_target
+        if set(kwtys) - {'out'}:
+            return None
+        out_type = kwtys.get('out')
+        impl, return_type = self._get_impl(cpu_target.typing_context,
+                                           tuple(argtys), out_type)
+        all_argtys = tuple(argtys)
+        if out_type is not None:
+            all_argtys += (out_type,)
+        sig = signature(return_type, *all_argtys)
+        sig.pysig = utils.pysignature(impl)
+        if all_argtys not in self._lowered:
+            cpu_target.target_context.insert_func_defn(
+                [(self._lower_me, self, all_argtys)])
+            self._lowered.add(all_argtys)
+        return sig
+
+    def _lower_me(self, context, builder, sig, args):
+        nargs = len(self.kernel_args)
+        out_type = sig.args[nargs] if len(sig.args) > nargs else None
+        impl, _ = self._impls[(tuple(sig.args[:nargs]), out_type)]
+        res = context.compile_internal(builder, impl, sig, args)
+        return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+    def _get_impl(self, typingctx, argtys, out_type):
+        """return the Python function implementing the stencil for the given
+        argument types and its return type.
+        """
+        key = (argtys, out_type)
+        if key in self._impls:
+            return self._impls[key]
+        if len(argtys) != len(self.kernel_args):
+            raise TypingError("stencil kernel {} expects {} arguments, got "
+                              "{}".format(self.kernel_func.__name__,
+                                          len(self.kernel_args), len(argtys)))
+        shape_arg = self.relative_args[0]
+        shape_type = argtys[self.kernel_args.index(shape_arg)]
+        if not (isinstance(shape_type, types.Array)
+                and shape_type.ndim == self.ndim):
+            raise TypingError("stencil argument {} should be a {}D array, not "
+                              "{}".format(shape_arg, self.ndim, shape_type))
+        kernel_type = self._get_kernel_return_type(typingctx, argtys)
+        try:
+            dtype = numpy_support.as_dtype(kernel_type)
+        except NotImplementedError:
+            raise TypingError("stencil kernel should return a scalar, not "
+                              "{}".format(kernel_type))
+        if out_type is not None:
+            if not (isinstance(out_type, types.Array)
+                    and out_type.ndim == self.ndim):
+                raise TypingError("stencil output should be a {}D array, not "
+                                  "{}".format(self.ndim, out_type))
+            return_type = out_type
+        else:
+            return_type = types.Array(kernel_type, self.ndim, 'C')
+
+        impl = self._make_impl(dtype.type, out_type is not None)
+        self._impls[key] = impl, return_type
+        return impl, return_type
+
+    def _get_kernel_return_type(self, typingctx, argtys):
+        # relative indices are valid standard indices, so the kernel itself
+        # can be typed to find the element type of the output
+        from numba import compiler
+        kernel_ir = compiler.run_frontend(self.kernel_func)
+        _, return_type, _ = compiler.type_inference_stage(typingctx,
+            kernel_ir, argtys, None)
+        return return_type
+
+    def _make_impl(self, dtype, has_out):
+        """generate the Python function that loops over the output and
+        computes the kernel at every point. The kernel statements replace
+        a sentinel in the generated loop nest after their relative indices
+        are offset by the loop indices.
+        """
+        impl_name = "__numba_stencil_{}_{}".format(self.kernel_func.__name__,
+                                                   len(self._impls))
+        params = list(self.kernel_args)
+        if has_out:
+            params.append('out')
+        shape_arg = self.relative_args[0]
+        index_vars = ["_stencil_i{}".format(i) for i in range(self.ndim)]
+
+        impl_txt = "def {}({}):\n".format(impl_name, ", ".join(params))
+        # the loop bounds come from the first relative-indexed array, the
+        # other arrays (and the output) must have its shape
+        checked = [a for a in self.relative_args if a != shape_arg]
+        if has_out:
+            checked.append('out')
+        for arg in checked:
+            impl_txt += ("    if {0}.shape != {1}.shape:\n"
+                         "        raise ValueError(\"stencil array {0} "
+                         "should have the shape of {1}\")\n"
+                         .format(arg, shape_arg))
+        if has_out:
+            impl_txt += "    _stencil_out = out\n"
+            if self.mode == 'constant':
+                impl_txt += "    _stencil_out[:] = _stencil_cval\n"
+        elif self.mode == 'constant':
+            impl_txt += ("    _stencil_out = _stencil_np.full({}.shape, "
+                         "_stencil_cval, _stencil_dtype)\n".format(shape_arg))
+        else:
+            # border elements keep the values of the input
+            impl_txt += ("    _stencil_out = {}.astype(_stencil_dtype)\n"
+                         .format(shape_arg))
+        # loop bounds are computed outside the loop nest so that the nest
+        # is perfect and its parfors can be collapsed
+        for i, (lo, hi) in enumerate(self.neighborhood):
+            impl_txt += "    _stencil_stop{} = {}.shape[{}] - {}\n".format(
+                i, shape_arg, i, max(hi, 0))
+        indent = "    "
+        for i, (lo, hi) in enumerate(self.neighborhood):
+            impl_txt += "{}for {} in _stencil_prange({}, _stencil_stop{}):\n"\
+                .format(indent, index_vars[i], -min(lo, 0), i)
+            indent += "    "
+        impl_txt += indent + "__sentinel__ = 0\n"
+        impl_txt += "    return _stencil_out\n"
+        if config.DEBUG_ARRAY_OPT:
+            print("stencil impl_txt = \n", impl_txt)
+
+        impl_ast = ast.parse(impl_txt)
+        kernel_body = _RelativeIndexTransformer(self.relative_args,
+            index_vars).visit(copy.deepcopy(self.kernel_def)).body
+        out_stmt = ast.parse("_stencil_out[{}] = 0".format(
+            ", ".join(index_vars))).body[0]
+        out_stmt.value = kernel_body[-1].value
+        new_body = kernel_body[:-1] + [out_stmt]
+        _replace_sentinel(impl_ast, new_body)
+        ast.fix_missing_locations(impl_ast)
+
+        glbls = dict(self.kernel_func.__globals__)
+        closure = self.kernel_func.__closure__ or ()
+        for name, cell in zip(self.kernel_func.__code__.co_freevars, closure):
+            glbls[name] = cell.cell_contents
+        glbls.update(_stencil_np=np, _stencil_prange=prange,
+                     _stencil_cval=self.cval, _stencil_dtype=dtype)
+        code = compile(impl_ast, inspect.getsourcefile(self.kernel_func)
+                       or "<stencil>", "exec")
+        exec(code, glbls)
+        return glbls[impl_name]
+
+    def _inline_call(self, func_ir, block, i, typemap, calltypes, typingctx):
+        """replace the call of this stencil function at the i-th statement
+        of block with the typed IR of its implementation. Returns the new
+        blocks.
+        """
+        from numba import compiler
+        scope = block.scope
+        stmt = block.body[i]
+        expr = stmt.value
+        kws = dict(expr.kws)
+        args = list(expr.args)
+        argtys = tuple(typemap[a.name] for a in args)
+        out_type = None
+        if 'out' in kws:
+            out_type = typemap[kws['out'].name]
+            args.append(kws['out'])
+        impl, _ = self._get_impl(typingctx, argtys, out_type)
+        all_argtys = tuple(typemap[a.name] for a in args)
+        impl_ir = compiler.run_frontend(impl)
+        impl_typemap, _, impl_calltypes = compiler.type_inference_stage(
+            typingctx, impl_ir, all_argtys, None)
+        remove_dels(impl_ir.blocks)
+
+        # relabel and rename variables to avoid conflicts with func_ir
+        offset = max(ir_utils._max_label, max(func_ir.blocks.keys())) + 1
+        impl_blocks = add_offset_to_labels(impl_ir.blocks, offset)
+        ir_utils._max_label = max(impl_blocks.keys())
+        entry_label = min(impl_blocks.keys())
+        var_dict = {}
+        for name, typ in impl_typemap.items():
+            new_var = ir.Var(scope, mk_unique_var(name), stmt.loc)
+            var_dict[name] = new_var
+            typemap[new_var.name] = typ
+        replace_vars(impl_blocks, var_dict)
+        calltypes.update(impl_calltypes)
+        _replace_args_with(impl_blocks, args)
+        # the output is returned to the caller as is
+        for b in impl_blocks.values():
+            for inst in b.body:
+                if (isinstance(inst, ir.Assign)
+                        and isinstance(inst.value, ir.Expr)
+                        and inst.value.op == 'cast'):
+                    inst.value = inst.value.value
+
+        new_label = next_label()
+        new_block = ir.Block(scope, block.loc)
+        new_block.body = block.body[i+1:]
+        func_ir.blocks[new_label] = new_block
+        block.body = block.body[:i]
+        block.body.append(ir.Jump(entry_label, stmt.loc))
+        _replace_returns(impl_blocks, stmt.target, new_label)
+        new_blocks = [(new_label, new_block)]
+        for label, b in impl_blocks.items():
+            b.scope = scope
+            _add_definition(func_ir, b)
+            func_ir.blocks[label] = b
+            new_blocks.append((label, b))
+        return new_blocks
+
+
+def stencil(func_or_mode='constant', **options):
+    """
+    This decorator creates a stencil function from a kernel written with
+    indices relative to the output point being computed.
+
+    Args
+    -----
+    mode: str
+        How the border of the output, where the neighborhood of the kernel
+        is outside the input arrays, is handled. With 'constant' (default),
+        border elements are set to ``cval``. With 'skip', border elements
+        are not computed: they keep the values of the first input array, or
+        of ``out`` if an output array is passed.
+
+    options:
+        cval: scalar
+            Value of the border elements in 'constant' mode. Default is 0.
+
+        neighborhood: tuple of (low, high) pairs
+            Minimum and maximum relative index of each dimension. Required if
+            the kernel uses non-constant relative indices, otherwise it is
+            inferred from the kernel.
+
+        standard_indexing: tuple of str
+            Names of kernel arguments that are indexed with standard
+            (absolute) indices.
+
+    Returns
+    --------
+    A StencilFunc object, callable with the kernel arguments and an
+    optional ``out`` keyword argument.
+
+    Examples
+    --------
+    ::
+
+        @stencil
+        def laplace(a):
+            return 0.25 * (a[0, 1] + a[1, 0] + a[0, -1] + a[-1, 0])
+
+        @stencil(neighborhood=((-2, 2),), cval=np.nan)
+        def moving_avg(a):
+            s = 0.0
+            for i in range(-2, 3):
+                s += a[i]
+            return s / 5
+    """
+    if isinstance(func_or_mode, str):
+        mode = func_or_mode
+        func = None
+    else:
+        mode = 'constant'
+        func = func_or_mode
+
+    def wrapper(func):
+        return StencilFunc(func, mode, options)
+
+    if func is not None:
+        return wrapper(func)
+    return wrapper
+
+
+def inline_stencil_calls(func_ir, typemap, calltypes, typingctx):
+    """replace calls to stencil functions in func_ir with the typed IR of
+    their implementations, so that the stencil loops become parfors of
+    func_ir and can be fused with the surrounding parfors.
+    """
+    work_list = list(func_ir.blocks.items())
+    while work_list:
+        label, block = work_list.pop()
+        for i, stmt in enumerate(block.body):
+            if (isinstance(stmt, ir.Assign)
+                    and isinstance(stmt.value, ir.Expr)
+                    and stmt.value.op == 'call'
+                    and stmt.value.vararg is None):
+                fnty = typemap.get(stmt.value.func.name)
+                if (isinstance(fnty, types.Function)
+                        and isinstance(fnty.typing_key, StencilFunc)):
+                    new_blocks = fnty.typing_key._inline_call(func_ir, block,
+                        i, typemap, calltypes, typingctx)
+                    work_list.extend(new_blocks)
+                    # current block is modified, skip the rest
+                    break
+    return
+
+
+def _get_kernel_def(kernel_func):
+    """return the AST of the kernel function definition, with its last
+    statement returning the value of the output point.
+    """
+    source = textwrap.dedent(inspect.getsource(kernel_func))
+    kernel_def = ast.parse(source).body[0]
+    if not isinstance(kernel_def, ast.FunctionDef):
+        raise ValueError("stencil kernel should be a function definition")
+    kernel_def.decorator_list = []
+    body = kernel_def.body
+    if (body and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, _str_nodes)):
+        # skip docstring
+        body = body[1:]
+    if not body or not isinstance(body[-1], ast.Return) or body[-1].value is None:
+        raise ValueError("stencil kernel should end with a return of the "
+                         "output value")
+    for node in ast.walk(ast.Module(body=body[:-1])):
+        if isinstance(node, ast.Return):
+            raise ValueError("stencil kernel should have a single return "
+                             "statement at the end")
+    kernel_def.body = body
+    return kernel_def
+
+
+_const_nodes = tuple(getattr(ast, n) for n in ('Constant', 'Num')
+                     if hasattr(ast, n))
+_str_nodes = tuple(getattr(ast, n) for n in ('Constant', 'Str')
+                   if hasattr(ast, n))
+_slice_nodes = tuple(getattr(ast, n) for n in ('Slice', 'ExtSlice')
+                     if hasattr(ast, n))
+
+def _get_const_int(node):
+    """return the integer value of a constant index expression, or None"""
+    if (isinstance(node, ast.UnaryOp)
+            and isinstance(node.op, (ast.USub, ast.UAdd))):
+        val = _get_const_int(node.operand)
+        if val is not None and isinstance(node.op, ast.USub):
+            val = -val
+        return val
+    if isinstance(node, _const_nodes):
+        val = getattr(node, 'value', getattr(node, 'n', None))
+        if isinstance(val, utils.INT_TYPES) and not isinstance(val, bool):
+            return val
+    return None
+
+def _get_index_elts(node):
+    """return the index expressions of a subscript node"""
+    index = node.slice
+    if hasattr(ast, 'Index') and isinstance(index, ast.Index):
+        index = index.value
+    if isinstance(index, _slice_nodes) or (
+            isinstance(index, ast.Tuple)
+            and any(isinstance(e, _slice_nodes) for e in index.elts)):
+        raise ValueError("slices are not supported in relative indices of "
+                         "stencil kernels")
+    if isinstance(index, ast.Tuple):
+        return index.elts
+    return [index]
+
+def _get_neighborhood(kernel_def, relative_args, neighborhood):
+    """return the neighborhood of the kernel as a list of (low, high) pairs,
+    inferred from constant relative indices if not given.
+    """
+    ndim = None
+    lows, highs = [], []
+    for node in ast.walk(kernel_def):
+        if not (isinstance(node, ast.Subscript)
+                and isinstance(node.value, ast.Name)
+                and node.value.id in relative_args):
+            continue
+        elts = _get_index_elts(node)
+        if ndim is None:
+            ndim = len(elts)
+            lows, highs = [0] * ndim, [0] * ndim
+        if len(elts) != ndim:
+            raise ValueError("relative indices of stencil kernel arrays "
+                             "should have the same number of dimensions")
+        if neighborhood is not None:
+            continue
+        for i, elt in enumerate(elts):
+            val = _get_const_int(elt)
+            if val is None:
+                raise ValueError("stencil kernel uses non-constant relative "
+                                 "indices, the neighborhood option is "
+                                 "required")
+            lows[i] = min(lows[i], val)
+            highs[i] = max(highs[i], val)
+    if neighborhood is not None:
+        neighborhood = [tuple(n) for n in neighborhood]
+        if ndim is not None and len(neighborhood) != ndim:
+            raise ValueError("neighborhood should have {} dimensions"
+                             .format(ndim))
+        return neighborhood
+    if ndim is None:
+        raise ValueError("stencil kernel does not access its arguments with "
+                         "relative indices")
+    return list(zip(lows, highs))
+
+
+class _RelativeIndexTransformer(ast.NodeTransformer):
+    """offset relative indices of kernel arrays by the loop indices"""
+
+    def __init__(self, relative_args, index_vars):
+        self.relative_args = relative_args
+        self.index_vars = index_vars
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        if (isinstance(node.value, ast.Name)
+                and node.value.id in self.relative_args):
+            elts = [ast.BinOp(left=ast.Name(id=v, ctx=ast.Load()),
+                              op=ast.Add(), right=e)
+                    for v, e in zip(self.index_vars, _get_index_elts(node))]
+            index = ast.Tuple(elts=elts, ctx=ast.Load())
+            if hasattr(ast, 'Index') and isinstance(node.slice, ast.Index):
+                node.slice.value = index
+            else:
+                node.slice = index
+        return node
+
+def _replace_sentinel(tree, new_body):
+    """replace the __sentinel__ assignment in tree with new_body"""
+    for node in ast.walk(tree):
+        body = getattr(node, 'body', None)
+        if not isinstance(body, list):
+            continue
+        for i, stmt in enumerate(body):
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                    and isinstance(stmt.targets[0], ast.Name)
+                    and stmt.targets[0].id == '__sentinel__'):
+                node.body = body[:i] + new_body + body[i+1:]
+                return
+    raise AssertionError("sentinel not found in stencil implementation")
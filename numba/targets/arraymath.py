@@ -4,6 +4,7 @@ Implementation of math operations on Array objects.
 
 from __future__ import print_function, absolute_import, division
 
+import collections
 import math
 
 import numpy as np
@@ -13,13 +14,226 @@ import llvmlite.llvmpy.core as lc
 from llvmlite.llvmpy.core import Constant, Type
 
 from numba import types, cgutils, typing
-from numba.extending import overload, overload_method, register_jitable
+from numba.errors import TypingError
+from numba.extending import (overload, overload_method, register_jitable,
+                             intrinsic)
 from numba.numpy_support import as_dtype
 from numba.numpy_support import version as numpy_version
+from numba.special import (parallel_scan, rolling_sum, rolling_mean,
+                           rolling_std, rolling_min, rolling_max)
 from numba.targets.imputils import (lower_builtin, impl_ret_borrowed,
                                     impl_ret_new_ref, impl_ret_untracked)
 from numba.typing import signature
-from .arrayobj import make_array, load_item, store_item, _empty_nd_impl
+from numba.typing.templates import register_constant_parameters
+from .arrayobj import (make_array, load_item, store_item, _empty_nd_impl,
+                       reshape_unchecked, populate_array)
+from . import selection
+
+
+#----------------------------------------------------------------------------
+# Pairwise summation
+#
+# Floating-point sums use the pairwise summation of Numpy: ranges of up to
+# PAIRWISE_BLOCKSIZE elements are summed with eight independent
+# accumulators, which don't force a strict order of the additions and
+# can be vectorized, and larger ranges are split in halves (rounded to a
+# multiple of 8) that are summed recursively.  The rounding error grows
+# like O(log n) instead of O(n) for a sequential sum, and the result is
+# the same as Numpy's for contiguous arrays.
+
+PAIRWISE_BLOCKSIZE = 128
+
+# Enough for the recursion of the pairwise summation of any array
+MAX_PAIRWISE_DEPTH = 64
+
+
+@intrinsic
+def _pairwise_stack(typingctx, like):
+    """
+    A 1D array of MAX_PAIRWISE_DEPTH items of the type of the scalar *like*,
+    allocated on the stack of the calling function: it must not outlive
+    the call.
+    """
+    if isinstance(like, (types.Number, types.Boolean)):
+        aryty = types.Array(like, 1, 'C')
+
+        def codegen(context, builder, sig, args):
+            llty = context.get_data_type(like)
+            data = cgutils.alloca_once(builder, llty, size=MAX_PAIRWISE_DEPTH)
+            itemsize = context.get_abi_sizeof(llty)
+            ary = make_array(aryty)(context, builder)
+            populate_array(ary,
+                           data=data,
+                           shape=[context.get_constant(types.intp,
+                                                       MAX_PAIRWISE_DEPTH)],
+                           strides=[context.get_constant(types.intp,
+                                                         itemsize)],
+                           itemsize=context.get_constant(types.intp,
+                                                         itemsize),
+                           meminfo=None)
+            return impl_ret_untracked(context, builder, aryty,
+                                      ary._getvalue())
+
+        return signature(aryty, like), codegen
+
+
+def _make_pairwise_sum(get):
+    """
+    Make a function sum_1d(a, arg, zero) returning the sum of
+    get(a, i, arg) over a one-dimensional array *a*, with *zero* (a zero
+    of the type of the result) added to each accumulator.  Like Numpy's
+    reductions, the sum starts from the first element and adds the
+    pairwise sum of the others.
+    """
+    @register_jitable
+    def block_sum(a, start, n, arg, zero):
+        if n < 8:
+            res = zero
+            for i in range(start, start + n):
+                res += get(a, i, arg)
+            return res
+        r0 = zero + get(a, start, arg)
+        r1 = zero + get(a, start + 1, arg)
+        r2 = zero + get(a, start + 2, arg)
+        r3 = zero + get(a, start + 3, arg)
+        r4 = zero + get(a, start + 4, arg)
+        r5 = zero + get(a, start + 5, arg)
+        r6 = zero + get(a, start + 6, arg)
+        r7 = zero + get(a, start + 7, arg)
+        stop = start + n - n % 8
+        for i in range(start + 8, stop, 8):
+            r0 += get(a, i, arg)
+            r1 += get(a, i + 1, arg)
+            r2 += get(a, i + 2, arg)
+            r3 += get(a, i + 3, arg)
+            r4 += get(a, i + 4, arg)
+            r5 += get(a, i + 5, arg)
+            r6 += get(a, i + 6, arg)
+            r7 += get(a, i + 7, arg)
+        res = ((r0 + r1) + (r2 + r3)) + ((r4 + r5) + (r6 + r7))
+        for i in range(stop, start + n):
+            res += get(a, i, arg)
+        return res
+
+    @register_jitable
+    def pairwise_sum(a, start, n, arg, zero):
+        if n <= PAIRWISE_BLOCKSIZE:
+            return block_sum(a, start, n, arg, zero)
+        # An explicit stack of the ranges being summed, with the sums of
+        # their first halves once computed.  The depth is at most
+        # log2(n), so it lives on the native stack rather than the heap.
+        starts = _pairwise_stack(n)
+        sizes = _pairwise_stack(n)
+        has_first = _pairwise_stack(False)
+        firsts = _pairwise_stack(zero)
+        top = 0
+        starts[0] = start
+        sizes[0] = n
+        has_first[0] = False
+        while True:
+            m = sizes[top]
+            if m > PAIRWISE_BLOCKSIZE:
+                # Sum the first half
+                half = m >> 1
+                half -= half % 8
+                starts[top + 1] = starts[top]
+                sizes[top + 1] = half
+                has_first[top + 1] = False
+                top += 1
+                continue
+            res = block_sum(a, starts[top], m, arg, zero)
+            # Return the sum to the ranges whose second half it is
+            top -= 1
+            while top >= 0 and has_first[top]:
+                res = firsts[top] + res
+                top -= 1
+            if top < 0:
+                return res
+            # It is a first half: sum the second half
+            firsts[top] = res
+            has_first[top] = True
+            half = sizes[top] >> 1
+            half -= half % 8
+            starts[top + 1] = starts[top] + half
+            sizes[top + 1] = sizes[top] - half
+            has_first[top + 1] = False
+            top += 1
+
+    @register_jitable
+    def sum_1d(a, arg, zero):
+        n = len(a)
+        if n == 0:
+            return zero
+        res = zero + get(a, 0, arg)
+        res += pairwise_sum(a, 1, n - 1, arg, zero)
+        return res
+
+    return sum_1d
+
+
+def _make_pairwise_array_sum(sum_1d):
+    """
+    Make a function returning, for an array type, a function
+    array_sum(a, arg, zero) summing over all the elements of an array of
+    that type with *sum_1d*.  Contiguous arrays are summed as a whole,
+    other arrays row by row along their innermost dimension in memory.
+    """
+    @register_jitable
+    def sum_c(a, arg, zero):
+        return sum_1d(a.reshape(a.size), arg, zero)
+
+    @register_jitable
+    def sum_f(a, arg, zero):
+        return sum_1d(a.T.reshape(a.size), arg, zero)
+
+    @register_jitable
+    def sum_any(a, arg, zero):
+        w = _transposed_view(a, _reduction_order(a))
+        res = zero
+        for idx in np.ndindex(w.shape[:-1]):
+            res += sum_1d(w[idx], arg, zero)
+        return res
+
+    def get_array_sum(aryty):
+        if aryty.ndim == 1:
+            return sum_1d
+        elif aryty.layout == 'C':
+            return sum_c
+        elif aryty.layout == 'F':
+            return sum_f
+        else:
+            return sum_any
+
+    return get_array_sum
+
+
+@register_jitable
+def _get_item(a, i, arg):
+    return a[i]
+
+@register_jitable
+def _get_squared_deviation(a, i, mean):
+    d = a[i] - mean
+    return d * d
+
+@register_jitable
+def _get_not_nan(a, i, arg):
+    v = a[i]
+    if v != v:
+        return arg
+    return v
+
+_pairwise_sum_1d = _make_pairwise_sum(_get_item)
+_get_array_sum = _make_pairwise_array_sum(_pairwise_sum_1d)
+_get_array_ssd = _make_pairwise_array_sum(
+    _make_pairwise_sum(_get_squared_deviation))
+_get_array_nansum = _make_pairwise_array_sum(_make_pairwise_sum(_get_not_nan))
+
+def _is_pairwise_summed(ty):
+    """
+    Whether sums of the array type *ty* use pairwise summation.
+    """
+    return isinstance(ty.dtype, (types.Float, types.Complex))
 
 
 #----------------------------------------------------------------------------
@@ -30,14 +244,20 @@ from .arrayobj import make_array, load_item, store_item, _empty_nd_impl
 def array_sum(context, builder, sig, args):
     zero = sig.return_type(0)
 
-    def array_sum_impl(arr):
-        c = zero
-        for v in np.nditer(arr):
-            c += v.item()
-        return c
+    if _is_pairwise_summed(sig.args[0]):
+        pairwise_sum = _get_array_sum(sig.args[0])
 
-    res = context.compile_internal(builder, array_sum_impl, sig, args,
-                                    locals=dict(c=sig.return_type))
+        def array_sum_impl(arr):
+            return pairwise_sum(arr, 0, zero)
+
+    else:
+        def array_sum_impl(arr):
+            c = zero
+            for v in np.nditer(arr):
+                c += v.item()
+            return c
+
+    res = context.compile_internal(builder, array_sum_impl, sig, args)
     return impl_ret_borrowed(context, builder, sig.return_type, res)
 
 @lower_builtin(np.prod, types.Array)
@@ -104,13 +324,20 @@ def array_cumprod(context, builder, sig, args):
 def array_mean(context, builder, sig, args):
     zero = sig.return_type(0)
 
-    def array_mean_impl(arr):
-        # Can't use the naive `arr.sum() / arr.size`, as it would return
-        # a wrong result on integer sum overflow.
-        c = zero
-        for v in np.nditer(arr):
-            c += v.item()
-        return c / arr.size
+    if _is_pairwise_summed(sig.args[0]):
+        pairwise_sum = _get_array_sum(sig.args[0])
+
+        def array_mean_impl(arr):
+            return pairwise_sum(arr, 0, zero) / arr.size
+
+    else:
+        def array_mean_impl(arr):
+            # Can't use the naive `arr.sum() / arr.size`, as it would return
+            # a wrong result on integer sum overflow.
+            c = zero
+            for v in np.nditer(arr):
+                c += v.item()
+            return c / arr.size
 
     res = context.compile_internal(builder, array_mean_impl, sig, args,
                                    locals=dict(c=sig.return_type))
@@ -119,15 +346,27 @@ def array_mean(context, builder, sig, args):
 @lower_builtin(np.var, types.Array)
 @lower_builtin("array.var", types.Array)
 def array_var(context, builder, sig, args):
-    def array_var_impl(arr):
-        # Compute the mean
-        m = arr.mean()
+    if isinstance(sig.args[0].dtype, types.Float):
+        zero = sig.return_type(0)
+        pairwise_ssd = _get_array_ssd(sig.args[0])
 
-        # Compute the sum of square diffs
-        ssd = 0
-        for v in np.nditer(arr):
-            ssd += (v.item() - m) ** 2
-        return ssd / arr.size
+        def array_var_impl(arr):
+            # Compute the mean
+            m = arr.mean()
+
+            # Compute the sum of square diffs
+            return pairwise_ssd(arr, m, zero) / arr.size
+
+    else:
+        def array_var_impl(arr):
+            # Compute the mean
+            m = arr.mean()
+
+            # Compute the sum of square diffs
+            ssd = 0
+            for v in np.nditer(arr):
+                ssd += (v.item() - m) ** 2
+            return ssd / arr.size
 
     res = context.compile_internal(builder, array_var_impl, sig, args)
     return impl_ret_untracked(context, builder, sig.return_type, res)
@@ -271,6 +510,406 @@ def array_argmax(context, builder, sig, args):
     return impl_ret_untracked(context, builder, sig.return_type, res)
 
 
+#----------------------------------------------------------------------------
+# Reductions over an axis
+#
+# The array is read in memory order whatever its layout, without copies:
+# the reductions run on a view of the array with its dimensions sorted by
+# decreasing stride, and write to a view of the output with the same
+# dimensions, where all the elements along the reduced dimension map to the
+# same output element (a zero stride).  When the reduced dimension varies
+# fastest in memory, each row is reduced in a scalar instead.
+
+@intrinsic
+def _tuple_like(typingctx, values, tup):
+    """
+    A tuple of the type of the homogeneous tuple *tup* holding the first
+    len(tup) items of the 1D array *values*.
+    """
+    if isinstance(values, types.Array) and isinstance(tup, types.UniTuple):
+        def codegen(context, builder, sig, args):
+            aryty = sig.args[0]
+            ary = make_array(aryty)(context, builder, args[0])
+            items = []
+            for i in range(tup.count):
+                idx = context.get_constant(types.intp, i)
+                ptr = cgutils.get_item_pointer(builder, aryty, ary, [idx])
+                val = load_item(context, builder, aryty, ptr)
+                items.append(context.cast(builder, val, aryty.dtype,
+                                          tup.dtype))
+            res = context.make_tuple(builder, tup, items)
+            return impl_ret_untracked(context, builder, tup, res)
+
+        return signature(tup, values, tup), codegen
+
+@register_jitable
+def _normalize_axis(axis, ndim):
+    if axis < 0:
+        axis += ndim
+    if axis < 0 or axis >= ndim:
+        raise ValueError("axis is out of bounds for the array")
+    return axis
+
+@register_jitable
+def _reduction_shape(a, axis):
+    """
+    The shape of *a* with a length of 1 at *axis*.
+    """
+    shape = np.empty(a.ndim, np.intp)
+    for i in range(a.ndim):
+        shape[i] = a.shape[i]
+    shape[axis] = 1
+    return _tuple_like(shape, a.shape)
+
+@register_jitable
+def _drop_axis(out, axis):
+    """
+    A view of the array *out* without the dimension *axis* of length 1.
+    """
+    shape = np.empty(out.ndim - 1, np.intp)
+    for i in range(out.ndim - 1):
+        shape[i] = out.shape[i if i < axis else i + 1]
+    return out.reshape(_tuple_like(shape, out.shape[1:]))
+
+@register_jitable
+def _ones_shape(a):
+    return _tuple_like(np.ones(a.ndim, np.intp), a.shape)
+
+@register_jitable
+def _reduction_order(a):
+    """
+    The dimensions of *a* sorted by decreasing (absolute) stride, keeping
+    the order of ties.  Iterating over them in this order reads *a* in
+    memory order.
+    """
+    ndim = a.ndim
+    order = np.empty(ndim, np.intp)
+    for i in range(ndim):
+        d = i
+        s = abs(a.strides[d])
+        j = i
+        while j > 0 and abs(a.strides[order[j - 1]]) < s:
+            order[j] = order[j - 1]
+            j -= 1
+        order[j] = d
+    return order
+
+@register_jitable
+def _index_of(order, d):
+    for i in range(len(order)):
+        if order[i] == d:
+            return i
+    return -1
+
+@register_jitable
+def _transposed_view(a, order):
+    """
+    A view of *a* with its dimensions permuted by *order*.
+    """
+    shape = np.empty(a.ndim, np.intp)
+    strides = np.empty(a.ndim, np.intp)
+    for i in range(a.ndim):
+        shape[i] = a.shape[order[i]]
+        strides[i] = a.strides[order[i]]
+    return reshape_unchecked(a, _tuple_like(shape, a.shape),
+                             _tuple_like(strides, a.strides))
+
+@register_jitable
+def _reduction_view(out, w, order, axis):
+    """
+    A view of the output *out* of a reduction over *axis* (with a length of
+    1 at *axis*) with the shape of *w*, the view of the reduced array with
+    its dimensions permuted by *order*, and a zero stride along *axis*.
+    """
+    strides = np.empty(out.ndim, np.intp)
+    for i in range(out.ndim):
+        d = order[i]
+        strides[i] = 0 if d == axis else out.strides[d]
+    return reshape_unchecked(out, w.shape, _tuple_like(strides, w.shape))
+
+@register_jitable
+def _fill(out, value):
+    flat = out.reshape(out.size)
+    for i in range(out.size):
+        flat[i] = value
+
+@register_jitable
+def _divide(out, n):
+    flat = out.reshape(out.size)
+    for i in range(out.size):
+        flat[i] /= n
+
+@register_jitable
+def _no_finalize(out, n):
+    pass
+
+@register_jitable
+def _add(acc, v):
+    return acc + v
+
+@register_jitable
+def _mul(acc, v):
+    return acc * v
+
+@register_jitable
+def _minimum(acc, v):
+    # NaNs propagate, like in Numpy
+    if v < acc or v != v:
+        return v
+    return acc
+
+@register_jitable
+def _maximum(acc, v):
+    if v > acc or v != v:
+        return v
+    return acc
+
+@register_jitable
+def _less(v, best):
+    # The first NaN wins, like in Numpy
+    return v < best or (v != v and best == best)
+
+@register_jitable
+def _greater(v, best):
+    return v > best or (v != v and best == best)
+
+
+def _make_axis_kernel(combine, zero=None):
+    """
+    Make a function reducing the transposed view *w* of an array into the
+    view *u* of the output (see _reduction_view()) along the dimension
+    *axis_pos* of the views, with the binary function *combine*.  If
+    *zero* is given, *combine* is an addition and rows contiguous along
+    the reduced dimension are summed pairwise with it instead.
+    """
+    if zero is None:
+        @register_jitable
+        def reduce_row(row, urow):
+            urow[0] = row[0]
+            acc = urow[0]
+            for k in range(1, len(row)):
+                acc = combine(acc, row[k])
+            urow[0] = acc
+
+    else:
+        @register_jitable
+        def reduce_row(row, urow):
+            urow[0] = _pairwise_sum_1d(row, 0, zero)
+
+    @register_jitable
+    def kernel(w, u, axis_pos):
+        if axis_pos == w.ndim - 1:
+            for idx in np.ndindex(w.shape[:-1]):
+                reduce_row(w[idx], u[idx])
+        else:
+            for idx in np.ndindex(w.shape):
+                if idx[axis_pos] == 0:
+                    u[idx] = w[idx]
+                else:
+                    u[idx] = combine(u[idx], w[idx])
+
+    return kernel
+
+def _make_axis_arg_kernel(better):
+    """
+    Make a function storing into the view *u* of the output the index along
+    the dimension *axis_pos* of the transposed view *w* of an array of its
+    first element for which no other element is *better*.  The best
+    elements go to the view *vals* of a scratch array of the shape of the
+    output.
+    """
+    @register_jitable
+    def kernel(w, u, vals, axis_pos):
+        if axis_pos == w.ndim - 1:
+            for idx in np.ndindex(w.shape[:-1]):
+                row = w[idx]
+                best = row[0]
+                best_k = 0
+                for k in range(1, len(row)):
+                    v = row[k]
+                    if better(v, best):
+                        best = v
+                        best_k = k
+                urow = u[idx]
+                urow[0] = best_k
+        else:
+            for idx in np.ndindex(w.shape):
+                k = idx[axis_pos]
+                v = w[idx]
+                if k == 0 or better(v, vals[idx]):
+                    vals[idx] = v
+                    u[idx] = k
+
+    return kernel
+
+
+AxisReduction = collections.namedtuple(
+    'AxisReduction',
+    (# The function reducing an array over a valid axis into an output
+     # with a length of 1 at the axis
+     'reduce_into',
+     # The kernel on the views of the array and of the output
+     'kernel',
+     # The binary function of the kernel, or the comparison of elements
+     # for argmin() and argmax()
+     'combine',
+     # Functions filling the output when the axis is empty, and applied to
+     # the output at the end
+     'empty', 'finalize',
+     ))
+
+# For each reduction, the binary function (or comparison for argmin() and
+# argmax()), the identity (None if the reduction of an empty axis is an
+# error) and whether the result is divided by the length of the axis
+_axis_reduction_funcs = {
+    'sum': (_add, 0, False),
+    'prod': (_mul, 1, False),
+    'mean': (_add, np.nan, True),
+    'min': (_minimum, None, False),
+    'max': (_maximum, None, False),
+    'argmin': (_less, None, False),
+    'argmax': (_greater, None, False),
+}
+
+_empty_reduction_messages = {
+    'min': "zero-size array to reduction operation minimum which has no identity",
+    'max': "zero-size array to reduction operation maximum which has no identity",
+    'argmin': "attempt to get argmin of an empty sequence",
+    'argmax': "attempt to get argmax of an empty sequence",
+}
+
+_axis_reductions = {}
+
+def get_axis_reduction(name, dtype):
+    """
+    Get the AxisReduction for the reduction *name* (e.g. 'sum') of arrays
+    of at least two dimensions over an axis, with results of the Numpy
+    *dtype*.
+    """
+    key = name, dtype
+    try:
+        return _axis_reductions[key]
+    except KeyError:
+        pass
+    combine, identity, is_mean = _axis_reduction_funcs[name]
+
+    if identity is None:
+        msg = _empty_reduction_messages[name]
+
+        @register_jitable
+        def empty(out):
+            raise ValueError(msg)
+
+    else:
+        @register_jitable
+        def empty(out):
+            _fill(out, identity)
+
+    finalize = _divide if is_mean else _no_finalize
+
+    if name in ('argmin', 'argmax'):
+        kernel = _make_axis_arg_kernel(combine)
+
+        @register_jitable
+        def reduce_into(a, axis):
+            out = np.empty(_reduction_shape(a, axis), dtype)
+            if a.shape[axis] == 0:
+                empty(out)
+            order = _reduction_order(a)
+            w = _transposed_view(a, order)
+            vals = np.empty(out.shape, a.dtype)
+            kernel(w, _reduction_view(out, w, order, axis),
+                   _reduction_view(vals, w, order, axis),
+                   _index_of(order, axis))
+            return out
+
+    else:
+        if name in ('sum', 'mean') and dtype.kind in 'fc':
+            kernel = _make_axis_kernel(combine, dtype.type(0))
+        else:
+            kernel = _make_axis_kernel(combine)
+
+        @register_jitable
+        def reduce_into(a, axis):
+            out = np.empty(_reduction_shape(a, axis), dtype)
+            n = a.shape[axis]
+            if n == 0:
+                empty(out)
+                return out
+            order = _reduction_order(a)
+            w = _transposed_view(a, order)
+            kernel(w, _reduction_view(out, w, order, axis),
+                   _index_of(order, axis))
+            finalize(out, n)
+            return out
+
+    res = AxisReduction(reduce_into, kernel, combine, empty, finalize)
+    _axis_reductions[key] = res
+    return res
+
+def _get_axis_reduction_impl(name, sig):
+    """
+    The implementation of the reduction *name* with the *axis* argument
+    typed in *sig* (the *keepdims* argument is only reflected in the
+    return type).
+    """
+    func = getattr(np, name)
+    aryty, axisty = sig.args[:2]
+    retty = sig.return_type
+    by_axis = isinstance(axisty, types.Integer)
+
+    if not isinstance(retty, types.Array):
+        # Reduction of the whole array
+        if by_axis:
+            def impl(a, axis):
+                _normalize_axis(axis, a.ndim)
+                return func(a)
+        else:
+            def impl(a, axis):
+                return func(a)
+
+    elif not by_axis or aryty.ndim == 1:
+        # Reduction of the whole array, keeping its dimensions
+        if by_axis:
+            def impl(a, axis):
+                _normalize_axis(axis, a.ndim)
+                return np.full(_ones_shape(a), func(a))
+        else:
+            def impl(a, axis):
+                return np.full(_ones_shape(a), func(a))
+
+    else:
+        reduce_into = get_axis_reduction(name,
+                                         as_dtype(retty.dtype)).reduce_into
+        if retty.ndim == aryty.ndim:
+            def impl(a, axis):
+                return reduce_into(a, _normalize_axis(axis, a.ndim))
+        else:
+            def impl(a, axis):
+                axis = _normalize_axis(axis, a.ndim)
+                return _drop_axis(reduce_into(a, axis), axis)
+
+    return impl
+
+def _install_axis_reduction(name, nargs):
+    argtys = (types.Array,) + (types.Any,) * nargs
+
+    @lower_builtin(getattr(np, name), *argtys)
+    @lower_builtin("array." + name, *argtys)
+    def array_reduce_axis(context, builder, sig, args):
+        # Only the array and the axis are passed, keepdims is constant
+        impl_sig = signature(sig.return_type, *sig.args[:2])
+        impl = _get_axis_reduction_impl(name, sig)
+        res = context.compile_internal(builder, impl, impl_sig, args[:2])
+        return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+for name in ('sum', 'prod', 'mean', 'min', 'max'):
+    _install_axis_reduction(name, 2)
+
+for name in ('argmin', 'argmax'):
+    _install_axis_reduction(name, 1)
+
+
 @overload(np.all)
 @overload_method(types.Array, "all")
 def np_all(a):
@@ -411,6 +1050,15 @@ def np_nansum(a):
     zero = retty(0)
     isnan = get_isnan(a.dtype)
 
+    if _is_pairwise_summed(a):
+        pairwise_nansum = _get_array_nansum(a)
+
+        def nansum_impl(arr):
+            # NaNs count as zeros
+            return pairwise_nansum(arr, zero, zero)
+
+        return nansum_impl
+
     def nansum_impl(arr):
         c = zero
         for view in np.nditer(arr):
@@ -446,72 +1094,29 @@ if numpy_version >= (1, 10):
 #----------------------------------------------------------------------------
 # Median and partitioning
 
-@register_jitable
-def _partition(A, low, high):
-    mid = (low + high) >> 1
-    # NOTE: the pattern of swaps below for the pivot choice and the
-    # partitioning gives good results (i.e. regular O(n log n))
-    # on sorted, reverse-sorted, and uniform arrays.  Subtle changes
-    # risk breaking this property.
-
-    # Use median of three {low, middle, high} as the pivot
-    if A[mid] < A[low]:
-        A[low], A[mid] = A[mid], A[low]
-    if A[high] < A[mid]:
-        A[high], A[mid] = A[mid], A[high]
-        if A[mid] < A[low]:
-            A[low], A[mid] = A[mid], A[low]
-    pivot = A[mid]
-
-    A[high], A[mid] = A[mid], A[high]
-
-    i = low
-    for j in range(low, high):
-        if A[j] <= pivot:
-            A[i], A[j] = A[j], A[i]
-            i += 1
-
-    A[i], A[high] = A[high], A[i]
-    return i
+_selection = selection.make_jit_selection()
+_select_one = _selection.select
+_select_pair = _selection.select_two
+_select_multiple = _selection.select_multiple
+_move_nans = _selection.move_nans
+
+_argselection = selection.make_jit_selection(is_argsort=True)
+_argselect_multiple = _argselection.select_multiple
+_argmove_nans = _argselection.move_nans
 
 @register_jitable
 def _select(arry, k, low, high):
     """
     Select the k'th smallest element in array[low:high + 1].
     """
-    i = _partition(arry, low, high)
-    while i != k:
-        if i < k:
-            low = i + 1
-            i = _partition(arry, low, high)
-        else:
-            high = i - 1
-            i = _partition(arry, low, high)
-    return arry[k]
+    return _select_one(arry, arry, k, low, high)
 
 @register_jitable
 def _select_two(arry, k, low, high):
     """
     Select the k'th and k+1'th smallest elements in array[low:high + 1].
-
-    This is significantly faster than doing two independent selections
-    for k and k+1.
-    """
-    while True:
-        assert high > low  # by construction
-        i = _partition(arry, low, high)
-        if i < k:
-            low = i + 1
-        elif i > k + 1:
-            high = i - 1
-        elif i == k:
-            _select(arry, k + 1, i + 1, high)
-            break
-        else:  # i == k + 1
-            _select(arry, k, low, i - 1)
-            break
-
-    return arry[k], arry[k + 1]
+    """
+    return _select_pair(arry, arry, k, low, high)
 
 @register_jitable
 def _median_inner(temp_arry, n):
@@ -562,6 +1167,191 @@ if numpy_version >= (1, 9):
 
         return nanmedian_impl
 
+@register_jitable
+def _normalize_kth(kth, n):
+    """
+    The indices *kth* along an axis of length *n*, made non-negative,
+    sorted and without duplicates.
+    """
+    out = np.empty(len(kth), np.intp)
+    for i in range(len(kth)):
+        k = kth[i]
+        if k < 0:
+            k += n
+        if k < 0 or k >= n:
+            raise ValueError("partition(): kth out of bounds")
+        out[i] = k
+    out.sort()
+    m = 0
+    for i in range(len(out)):
+        if m == 0 or out[i] != out[m - 1]:
+            out[m] = out[i]
+            m += 1
+    return out[:m]
+
+@register_jitable
+def _normalize_kth_scalar(kth, n):
+    out = np.empty(1, np.intp)
+    out[0] = kth
+    return _normalize_kth(out, n)
+
+def _get_kth_normalizer(kth):
+    """
+    The function normalizing the *kth* argument of np.partition(), or
+    None if it isn't an integer or a sequence of integers.
+    """
+    if isinstance(kth, types.Integer):
+        return _normalize_kth_scalar
+    if isinstance(kth, types.Array):
+        if kth.ndim == 1 and isinstance(kth.dtype, types.Integer):
+            return _normalize_kth
+    elif isinstance(kth, (types.UniTuple, types.List)):
+        if isinstance(kth.dtype, types.Integer):
+            return _normalize_kth
+
+def _is_selectable_array(a):
+    return (isinstance(a, types.Array) and a.ndim >= 1 and
+            isinstance(a.dtype, (types.Integer, types.Float)))
+
+@overload(np.partition)
+def np_partition(a, kth):
+    if not _is_selectable_array(a):
+        return
+    normalize = _get_kth_normalizer(kth)
+    if normalize is None:
+        return
+
+    def partition_impl(a, kth):
+        n = a.shape[-1]
+        kth_array = normalize(kth, n)
+        out = a.flatten()
+        if n == 0:
+            return out.reshape(a.shape)
+        # Partition each row along the last axis
+        for start in range(0, out.size, n):
+            row = out[start:start + n]
+            # NaNs are sorted last
+            end = _move_nans(row, row, 0, n - 1)
+            nk = np.searchsorted(kth_array, end)
+            _select_multiple(row, row, kth_array[:nk], 0, end - 1)
+        return out.reshape(a.shape)
+
+    return partition_impl
+
+@overload(np.argpartition)
+def np_argpartition(a, kth):
+    if not _is_selectable_array(a):
+        return
+    normalize = _get_kth_normalizer(kth)
+    if normalize is None:
+        return
+
+    def argpartition_impl(a, kth):
+        n = a.shape[-1]
+        kth_array = normalize(kth, n)
+        values = a.flatten()
+        out = np.empty(values.size, np.intp)
+        if n == 0:
+            return out.reshape(a.shape)
+        for start in range(0, values.size, n):
+            row = values[start:start + n]
+            idx = out[start:start + n]
+            for i in range(n):
+                idx[i] = i
+            # NaNs are sorted last
+            end = _argmove_nans(row, idx, 0, n - 1)
+            nk = np.searchsorted(kth_array, end)
+            _argselect_multiple(row, idx, kth_array[:nk], 0, end - 1)
+        return out.reshape(a.shape)
+
+    return argpartition_impl
+
+@register_jitable
+def _quantiles_inner(temp_arry, qs):
+    """
+    The main logic of the percentile() and quantile() calls, with *qs*
+    the array of quantiles as fractions of 1, interpolated linearly.
+    *temp_arry* must be disposable, as this function will mutate it.
+    All quantiles are selected together, nesting the selections.
+    """
+    n = temp_arry.size
+    out = np.empty(qs.size, np.float64)
+    if n == 0 or _move_nans(temp_arry, temp_arry, 0, n - 1) < n:
+        out[:] = np.nan
+        return out
+
+    # The elements below and above each quantile's position
+    positions = np.empty(2 * qs.size, np.intp)
+    for i in range(qs.size):
+        below = int(math.floor(qs[i] * (n - 1)))
+        positions[2 * i] = below
+        positions[2 * i + 1] = min(below + 1, n - 1)
+    _select_multiple(temp_arry, temp_arry, _normalize_kth(positions, n),
+                     0, n - 1)
+
+    for i in range(qs.size):
+        weight_above = qs[i] * (n - 1) - positions[2 * i]
+        x1 = temp_arry[positions[2 * i]] * (1.0 - weight_above)
+        x2 = temp_arry[positions[2 * i + 1]] * weight_above
+        out[i] = x1 + x2
+    return out
+
+@register_jitable
+def _check_quantiles(qs):
+    for i in range(qs.size):
+        if not 0.0 <= qs[i] <= 1.0:
+            raise ValueError("quantile(): Quantiles must be in the range [0, 1]")
+
+@register_jitable
+def _check_percentiles(qs):
+    for i in range(qs.size):
+        if not 0.0 <= qs[i] <= 1.0:
+            raise ValueError("percentile(): Percentiles must be in the range [0, 100]")
+
+def _get_quantiles_impl(q, scale, check):
+    """
+    The implementation of np.quantile() (*scale* is 1) or np.percentile()
+    (*scale* is 100) for the type of the *q* argument.
+    """
+    if isinstance(q, types.Number):
+        def quantiles_impl(a, q):
+            qs = np.empty(1, np.float64)
+            qs[0] = q / scale
+            check(qs)
+            return _quantiles_inner(a.flatten(), qs)[0]
+
+    elif isinstance(q, types.Array) and q.ndim >= 1:
+        def quantiles_impl(a, q):
+            qs = q.flatten() / scale
+            check(qs)
+            return _quantiles_inner(a.flatten(), qs).reshape(q.shape)
+
+    elif isinstance(q, (types.UniTuple, types.List)):
+        def quantiles_impl(a, q):
+            qs = np.empty(len(q), np.float64)
+            for i in range(len(q)):
+                qs[i] = q[i] / scale
+            check(qs)
+            return _quantiles_inner(a.flatten(), qs)
+
+    else:
+        return
+
+    return quantiles_impl
+
+@overload(np.percentile)
+def np_percentile(a, q):
+    if not _is_selectable_array(a):
+        return
+    return _get_quantiles_impl(q, 100.0, _check_percentiles)
+
+if numpy_version >= (1, 15):
+    @overload(np.quantile)
+    def np_quantile(a, q):
+        if not _is_selectable_array(a):
+            return
+        return _get_quantiles_impl(q, 1.0, _check_quantiles)
+
 
 #----------------------------------------------------------------------------
 # Element-wise computations
@@ -979,113 +1769,139 @@ def searchsorted(a, v):
         return searchsorted_impl
 
 
-@overload(np.digitize)
-def np_digitize(x, bins, right=False):
-    @register_jitable
-    def are_bins_increasing(bins):
-        n = len(bins)
-        is_increasing = True
-        is_decreasing = True
-        if n > 1:
-            prev = bins[0]
-            for i in range(1, n):
-                cur = bins[i]
-                is_increasing = is_increasing and not prev > cur
-                is_decreasing = is_decreasing and not prev < cur
-                if not is_increasing and not is_decreasing:
-                    raise ValueError("bins must be monotonically increasing or decreasing")
-                prev = cur
-        return is_increasing
-
-    # NOTE: the algorithm is slightly different from searchsorted's,
-    # as the edge cases (bin boundaries, NaN) give different results.
+@overload(parallel_scan)
+def np_parallel_scan(op, a, out=None):
+    if not (isinstance(op, types.Dispatcher) and isinstance(a, types.Array)):
+        return
+    from numba.targets.parallel_arraymath import get_parallel_scan
+    run_scan = get_parallel_scan(op.dispatcher)
 
-    @register_jitable
-    def digitize_scalar(x, bins, right):
-        # bins are monotonically-increasing
-        n = len(bins)
-        lo = 0
-        hi = n
-
-        if right:
-            if np.isnan(x):
-                # Find the first nan (i.e. the last from the end of bins,
-                # since there shouldn't be many of them in practice)
-                for i in range(n, 0, -1):
-                    if not np.isnan(bins[i - 1]):
-                        return i
-                return 0
-            while hi > lo:
-                mid = (lo + hi) >> 1
-                if bins[mid] < x:
-                    # mid is too low => narrow to upper bins
-                    lo = mid + 1
-                else:
-                    # mid is too high, or is a NaN => narrow to lower bins
-                    hi = mid
-        else:
-            if np.isnan(x):
-                # NaNs end up in the last bin
-                return n
-            while hi > lo:
-                mid = (lo + hi) >> 1
-                if bins[mid] <= x:
-                    # mid is too low => narrow to upper bins
-                    lo = mid + 1
-                else:
-                    # mid is too high, or is a NaN => narrow to lower bins
-                    hi = mid
+    if out in (None, types.none):
+        def parallel_scan_impl(op, a, out=None):
+            flat = a.ravel()
+            return run_scan(flat, np.empty_like(flat))
 
-        return lo
+    elif isinstance(out, types.Array) and out.ndim == 1:
+        def parallel_scan_impl(op, a, out=None):
+            flat = a.ravel()
+            if len(out) != len(flat):
+                raise ValueError("parallel_scan(): out must have as many elements as a")
+            return run_scan(flat, out)
 
-    @register_jitable
-    def digitize_scalar_decreasing(x, bins, right):
-        # bins are monotonically-decreasing
-        n = len(bins)
-        lo = 0
-        hi = n
-
-        if right:
-            if np.isnan(x):
-                # Find the last nan
-                for i in range(0, n):
-                    if not np.isnan(bins[i]):
-                        return i
-                return n
-            while hi > lo:
-                mid = (lo + hi) >> 1
-                if bins[mid] < x:
-                    # mid is too high => narrow to lower bins
-                    hi = mid
-                else:
-                    # mid is too low, or is a NaN => narrow to upper bins
-                    lo = mid + 1
-        else:
-            if np.isnan(x):
-                # NaNs end up in the first bin
-                return 0
-            while hi > lo:
-                mid = (lo + hi) >> 1
-                if bins[mid] <= x:
-                    # mid is too high => narrow to lower bins
-                    hi = mid
-                else:
-                    # mid is too low, or is a NaN => narrow to upper bins
-                    lo = mid + 1
+    else:
+        return
+
+    return parallel_scan_impl
+
+
+@register_jitable
+def _are_bins_increasing(bins):
+    n = len(bins)
+    is_increasing = True
+    is_decreasing = True
+    if n > 1:
+        prev = bins[0]
+        for i in range(1, n):
+            cur = bins[i]
+            is_increasing = is_increasing and not prev > cur
+            is_decreasing = is_decreasing and not prev < cur
+            if not is_increasing and not is_decreasing:
+                raise ValueError("bins must be monotonically increasing or decreasing")
+            prev = cur
+    return is_increasing
+
+# NOTE: the algorithm is slightly different from searchsorted's,
+# as the edge cases (bin boundaries, NaN) give different results.
+
+@register_jitable
+def _digitize_scalar(x, bins, right):
+    # bins are monotonically-increasing
+    n = len(bins)
+    lo = 0
+    hi = n
+
+    if right:
+        if np.isnan(x):
+            # Find the first nan (i.e. the last from the end of bins,
+            # since there shouldn't be many of them in practice)
+            for i in range(n, 0, -1):
+                if not np.isnan(bins[i - 1]):
+                    return i
+            return 0
+        while hi > lo:
+            mid = (lo + hi) >> 1
+            if bins[mid] < x:
+                # mid is too low => narrow to upper bins
+                lo = mid + 1
+            else:
+                # mid is too high, or is a NaN => narrow to lower bins
+                hi = mid
+    else:
+        if np.isnan(x):
+            # NaNs end up in the last bin
+            return n
+        while hi > lo:
+            mid = (lo + hi) >> 1
+            if bins[mid] <= x:
+                # mid is too low => narrow to upper bins
+                lo = mid + 1
+            else:
+                # mid is too high, or is a NaN => narrow to lower bins
+                hi = mid
+
+    return lo
+
+@register_jitable
+def _digitize_scalar_decreasing(x, bins, right):
+    # bins are monotonically-decreasing
+    n = len(bins)
+    lo = 0
+    hi = n
+
+    if right:
+        if np.isnan(x):
+            # Find the last nan
+            for i in range(0, n):
+                if not np.isnan(bins[i]):
+                    return i
+            return n
+        while hi > lo:
+            mid = (lo + hi) >> 1
+            if bins[mid] < x:
+                # mid is too high => narrow to lower bins
+                hi = mid
+            else:
+                # mid is too low, or is a NaN => narrow to upper bins
+                lo = mid + 1
+    else:
+        if np.isnan(x):
+            # NaNs end up in the first bin
+            return 0
+        while hi > lo:
+            mid = (lo + hi) >> 1
+            if bins[mid] <= x:
+                # mid is too high => narrow to lower bins
+                hi = mid
+            else:
+                # mid is too low, or is a NaN => narrow to upper bins
+                lo = mid + 1
 
-        return lo
+    return lo
 
+
+@overload(np.digitize)
+def np_digitize(x, bins, right=False):
     if isinstance(x, types.Array):
         # N-d array and output
 
         def digitize_impl(x, bins, right=False):
-            is_increasing = are_bins_increasing(bins)
+            is_increasing = _are_bins_increasing(bins)
             out = np.empty(x.shape, np.intp)
             for view, outview in np.nditer((x, out)):
                 if is_increasing:
-                    index = digitize_scalar(view.item(), bins, right)
+                    index = _digitize_scalar(view.item(), bins, right)
                 else:
-                    index = digitize_scalar_decreasing(view.item(), bins, right)
+                    index = _digitize_scalar_decreasing(view.item(), bins, right)
                 outview.itemset(index)
             return out
 
@@ -1095,13 +1911,13 @@ def np_digitize(x, bins, right=False):
         # 1-d sequence and output
 
         def digitize_impl(x, bins, right=False):
-            is_increasing = are_bins_increasing(bins)
+            is_increasing = _are_bins_increasing(bins)
             out = np.empty(len(x), np.intp)
             for i in range(len(x)):
                 if is_increasing:
-                    out[i] = digitize_scalar(x[i], bins, right)
+                    out[i] = _digitize_scalar(x[i], bins, right)
                 else:
-                    out[i] = digitize_scalar_decreasing(x[i], bins, right)
+                    out[i] = _digitize_scalar_decreasing(x[i], bins, right)
             return out
 
         return digitize_impl
@@ -1186,3 +2002,885 @@ def np_histogram(a, bins=10, range=None):
             return hist, bins
 
     return histogram_impl
+
+
+#----------------------------------------------------------------------------
+# Gathers and scatters
+#
+# np.take() and friends reduce to 1D gathers out[i] = src[idx[i]] (and
+# np.put() to the scatter dst[idx[i]] = vals[i]).  The accesses to *src*
+# are random, so for large sources the loop is unrolled and the element
+# needed PREFETCH_DISTANCE iterations later is prefetched, which hides most
+# of the latency of the cache misses.  Out of bounds indices are counted
+# rather than raised from the kernels, so that they can also run in
+# parallel loops.
+
+# Sources smaller than this are assumed to fit in the cache
+PREFETCH_MIN_SIZE = 1 << 15
+# Number of iterations ahead of the current one whose element is prefetched
+PREFETCH_DISTANCE = 16
+
+@intrinsic
+def _prefetch(typingctx, ary, index):
+    """
+    Prefetch ary[index] (wrapped if negative) into the cache for reading.
+    The address needs not be valid.
+    """
+    if (isinstance(ary, types.Array) and ary.ndim == 1
+            and isinstance(index, types.Integer)):
+        def codegen(context, builder, sig, args):
+            aryty, idxty = sig.args
+            ary = make_array(aryty)(context, builder, args[0])
+            idx = context.cast(builder, args[1], idxty, types.intp)
+            ptr = cgutils.get_item_pointer(builder, aryty, ary, [idx],
+                                           wraparound=True)
+            i32 = ir.IntType(32)
+            fnty = ir.FunctionType(ir.VoidType(),
+                                   [cgutils.voidptr_t, i32, i32, i32])
+            fn = builder.module.get_or_insert_function(fnty,
+                                                       name="llvm.prefetch")
+            # read, high temporal locality, data cache
+            builder.call(fn, [builder.bitcast(ptr, cgutils.voidptr_t),
+                              i32(0), i32(3), i32(1)])
+            return context.get_dummy_value()
+
+        return signature(types.none, ary, index), codegen
+
+@register_jitable
+def _wrap_index(i, n):
+    """
+    The index *i* into a dimension of length *n*, wrapped if negative, or
+    -1 if it is out of bounds.
+    """
+    i = np.intp(i)
+    if i < 0:
+        i += n
+    if i < 0 or i >= n:
+        return -1
+    return i
+
+@register_jitable
+def _check_bounds(nbad):
+    if nbad:
+        raise IndexError("index out of bounds")
+
+@register_jitable
+def _check_indices(idx, n):
+    """
+    Raise IndexError if any of the 1D indices *idx* is out of bounds for a
+    dimension of length *n*.
+    """
+    for i in range(len(idx)):
+        _check_bounds(_wrap_index(idx[i], n) < 0)
+
+@register_jitable
+def _gather(src, idx, out):
+    """
+    out[i] = src[idx[i]] for the 1D arrays *src*, *idx* and *out*.  Returns
+    the number of out of bounds indices, whose elements are left unset.
+    """
+    n = len(src)
+    m = len(idx)
+    nbad = 0
+    i = 0
+    if n >= PREFETCH_MIN_SIZE:
+        stop = m - PREFETCH_DISTANCE - 3
+        while i < stop:
+            ahead = i + PREFETCH_DISTANCE
+            _prefetch(src, idx[ahead])
+            _prefetch(src, idx[ahead + 1])
+            _prefetch(src, idx[ahead + 2])
+            _prefetch(src, idx[ahead + 3])
+            for k in range(i, i + 4):
+                j = _wrap_index(idx[k], n)
+                if j < 0:
+                    nbad += 1
+                else:
+                    out[k] = src[j]
+            i += 4
+    while i < m:
+        j = _wrap_index(idx[i], n)
+        if j < 0:
+            nbad += 1
+        else:
+            out[i] = src[j]
+        i += 1
+    return nbad
+
+@register_jitable
+def _scatter(dst, idx, vals):
+    """
+    dst[idx[i]] = vals[i % len(vals)] for the 1D arrays *idx* and *vals*
+    (not empty) and the 1D array or flat iterator *dst*, in order.  Returns
+    the number of out of bounds indices, which are skipped.
+    """
+    n = len(dst)
+    m = len(idx)
+    k = len(vals)
+    nbad = 0
+    v = 0
+    for i in range(m):
+        j = _wrap_index(idx[i], n)
+        if j < 0:
+            nbad += 1
+        else:
+            dst[j] = vals[v]
+        v += 1
+        if v == k:
+            v = 0
+    return nbad
+
+@register_jitable
+def _scatter_prefetch(dst, idx, vals):
+    """
+    _scatter() for a 1D array *dst* and at least as many values as indices.
+    """
+    n = len(dst)
+    m = len(idx)
+    nbad = 0
+    i = 0
+    if n >= PREFETCH_MIN_SIZE:
+        stop = m - PREFETCH_DISTANCE - 3
+        while i < stop:
+            ahead = i + PREFETCH_DISTANCE
+            _prefetch(dst, idx[ahead])
+            _prefetch(dst, idx[ahead + 1])
+            _prefetch(dst, idx[ahead + 2])
+            _prefetch(dst, idx[ahead + 3])
+            for k in range(i, i + 4):
+                j = _wrap_index(idx[k], n)
+                if j < 0:
+                    nbad += 1
+                else:
+                    dst[j] = vals[k]
+            i += 4
+    while i < m:
+        j = _wrap_index(idx[i], n)
+        if j < 0:
+            nbad += 1
+        else:
+            dst[j] = vals[i]
+        i += 1
+    return nbad
+
+@register_jitable
+def _take_axis(a, idx, axis):
+    """
+    The elements of *a* at the 1D indices *idx* along *axis*, as a new
+    C-contiguous array of shape (outer, len(idx), inner) where *outer* and
+    *inner* are the products of the dimensions before and after *axis*.
+    """
+    n = a.shape[axis]
+    outer = 1
+    for d in range(axis):
+        outer *= a.shape[d]
+    inner = 1
+    for d in range(axis + 1, a.ndim):
+        inner *= a.shape[d]
+    m = len(idx)
+    src = a.ravel().reshape((outer, n, inner))
+    out = np.empty((outer, m, inner), a.dtype)
+    if inner == 1:
+        # Gather each row of the source
+        src2 = src.reshape((outer, n))
+        out2 = out.reshape((outer, m))
+        nbad = 0
+        for o in range(outer):
+            nbad += _gather(src2[o], idx, out2[o])
+        _check_bounds(nbad)
+    else:
+        # Copy contiguous slices
+        for i in range(m):
+            j = _wrap_index(idx[i], n)
+            _check_bounds(j < 0)
+            for o in range(outer):
+                out[o, i] = src[o, j]
+    return out
+
+@register_jitable
+def _take_shape(a, indices_shape, axis, template):
+    """
+    The shape of np.take(a, indices, axis) for an array of indices of
+    shape *indices_shape*, as a tuple of the type of *template*.
+    """
+    shape = np.empty(a.ndim - 1 + len(indices_shape), np.intp)
+    k = 0
+    for d in range(axis):
+        shape[k] = a.shape[d]
+        k += 1
+    for s in indices_shape:
+        shape[k] = s
+        k += 1
+    for d in range(axis + 1, a.ndim):
+        shape[k] = a.shape[d]
+        k += 1
+    return _tuple_like(shape, template)
+
+@register_jitable
+def _nonzero_indices(condition):
+    """
+    The indices of the true elements of the 1D sequence *condition*.
+    """
+    n = len(condition)
+    count = 0
+    for i in range(n):
+        if condition[i]:
+            count += 1
+    idx = np.empty(count, np.intp)
+    k = 0
+    for i in range(n):
+        if condition[i]:
+            idx[k] = i
+            k += 1
+    return idx
+
+@overload(np.take)
+@overload_method(types.Array, "take")
+def np_take(a, indices, axis=None):
+    if not isinstance(a, types.Array):
+        return
+
+    if isinstance(indices, types.Integer):
+        if axis in (None, types.none):
+            def take_impl(a, indices, axis=None):
+                flat = a.ravel()
+                j = _wrap_index(indices, flat.size)
+                _check_bounds(j < 0)
+                return flat[j]
+
+        elif a.ndim == 1:
+            def take_impl(a, indices, axis=None):
+                _normalize_axis(axis, 1)
+                j = _wrap_index(indices, len(a))
+                _check_bounds(j < 0)
+                return a[j]
+
+        else:
+            def take_impl(a, indices, axis=None):
+                axis = _normalize_axis(axis, a.ndim)
+                idx = np.empty(1, np.intp)
+                idx[0] = indices
+                out = _take_axis(a, idx, axis)
+                out = out.reshape(_take_shape(a, idx.shape, axis, a.shape))
+                return _drop_axis(out, axis)
+
+    elif (isinstance(indices, types.Array) and indices.ndim > 0
+            and isinstance(indices.dtype, types.Integer)):
+        if axis in (None, types.none):
+            def take_impl(a, indices, axis=None):
+                flat = a.ravel()
+                idx = indices.ravel()
+                out = np.empty(idx.size, a.dtype)
+                _check_bounds(_gather(flat, idx, out))
+                return out.reshape(indices.shape)
+
+        else:
+            def take_impl(a, indices, axis=None):
+                axis = _normalize_axis(axis, a.ndim)
+                out = _take_axis(a, indices.ravel(), axis)
+                return out.reshape(_take_shape(a, indices.shape, axis,
+                                               a.shape[1:] + indices.shape))
+
+    else:
+        raise TypingError("take(): indices must be an integer or an array "
+                          "of integers")
+
+    return take_impl
+
+@register_jitable
+def _broadcast_view(x, shape, keep_last):
+    """
+    A view of *x* broadcast to *shape* (with a zero stride along the
+    dimensions of length 1 of *x*), but for its last dimension if
+    *keep_last* is true.
+    """
+    ndim = x.ndim
+    new_shape = np.empty(ndim, np.intp)
+    strides = np.empty(ndim, np.intp)
+    for d in range(ndim):
+        if x.shape[d] == 1 and not (keep_last and d == ndim - 1):
+            new_shape[d] = shape[d]
+            strides[d] = 0
+        else:
+            new_shape[d] = x.shape[d]
+            strides[d] = x.strides[d]
+    return reshape_unchecked(x, _tuple_like(new_shape, x.shape),
+                             _tuple_like(strides, x.strides))
+
+@register_jitable
+def _take_along_axis_shape(arr, indices, axis):
+    shape = np.empty(arr.ndim, np.intp)
+    for d in range(arr.ndim):
+        m = indices.shape[d]
+        if d != axis:
+            n = arr.shape[d]
+            if m != n and m != 1 and n != 1:
+                raise ValueError("shape mismatch: objects cannot be "
+                                 "broadcast to a single shape")
+            if m == 1:
+                m = n
+        shape[d] = m
+    return _tuple_like(shape, arr.shape)
+
+@register_jitable
+def _axis_last_order(ndim, axis):
+    order = np.empty(ndim, np.intp)
+    k = 0
+    for d in range(ndim):
+        if d != axis:
+            order[k] = d
+            k += 1
+    order[k] = axis
+    return order
+
+if numpy_version >= (1, 15):
+    @overload(np.take_along_axis)
+    def np_take_along_axis(arr, indices, axis):
+        if not (isinstance(arr, types.Array)
+                and isinstance(indices, types.Array)
+                and isinstance(indices.dtype, types.Integer)):
+            return
+
+        if axis in (None, types.none):
+            if indices.ndim != 1:
+                raise TypingError("take_along_axis(): indices must be 1D "
+                                  "when axis is None")
+
+            def take_along_axis_impl(arr, indices, axis):
+                out = np.empty(len(indices), arr.dtype)
+                _check_bounds(_gather(arr.ravel(), indices, out))
+                return out
+
+        elif indices.ndim != arr.ndim:
+            raise TypingError("take_along_axis(): indices and arr must have "
+                              "the same number of dimensions")
+
+        elif arr.ndim == 1:
+            def take_along_axis_impl(arr, indices, axis):
+                _normalize_axis(axis, 1)
+                out = np.empty(len(indices), arr.dtype)
+                _check_bounds(_gather(arr, indices, out))
+                return out
+
+        else:
+            def take_along_axis_impl(arr, indices, axis):
+                axis = _normalize_axis(axis, arr.ndim)
+                out = np.empty(_take_along_axis_shape(arr, indices, axis),
+                               arr.dtype)
+                # Gather along the last dimension of views of the arrays
+                # with *axis* last, broadcast to the shape of the output
+                order = _axis_last_order(arr.ndim, axis)
+                out_t = _transposed_view(out, order)
+                arr_t = _broadcast_view(_transposed_view(arr, order),
+                                        out_t.shape, True)
+                idx_t = _broadcast_view(_transposed_view(indices, order),
+                                        out_t.shape, False)
+                nbad = 0
+                for ix in np.ndindex(out_t.shape[:-1]):
+                    nbad += _gather(arr_t[ix], idx_t[ix], out_t[ix])
+                _check_bounds(nbad)
+                return out
+
+        return take_along_axis_impl
+
+@overload(np.put)
+def np_put(a, ind, v):
+    if not isinstance(a, types.Array):
+        return
+
+    if a.layout == 'C':
+        @register_jitable
+        def flat_target(a):
+            return a.reshape(a.size)
+    else:
+        @register_jitable
+        def flat_target(a):
+            return a.flat
+
+    if isinstance(ind, types.Integer):
+        @register_jitable
+        def flat_indices(ind):
+            idx = np.empty(1, np.intp)
+            idx[0] = ind
+            return idx
+    elif (isinstance(ind, types.Array)
+            and isinstance(ind.dtype, types.Integer)):
+        @register_jitable
+        def flat_indices(ind):
+            return ind.ravel()
+    else:
+        raise TypingError("put(): indices must be an integer or an array "
+                          "of integers")
+
+    if isinstance(v, types.Array):
+        @register_jitable
+        def flat_values(v):
+            return v.ravel()
+    elif isinstance(v, (types.Number, types.Boolean)):
+        @register_jitable
+        def flat_values(v):
+            return np.full(1, v)
+    else:
+        raise TypingError("put(): values must be a scalar or an array")
+
+    if a.layout == 'C':
+        def put_impl(a, ind, v):
+            idx = flat_indices(ind)
+            vals = flat_values(v)
+            if len(vals) == 0:
+                return
+            # All the indices are checked first, so that the array is left
+            # unchanged if one is out of bounds
+            _check_indices(idx, a.size)
+            dst = flat_target(a)
+            if len(vals) >= len(idx):
+                _scatter_prefetch(dst, idx, vals)
+            else:
+                _scatter(dst, idx, vals)
+    else:
+        def put_impl(a, ind, v):
+            idx = flat_indices(ind)
+            vals = flat_values(v)
+            if len(vals) == 0:
+                return
+            _check_indices(idx, a.size)
+            _scatter(flat_target(a), idx, vals)
+
+    return put_impl
+
+@overload(np.compress)
+def np_compress(condition, a, axis=None):
+    if not isinstance(a, types.Array):
+        return
+    if not ((isinstance(condition, types.Array) and condition.ndim == 1)
+            or isinstance(condition, types.Sequence)):
+        raise TypingError("compress(): condition must be a 1D array or "
+                          "sequence")
+
+    if axis in (None, types.none):
+        def compress_impl(condition, a, axis=None):
+            idx = _nonzero_indices(condition)
+            out = np.empty(len(idx), a.dtype)
+            _check_bounds(_gather(a.ravel(), idx, out))
+            return out
+
+    else:
+        def compress_impl(condition, a, axis=None):
+            axis = _normalize_axis(axis, a.ndim)
+            idx = _nonzero_indices(condition)
+            out = _take_axis(a, idx, axis)
+            return out.reshape(_take_shape(a, idx.shape, axis, a.shape))
+
+    return compress_impl
+
+@overload(np.extract)
+def np_extract(condition, arr):
+    if not (isinstance(condition, types.Array)
+            and isinstance(arr, types.Array)):
+        return
+
+    def extract_impl(condition, arr):
+        idx = _nonzero_indices(condition.ravel())
+        out = np.empty(len(idx), arr.dtype)
+        _check_bounds(_gather(arr.ravel(), idx, out))
+        return out
+
+    return extract_impl
+
+
+#----------------------------------------------------------------------------
+# Convolution and moving windows
+
+@register_jitable
+def _correlate_full(x, y, out, offset, zero):
+    """
+    out[k] = c[k + offset] where c is the full correlation of the 1D
+    arrays *x* and *y*: c[f] = sum(x[f - len(y) + 1 + j] * y[j]) over the
+    indices j of *y* for which the index into *x* is in bounds.
+    """
+    n = len(x)
+    m = len(y)
+    for k in range(len(out)):
+        start = k + offset - (m - 1)
+        lo = max(0, -start)
+        hi = min(m, n - start)
+        acc = zero
+        for j in range(lo, hi):
+            acc += x[start + j] * y[j]
+        out[k] = acc
+
+def _get_correlate_mode(func_name, mode):
+    """
+    The name of the constant *mode* argument of np.convolve() or
+    np.correlate(), which may be abbreviated like in Numpy.
+    """
+    if isinstance(mode, types.Omitted):
+        mode = mode.value
+    if not isinstance(mode, str):
+        raise TypingError("%s(): mode must be a constant string" % func_name)
+    for name in ('valid', 'same', 'full'):
+        if mode[:1].lower() == name[0]:
+            return name
+    raise TypingError("%s(): mode must be one of 'valid', 'same' or 'full'"
+                      % func_name)
+
+def _make_correlate_bounds(mode):
+    """
+    Make a function returning the offset into the full correlation and the
+    length of the correlation in *mode* of arrays of lengths n >= m.
+    """
+    if mode == 'valid':
+        @register_jitable
+        def bounds(n, m):
+            return m - 1, n - m + 1
+    elif mode == 'same':
+        @register_jitable
+        def bounds(n, m):
+            return (m - 1) - m // 2, n
+    else:
+        @register_jitable
+        def bounds(n, m):
+            return 0, n + m - 1
+    return bounds
+
+def _correlate_dtype(a, v):
+    if not (isinstance(a, types.Array) and a.ndim == 1
+            and isinstance(a.dtype, types.Number)
+            and isinstance(v, types.Array) and v.ndim == 1
+            and isinstance(v.dtype, types.Number)):
+        return None
+    return np.result_type(as_dtype(a.dtype), as_dtype(v.dtype))
+
+register_constant_parameters(np.convolve, ('mode',))
+register_constant_parameters(np.correlate, ('mode',))
+
+@overload(np.convolve)
+def np_convolve(a, v, mode='full'):
+    dtype = _correlate_dtype(a, v)
+    if dtype is None:
+        return
+    bounds = _make_correlate_bounds(_get_correlate_mode("convolve", mode))
+    zero = dtype.type(0)
+
+    def convolve_impl(a, v, mode='full'):
+        if len(a) == 0:
+            raise ValueError("convolve(): a cannot be empty")
+        if len(v) == 0:
+            raise ValueError("convolve(): v cannot be empty")
+        # Convolution is commutative: correlate the longer array with the
+        # reversed shorter one
+        if len(v) > len(a):
+            offset, length = bounds(len(v), len(a))
+            out = np.empty(length, dtype)
+            _correlate_full(v, a[::-1], out, offset, zero)
+        else:
+            offset, length = bounds(len(a), len(v))
+            out = np.empty(length, dtype)
+            _correlate_full(a, v[::-1], out, offset, zero)
+        return out
+
+    return convolve_impl
+
+@overload(np.correlate)
+def np_correlate(a, v, mode='valid'):
+    dtype = _correlate_dtype(a, v)
+    if dtype is None:
+        return
+    bounds = _make_correlate_bounds(_get_correlate_mode("correlate", mode))
+    zero = dtype.type(0)
+
+    if isinstance(dtype.type(0), np.complexfloating):
+        @register_jitable
+        def conj(x):
+            return np.conj(x)
+    else:
+        @register_jitable
+        def conj(x):
+            return x
+
+    def correlate_impl(a, v, mode='valid'):
+        if len(a) == 0:
+            raise ValueError("correlate(): a cannot be empty")
+        if len(v) == 0:
+            raise ValueError("correlate(): v cannot be empty")
+        vc = conj(v)
+        if len(a) >= len(v):
+            offset, length = bounds(len(a), len(vc))
+            out = np.empty(length, dtype)
+            _correlate_full(a, vc, out, offset, zero)
+            return out
+        # Like Numpy, swap the arrays and reverse the result
+        offset, length = bounds(len(vc), len(a))
+        out = np.empty(length, dtype)
+        _correlate_full(vc, a, out, offset, zero)
+        return out[::-1].copy()
+
+    return correlate_impl
+
+# The rolling functions of numba.special run on 1D arrays of numbers and
+# return the results of the len(a) - window + 1 full windows.  Sums and
+# means add the new element and subtract the one leaving the window at
+# each step, with a compensated sum for floats whose non-finite elements
+# are counted rather than added (so that a NaN doesn't stick to all the
+# following windows).  Standard deviations are updated the same way with
+# Welford's algorithm.  Minimums and maximums keep the indices of the
+# candidate elements in a monotonic queue (a ring buffer): each element is
+# pushed and popped at most once.
+
+def _is_window_array(a):
+    return (isinstance(a, types.Array) and a.ndim == 1
+            and isinstance(a.dtype, (types.Integer, types.Float)))
+
+@register_jitable
+def _num_windows(n, window):
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    return max(n - window + 1, 0)
+
+@register_jitable
+def _compensated_add(s, c, x):
+    """
+    Add *x* to the sum *s* with compensation *c* (Neumaier's variant of
+    Kahan summation).
+    """
+    t = s + x
+    if abs(s) >= abs(x):
+        c += (s - t) + x
+    else:
+        c += (x - t) + s
+    return t, c
+
+@register_jitable
+def _is_finite(x):
+    return not (math.isinf(x) or math.isnan(x))
+
+def _make_rolling_sum(dtype, is_mean):
+    """
+    Make a function storing the sums (or means, if *is_mean*) of the
+    windows of a 1D array of the Numba *dtype* into *out*.
+    """
+    if isinstance(dtype, types.Integer):
+        # Integers are summed exactly (modulo overflow), like np.sum()
+        acc_type = np.ones(1, as_dtype(dtype)).sum().dtype.type
+
+        @register_jitable
+        def rolling(a, window, out):
+            s = acc_type(0)
+            for i in range(len(a)):
+                s += a[i]
+                if i >= window:
+                    s -= a[i - window]
+                if i >= window - 1:
+                    if is_mean:
+                        out[i - window + 1] = s / window
+                    else:
+                        out[i - window + 1] = s
+
+    else:
+        @register_jitable
+        def rolling(a, window, out):
+            s = 0.0
+            c = 0.0
+            nans = 0
+            pinfs = 0
+            ninfs = 0
+            for i in range(len(a)):
+                x = float(a[i])
+                if _is_finite(x):
+                    s, c = _compensated_add(s, c, x)
+                elif x > 0:
+                    pinfs += 1
+                elif x < 0:
+                    ninfs += 1
+                else:
+                    nans += 1
+                if i >= window:
+                    y = float(a[i - window])
+                    if _is_finite(y):
+                        s, c = _compensated_add(s, c, -y)
+                    elif y > 0:
+                        pinfs -= 1
+                    elif y < 0:
+                        ninfs -= 1
+                    else:
+                        nans -= 1
+                if i >= window - 1:
+                    if nans or (pinfs and ninfs):
+                        r = np.nan
+                    elif pinfs:
+                        r = np.inf
+                    elif ninfs:
+                        r = -np.inf
+                    else:
+                        r = s + c
+                    if is_mean:
+                        r /= window
+                    out[i - window + 1] = r
+
+    return rolling
+
+@register_jitable
+def _rolling_std(a, window, ddof, out):
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    nonfinite = 0
+    # Windows of equal values have a zero deviation, which the updates
+    # would only approximate
+    same = 0
+    for i in range(len(a)):
+        x = float(a[i])
+        if i > 0 and x == a[i - 1]:
+            same += 1
+        else:
+            same = 1
+        if _is_finite(x):
+            count += 1
+            d = x - mean
+            mean += d / count
+            m2 += d * (x - mean)
+        else:
+            nonfinite += 1
+        if i >= window:
+            y = float(a[i - window])
+            if not _is_finite(y):
+                nonfinite -= 1
+            elif count == 1:
+                count = 0
+                mean = 0.0
+                m2 = 0.0
+            else:
+                count -= 1
+                d = y - mean
+                mean -= d / count
+                m2 -= d * (y - mean)
+        if i >= window - 1:
+            if nonfinite or window <= ddof:
+                out[i - window + 1] = np.nan
+            elif same >= window:
+                out[i - window + 1] = 0.0
+            else:
+                out[i - window + 1] = math.sqrt(max(m2, 0.0) / (window - ddof))
+
+def _rolling_extremum_dtype(dtype):
+    """
+    The Numpy dtype of the rolling minimums and maximums of an array of the
+    Numba *dtype*.  Windows holding a NaN give a NaN, so they are floats.
+    """
+    if isinstance(dtype, types.Float):
+        return as_dtype(dtype)
+    return np.dtype(np.float64)
+
+def _make_rolling_extremum(dtype, is_max):
+    """
+    Make a function storing the minimums (or maximums, if *is_max*) of the
+    windows of a 1D array of the Numba *dtype* into the floating-point
+    array *out*.
+    """
+    isnan = get_isnan(dtype)
+
+    @register_jitable
+    def rolling(a, window, out):
+        n = len(a)
+        # The queue holds increasing indices of elements which are
+        # monotonic, the front one being the extremum of the window
+        cap = min(window, n) + 1
+        queue = np.empty(cap, np.intp)
+        head = 0
+        size = 0
+        last_nan = -window - 1
+        for i in range(n):
+            x = a[i]
+            if isnan(x):
+                last_nan = i
+            else:
+                while size > 0:
+                    v = a[queue[(head + size - 1) % cap]]
+                    if is_max:
+                        dominated = v <= x
+                    else:
+                        dominated = v >= x
+                    if not dominated:
+                        break
+                    size -= 1
+                queue[(head + size) % cap] = i
+                size += 1
+            if size > 0 and queue[head] <= i - window:
+                head = (head + 1) % cap
+                size -= 1
+            if i >= window - 1:
+                if last_nan > i - window:
+                    out[i - window + 1] = np.nan
+                else:
+                    out[i - window + 1] = a[queue[head]]
+
+    return rolling
+
+@overload(rolling_sum)
+def np_rolling_sum(a, window):
+    if not _is_window_array(a):
+        return
+    rolling = _make_rolling_sum(a.dtype, False)
+    dtype = np.ones(1, as_dtype(a.dtype)).sum().dtype
+
+    def rolling_sum_impl(a, window):
+        out = np.empty(_num_windows(len(a), window), dtype)
+        rolling(a, window, out)
+        return out
+
+    return rolling_sum_impl
+
+@overload(rolling_mean)
+def np_rolling_mean(a, window):
+    if not _is_window_array(a):
+        return
+    rolling = _make_rolling_sum(a.dtype, True)
+    dtype = np.ones(1, as_dtype(a.dtype)).mean().dtype
+
+    def rolling_mean_impl(a, window):
+        out = np.empty(_num_windows(len(a), window), dtype)
+        rolling(a, window, out)
+        return out
+
+    return rolling_mean_impl
+
+@overload(rolling_std)
+def np_rolling_std(a, window, ddof=0):
+    if not _is_window_array(a):
+        return
+    dtype = np.ones(1, as_dtype(a.dtype)).std().dtype
+
+    def rolling_std_impl(a, window, ddof=0):
+        out = np.empty(_num_windows(len(a), window), dtype)
+        _rolling_std(a, window, ddof, out)
+        return out
+
+    return rolling_std_impl
+
+@overload(rolling_min)
+def np_rolling_min(a, window):
+    if not _is_window_array(a):
+        return
+    rolling = _make_rolling_extremum(a.dtype, False)
+    dtype = _rolling_extremum_dtype(a.dtype)
+
+    def rolling_min_impl(a, window):
+        out = np.empty(_num_windows(len(a), window), dtype)
+        rolling(a, window, out)
+        return out
+
+    return rolling_min_impl
+
+@overload(rolling_max)
+def np_rolling_max(a, window):
+    if not _is_window_array(a):
+        return
+    rolling = _make_rolling_extremum(a.dtype, True)
+    dtype = _rolling_extremum_dtype(a.dtype)
+
+    def rolling_max_impl(a, window):
+        out = np.empty(_num_windows(len(a), window), dtype)
+        rolling(a, window, out)
+        return out
+
+    return rolling_max_impl
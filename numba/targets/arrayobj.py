@@ -25,7 +25,8 @@ from numba.targets.imputils import (lower_builtin, lower_getattr,
                                     impl_ret_new_ref, impl_ret_untracked)
 from numba.typing import signature
 from numba.extending import register_jitable
-from . import quicksort, slicing
+from numba.six import exec_
+from . import mergesort, quicksort, radixsort, slicing, timsort
 
 
 def set_range_metadata(builder, load, lower_bound, upper_bound):
@@ -578,6 +579,11 @@ class Indexer(object):
         """
         raise NotImplementedError
 
+    def cleanup(self):
+        """
+        Release the resources allocated by prepare(), after the loops.
+        """
+
 
 class EntireIndexer(Indexer):
     """
@@ -866,6 +872,178 @@ class SliceIndexer(Indexer):
         builder.position_at_end(self.bb_end)
 
 
+class AdvancedIndexer(Indexer):
+    """
+    Compute indices from several advanced indices broadcast together
+    (arrays of integers, 1D arrays of booleans and integers), over the
+    array dimensions *axes* they index.  Unlike the other indexers, this
+    one spans as many dimensions of the result as the broadcast indices
+    have, and loop_head() returns tuples of indices and counts.
+    """
+
+    def __init__(self, context, builder, aryty, ary, axes, index_types,
+                 indices):
+        self.context = context
+        self.builder = builder
+        self.aryty = aryty
+        self.ary = ary
+        self.axes = axes
+        self.index_types = index_types
+        self.indices = indices
+        self.ll_intp = self.context.get_value_type(types.intp)
+        self.zero = Constant.int(self.ll_intp, 0)
+        self.one = Constant.int(self.ll_intp, 1)
+        self.ndim = max(ty.ndim if isinstance(ty, types.Array) else 0
+                        for ty in index_types)
+
+    def prepare(self):
+        context = self.context
+        builder = self.builder
+        dim_sizes = cgutils.unpack_tuple(builder, self.ary.shape)
+        self.temporaries = []
+        # Each index is an integer or a (data, shapes, strides) triple,
+        # with zero strides along its broadcast dimensions
+        self.entries = []
+        shapes = []
+        for ax, idxty, idx in zip(self.axes, self.index_types, self.indices):
+            if isinstance(idxty, types.Integer):
+                ind = fix_integer_index(context, builder, idxty, idx,
+                                        dim_sizes[ax])
+                self.entries.append((ax, idxty, ind))
+                continue
+            if isinstance(idxty.dtype, types.Boolean):
+                # Boolean arrays must have the length of the dimension
+                # they index, and index with the positions of their true
+                # items
+                mask = make_array(idxty)(context, builder, idx)
+                mask_size = cgutils.unpack_tuple(builder, mask.shape, 1)[0]
+                with builder.if_then(builder.icmp_signed('!=', mask_size,
+                                                         dim_sizes[ax]),
+                                     likely=False):
+                    self._raise_index_error(
+                        "boolean index did not match indexed array along "
+                        "dimension %d" % (ax,))
+
+                def nonzero_impl(mask):
+                    return mask.nonzero()[0]
+
+                intty = types.Array(types.intp, 1, 'C')
+                idx = context.compile_internal(builder, nonzero_impl,
+                                               signature(intty, idxty),
+                                               (idx,))
+                self.temporaries.append((intty, idx))
+                idxty = intty
+            idxary = make_array(idxty)(context, builder, idx)
+            idx_shapes = cgutils.unpack_tuple(builder, idxary.shape,
+                                              idxty.ndim)
+            idx_strides = cgutils.unpack_tuple(builder, idxary.strides,
+                                               idxty.ndim)
+            idx_strides = [builder.select(builder.icmp_signed('==', n,
+                                                              self.one),
+                                          self.zero, stride)
+                           for n, stride in zip(idx_shapes, idx_strides)]
+            self.entries.append((ax, idxty,
+                                 (idxary.data, idx_shapes, idx_strides)))
+            shapes.append(idx_shapes)
+
+        # Broadcast the shapes of the index arrays together
+        shape_error = cgutils.false_bit
+        self.shape = []
+        for i in range(self.ndim):
+            size = self.one
+            for idx_shapes in shapes:
+                j = i - self.ndim + len(idx_shapes)
+                if j < 0:
+                    continue
+                n = idx_shapes[j]
+                is_one = builder.icmp_signed('==', n, self.one)
+                mismatch = builder.and_(
+                    builder.icmp_signed('!=', size, self.one),
+                    builder.icmp_signed('!=', size, n))
+                shape_error = builder.or_(shape_error,
+                                          builder.and_(builder.not_(is_one),
+                                                       mismatch))
+                size = builder.select(is_one, size, n)
+            self.shape.append(size)
+        with builder.if_then(shape_error, likely=False):
+            self._raise_index_error("shape mismatch: indexing arrays could "
+                                    "not be broadcast together")
+
+        self.size = functools.reduce(builder.mul, self.shape)
+        self.counts = [cgutils.alloca_once(builder, self.ll_intp)
+                       for i in range(self.ndim)]
+        self.flat_index = cgutils.alloca_once(builder, self.ll_intp)
+        self.bb_start = builder.append_basic_block()
+        self.bb_end = builder.append_basic_block()
+
+    def _raise_index_error(self, msg):
+        # Release the index arrays computed so far before raising
+        self.cleanup()
+        self.context.call_conv.return_user_exc(self.builder, IndexError,
+                                               (msg,))
+
+    def get_size(self):
+        return self.size
+
+    def get_shape(self):
+        return tuple(self.shape)
+
+    def get_index_bounds(self):
+        # Pessimal heuristic, as we don't want to scan for the min and max
+        dim_sizes = cgutils.unpack_tuple(self.builder, self.ary.shape)
+        return [(self.zero, dim_sizes[ax]) for ax in self.axes]
+
+    def loop_head(self):
+        context = self.context
+        builder = self.builder
+        # Initialize loop variables
+        for count in self.counts:
+            builder.store(self.zero, count)
+        builder.store(self.zero, self.flat_index)
+        builder.branch(self.bb_start)
+        builder.position_at_end(self.bb_start)
+        flat_index = builder.load(self.flat_index)
+        with builder.if_then(builder.icmp_signed('>=', flat_index,
+                                                 self.size),
+                             likely=False):
+            builder.branch(self.bb_end)
+        counts = [builder.load(count) for count in self.counts]
+        dim_sizes = cgutils.unpack_tuple(builder, self.ary.shape)
+        indices = []
+        for ax, idxty, entry in self.entries:
+            if isinstance(idxty, types.Integer):
+                indices.append(entry)
+                continue
+            # Gather the index from the (broadcast) index array
+            data, idx_shapes, idx_strides = entry
+            ptr = cgutils.get_item_pointer2(builder, data, idx_shapes,
+                                            idx_strides, 'A',
+                                            counts[self.ndim - idxty.ndim:])
+            index = load_item(context, builder, idxty, ptr)
+            indices.append(fix_integer_index(context, builder, idxty.dtype,
+                                             index, dim_sizes[ax]))
+        return tuple(indices), tuple(counts)
+
+    def loop_tail(self):
+        builder = self.builder
+        # Increment the counts from the innermost one, with carry
+        carry = cgutils.true_bit
+        for count, size in reversed(list(zip(self.counts, self.shape))):
+            cur = builder.load(count)
+            cur = builder.add(cur, builder.zext(carry, cur.type))
+            carry = builder.and_(carry, builder.icmp_signed('>=', cur, size))
+            builder.store(builder.select(carry, self.zero, cur), count)
+        next_index = cgutils.increment_index(builder,
+                                             builder.load(self.flat_index))
+        builder.store(next_index, self.flat_index)
+        builder.branch(self.bb_start)
+        builder.position_at_end(self.bb_end)
+
+    def cleanup(self):
+        for ty, value in self.temporaries:
+            self.context.nrt.decref(self.builder, ty, value)
+
+
 class FancyIndexer(object):
     """
     Perform fancy indexing on the given array.
@@ -879,7 +1057,20 @@ class FancyIndexer(object):
         self.strides = cgutils.unpack_tuple(builder, ary.strides, aryty.ndim)
         self.ll_intp = self.context.get_value_type(types.intp)
 
+        # With several advanced indices, or an integer mixed with an
+        # advanced index, Numpy broadcasts them all together
+        arrays = [ty for ty in index_types if isinstance(ty, types.Array)]
+        use_advanced = bool(arrays) and (
+            len(arrays) > 1 or arrays[0].ndim != 1
+            or any(isinstance(ty, types.Integer) for ty in index_types))
+
         indexers = []
+        # The array dimensions each indexer is for
+        indexer_axes = []
+        # The advanced indices as (dimension, type, value), and the
+        # number of indexers before each of them
+        advanced = []
+        advanced_positions = []
 
         ax = 0
         for indexval, idxty in zip(indices, index_types):
@@ -889,10 +1080,17 @@ class FancyIndexer(object):
                 for i in range(n_missing):
                     indexer = EntireIndexer(context, builder, aryty, ary, ax)
                     indexers.append(indexer)
+                    indexer_axes.append((ax,))
                     ax += 1
                 continue
 
             # Regular index value
+            if use_advanced and isinstance(idxty, (types.Integer,
+                                                   types.Array)):
+                advanced.append((ax, idxty, indexval))
+                advanced_positions.append(len(indexers))
+                ax += 1
+                continue
             if isinstance(idxty, types.SliceType):
                 slice = context.make_helper(builder, idxty, indexval)
                 indexer = SliceIndexer(context, builder, aryty, ary, ax,
@@ -917,6 +1115,7 @@ class FancyIndexer(object):
                 indexers.append(indexer)
             else:
                 raise AssertionError("unexpected index type: %s" % (idxty,))
+            indexer_axes.append((ax,))
             ax += 1
 
         # Fill up missing dimensions at the end
@@ -924,10 +1123,27 @@ class FancyIndexer(object):
         while ax < aryty.ndim:
             indexer = EntireIndexer(context, builder, aryty, ary, ax)
             indexers.append(indexer)
+            indexer_axes.append((ax,))
             ax += 1
 
-        assert len(indexers) == aryty.ndim, (len(indexers), aryty.ndim)
+        if advanced:
+            # The dimensions of the broadcast indices replace the indexed
+            # ones if these are next to each other, otherwise they come
+            # first in the result
+            axes, adv_types, adv_indices = zip(*advanced)
+            indexer = AdvancedIndexer(context, builder, aryty, ary,
+                                      axes, adv_types, adv_indices)
+            if len(set(advanced_positions)) == 1:
+                pos = advanced_positions[0]
+            else:
+                pos = 0
+            indexers.insert(pos, indexer)
+            indexer_axes.insert(pos, axes)
+
+        assert sum(map(len, indexer_axes)) == aryty.ndim, \
+            (indexer_axes, aryty.ndim)
         self.indexers = indexers
+        self.indexer_axes = indexer_axes
 
     def prepare(self):
         for i in self.indexers:
@@ -954,20 +1170,29 @@ class FancyIndexer(object):
         one = self.ll_intp(1)
         lower = zero
         upper = zero
-        for indexer, shape, stride in zip(self.indexers, self.indexers_shape,
-                                          strides):
+        for shape in self.indexers_shape:
             is_empty = builder.or_(is_empty,
                                    builder.icmp_unsigned('==', shape, zero))
-            # Compute [lower, upper) indices on this dimension
-            lower_index, upper_index = indexer.get_index_bounds()
-            lower_offset = builder.mul(stride, lower_index)
-            upper_offset = builder.mul(stride, builder.sub(upper_index, one))
-            # Adjust total interval
-            is_downwards = builder.icmp_signed('<', stride, zero)
-            lower = builder.add(lower,
-                                builder.select(is_downwards, upper_offset, lower_offset))
-            upper = builder.add(upper,
-                                builder.select(is_downwards, lower_offset, upper_offset))
+        for axes, indexer in zip(self.indexer_axes, self.indexers):
+            bounds = indexer.get_index_bounds()
+            if not isinstance(indexer, AdvancedIndexer):
+                bounds = [bounds]
+            for ax, (lower_index, upper_index) in zip(axes, bounds):
+                # Compute [lower, upper) indices on this dimension
+                stride = strides[ax]
+                lower_offset = builder.mul(stride, lower_index)
+                upper_offset = builder.mul(stride,
+                                           builder.sub(upper_index, one))
+                # Adjust total interval
+                is_downwards = builder.icmp_signed('<', stride, zero)
+                lower = builder.add(lower,
+                                    builder.select(is_downwards,
+                                                   upper_offset,
+                                                   lower_offset))
+                upper = builder.add(upper,
+                                    builder.select(is_downwards,
+                                                   lower_offset,
+                                                   upper_offset))
         # Make interval half-open
         upper = builder.add(upper, itemsize)
         # Adjust for empty shape
@@ -976,13 +1201,32 @@ class FancyIndexer(object):
         return lower, upper
 
     def begin_loops(self):
-        indices, counts = zip(*(i.loop_head() for i in self.indexers))
-        return indices, counts
+        """
+        Start the loops of the indexers, and return the indices along
+        the array dimensions and the iteration counts of the result
+        dimensions (None for dimensions omitted from the result).
+        """
+        indices = [None] * self.aryty.ndim
+        counts = []
+        for axes, indexer in zip(self.indexer_axes, self.indexers):
+            index, count = indexer.loop_head()
+            if isinstance(indexer, AdvancedIndexer):
+                for ax, ind in zip(axes, index):
+                    indices[ax] = ind
+                counts.extend(count)
+            else:
+                indices[axes[0]] = index
+                counts.append(count)
+        return tuple(indices), tuple(counts)
 
     def end_loops(self):
         for i in reversed(self.indexers):
             i.loop_tail()
 
+    def cleanup(self):
+        for i in self.indexers:
+            i.cleanup()
+
 
 def fancy_getitem(context, builder, sig, args,
                   aryty, ary, index_types, indices):
@@ -1022,6 +1266,7 @@ def fancy_getitem(context, builder, sig, args,
     builder.store(next_idx, out_idx)
 
     indexer.end_loops()
+    indexer.cleanup()
 
     return impl_ret_new_ref(context, builder, out_ty, out._getvalue())
 
@@ -1372,6 +1617,7 @@ def fancy_setslice(context, builder, sig, args, index_types, indices):
     store_item(context, builder, aryty, val, dest_ptr)
 
     indexer.end_loops()
+    indexer.cleanup()
 
     src_cleanup()
 
@@ -3432,6 +3678,9 @@ def numpy_linspace_3(context, builder, sig, args):
         arr[0] = start
         for i in range(1, num):
             arr[i] = start + delta * (i / div)
+        if num > 1:
+            # like Numpy, the last element is exactly stop
+            arr[num - 1] = stop
         return arr
 
     res = context.compile_internal(builder, linspace, sig, args)
@@ -4316,56 +4565,273 @@ def np_dstack(context, builder, sig, args):
 # Sorting
 
 _sorts = {}
+_parallel_sorts = {}
 
 def lt_floats(a, b):
-    return math.isnan(b) or a < b
+    # NaNs sort last and compare equal to each other, which keeps them
+    # in order in stable sorts
+    return a < b or (math.isnan(b) and not math.isnan(a))
 
-def get_sort_func(is_float, is_argsort=False):
+# Sort kinds served by the timsort of timsort.py, the others ('quicksort'
+# and 'heapsort') use the introsort of quicksort.py, or the radix sort of
+# radixsort.py for large arrays of integers and floats
+_stable_sort_kinds = ('mergesort', 'stable')
+
+def get_sort_func(is_float, is_argsort=False, kind='quicksort', dtype=None):
     """
-    Get a sort implementation of the given kind.
+    Get a sort implementation of the given kind for arrays of the
+    Numba type *dtype*.
     """
-    key = is_float, is_argsort
+    stable = kind in _stable_sort_kinds
+    if stable or not radixsort.can_radix_sort(dtype):
+        dtype = None
+    key = is_float, is_argsort, stable, dtype
     try:
         return _sorts[key]
     except KeyError:
-        sort = quicksort.make_jit_quicksort(lt=lt_floats if is_float else None,
-                                            is_argsort=is_argsort)
-        func = _sorts[key] = sort.run_quicksort
+        lt = lt_floats if is_float else None
+        if stable:
+            func = timsort.make_jit_array_timsort(lt=lt,
+                                                  is_argsort=is_argsort)
+        else:
+            sort = quicksort.make_jit_quicksort(lt=lt, is_argsort=is_argsort)
+            func = sort.run_quicksort
+            if dtype is not None:
+                func = radixsort.make_hybrid_sort(func, as_dtype(dtype),
+                                                  is_argsort=is_argsort)
+        _sorts[key] = func
         return func
 
+def get_parallel_sort_func(is_float, is_argsort=False, kind='quicksort',
+                           dtype=None):
+    """
+    Get a parallel sort implementation of the given kind, for use by
+    the parfor pass (see mergesort.make_parallel_sort()).
+    """
+    stable = kind in _stable_sort_kinds
+    key = is_float, is_argsort, stable, dtype
+    try:
+        return _parallel_sorts[key]
+    except KeyError:
+        impl = mergesort.make_parallel_sort(
+            get_sort_func(is_float, is_argsort, kind, dtype),
+            lt=lt_floats if is_float else None, is_argsort=is_argsort)
+        _parallel_sorts[key] = impl
+        return impl
+
+def lt_complex(a, b):
+    # Complex numbers are ordered by their real parts, then by their
+    # imaginary parts
+    if a.real == b.real:
+        return lt_floats(a.imag, b.imag)
+    return lt_floats(a.real, b.real)
+
+_record_lt_template = """
+def record_lt(a, b):
+{body}
+"""
+
+def make_record_lt(rectype, fields):
+    """
+    Make the comparison function of records of the Numba type *rectype*
+    by the successive *fields*, the other fields breaking ties.
+    """
+    def compare(name, x, y):
+        fieldty = rectype.typeof(name)
+        if isinstance(fieldty, types.Float):
+            return "lt_floats(%s, %s)" % (x, y)
+        elif isinstance(fieldty, types.Complex):
+            return "lt_complex(%s, %s)" % (x, y)
+        return "%s < %s" % (x, y)
+
+    lines = []
+    for i, name in enumerate(fields):
+        x = "x%d" % i
+        y = "y%d" % i
+        lines.append("    %s = a[%r]" % (x, name))
+        lines.append("    %s = b[%r]" % (y, name))
+        if i == len(fields) - 1:
+            lines.append("    return %s" % compare(name, x, y))
+        else:
+            lines.append("    if %s:" % compare(name, x, y))
+            lines.append("        return True")
+            lines.append("    if %s:" % compare(name, y, x))
+            lines.append("        return False")
+    source = _record_lt_template.format(body='\n'.join(lines))
+    glbls = {'lt_floats': register_jitable(lt_floats),
+             'lt_complex': register_jitable(lt_complex)}
+    exec_(source, glbls)
+    return glbls['record_lt']
+
+def get_record_sort_func(rectype, fields, is_argsort=False,
+                         kind='quicksort'):
+    """
+    Get a sort implementation of the given kind for arrays of records of
+    the Numba type *rectype*, sorted by the given *fields*.  The records
+    are argsorted, then moved to their place when sorting.
+    """
+    stable = kind in _stable_sort_kinds
+    key = rectype, fields, is_argsort, stable
+    try:
+        return _sorts[key]
+    except KeyError:
+        if is_argsort:
+            lt = make_record_lt(rectype, fields)
+            if stable:
+                sort = mergesort.make_jit_mergesort(lt=lt, is_argsort=True)
+                func = sort.run_mergesort
+            else:
+                sort = quicksort.make_jit_quicksort(lt=lt, is_argsort=True)
+                func = sort.run_quicksort
+        else:
+            run_argsort = get_record_sort_func(rectype, fields, True, kind)
+
+            @register_jitable
+            def func(A):
+                idx = run_argsort(A)
+                B = A.copy()
+                for i in range(len(A)):
+                    A[i] = B[idx[i]]
+                return A
 
-@lower_builtin("array.sort", types.Array)
+        _sorts[key] = func
+        return func
+
+def _sort_kind(sig):
+    """
+    The sort kind of a sort() or argsort() call, given as an optional
+    constant argument after the array.
+    """
+    kind = sig.args[1]
+    if isinstance(kind, types.Const):
+        return kind.value
+    return 'quicksort'
+
+def _get_array_sort_func(sig, is_argsort=False):
+    """
+    Get the implementation of the sort() or argsort() call of signature
+    *sig*, whose arguments are the array, the kind and the order.
+    """
+    from numba.typing.npydecl import _sort_order_fields
+    arytype, _, order = sig.args
+    fields = _sort_order_fields(arytype.dtype, order)
+    if fields is not None:
+        return get_record_sort_func(arytype.dtype, fields,
+                                    is_argsort=is_argsort,
+                                    kind=_sort_kind(sig))
+    return get_sort_func(is_float=isinstance(arytype.dtype, types.Float),
+                         is_argsort=is_argsort, kind=_sort_kind(sig),
+                         dtype=arytype.dtype)
+
+
+@lower_builtin("array.sort", types.Array, types.Any, types.Any)
 def array_sort(context, builder, sig, args):
     arytype = sig.args[0]
-    sort_func = get_sort_func(is_float=isinstance(arytype.dtype, types.Float))
+    sort_func = _get_array_sort_func(sig)
 
     def array_sort_impl(arr):
         # Note we clobber the return value
         sort_func(arr)
 
-    return context.compile_internal(builder, array_sort_impl, sig, args)
+    innersig = signature(sig.return_type, arytype)
+    return context.compile_internal(builder, array_sort_impl, innersig,
+                                    args[:1])
 
-@lower_builtin(np.sort, types.Array)
+@lower_builtin(np.sort, types.Array, types.Any, types.Any)
 def np_sort(context, builder, sig, args):
+    arytype = sig.args[0]
+    sort_func = _get_array_sort_func(sig)
 
     def np_sort_impl(a):
         res = a.copy()
-        res.sort()
+        sort_func(res)
         return res
 
-    return context.compile_internal(builder, np_sort_impl, sig, args)
+    innersig = signature(sig.return_type, arytype)
+    return context.compile_internal(builder, np_sort_impl, innersig,
+                                    args[:1])
 
-@lower_builtin("array.argsort", types.Array)
-@lower_builtin(np.argsort, types.Array)
+@lower_builtin("array.argsort", types.Array, types.Any, types.Any)
+@lower_builtin(np.argsort, types.Array, types.Any, types.Any)
 def array_argsort(context, builder, sig, args):
     arytype = sig.args[0]
-    sort_func = get_sort_func(is_float=isinstance(arytype.dtype, types.Float),
-                              is_argsort=True)
+    sort_func = _get_array_sort_func(sig, is_argsort=True)
 
     def array_argsort_impl(arr):
         return sort_func(arr)
 
-    return context.compile_internal(builder, array_argsort_impl, sig, args)
+    innersig = signature(sig.return_type, arytype)
+    return context.compile_internal(builder, array_argsort_impl, innersig,
+                                    args[:1])
+
+
+_lexsorts = {}
+
+_lexsort_template = """
+def lexsort(keys):
+    idx = argsort0(keys[0])
+    n = len(idx)
+{body}
+    return idx
+"""
+
+def get_lexsort_func(keysty):
+    """
+    Get the implementation of np.lexsort() for keys of the Numba type
+    *keysty* (a tuple of 1D arrays or a 1D or 2D array).  The indices are
+    sorted by one key after the other with a stable argsort, starting
+    from the first key, so that the last key is the primary one.
+    """
+    try:
+        return _lexsorts[keysty]
+    except KeyError:
+        pass
+
+    def get_argsort(dtype):
+        return get_sort_func(is_float=isinstance(dtype, types.Float),
+                             is_argsort=True, kind='stable', dtype=dtype)
+
+    if isinstance(keysty, types.BaseTuple):
+        lines = []
+        glbls = {}
+        for k, key in enumerate(keysty):
+            glbls['argsort%d' % k] = get_argsort(key.dtype)
+            if k == 0:
+                continue
+            lines.append("    if len(keys[%d]) != n:" % k)
+            lines.append("        raise ValueError('all keys need to be "
+                         "the same shape')")
+            lines.append("    idx = idx[argsort%d(keys[%d][idx])]" % (k, k))
+        source = _lexsort_template.format(body='\n'.join(lines))
+        exec_(source, glbls)
+        lexsort = glbls['lexsort']
+
+    elif keysty.ndim == 1:
+        argsort = get_argsort(keysty.dtype)
+
+        def lexsort(keys):
+            return argsort(keys)
+
+    else:
+        argsort = get_argsort(keysty.dtype)
+
+        def lexsort(keys):
+            if keys.shape[0] == 0:
+                raise TypeError("need sequence of keys with len > 0 "
+                                "in lexsort")
+            idx = argsort(keys[0])
+            for k in range(1, keys.shape[0]):
+                idx = idx[argsort(keys[k][idx])]
+            return idx
+
+    _lexsorts[keysty] = lexsort
+    return lexsort
+
+@lower_builtin(np.lexsort, types.Array)
+@lower_builtin(np.lexsort, types.BaseTuple)
+def np_lexsort(context, builder, sig, args):
+    lexsort = get_lexsort_func(sig.args[0])
+    return context.compile_internal(builder, lexsort, sig, args)
 
 
 # -----------------------------------------------------------------------------
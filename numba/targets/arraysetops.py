@@ -0,0 +1,451 @@
+"""
+Implementation of the set routines of Numpy: np.unique(), np.in1d(),
+np.intersect1d() and np.union1d().
+
+Values are deduplicated by sorting them for small arrays.  Larger arrays
+are deduplicated in linear time instead, by hashing the values into an
+open-addressing table, or for integers with a range of values not much
+larger than the array, by counting them in a table indexed by value.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import numpy as np
+
+from numba import types
+from numba.errors import TypingError
+from numba.extending import overload, register_jitable
+from numba.numpy_support import as_dtype, from_dtype
+from numba.typing.templates import register_constant_parameters
+
+
+# Arrays smaller than this are deduplicated by sorting
+HASH_THRESHOLD = 1 << 12
+
+# Integers are counted by value if their range is at most this many
+# times the number of values
+DIRECT_RANGE_FACTOR = 2
+
+# 2 ** 64 divided by the golden ratio
+_FIBONACCI = np.uint64(11400714819323198485)
+
+
+#----------------------------------------------------------------------------
+# Hash tables
+
+@register_jitable
+def _table_bits(n):
+    """
+    The log2 of the size of a hash table for *n* keys, which keeps the
+    table at most half full.
+    """
+    bits = 1
+    while (1 << bits) < 2 * n:
+        bits += 1
+    return bits
+
+@register_jitable
+def _hash_slot(v, bits):
+    """
+    The slot of value *v* in a table of 2 ** *bits* slots.
+    """
+    # Adding 0 turns -0.0 into 0.0, which hashes differently.  Fibonacci
+    # hashing spreads patterns of the low bits (e.g. multiples of a power
+    # of two) over the table.
+    h = np.uint64(hash(v + 0)) * _FIBONACCI
+    return np.intp(h >> np.uint64(64 - bits))
+
+@register_jitable
+def _hash_insert(slots, keys, bits, m, v):
+    """
+    Find *v* in the table *slots* of indices into *keys*, which holds *m*
+    keys, inserting it if not found.  The index of *v* in *keys* is
+    returned, equal to *m* if it was inserted.
+    """
+    mask = len(slots) - 1
+    i = _hash_slot(v, bits)
+    while True:
+        k = slots[i]
+        if k < 0:
+            slots[i] = m
+            keys[m] = v
+            return m
+        if keys[k] == v:
+            return k
+        i = (i + 1) & mask
+
+@register_jitable
+def _hash_find(slots, keys, bits, v):
+    """
+    The index of *v* in *keys* through the table *slots*, or -1.
+    """
+    mask = len(slots) - 1
+    i = _hash_slot(v, bits)
+    while True:
+        k = slots[i]
+        if k < 0 or keys[k] == v:
+            return k
+        i = (i + 1) & mask
+
+
+#----------------------------------------------------------------------------
+# np.unique()
+
+def _is_direct_dtype(dtype):
+    """
+    Whether values of *dtype* can be counted in a table indexed by value.
+    """
+    # Offsets of uint64 values don't mix with signed integers
+    return (isinstance(dtype, types.Integer) and
+            (dtype.signed or dtype.bitwidth < 64))
+
+def _make_unique_impl(is_direct, need_index, need_inverse, need_counts):
+    """
+    Make a function computing the sorted unique values of a 1D array and,
+    if needed, the index of their first occurrences, the indices of the
+    unique values giving back the array and the number of occurrences of
+    each of them.  Arrays that aren't needed are returned empty.
+    """
+
+    @register_jitable
+    def unique_sort(ar):
+        n = len(ar)
+        if need_index or need_inverse:
+            # A stable sort puts the first occurrence first
+            perm = np.argsort(ar, kind='mergesort')
+            values = ar[perm]
+        else:
+            perm = np.empty(0, np.intp)
+            values = np.sort(ar)
+        # Starts of the runs of equal values
+        starts = np.empty(n + 1, np.intp)
+        m = 0
+        for i in range(n):
+            if i == 0 or values[i] != values[i - 1]:
+                starts[m] = i
+                m += 1
+        starts[m] = n
+
+        uniq = np.empty(m, ar.dtype)
+        index = np.empty(m if need_index else 0, np.intp)
+        inverse = np.empty(n if need_inverse else 0, np.intp)
+        counts = np.empty(m if need_counts else 0, np.intp)
+        for j in range(m):
+            start = starts[j]
+            stop = starts[j + 1]
+            uniq[j] = values[start]
+            if need_index:
+                index[j] = perm[start]
+            if need_inverse:
+                for i in range(start, stop):
+                    inverse[perm[i]] = j
+            if need_counts:
+                counts[j] = stop - start
+        return uniq, index, inverse, counts
+
+    @register_jitable
+    def unique_hash(ar):
+        n = len(ar)
+        bits = _table_bits(n)
+        slots = np.full(1 << bits, -1, np.intp)
+        keys = np.empty(n, ar.dtype)
+        first = np.empty(n if need_index else 0, np.intp)
+        group_counts = np.zeros(n if need_counts else 0, np.intp)
+        groups = np.empty(n if need_inverse else 0, np.intp)
+        m = 0
+        for i in range(n):
+            k = _hash_insert(slots, keys, bits, m, ar[i])
+            if k == m:
+                if need_index:
+                    first[m] = i
+                m += 1
+            if need_counts:
+                group_counts[k] += 1
+            if need_inverse:
+                groups[i] = k
+
+        # Only the unique values are sorted
+        order = np.argsort(keys[:m])
+        uniq = keys[order]
+        index = np.empty(m if need_index else 0, np.intp)
+        counts = np.empty(m if need_counts else 0, np.intp)
+        ranks = np.empty(m if need_inverse else 0, np.intp)
+        for j in range(m):
+            k = order[j]
+            if need_index:
+                index[j] = first[k]
+            if need_counts:
+                counts[j] = group_counts[k]
+            if need_inverse:
+                ranks[k] = j
+        inverse = np.empty(n if need_inverse else 0, np.intp)
+        if need_inverse:
+            for i in range(n):
+                inverse[i] = ranks[groups[i]]
+        return uniq, index, inverse, counts
+
+    @register_jitable
+    def unique_direct(ar, lo, span):
+        n = len(ar)
+        value_counts = np.zeros(span, np.intp)
+        first = np.full(span if need_index else 0, -1, np.intp)
+        for i in range(n):
+            d = ar[i] - lo
+            if need_index and value_counts[d] == 0:
+                first[d] = i
+            value_counts[d] += 1
+
+        # The values are sorted by construction
+        m = 0
+        for d in range(span):
+            if value_counts[d] > 0:
+                m += 1
+        uniq = np.empty(m, ar.dtype)
+        index = np.empty(m if need_index else 0, np.intp)
+        counts = np.empty(m if need_counts else 0, np.intp)
+        ranks = np.empty(span if need_inverse else 0, np.intp)
+        j = 0
+        for d in range(span):
+            if value_counts[d] > 0:
+                uniq[j] = lo + d
+                if need_index:
+                    index[j] = first[d]
+                if need_counts:
+                    counts[j] = value_counts[d]
+                if need_inverse:
+                    ranks[d] = j
+                j += 1
+        inverse = np.empty(n if need_inverse else 0, np.intp)
+        if need_inverse:
+            for i in range(n):
+                inverse[i] = ranks[ar[i] - lo]
+        return uniq, index, inverse, counts
+
+    if is_direct:
+        @register_jitable
+        def unique(ar):
+            n = len(ar)
+            if n < HASH_THRESHOLD:
+                return unique_sort(ar)
+            lo = ar.min()
+            hi = ar.max()
+            # Compare as floats to avoid overflows
+            if float(hi) - float(lo) < float(DIRECT_RANGE_FACTOR * n):
+                return unique_direct(ar, lo, hi - lo + 1)
+            return unique_hash(ar)
+
+    else:
+        @register_jitable
+        def unique(ar):
+            if len(ar) < HASH_THRESHOLD:
+                return unique_sort(ar)
+            return unique_hash(ar)
+
+    return unique
+
+
+def _is_set_array(ar):
+    return (isinstance(ar, types.Array) and
+            isinstance(ar.dtype, (types.Integer, types.Float, types.Boolean)))
+
+def _get_flag(func_name, name, flag):
+    """
+    The value of the flag argument *name* that must be a constant.
+    """
+    if isinstance(flag, types.Omitted):
+        return bool(flag.value)
+    if isinstance(flag, bool):
+        return flag
+    raise TypingError("%s(): %s must be a constant boolean"
+                      % (func_name, name))
+
+register_constant_parameters(np.unique, ('return_index', 'return_inverse',
+                                         'return_counts'))
+
+@overload(np.unique)
+def np_unique(ar, return_index=False, return_inverse=False,
+              return_counts=False):
+    if not _is_set_array(ar):
+        return
+    need_index = _get_flag("unique", "return_index", return_index)
+    need_inverse = _get_flag("unique", "return_inverse", return_inverse)
+    need_counts = _get_flag("unique", "return_counts", return_counts)
+    unique = _make_unique_impl(_is_direct_dtype(ar.dtype),
+                               need_index, need_inverse, need_counts)
+
+    # The flags select the elements of the result tuple
+    if not (need_index or need_inverse or need_counts):
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            return unique(ar.ravel())[0]
+    elif need_index and need_inverse and need_counts:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, index, inverse, counts
+    elif need_index and need_inverse:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, index, inverse
+    elif need_index and need_counts:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, index, counts
+    elif need_inverse and need_counts:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, inverse, counts
+    elif need_index:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, index
+    elif need_inverse:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, inverse
+    else:
+        def unique_impl(ar, return_index=False, return_inverse=False,
+                        return_counts=False):
+            uniq, index, inverse, counts = unique(ar.ravel())
+            return uniq, counts
+
+    return unique_impl
+
+_unique_values = {}
+
+def _get_unique_values(dtype):
+    """
+    The function computing the sorted unique values of a 1D array of
+    *dtype*.
+    """
+    try:
+        return _unique_values[dtype]
+    except KeyError:
+        unique = _make_unique_impl(_is_direct_dtype(dtype),
+                                   False, False, False)
+        _unique_values[dtype] = unique
+        return unique
+
+
+#----------------------------------------------------------------------------
+# Membership
+
+@register_jitable
+def _in1d_sort(ar1, ar2, invert):
+    values = np.sort(ar2)
+    n2 = len(values)
+    out = np.empty(len(ar1), np.bool_)
+    for i in range(len(ar1)):
+        v = ar1[i]
+        k = np.searchsorted(values, v)
+        out[i] = (k < n2 and values[k] == v) != invert
+    return out
+
+@register_jitable
+def _in1d_hash(ar1, ar2, invert):
+    n2 = len(ar2)
+    bits = _table_bits(n2)
+    slots = np.full(1 << bits, -1, np.intp)
+    keys = np.empty(n2, ar2.dtype)
+    m = 0
+    for i in range(n2):
+        if _hash_insert(slots, keys, bits, m, ar2[i]) == m:
+            m += 1
+    out = np.empty(len(ar1), np.bool_)
+    for i in range(len(ar1)):
+        out[i] = (_hash_find(slots, keys, bits, ar1[i]) >= 0) != invert
+    return out
+
+@register_jitable
+def _in1d_direct(ar1, ar2, invert, lo, hi):
+    present = np.zeros(hi - lo + 1, np.bool_)
+    for i in range(len(ar2)):
+        present[ar2[i] - lo] = True
+    out = np.empty(len(ar1), np.bool_)
+    for i in range(len(ar1)):
+        v = ar1[i]
+        found = lo <= v and v <= hi and present[v - lo]
+        out[i] = found != invert
+    return out
+
+def _get_in1d_impl(dtype1, dtype2):
+    """
+    The membership test of the values of an array of *dtype1* in an array
+    of *dtype2*, both 1D.
+    """
+    if _is_direct_dtype(dtype1) and _is_direct_dtype(dtype2):
+        def in1d(ar1, ar2, invert):
+            n2 = len(ar2)
+            if n2 < HASH_THRESHOLD:
+                return _in1d_sort(ar1, ar2, invert)
+            lo = ar2.min()
+            hi = ar2.max()
+            # Compare as floats to avoid overflows
+            if float(hi) - float(lo) < float(DIRECT_RANGE_FACTOR * n2):
+                return _in1d_direct(ar1, ar2, invert, lo, hi)
+            if dtype1 != dtype2:
+                return _in1d_sort(ar1, ar2, invert)
+            return _in1d_hash(ar1, ar2, invert)
+    elif dtype1 != dtype2:
+        # Equal values of different types hash differently
+        def in1d(ar1, ar2, invert):
+            return _in1d_sort(ar1, ar2, invert)
+    else:
+        def in1d(ar1, ar2, invert):
+            if len(ar2) < HASH_THRESHOLD:
+                return _in1d_sort(ar1, ar2, invert)
+            return _in1d_hash(ar1, ar2, invert)
+
+    return register_jitable(in1d)
+
+@overload(np.in1d)
+def np_in1d(ar1, ar2, assume_unique=False, invert=False):
+    if not (_is_set_array(ar1) and _is_set_array(ar2)):
+        return
+    in1d = _get_in1d_impl(ar1.dtype, ar2.dtype)
+
+    def in1d_impl(ar1, ar2, assume_unique=False, invert=False):
+        # Uniqueness doesn't make membership tests any faster here
+        return in1d(ar1.ravel(), ar2.ravel(), invert)
+
+    return in1d_impl
+
+
+#----------------------------------------------------------------------------
+# Set operations
+
+@overload(np.intersect1d)
+def np_intersect1d(ar1, ar2, assume_unique=False):
+    if not (_is_set_array(ar1) and _is_set_array(ar2)):
+        return
+    unique = _get_unique_values(ar1.dtype)
+    in1d = _get_in1d_impl(ar1.dtype, ar2.dtype)
+
+    def intersect1d_impl(ar1, ar2, assume_unique=False):
+        if assume_unique:
+            uniq = np.sort(ar1.ravel())
+        else:
+            uniq = unique(ar1.ravel())[0]
+        return uniq[in1d(uniq, ar2.ravel(), False)]
+
+    return intersect1d_impl
+
+@overload(np.union1d)
+def np_union1d(ar1, ar2):
+    if not (_is_set_array(ar1) and _is_set_array(ar2)):
+        return
+    dtype = np.promote_types(as_dtype(ar1.dtype), as_dtype(ar2.dtype))
+    unique = _get_unique_values(from_dtype(dtype))
+
+    def union1d_impl(ar1, ar2):
+        both = np.empty(ar1.size + ar2.size, dtype)
+        both[:ar1.size] = ar1.ravel()
+        both[ar1.size:] = ar2.ravel()
+        return unique(both)[0]
+
+    return union1d_impl
@@ -256,9 +256,9 @@ class BaseContext(object):
         Useful for third-party extensions.
         """
         # Populate built-in registry
-        from . import (arraymath, enumimpl, iterators, linalg, numbers,
-                       optional, polynomial, rangeobj, slicing, smartarray,
-                       tupleobj)
+        from . import (arraymath, arraysetops, enumimpl, iterators, linalg,
+                       numbers, optional, polynomial, rangeobj, slicing,
+                       smartarray, tupleobj)
         try:
             from . import npdatetime
         except NotImplementedError:
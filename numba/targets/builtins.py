@@ -69,6 +69,14 @@ def any_to_deferred(context, builder, fromty, toty, val):
     model = context.data_model_manager[toty]
     return model.set(builder, model.make_uninitialized(), actual)
 
+@lower_cast(types.Any, types.Omitted)
+def any_to_omitted(context, builder, fromty, toty, val):
+    """
+    A constant passed for a parameter typed as its value (see
+    typing.templates.constant_parameters) isn't passed at run time.
+    """
+    return context.get_dummy_value()
+
 @lower_cast(types.DeferredType, types.Any)
 @lower_cast(types.DeferredType, types.Boolean)
 @lower_cast(types.DeferredType, types.Optional)
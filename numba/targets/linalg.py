@@ -490,6 +490,14 @@ def dot_2_mv(context, builder, sig, args):
     return impl_ret_new_ref(context, builder, sig.return_type, res)
 
 
+def dot_2_vv_check_args(a, b):
+    m, = a.shape
+    n, = b.shape
+    if m != n:
+        raise ValueError("incompatible array sizes for np.dot(a, b) "
+                         "(vector * vector)")
+
+
 def dot_2_vv(context, builder, sig, args, conjugate=False):
     """
     np.dot(vector, vector)
@@ -501,14 +509,7 @@ def dot_2_vv(context, builder, sig, args, conjugate=False):
     b = make_array(bty)(context, builder, args[1])
     n, = cgutils.unpack_tuple(builder, a.shape)
 
-    def check_args(a, b):
-        m, = a.shape
-        n, = b.shape
-        if m != n:
-            raise ValueError("incompatible array sizes for np.dot(a, b) "
-                             "(vector * vector)")
-
-    context.compile_internal(builder, check_args,
+    context.compile_internal(builder, dot_2_vv_check_args,
                              signature(types.none, *sig.args), args)
     check_c_int(context, builder, n)
 
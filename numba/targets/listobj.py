@@ -12,7 +12,7 @@ from numba.targets.imputils import (lower_builtin, lower_cast,
                                     iternext_impl, impl_ret_borrowed,
                                     impl_ret_new_ref, impl_ret_untracked)
 from numba.utils import cached_property
-from . import quicksort, slicing
+from . import slicing, timsort
 
 
 def get_list_payload(context, builder, list_type, value):
@@ -916,7 +916,7 @@ _sorting_init = False
 
 def load_sorts():
     """
-    Load quicksort lazily, to avoid circular imports accross the jit() global.
+    Load timsort lazily, to avoid circular imports accross the jit() global.
     """
     g = globals()
     if g['_sorting_init']:
@@ -925,40 +925,65 @@ def load_sorts():
     def gt(a, b):
         return a > b
 
-    default_sort = quicksort.make_jit_quicksort()
-    reversed_sort = quicksort.make_jit_quicksort(lt=gt)
-    g['run_default_sort'] = default_sort.run_quicksort
-    g['run_reversed_sort'] = reversed_sort.run_quicksort
+    # Comparing with gt() keeps reversed sorts stable, as in Python
+    default_sort = timsort.make_jit_timsort(timsort.make_temp_list)
+    reversed_sort = timsort.make_jit_timsort(timsort.make_temp_list, lt=gt)
+    g['run_default_sort'] = default_sort.run_timsort
+    g['run_reversed_sort'] = reversed_sort.run_timsort
+    g['run_default_sort_with_values'] = default_sort.run_timsort_with_values
+    g['run_reversed_sort_with_values'] = reversed_sort.run_timsort_with_values
     g['_sorting_init'] = True
 
 
 @lower_builtin("list.sort", types.List)
-@lower_builtin("list.sort", types.List, types.Boolean)
+@lower_builtin("list.sort", types.List, types.Any, types.Boolean)
 def list_sort(context, builder, sig, args):
     load_sorts()
 
     if len(args) == 1:
-        sig = typing.signature(sig.return_type, *sig.args + (types.boolean,))
-        args = tuple(args) + (cgutils.false_bit,)
-
-    def list_sort_impl(lst, reverse):
-        if reverse:
-            run_reversed_sort(lst)
-        else:
-            run_default_sort(lst)
-
-    return context.compile_internal(builder, list_sort_impl, sig, args)
+        keyty = types.none
+        reverse = cgutils.false_bit
+    else:
+        keyty = sig.args[1]
+        reverse = args[2]
+
+    if isinstance(keyty, types.Dispatcher):
+        key = keyty.dispatcher
+
+        def list_sort_impl(lst, reverse):
+            # Sort the keys, moving the items along with them
+            keys = []
+            for x in lst:
+                keys.append(key(x))
+            if reverse:
+                run_reversed_sort_with_values(keys, lst)
+            else:
+                run_default_sort_with_values(keys, lst)
+
+    else:
+        def list_sort_impl(lst, reverse):
+            if reverse:
+                run_reversed_sort(lst)
+            else:
+                run_default_sort(lst)
+
+    innersig = typing.signature(sig.return_type, sig.args[0], types.boolean)
+    return context.compile_internal(builder, list_sort_impl, innersig,
+                                    (args[0], reverse))
 
 @lower_builtin(sorted, types.IterableType)
-@lower_builtin(sorted, types.IterableType, types.Boolean)
+@lower_builtin(sorted, types.IterableType, types.Any, types.Boolean)
 def sorted_impl(context, builder, sig, args):
     if len(args) == 1:
-        sig = typing.signature(sig.return_type, *sig.args + (types.boolean,))
-        args = tuple(args) + (cgutils.false_bit,)
+        sig = typing.signature(sig.return_type,
+                               *sig.args + (types.none, types.boolean))
+        args = tuple(args) + (context.get_constant_generic(builder,
+                                                           types.none, None),
+                              cgutils.false_bit)
 
-    def sorted_impl(it, reverse):
+    def sorted_impl(it, key, reverse):
         lst = list(it)
-        lst.sort(reverse=reverse)
+        lst.sort(key=key, reverse=reverse)
         return lst
 
     return context.compile_internal(builder, sorted_impl, sig, args)
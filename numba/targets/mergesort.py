@@ -0,0 +1,265 @@
+"""
+Stable bottom-up merge sort, and a parallel merge sort on the Numba
+thread pool used for large arrays in functions compiled with
+parallel=True.  Sequential stable sorts use the timsort of timsort.py.
+"""
+from __future__ import print_function, absolute_import, division
+
+import collections
+
+import numpy as np
+
+from numba import types, config
+
+
+MergesortImplementation = collections.namedtuple(
+    'MergesortImplementation',
+    (# The compile function itself
+     'compile',
+     # All subroutines exercised by test_sort
+     'insertion_sort', 'merge', 'corank',
+     # The top-level function
+     'run_mergesort',
+     ))
+
+ParallelSortImplementation = collections.namedtuple(
+    'ParallelSortImplementation',
+    (# Sort (or argsort) the array, in place for sort
+     'run_parallel_sort',
+     # Same, on a copy of the array for sort (np.sort())
+     'run_parallel_sort_copy',
+     ))
+
+
+# Runs of this size are sorted with an insertion sort before merging
+SMALL_MERGESORT = 16
+
+# Arrays smaller than this are sorted sequentially even in parallel code
+PARALLEL_SORT_THRESHOLD = 1 << 16
+
+
+def make_mergesort_impl(wrap, lt=None, is_argsort=False):
+
+    intp = types.intp
+    zero = intp(0)
+
+    # Two subroutines to make the core algorithm generic wrt. argsort
+    # or normal sorting, as in quicksort.py
+    if is_argsort:
+        @wrap
+        def make_res(A):
+            return np.arange(A.size)
+
+        @wrap
+        def GET(A, idx_or_val):
+            return A[idx_or_val]
+
+    else:
+        @wrap
+        def make_res(A):
+            return A
+
+        @wrap
+        def GET(A, idx_or_val):
+            return idx_or_val
+
+    def default_lt(a, b):
+        """
+        Trivial comparison function between two keys.
+        """
+        return a < b
+
+    LT = wrap(lt if lt is not None else default_lt)
+
+    @wrap
+    def insertion_sort(A, R, low, high):
+        """
+        Stable insertion sort of R[low:high + 1]. Note the inclusive bounds.
+        """
+        for i in range(low + 1, high + 1):
+            k = R[i]
+            v = GET(A, k)
+            j = i
+            while j > low and LT(v, GET(A, R[j - 1])):
+                R[j] = R[j - 1]
+                j -= 1
+            R[j] = k
+
+    @wrap
+    def merge(A, src, dst, lstart, lstop, rstart, rstop, out):
+        """
+        Merge the sorted runs src[lstart:lstop] and src[rstart:rstop] into
+        dst[out:].  Equal keys are taken from the left run first, which
+        keeps the sort stable.
+        """
+        i = lstart
+        j = rstart
+        k = out
+        while i < lstop and j < rstop:
+            if LT(GET(A, src[j]), GET(A, src[i])):
+                dst[k] = src[j]
+                j += 1
+            else:
+                dst[k] = src[i]
+                i += 1
+            k += 1
+        while i < lstop:
+            dst[k] = src[i]
+            i += 1
+            k += 1
+        while j < rstop:
+            dst[k] = src[j]
+            j += 1
+            k += 1
+
+    @wrap
+    def corank(A, src, k, low, mid, high):
+        """
+        Return how many of the first *k* elements of the stable merge of
+        src[low:mid] and src[mid:high] come from the left run.  This splits
+        a merge into independent pieces.
+        """
+        ilo = max(zero, k - (high - mid))
+        ihi = min(k, mid - low)
+        while ilo < ihi:
+            i = (ilo + ihi) >> 1
+            j = k - i
+            # left[i] goes before right[j - 1]: take more from the left
+            if not LT(GET(A, src[mid + j - 1]), GET(A, src[low + i])):
+                ilo = i + 1
+            else:
+                ihi = i
+        return ilo
+
+    @wrap
+    def run_mergesort(A):
+        R = make_res(A)
+        n = len(R)
+        if n < 2:
+            return R
+
+        for low in range(0, n, SMALL_MERGESORT):
+            insertion_sort(A, R, low, min(low + SMALL_MERGESORT, n) - 1)
+
+        src = R
+        dst = np.empty_like(R)
+        swapped = False
+        width = SMALL_MERGESORT
+        while width < n:
+            for low in range(0, n, 2 * width):
+                mid = min(low + width, n)
+                high = min(low + 2 * width, n)
+                merge(A, src, dst, low, mid, mid, high, low)
+            src, dst = dst, src
+            swapped = not swapped
+            width *= 2
+        if swapped:
+            R[:] = src
+        return R
+
+    return MergesortImplementation(wrap,
+                                   insertion_sort, merge, corank,
+                                   run_mergesort)
+
+
+def make_py_mergesort(*args, **kwargs):
+    return make_mergesort_impl((lambda f: f), *args, **kwargs)
+
+def make_jit_mergesort(*args, **kwargs):
+    from numba.extending import register_jitable
+    return make_mergesort_impl((lambda f: register_jitable(f)),
+                               *args, **kwargs)
+
+
+def make_parallel_sort(run_sort, lt=None, is_argsort=False,
+                       threshold=PARALLEL_SORT_THRESHOLD, nchunks=None):
+    """
+    Make a parallel merge sort from the sequential sort *run_sort* (a
+    jitted run_quicksort(), run_mergesort() or array timsort built with the
+    same *lt* and *is_argsort*).  The array is split into *nchunks* chunks (by default
+    the number of threads) which are sorted concurrently, then pairs of
+    sorted runs are merged in parallel passes, each merge being split into
+    pieces at co-ranks so that all threads take part in the last passes.
+    The result is stable if *run_sort* is.  Arrays smaller than
+    *threshold* are sorted with *run_sort* directly.
+    """
+    from numba import njit, prange
+
+    if nchunks is None:
+        nchunks = config.NUMBA_NUM_THREADS
+    impl = make_jit_mergesort(lt=lt, is_argsort=is_argsort)
+    merge = impl.merge
+    corank = impl.corank
+
+    if is_argsort:
+        @njit
+        def sort_chunk(A, R, low, high):
+            R[low:high] = run_sort(A[low:high]) + low
+
+        @njit
+        def make_res(A):
+            return np.arange(A.size)
+
+    else:
+        @njit
+        def sort_chunk(A, R, low, high):
+            run_sort(A[low:high])
+
+        @njit
+        def make_res(A):
+            return A
+
+    @njit(parallel=True)
+    def run_parallel_sort(A):
+        n = len(A)
+        if n < threshold or n < 2 * nchunks:
+            return run_sort(A)
+
+        R = make_res(A)
+        chunk = (n + nchunks - 1) // nchunks
+        for c in prange(nchunks):
+            start = c * chunk
+            stop = min(start + chunk, n)
+            if start < stop:
+                sort_chunk(A, R, start, stop)
+
+        src = R
+        dst = np.empty_like(R)
+        swapped = False
+        width = chunk
+        while width < n:
+            npairs = (n + 2 * width - 1) // (2 * width)
+            # split each merge into pieces so that every pass has about
+            # nchunks independent pieces of work
+            npieces = max(1, nchunks // npairs)
+            for t in prange(npairs * npieces):
+                p = t // npieces
+                q = t % npieces
+                low = p * 2 * width
+                mid = min(low + width, n)
+                high = min(low + 2 * width, n)
+                size = high - low
+                k0 = size * q // npieces
+                k1 = size * (q + 1) // npieces
+                i0 = corank(A, src, k0, low, mid, high)
+                i1 = corank(A, src, k1, low, mid, high)
+                merge(A, src, dst, low + i0, low + i1,
+                      mid + k0 - i0, mid + k1 - i1, low + k0)
+            src, dst = dst, src
+            swapped = not swapped
+            width *= 2
+        if swapped:
+            R[:] = src
+        return R
+
+    if is_argsort:
+        run_parallel_sort_copy = run_parallel_sort
+    else:
+        @njit
+        def run_parallel_sort_copy(A):
+            res = A.copy()
+            run_parallel_sort(res)
+            return res
+
+    return ParallelSortImplementation(run_parallel_sort,
+                                      run_parallel_sort_copy)
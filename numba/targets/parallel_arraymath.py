@@ -0,0 +1,547 @@
+"""
+Parallel implementations of np.histogram(), np.bincount(), np.digitize(),
+np.searchsorted(), np.cumsum() and np.cumprod() for one-dimensional arrays,
+of np.take() with one-dimensional indices, and of reductions over an axis,
+which the parfor pass calls instead of the
+implementations of arraymath.py in functions compiled with parallel=True.
+Counts go to per-thread partial histograms that are merged at the end (a
+prange reduction into an array, or rows of partial counts per chunk of the
+array for np.bincount()), queries are divided among the threads,
+cumulative functions are parallel prefix scans, also available as
+numba.parallel_scan(), gathers are divided among the threads by chunks of
+indices, and reductions over an axis divide their output or
+the reduced axis among the threads.
+"""
+from __future__ import print_function, absolute_import, division
+
+import math
+
+import numpy as np
+
+from numba import config, njit, prange
+from numba.targets.arraymath import (_are_bins_increasing, _digitize_scalar,
+                                     _digitize_scalar_decreasing,
+                                     get_axis_reduction, _normalize_axis,
+                                     _reduction_shape, _drop_axis,
+                                     _reduction_order, _index_of,
+                                     _transposed_view, _reduction_view,
+                                     _gather, _check_bounds)
+
+
+# Arrays smaller than this are processed by the sequential implementations
+PARALLEL_HISTOGRAM_THRESHOLD = 1 << 16
+PARALLEL_SCAN_THRESHOLD = 1 << 16
+PARALLEL_REDUCTION_THRESHOLD = 1 << 16
+PARALLEL_GATHER_THRESHOLD = 1 << 16
+
+# Number of chunks of the array for the min / max computations and scans
+NUM_CHUNKS = config.NUMBA_NUM_THREADS
+
+# np.bincount() keeps one row of counts per chunk; when these rows would
+# hold more than this many times as many elements as the input, the
+# sequential implementation is used instead
+BINCOUNT_MAX_PARTIAL_RATIO = 2
+
+
+@njit(parallel=True)
+def min_max(a):
+    """
+    Minimum and maximum of *a* as floats, ignoring NaNs, like the
+    sequential np.histogram() computes its range.
+    """
+    n = len(a)
+    chunk = (n + NUM_CHUNKS - 1) // NUM_CHUNKS
+    mins = np.empty(NUM_CHUNKS)
+    maxs = np.empty(NUM_CHUNKS)
+    for c in prange(NUM_CHUNKS):
+        lo = np.inf
+        hi = -np.inf
+        for i in range(c * chunk, min((c + 1) * chunk, n)):
+            v = a[i]
+            if lo > v:
+                lo = v
+            if hi < v:
+                hi = v
+        mins[c] = lo
+        maxs[c] = hi
+    return mins.min(), maxs.max()
+
+
+@njit(parallel=True)
+def histogram_uniform(a, bins, bin_min, bin_max):
+    hist = np.zeros(bins, np.intp)
+    if bin_max > bin_min:
+        bin_ratio = bins / (bin_max - bin_min)
+        last = bins - 1
+        for i in prange(len(a)):
+            v = a[i]
+            b = math.floor((v - bin_min) * bin_ratio)
+            if 0 <= b < bins:
+                hist[int(b)] += 1
+            elif v == bin_max:
+                hist[last] += 1
+    return hist
+
+
+@njit
+def histogram_range(a, bins, range):
+    """
+    np.histogram(a, bins, range) for an integer number of bins.
+    """
+    if len(a) < PARALLEL_HISTOGRAM_THRESHOLD:
+        return np.histogram(a, bins, range)
+    if bins <= 0:
+        raise ValueError("histogram(): `bins` should be a positive integer")
+    bin_min, bin_max = range
+    if not bin_min <= bin_max:
+        raise ValueError("histogram(): max must be larger than min in range parameter")
+    hist = histogram_uniform(a, bins, bin_min, bin_max)
+    return hist, np.linspace(bin_min, bin_max, bins + 1)
+
+
+@njit
+def histogram_bins(a, bins):
+    """
+    np.histogram(a, bins) for an integer number of bins.
+    """
+    if len(a) < PARALLEL_HISTOGRAM_THRESHOLD:
+        return np.histogram(a, bins)
+    return histogram_range(a, bins, min_max(a))
+
+
+@njit(parallel=True)
+def histogram_edges_count(a, bins):
+    nbins = len(bins) - 1
+    bin_min = bins[0]
+    bin_max = bins[nbins]
+    hist = np.zeros(nbins, np.intp)
+    for i in prange(len(a)):
+        v = a[i]
+        # Values out of bounds are ignored (this also catches NaNs)
+        if bin_min <= v <= bin_max:
+            # Bisect in bins[:-1]
+            lo = 0
+            hi = nbins - 1
+            while lo < hi:
+                mid = (lo + hi + 1) >> 1
+                if v < bins[mid]:
+                    hi = mid - 1
+                else:
+                    lo = mid
+            hist[lo] += 1
+    return hist
+
+
+@njit
+def histogram_edges(a, bins):
+    """
+    np.histogram(a, bins) for an array of bin edges.
+    """
+    nbins = len(bins) - 1
+    if len(a) < PARALLEL_HISTOGRAM_THRESHOLD or nbins <= 0:
+        return np.histogram(a, bins)
+    for i in range(nbins):
+        # Note this also catches NaNs
+        if not bins[i] <= bins[i + 1]:
+            raise ValueError("histogram(): bins must increase monotonically")
+    return histogram_edges_count(a, bins), bins
+
+
+@njit(parallel=True)
+def bincount_max(a):
+    """
+    Maximum of the non-empty integer array *a*, raising ValueError if it
+    has negative values.
+    """
+    n = len(a)
+    chunk = (n + NUM_CHUNKS - 1) // NUM_CHUNKS
+    maxs = np.empty(NUM_CHUNKS, a.dtype)
+    negative = np.zeros(NUM_CHUNKS, np.bool_)
+    for c in prange(NUM_CHUNKS):
+        start = c * chunk
+        m = a[min(start, n - 1)]
+        neg = False
+        for i in range(start, min(start + chunk, n)):
+            v = a[i]
+            if v < 0:
+                neg = True
+            if v > m:
+                m = v
+        maxs[c] = m
+        negative[c] = neg
+    if negative.any():
+        raise ValueError("bincount(): first argument must be non-negative")
+    return maxs.max()
+
+
+@njit(parallel=True)
+def merge_chunk_counts(partial, out):
+    """
+    Add the rows of *partial* (one per chunk) into *out*.
+    """
+    for b in prange(len(out)):
+        s = out[b]
+        for c in range(partial.shape[0]):
+            s += partial[c, b]
+        out[b] = s
+    return out
+
+
+@njit(parallel=True)
+def bincount_count(a, out):
+    # Each chunk of the array is counted into its own row of partial
+    # counts, which are merged at the end
+    n = len(a)
+    chunk = (n + NUM_CHUNKS - 1) // NUM_CHUNKS
+    partial = np.zeros((NUM_CHUNKS, len(out)), out.dtype)
+    for c in prange(NUM_CHUNKS):
+        for i in range(c * chunk, min((c + 1) * chunk, n)):
+            partial[c, a[i]] += 1
+    return merge_chunk_counts(partial, out)
+
+
+@njit
+def bincount(a):
+    """
+    np.bincount(a) for an array of integers.
+    """
+    if len(a) < PARALLEL_HISTOGRAM_THRESHOLD:
+        return np.bincount(a)
+    nbins = bincount_max(a) + 1
+    if nbins * NUM_CHUNKS > BINCOUNT_MAX_PARTIAL_RATIO * len(a):
+        return np.bincount(a)
+    return bincount_count(a, np.zeros(nbins, np.intp))
+
+
+@njit(parallel=True)
+def bincount_weights_sum(a, weights, out):
+    n = len(a)
+    chunk = (n + NUM_CHUNKS - 1) // NUM_CHUNKS
+    partial = np.zeros((NUM_CHUNKS, len(out)), out.dtype)
+    for c in prange(NUM_CHUNKS):
+        for i in range(c * chunk, min((c + 1) * chunk, n)):
+            partial[c, a[i]] += weights[i]
+    return merge_chunk_counts(partial, out)
+
+
+@njit
+def bincount_weights(a, weights):
+    """
+    np.bincount(a, weights) for an array of integers.
+    """
+    if len(a) != len(weights):
+        raise ValueError("bincount(): weights and list don't have the same length")
+    if len(a) < PARALLEL_HISTOGRAM_THRESHOLD:
+        return np.bincount(a, weights)
+    nbins = bincount_max(a) + 1
+    if nbins * NUM_CHUNKS > BINCOUNT_MAX_PARTIAL_RATIO * len(a):
+        return np.bincount(a, weights)
+    return bincount_weights_sum(a, weights, np.zeros(nbins, weights.dtype))
+
+
+@njit(parallel=True)
+def digitize_values(x, bins, right, is_increasing):
+    out = np.empty(len(x), np.intp)
+    for i in prange(len(x)):
+        if is_increasing:
+            out[i] = _digitize_scalar(x[i], bins, right)
+        else:
+            out[i] = _digitize_scalar_decreasing(x[i], bins, right)
+    return out
+
+
+@njit
+def digitize(x, bins, right=False):
+    """
+    np.digitize(x, bins, right) for an array of values.
+    """
+    if len(x) < PARALLEL_HISTOGRAM_THRESHOLD:
+        return np.digitize(x, bins, right)
+    return digitize_values(x, bins, right, _are_bins_increasing(bins))
+
+
+@njit(parallel=True)
+def searchsorted_values(a, v):
+    out = np.empty(len(v), np.intp)
+    for i in prange(len(v)):
+        out[i] = np.searchsorted(a, v[i])
+    return out
+
+
+@njit
+def searchsorted(a, v):
+    """
+    np.searchsorted(a, v) for an array of values.
+    """
+    if len(v) < PARALLEL_HISTOGRAM_THRESHOLD:
+        return np.searchsorted(a, v)
+    return searchsorted_values(a, v)
+
+
+@njit(parallel=True)
+def gather_chunks(src, idx, out):
+    """
+    _gather(src, idx, out) with the indices divided among the threads.
+    """
+    m = len(idx)
+    chunk = (m + NUM_CHUNKS - 1) // NUM_CHUNKS
+    nbad = 0
+    for c in prange(NUM_CHUNKS):
+        start = min(c * chunk, m)
+        stop = min(start + chunk, m)
+        nbad += _gather(src, idx[start:stop], out[start:stop])
+    return nbad
+
+
+@njit
+def take(a, indices):
+    """
+    np.take(a, indices) for a 1D array of indices.
+    """
+    if len(indices) < PARALLEL_GATHER_THRESHOLD:
+        return np.take(a, indices)
+    out = np.empty(len(indices), a.dtype)
+    _check_bounds(gather_chunks(a.ravel(), indices, out))
+    return out
+
+
+def make_parallel_scan(op, threshold=PARALLEL_SCAN_THRESHOLD, nchunks=None):
+    """
+    Make a function run_scan(a, out) computing the inclusive scan of the 1D
+    array *a* with the associative binary function *op* (a jitted
+    function) into *out*, i.e. out[i] = op(out[i - 1], a[i]), and returning
+    *out*, which may be *a* itself.  This is done in two passes: chunks of
+    the array are scanned concurrently, the last elements of the chunks are
+    combined to get the prefix of each chunk, then each chunk is updated
+    with the prefix of the chunks before it concurrently.  Arrays smaller
+    than *threshold* are scanned sequentially.
+    """
+    if nchunks is None:
+        nchunks = NUM_CHUNKS
+
+    @njit
+    def scan_range(a, out, start, stop):
+        if start < stop:
+            acc = a[start]
+            out[start] = acc
+            for i in range(start + 1, stop):
+                acc = op(acc, a[i])
+                out[i] = acc
+
+    @njit(parallel=True)
+    def run_scan(a, out):
+        n = len(a)
+        if n < threshold or n < 2 * nchunks:
+            scan_range(a, out, 0, n)
+            return out
+
+        chunk = (n + nchunks - 1) // nchunks
+        for c in prange(nchunks):
+            scan_range(a, out, c * chunk, min((c + 1) * chunk, n))
+        # the last element of each chunk gets the prefix of the chunk
+        for c in range(1, nchunks):
+            start = c * chunk
+            stop = min(start + chunk, n)
+            if start < stop:
+                out[stop - 1] = op(out[start - 1], out[stop - 1])
+        for t in prange(nchunks - 1):
+            start = (t + 1) * chunk
+            stop = min(start + chunk, n)
+            if start < stop:
+                prefix = out[start - 1]
+                for i in range(start, stop - 1):
+                    out[i] = op(prefix, out[i])
+        return out
+
+    return run_scan
+
+
+_parallel_scans = {}
+
+def get_parallel_scan(op):
+    """
+    Get the parallel scan with the associative binary function *op*, see
+    make_parallel_scan().
+    """
+    try:
+        return _parallel_scans[op]
+    except KeyError:
+        run_scan = make_parallel_scan(op)
+        _parallel_scans[op] = run_scan
+        return run_scan
+
+
+@njit
+def _add(a, b):
+    return a + b
+
+@njit
+def _mul(a, b):
+    return a * b
+
+@njit
+def _cumsum(a):
+    return np.cumsum(a)
+
+@njit
+def _cumprod(a):
+    return np.cumprod(a)
+
+_cumulative_funcs = {
+    'cumsum': (_add, _cumsum),
+    'cumprod': (_mul, _cumprod),
+}
+
+_parallel_cumulatives = {}
+
+def get_parallel_cumulative(name, dtype):
+    """
+    Get the parallel implementation of np.cumsum() or np.cumprod() (given
+    by *name*) for 1D arrays, with results of the Numpy *dtype*.
+    """
+    key = name, dtype
+    try:
+        return _parallel_cumulatives[key]
+    except KeyError:
+        pass
+    op, sequential = _cumulative_funcs[name]
+    run_scan = get_parallel_scan(op)
+
+    @njit
+    def cumulative(a):
+        if len(a) < PARALLEL_SCAN_THRESHOLD:
+            return sequential(a)
+        out = a.astype(dtype)
+        return run_scan(out, out)
+
+    _parallel_cumulatives[key] = cumulative
+    return cumulative
+
+
+def _make_parallel_axis_reduction(name, dtype):
+    """
+    Make the parallel version of the reduce_into() function of the
+    AxisReduction of arraymath.get_axis_reduction().  If the reduced
+    dimension has the largest stride of the array, it is divided among the
+    threads, which reduce their part into private outputs that are combined
+    at the end.  Otherwise the output is divided among the threads along
+    the dimension with the largest stride.
+    """
+    reduction = get_axis_reduction(name, dtype)
+    sequential = reduction.reduce_into
+    kernel = reduction.kernel
+    combine = reduction.combine
+    finalize = reduction.finalize
+
+    if name in ('argmin', 'argmax'):
+        @njit(parallel=True)
+        def reduce_into(a, axis):
+            order = _reduction_order(a)
+            split_axis = order[0] == axis
+            m = a.shape[order[0]]
+            if a.size < PARALLEL_REDUCTION_THRESHOLD or m < NUM_CHUNKS:
+                return sequential(a, axis)
+            out = np.empty(_reduction_shape(a, axis), dtype)
+            w = _transposed_view(a, order)
+            chunk = (m + NUM_CHUNKS - 1) // NUM_CHUNKS
+            nchunks = (m + chunk - 1) // chunk
+            if split_axis:
+                indices = np.empty((nchunks,) + out.shape, np.intp)
+                values = np.empty((nchunks,) + out.shape, a.dtype)
+                for c in prange(nchunks):
+                    start = c * chunk
+                    wc = w[start:min(start + chunk, m)]
+                    kernel(wc, _reduction_view(indices[c], wc, order, axis),
+                           _reduction_view(values[c], wc, order, axis), 0)
+                size = out.size
+                flat_indices = indices.reshape((nchunks, size))
+                flat_values = values.reshape((nchunks, size))
+                flat = out.reshape(size)
+                for j in prange(size):
+                    best = flat_values[0, j]
+                    best_k = flat_indices[0, j]
+                    for c in range(1, nchunks):
+                        v = flat_values[c, j]
+                        if combine(v, best):
+                            best = v
+                            best_k = flat_indices[c, j] + c * chunk
+                    flat[j] = best_k
+            else:
+                values = np.empty(out.shape, a.dtype)
+                u = _reduction_view(out, w, order, axis)
+                uv = _reduction_view(values, w, order, axis)
+                axis_pos = _index_of(order, axis)
+                for c in prange(nchunks):
+                    start = c * chunk
+                    stop = min(start + chunk, m)
+                    kernel(w[start:stop], u[start:stop], uv[start:stop],
+                           axis_pos)
+            return out
+
+    else:
+        @njit(parallel=True)
+        def reduce_into(a, axis):
+            order = _reduction_order(a)
+            split_axis = order[0] == axis
+            m = a.shape[order[0]]
+            if a.size < PARALLEL_REDUCTION_THRESHOLD or m < NUM_CHUNKS:
+                return sequential(a, axis)
+            out = np.empty(_reduction_shape(a, axis), dtype)
+            w = _transposed_view(a, order)
+            chunk = (m + NUM_CHUNKS - 1) // NUM_CHUNKS
+            nchunks = (m + chunk - 1) // chunk
+            if split_axis:
+                partials = np.empty((nchunks,) + out.shape, dtype)
+                for c in prange(nchunks):
+                    start = c * chunk
+                    wc = w[start:min(start + chunk, m)]
+                    kernel(wc, _reduction_view(partials[c], wc, order, axis),
+                           0)
+                size = out.size
+                flat_partials = partials.reshape((nchunks, size))
+                flat = out.reshape(size)
+                for j in prange(size):
+                    acc = flat_partials[0, j]
+                    for c in range(1, nchunks):
+                        acc = combine(acc, flat_partials[c, j])
+                    flat[j] = acc
+            else:
+                u = _reduction_view(out, w, order, axis)
+                axis_pos = _index_of(order, axis)
+                for c in prange(nchunks):
+                    start = c * chunk
+                    stop = min(start + chunk, m)
+                    kernel(w[start:stop], u[start:stop], axis_pos)
+            finalize(out, a.shape[axis])
+            return out
+
+    return reduce_into
+
+
+_parallel_axis_reductions = {}
+
+def get_parallel_axis_reduction(name, dtype, keepdims):
+    """
+    Get the parallel implementation of the reduction *name* (e.g. 'sum')
+    of arrays of at least two dimensions over an integer axis, with results
+    of the Numpy *dtype*, keeping the reduced dimension if *keepdims*.
+    """
+    key = name, dtype, keepdims
+    try:
+        return _parallel_axis_reductions[key]
+    except KeyError:
+        pass
+    reduce_into = _make_parallel_axis_reduction(name, dtype)
+
+    if keepdims:
+        @njit
+        def reduction(a, axis):
+            return reduce_into(a, _normalize_axis(axis, a.ndim))
+    else:
+        @njit
+        def reduction(a, axis):
+            axis = _normalize_axis(axis, a.ndim)
+            return _drop_axis(reduce_into(a, axis), axis)
+
+    _parallel_axis_reductions[key] = reduction
+    return reduction
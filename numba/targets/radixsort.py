@@ -0,0 +1,217 @@
+"""
+LSD radix sort of integer and floating-point arrays, used instead of the
+introsort of quicksort.py for the unstable kinds of np.sort() and
+np.argsort() on large arrays.
+
+The elements are mapped to unsigned integer keys of the same size whose
+order is the order of the elements: the sign bit of signed integers is
+flipped, and so is the sign bit of positive floats while all the bits of
+negative floats are flipped.  NaNs are mapped to the largest key, so that
+they sort last.  The keys are then sorted one byte at a time, starting
+from the least significant one, with a counting sort; bytes which are the
+same for all the keys are skipped.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import collections
+
+import numpy as np
+
+from numba import types
+
+
+RadixsortImplementation = collections.namedtuple(
+    'RadixsortImplementation',
+    (# The compile function itself
+     'compile',
+     # All subroutines exercised by test_sort
+     'make_keys', 'radix_sort',
+     # The top-level function
+     'run_radixsort',
+     ))
+
+
+# Number of buckets of each pass (one byte of the keys)
+RADIX = 256
+
+# Arrays smaller than this are sorted with the quicksort
+RADIX_SORT_THRESHOLD = 1 << 12
+
+
+def can_radix_sort(dtype):
+    """
+    Whether arrays of the Numba type *dtype* can be radix-sorted.
+    """
+    return isinstance(dtype, (types.Integer, types.Float))
+
+
+def make_radixsort_impl(wrap, dtype, is_argsort=False):
+    """
+    Make the radix sort of arrays of the Numpy *dtype*.
+    """
+    dtype = np.dtype(dtype)
+    DTYPE = dtype.type
+    UTYPE = np.dtype('u%d' % dtype.itemsize).type
+    NBYTES = dtype.itemsize
+    nbits = 8 * NBYTES
+    ZERO = UTYPE(0)
+    SIGN = UTYPE(1 << (nbits - 1))
+    ALL_ONES = UTYPE((1 << nbits) - 1)
+    MASK = UTYPE(RADIX - 1)
+    DIGIT_BITS = UTYPE(8)
+
+    if dtype.kind == 'f':
+        @wrap
+        def to_key(v, u):
+            if v != v:
+                return ALL_ONES
+            if u & SIGN:
+                return ALL_ONES ^ u
+            return u | SIGN
+
+        @wrap
+        def from_key(u):
+            if u & SIGN:
+                return u ^ SIGN
+            return ALL_ONES ^ u
+
+    elif dtype.kind == 'i':
+        @wrap
+        def to_key(v, u):
+            return u ^ SIGN
+
+        @wrap
+        def from_key(u):
+            return u ^ SIGN
+
+    else:
+        @wrap
+        def to_key(v, u):
+            return u
+
+        @wrap
+        def from_key(u):
+            return u
+
+    @wrap
+    def has_values(keys, values):
+        return values is not keys
+
+    @wrap
+    def make_keys(A):
+        """
+        Return a new array of the keys of the elements of A.
+        """
+        K = np.empty(len(A), DTYPE)
+        K[:] = A
+        U = K.view(UTYPE)
+        for i in range(len(U)):
+            U[i] = to_key(K[i], U[i])
+        return U
+
+    @wrap
+    def radix_sort(keys, values):
+        """
+        Sort the keys, and the values along with them unless *values* is
+        *keys*.  The sort is stable.  The arrays holding the sorted keys
+        and values are returned, they are either the given arrays or
+        new ones.
+        """
+        n = len(keys)
+        _has_values = has_values(keys, values)
+        # The histograms of all the bytes are computed at once
+        counts = np.zeros((NBYTES, RADIX), np.intp)
+        for i in range(n):
+            k = keys[i]
+            shift = ZERO
+            for b in range(NBYTES):
+                counts[b, (k >> shift) & MASK] += 1
+                shift += DIGIT_BITS
+
+        src_keys = keys
+        src_values = values
+        dst_keys = np.empty_like(keys)
+        if _has_values:
+            dst_values = np.empty_like(values)
+        else:
+            # Only sorting the keys: the values buffer is never written
+            dst_values = np.empty(0, values.dtype)
+        shift = ZERO
+        for b in range(NBYTES):
+            count = counts[b]
+            if n == 0 or count[(keys[0] >> shift) & MASK] == n:
+                # All the keys have the same byte
+                shift += DIGIT_BITS
+                continue
+            # Turn the histogram into the start of each bucket
+            start = 0
+            for d in range(RADIX):
+                c = count[d]
+                count[d] = start
+                start += c
+            for i in range(n):
+                k = src_keys[i]
+                d = (k >> shift) & MASK
+                j = count[d]
+                count[d] = j + 1
+                dst_keys[j] = k
+                if _has_values:
+                    dst_values[j] = src_values[i]
+            src_keys, dst_keys = dst_keys, src_keys
+            src_values, dst_values = dst_values, src_values
+            shift += DIGIT_BITS
+        return src_keys, src_values
+
+    if is_argsort:
+        @wrap
+        def run_radixsort(A):
+            R = np.arange(A.size)
+            if len(A) < 2:
+                return R
+            keys, R = radix_sort(make_keys(A), R)
+            return R
+
+    else:
+        @wrap
+        def run_radixsort(A):
+            if len(A) < 2:
+                return A
+            keys = make_keys(A)
+            keys, _ = radix_sort(keys, keys)
+            for i in range(len(keys)):
+                keys[i] = from_key(keys[i])
+            A[:] = keys.view(DTYPE)
+            return A
+
+    return RadixsortImplementation(wrap,
+                                   make_keys, radix_sort,
+                                   run_radixsort)
+
+
+def make_py_radixsort(*args, **kwargs):
+    return make_radixsort_impl((lambda f: f), *args, **kwargs)
+
+def make_jit_radixsort(*args, **kwargs):
+    from numba.extending import register_jitable
+    return make_radixsort_impl((lambda f: register_jitable(f)),
+                               *args, **kwargs)
+
+
+def make_hybrid_sort(run_sort, dtype, is_argsort=False,
+                     threshold=RADIX_SORT_THRESHOLD):
+    """
+    Make a jitted function radix-sorting arrays of the Numpy *dtype* with
+    at least *threshold* elements, and sorting smaller ones with *run_sort*
+    (a jitted run_quicksort() built with the same *is_argsort*).
+    """
+    from numba.extending import register_jitable
+    run_radixsort = make_jit_radixsort(dtype, is_argsort).run_radixsort
+
+    @register_jitable
+    def run_hybrid_sort(A):
+        if len(A) >= threshold:
+            return run_radixsort(A)
+        return run_sort(A)
+
+    return run_hybrid_sort
@@ -0,0 +1,322 @@
+"""
+Selection of order statistics (quickselect), for np.median(),
+np.partition(), np.percentile() and friends.
+
+Partitions use a median-of-three pivot like the quicksort of quicksort.py.
+When they stop shrinking the range to select in (which happens on arrays
+with many equal values, or on inputs crafted against the pivot choice),
+selection falls back to a median-of-medians pivot with a three-way
+partition, which guarantees a linear worst case.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import collections
+
+import numpy as np
+
+from numba import types
+
+
+SelectionImplementation = collections.namedtuple(
+    'SelectionImplementation',
+    (# The compile function itself
+     'compile',
+     # All subroutines exercised by the tests
+     'partition', 'partition3', 'insertion_sort', 'move_nans',
+     'select_mom',
+     # The top-level functions
+     'select', 'select_two', 'select_multiple',
+     ))
+
+
+# Ranges smaller than this are never considered for the median-of-medians
+# fallback
+SMALL_SELECT = 64
+
+# Number of partitions not shrinking the range by at least a quarter
+# after which the median-of-medians fallback is used
+MAX_BAD_PARTITIONS = 4
+
+# Under this size, median-of-medians selection uses an insertion sort
+SMALL_MOM = 10
+
+# Enough for ranges of up to 5 ** 32 elements
+MAX_MOM_STACK = 32
+
+
+def make_selection_impl(wrap, is_argsort=False):
+    """
+    Make the selection functions.  They take the array of keys A and the
+    array R that is permuted, which is A itself for normal selection and
+    an array of indices into A for argpartition.  Bounds are inclusive.
+    """
+    intp = types.intp
+
+    if is_argsort:
+        @wrap
+        def GET(A, R, i):
+            return A[R[i]]
+
+    else:
+        @wrap
+        def GET(A, R, i):
+            return R[i]
+
+    @wrap
+    def insertion_sort(A, R, low, high):
+        """
+        Insertion sort R[low:high + 1] by key.
+        """
+        for i in range(low + 1, high + 1):
+            k = R[i]
+            v = GET(A, R, i)
+            j = i
+            while j > low and v < GET(A, R, j - 1):
+                R[j] = R[j - 1]
+                j -= 1
+            R[j] = k
+
+    @wrap
+    def partition(A, R, low, high):
+        """
+        Partition R[low:high + 1] around a median-of-three pivot.  The
+        pivot's index is returned.
+        """
+        mid = (low + high) >> 1
+        # NOTE: the pattern of swaps below for the pivot choice and the
+        # partitioning gives good results (i.e. regular O(n log n))
+        # on sorted and reverse-sorted arrays.  Subtle changes
+        # risk breaking this property.
+
+        # Use median of three {low, middle, high} as the pivot
+        if GET(A, R, mid) < GET(A, R, low):
+            R[low], R[mid] = R[mid], R[low]
+        if GET(A, R, high) < GET(A, R, mid):
+            R[high], R[mid] = R[mid], R[high]
+            if GET(A, R, mid) < GET(A, R, low):
+                R[low], R[mid] = R[mid], R[low]
+        pivot = GET(A, R, mid)
+
+        R[high], R[mid] = R[mid], R[high]
+
+        i = low
+        for j in range(low, high):
+            if GET(A, R, j) <= pivot:
+                R[i], R[j] = R[j], R[i]
+                i += 1
+
+        R[i], R[high] = R[high], R[i]
+        return i
+
+    @wrap
+    def partition3(A, R, low, high, p):
+        """
+        Three-way partition R[low:high + 1] around the element at index p.
+        A tuple (lt, gt) is returned such that:
+            - all elements in [low, lt) are < pivot
+            - all elements in [lt, gt] are == pivot
+            - all elements in (gt, high] are > pivot
+        """
+        R[low], R[p] = R[p], R[low]
+        pivot = GET(A, R, low)
+        lt = low
+        gt = high
+        i = low + 1
+        while i <= gt:
+            v = GET(A, R, i)
+            if v < pivot:
+                R[lt], R[i] = R[i], R[lt]
+                lt += 1
+                i += 1
+            elif pivot < v:
+                R[gt], R[i] = R[i], R[gt]
+                gt -= 1
+            else:
+                i += 1
+        return lt, gt
+
+    @wrap
+    def move_nans(A, R, low, high):
+        """
+        Move the NaNs of R[low:high + 1] to its end.  The index of the
+        first NaN (high + 1 if there are none) is returned.
+        """
+        i = low
+        j = high
+        while i <= j:
+            v = GET(A, R, i)
+            # Only true for NaNs
+            if v != v:
+                R[i], R[j] = R[j], R[i]
+                j -= 1
+            else:
+                i += 1
+        return i
+
+    @wrap
+    def select_mom(A, R, k, low, high):
+        """
+        Put the k'th smallest element of R[low:high + 1] in place using
+        median-of-medians pivots, in linear time.  The recursive selection
+        of the median of the medians uses an explicit stack.
+        """
+        lows = np.empty(MAX_MOM_STACK, intp)
+        highs = np.empty(MAX_MOM_STACK, intp)
+        ks = np.empty(MAX_MOM_STACK, intp)
+        # The index of the median of medians of each range, once selected
+        pivots = np.empty(MAX_MOM_STACK, intp)
+        lows[0] = low
+        highs[0] = high
+        ks[0] = k
+        pivots[0] = -1
+        n = 0
+
+        while n >= 0:
+            low = lows[n]
+            high = highs[n]
+            k = ks[n]
+            if high - low < SMALL_MOM:
+                insertion_sort(A, R, low, high)
+                n -= 1
+                continue
+            p = pivots[n]
+            if p < 0:
+                # Gather the medians of groups of 5 at the start of the
+                # range and select their median
+                ngroups = 0
+                for start in range(low, high + 1, 5):
+                    stop = min(start + 4, high)
+                    insertion_sort(A, R, start, stop)
+                    m = (start + stop) >> 1
+                    R[low + ngroups], R[m] = R[m], R[low + ngroups]
+                    ngroups += 1
+                pivots[n] = low + ((ngroups - 1) >> 1)
+                assert n + 1 < MAX_MOM_STACK
+                lows[n + 1] = low
+                highs[n + 1] = low + ngroups - 1
+                ks[n + 1] = pivots[n]
+                pivots[n + 1] = -1
+                n += 1
+                continue
+            lt, gt = partition3(A, R, low, high, p)
+            pivots[n] = -1
+            if k < lt:
+                highs[n] = lt - 1
+            elif k > gt:
+                lows[n] = gt + 1
+            else:
+                n -= 1
+
+    @wrap
+    def select(A, R, k, low, high):
+        """
+        Put the k'th smallest element of R[low:high + 1] in place, smaller
+        elements before it and larger elements after it, and return it.
+        """
+        bad = 0
+        while high > low:
+            if high - low >= SMALL_SELECT and bad >= MAX_BAD_PARTITIONS:
+                select_mom(A, R, k, low, high)
+                break
+            i = partition(A, R, low, high)
+            if i == k:
+                break
+            size = high - low
+            if i < k:
+                low = i + 1
+            else:
+                high = i - 1
+            if 4 * (high - low) > 3 * size:
+                bad += 1
+        return GET(A, R, k)
+
+    @wrap
+    def select_two(A, R, k, low, high):
+        """
+        Select the k'th and k+1'th smallest elements in R[low:high + 1].
+
+        This is significantly faster than doing two independent selections
+        for k and k+1.
+        """
+        bad = 0
+        while True:
+            assert high > low  # by construction
+            if high - low >= SMALL_SELECT and bad >= MAX_BAD_PARTITIONS:
+                select_mom(A, R, k, low, high)
+                select(A, R, k + 1, k + 1, high)
+                break
+            i = partition(A, R, low, high)
+            size = high - low
+            if i < k:
+                low = i + 1
+            elif i > k + 1:
+                high = i - 1
+            elif i == k:
+                select(A, R, k + 1, i + 1, high)
+                break
+            else:  # i == k + 1
+                select(A, R, k, low, i - 1)
+                break
+            if 4 * (high - low) > 3 * size:
+                bad += 1
+
+        return GET(A, R, k), GET(A, R, k + 1)
+
+    @wrap
+    def select_multiple(A, R, kth, low, high):
+        """
+        Put the elements of R[low:high + 1] whose sorted positions are the
+        sorted, unique indices *kth* in place, like np.partition().  The
+        selections are nested: once the middle index is selected, the
+        indices before it only look at the elements before it, and
+        conversely.
+        """
+        m = len(kth)
+        if m == 0:
+            return
+        # Each entry is a range of kth and the range of R it lies in
+        kth_lows = np.empty(m, intp)
+        kth_highs = np.empty(m, intp)
+        lows = np.empty(m, intp)
+        highs = np.empty(m, intp)
+        kth_lows[0] = 0
+        kth_highs[0] = m - 1
+        lows[0] = low
+        highs[0] = high
+        n = 1
+        while n > 0:
+            n -= 1
+            klo = kth_lows[n]
+            khi = kth_highs[n]
+            low = lows[n]
+            high = highs[n]
+            mid = (klo + khi) >> 1
+            k = kth[mid]
+            select(A, R, k, low, high)
+            if klo < mid:
+                kth_lows[n] = klo
+                kth_highs[n] = mid - 1
+                lows[n] = low
+                highs[n] = k - 1
+                n += 1
+            if mid < khi:
+                kth_lows[n] = mid + 1
+                kth_highs[n] = khi
+                lows[n] = k + 1
+                highs[n] = high
+                n += 1
+
+    return SelectionImplementation(wrap,
+                                   partition, partition3, insertion_sort,
+                                   move_nans, select_mom,
+                                   select, select_two, select_multiple)
+
+
+def make_py_selection(*args, **kwargs):
+    return make_selection_impl((lambda f: f), *args, **kwargs)
+
+def make_jit_selection(*args, **kwargs):
+    from numba.extending import register_jitable
+    return make_selection_impl((lambda f: register_jitable(f)),
+                               *args, **kwargs)
@@ -2,12 +2,19 @@
 Timsort implementation.  Mostly adapted from CPython's listobject.c.
 
 For more information, see listsort.txt in CPython's source tree.
+
+Timsort is stable and merges the runs already present in the input, so
+that it sorts presorted (or reverse-sorted) data in linear time.  It
+serves list.sort(), sorted() and the stable kinds ('mergesort' and
+'stable') of np.sort() and np.argsort().
 """
 
 from __future__ import print_function, absolute_import, division
 
 import collections
 
+import numpy as np
+
 from numba import types
 
 
@@ -55,7 +62,14 @@ MergeState = collections.namedtuple(
 MergeRun = collections.namedtuple('MergeRun', ('start', 'size'))
 
 
-def make_timsort_impl(wrap, make_temp_area):
+def make_temp_list(keys, n):
+    return [keys[0]] * n
+
+def make_temp_array(keys, n):
+    return np.empty(n, keys.dtype)
+
+
+def make_timsort_impl(wrap, make_temp_area, lt=None):
 
     make_temp_area = wrap(make_temp_area)
     intp = types.intp
@@ -132,14 +146,15 @@ def make_timsort_impl(wrap, make_temp_area):
         return MergeState(intp(new_gallop), ms.keys, ms.values, ms.pending, ms.n)
 
 
-    @wrap
-    def LT(a, b):
+    def default_lt(a, b):
         """
         Trivial comparison function between two keys.  This is factored out to
         make it clear where comparisons occur.
         """
         return a < b
 
+    LT = wrap(lt if lt is not None else default_lt)
+
     @wrap
     def binarysort(keys, values, lo, hi, start):
         """
@@ -914,6 +929,8 @@ def make_timsort_impl(wrap, make_temp_area):
         """
         Run timsort over the given keys.
         """
+        if len(keys) < 2:
+            return
         values = keys
         run_timsort_with_mergestate(merge_init(keys), keys, values)
 
@@ -923,6 +940,8 @@ def make_timsort_impl(wrap, make_temp_area):
         """
         Run timsort over the given keys and values.
         """
+        if len(keys) < 2:
+            return
         run_timsort_with_mergestate(merge_init_with_values(keys, values),
                                     keys, values)
 
@@ -935,10 +954,39 @@ def make_timsort_impl(wrap, make_temp_area):
         run_timsort, run_timsort_with_values)
 
 
-def make_py_timsort(*args):
-    return make_timsort_impl((lambda f: f), *args)
+def make_py_timsort(*args, **kwargs):
+    return make_timsort_impl((lambda f: f), *args, **kwargs)
 
-def make_jit_timsort(*args):
+def make_jit_timsort(*args, **kwargs):
     from numba import jit
     return make_timsort_impl((lambda f: jit(nopython=True)(f)),
-                              *args)
+                              *args, **kwargs)
+
+
+def make_jit_array_timsort(lt=None, is_argsort=False):
+    """
+    Make a jitted timsort of one-dimensional arrays with the interface of
+    run_quicksort() and run_mergesort(): the array is sorted in place and
+    returned, or if *is_argsort* is true, the indices that would sort it
+    are returned.
+    """
+    from numba import njit
+    impl = make_jit_timsort(make_temp_array, lt=lt)
+    run_timsort = impl.run_timsort
+    run_timsort_with_values = impl.run_timsort_with_values
+
+    if is_argsort:
+        @njit
+        def run_array_timsort(A):
+            R = np.arange(A.size)
+            # Sort a copy of the keys along with the indices
+            run_timsort_with_values(A.copy(), R)
+            return R
+
+    else:
+        @njit
+        def run_array_timsort(A):
+            run_timsort(A)
+            return A
+
+    return run_array_timsort
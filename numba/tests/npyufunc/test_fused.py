@@ -0,0 +1,134 @@
+from __future__ import absolute_import, print_function, division
+
+import numpy as np
+
+from numba import unittest_support as unittest
+from numba import vectorize
+from numba.npyufunc import fuse, FusedExpression
+from numba.npyufunc import fused
+from numba.tests.support import TestCase, override_config
+
+
+@vectorize(['float64(float64, float64)'])
+def cpu_add(a, b):
+    return a + b
+
+@vectorize(['float64(float64, float64)'], target='parallel')
+def parallel_mul(a, b):
+    return a * b
+
+@vectorize
+def dufunc_sub(a, b):
+    return a - b
+
+
+def chain(a, b, c):
+    return np.multiply(cpu_add(a, b), dufunc_sub(c, 1.0))
+
+def chain_parallel_ufunc(a, b, c):
+    # ufuncs built with target='parallel' can't be called from several
+    # threads at once, so this is only fused with target='cpu'
+    return parallel_mul(cpu_add(a, b), c)
+
+def chain_numpy(a, b, c):
+    return np.hypot(np.add(a, b), c)
+
+def two_outputs(a, b):
+    return np.add(a, b), np.multiply(a, b) > 1.0
+
+
+class TestFusedExpression(TestCase):
+
+    def setUp(self):
+        np.random.seed(42)
+
+    def check(self, pyfunc, args, targets=('cpu', 'parallel')):
+        expected = pyfunc(*args)
+        for target in targets:
+            # small tiles so that there are many of them
+            cfunc = fuse(pyfunc, tile_size=1024, target=target)
+            got = cfunc(*args)
+            np.testing.assert_allclose(got, expected)
+            self.assertEqual(got.dtype, expected.dtype)
+            self.assertEqual(got.shape, expected.shape)
+
+    def test_chain_1d(self):
+        for n in (1, 100, 10001):
+            args = [np.random.random(n) for _ in range(3)]
+            self.check(chain, args)
+            self.check(chain_numpy, args)
+            self.check(chain_parallel_ufunc, args, targets=('cpu',))
+
+    def test_chain_2d(self):
+        a = np.random.random((300, 7))
+        b = np.random.random((300, 7))
+        self.check(chain, (a, b, 2.5))
+        self.check(chain_parallel_ufunc, (a, b, 2.5), targets=('cpu',))
+
+    def test_broadcast(self):
+        a = np.random.random((500, 9))
+        b = np.random.random(9)
+        self.check(chain_numpy, (a, b, 0.5))
+        self.check(chain_numpy, (np.random.random((500, 1)), b, a))
+
+    def test_wide_rows(self):
+        # Few rows are split along the second dimension
+        a = np.random.random((2, 20000))
+        b = np.random.random(20000)
+        tiles = fused._tile_indices(a.shape, 3 * 8, 1024)
+        self.assertGreater(len(tiles), 2)
+        self.check(chain_numpy, (a, b, 0.5))
+        self.check(chain, (a[:, ::-1], b, np.random.random((2, 1))))
+        self.check(chain_numpy, (np.random.random((3, 2, 5000)), 1.0, 2.0))
+
+    def test_thread_pool_reused(self):
+        args = [np.random.random(10000) for _ in range(3)]
+        cfunc = fuse(chain_numpy, tile_size=1024, target='parallel')
+        cfunc(*args)
+        pool = fused._get_thread_pool()
+        np.testing.assert_allclose(cfunc(*args), chain_numpy(*args))
+        self.assertIs(fused._get_thread_pool(), pool)
+
+    def test_nested_parallel(self):
+        inner = fuse(chain_numpy, tile_size=256, target='parallel')
+
+        def outer(a, b, c):
+            return np.negative(inner(a, b, c))
+
+        args = [np.random.random(20000) for _ in range(3)]
+        self.check(outer, args)
+
+    def test_scalars(self):
+        self.assertEqual(fuse(chain_numpy)(3.0, 1.0, 5.0),
+                         chain_numpy(3.0, 1.0, 5.0))
+
+    def test_multiple_outputs(self):
+        a = np.random.random(5000) * 2
+        b = np.random.random(5000) * 2
+        expected = two_outputs(a, b)
+        got = fuse(tile_size=1024)(two_outputs)(a, b)
+        self.assertIsInstance(got, tuple)
+        for x, y in zip(got, expected):
+            np.testing.assert_array_equal(x, y)
+
+    def test_single_ufunc(self):
+        a = np.random.random(10000)
+        b = np.random.random(10000)
+        got = fuse(parallel_mul, tile_size=4096)(a, b)
+        np.testing.assert_array_equal(got, a * b)
+
+    def test_tile_size_config(self):
+        fused = fuse(chain_numpy)
+        self.assertIsInstance(fused, FusedExpression)
+        self.assertEqual(fused.__name__, 'chain_numpy')
+        args = [np.random.random(4000) for _ in range(3)]
+        with override_config('UFUNC_TILE_SIZE', 512):
+            np.testing.assert_allclose(fused(*args), chain_numpy(*args))
+
+    def test_bad_target(self):
+        with self.assertRaises(ValueError):
+            fuse(chain, target='cuda')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Tests the selection of the threading layer with NUMBA_THREADING_LAYER.
+The threading layer is chosen once per process, so each check runs in a
+subprocess.
+"""
+from __future__ import absolute_import, print_function, division
+
+import os
+import subprocess
+import sys
+
+from numba import unittest_support as unittest
+from numba.npyufunc import parallel
+
+
+_runner = """if 1:
+    import warnings
+    import numpy as np
+    import numba
+    from numba import njit, prange, vectorize
+
+    @vectorize(['float64(float64, float64)'], target='parallel')
+    def vadd(a, b):
+        return a + b
+
+    @njit(parallel=True)
+    def psum(n):
+        s = 0
+        for i in prange(n):
+            s += i
+        return s
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        X = np.arange(1000.0)
+        np.testing.assert_equal(vadd(X, X), X + X)
+        assert psum(100000) == sum(range(100000))
+    print(numba.threading_layer())
+    print(len([x for x in w if 'NUMBA_THREADING_LAYER' in str(x.message)]))
+"""
+
+
+def _available(name):
+    return parallel._load_threading_lib(name) is not None
+
+
+class TestThreadingLayerSelection(unittest.TestCase):
+
+    def run_layer(self, layer, code=_runner):
+        env = os.environ.copy()
+        env['NUMBA_THREADING_LAYER'] = layer
+        popen = subprocess.Popen([sys.executable, "-c", code],
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, env=env)
+        out, err = popen.communicate()
+        return popen.returncode, out.decode(), err.decode()
+
+    def check_layer(self, layer):
+        returncode, out, err = self.run_layer(layer)
+        if returncode != 0:
+            raise AssertionError("process failed with code %s: stderr "
+                                 "follows\n%s\n" % (returncode, err))
+        used, nwarnings = out.split()
+        return used, int(nwarnings)
+
+    def check_named_layer(self, layer):
+        if not _available(layer):
+            self.skipTest("%s threading layer not available" % layer)
+        self.assertEqual(self.check_layer(layer), (layer, 0))
+
+    def test_workqueue(self):
+        self.check_named_layer('workqueue')
+
+    def test_tbb(self):
+        self.check_named_layer('tbb')
+
+    def test_omp(self):
+        self.check_named_layer('omp')
+
+    def test_default(self):
+        expected = [name for name in parallel._threading_layer_priority
+                    if _available(name)][0]
+        self.assertEqual(self.check_layer('default'), (expected, 0))
+
+    def test_default_is_not_omp(self):
+        # OpenMP runtimes aren't fork safe, the default must prefer the
+        # always built workqueue over them
+        expected = 'tbb' if _available('tbb') else 'workqueue'
+        self.assertEqual(self.check_layer('default'), (expected, 0))
+
+    def test_fallback(self):
+        missing = [name for name in parallel._threading_layer_priority
+                   if not _available(name)]
+        if not missing:
+            self.skipTest("all threading layers are available")
+        used, nwarnings = self.check_layer(missing[0])
+        self.assertNotEqual(used, missing[0])
+        self.assertEqual(nwarnings, 1)
+
+    @unittest.skipIf(not hasattr(os, 'fork'), "needs os.fork()")
+    def test_omp_forked_child(self):
+        # OpenMP isn't fork safe: a child forked after the parent used it
+        # runs parallel code sequentially, with one warning, and gets the
+        # right results
+        if not _available('omp'):
+            self.skipTest("omp threading layer not available")
+        code = """if 1:
+            import os
+            import sys
+            import numpy as np
+            import numba
+            from numba import njit, prange, vectorize
+
+            @vectorize(['float64(float64, float64)'], target='parallel')
+            def vadd(a, b):
+                return a + b
+
+            @njit(parallel=True)
+            def psum(n):
+                s = 0
+                for i in prange(n):
+                    s += i
+                return s
+
+            def check():
+                X = np.arange(1000.0)
+                np.testing.assert_equal(vadd(X, X), X + X)
+                assert psum(100000) == sum(range(100000))
+
+            check()
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    check()
+                    check()
+                    sys.stdout.write('child ok\\n')
+                    sys.stdout.flush()
+                finally:
+                    os._exit(0)
+            _, status = os.waitpid(pid, 0)
+            assert status == 0
+            check()
+            print(numba.threading_layer())
+            """
+        returncode, out, err = self.run_layer('omp', code)
+        self.assertEqual(returncode, 0, msg=err)
+        self.assertEqual(out.split(), ['child', 'ok', 'omp'])
+        self.assertEqual(err.count("'omp' threading layer can't be used"), 1)
+
+    def test_invalid_layer(self):
+        returncode, out, err = self.run_layer('not_a_layer')
+        self.assertNotEqual(returncode, 0)
+        self.assertIn("Invalid value for NUMBA_THREADING_LAYER", err)
+
+    def test_not_initialized(self):
+        code = """if 1:
+            import numba
+            try:
+                numba.threading_layer()
+            except ValueError as e:
+                print(e)
+            """
+        returncode, out, err = self.run_layer('default', code)
+        self.assertEqual(returncode, 0, msg=err)
+        self.assertIn("Threading layer is not initialized", out)
+
+
+if __name__ == '__main__':
+    unittest.main()
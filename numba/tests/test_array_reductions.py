@@ -7,6 +7,7 @@ import numpy as np
 from numba import unittest_support as unittest
 from numba import jit, typeof
 from numba.compiler import compile_isolated
+from numba.errors import TypingError
 from numba.numpy_support import version as np_version
 from .support import TestCase, MemoryLeakMixin, tag
 
@@ -92,6 +93,72 @@ def array_argmax_global(arr):
 def array_median_global(arr):
     return np.median(arr)
 
+def array_percentile_global(arr, q):
+    return np.percentile(arr, q)
+
+def array_quantile_global(arr, q):
+    return np.quantile(arr, q)
+
+def array_sum_axis(arr, axis):
+    return arr.sum(axis)
+
+def array_sum_axis_global(arr, axis):
+    return np.sum(arr, axis=axis)
+
+def array_prod_axis(arr, axis):
+    return arr.prod(axis)
+
+def array_prod_axis_global(arr, axis):
+    return np.prod(arr, axis=axis)
+
+def array_mean_axis(arr, axis):
+    return arr.mean(axis)
+
+def array_mean_axis_global(arr, axis):
+    return np.mean(arr, axis=axis)
+
+def array_min_axis(arr, axis):
+    return arr.min(axis)
+
+def array_min_axis_global(arr, axis):
+    return np.min(arr, axis=axis)
+
+def array_max_axis(arr, axis):
+    return arr.max(axis)
+
+def array_max_axis_global(arr, axis):
+    return np.max(arr, axis=axis)
+
+def array_argmin_axis(arr, axis):
+    return arr.argmin(axis)
+
+def array_argmin_axis_global(arr, axis):
+    return np.argmin(arr, axis=axis)
+
+def array_argmax_axis(arr, axis):
+    return arr.argmax(axis)
+
+def array_argmax_axis_global(arr, axis):
+    return np.argmax(arr, axis=axis)
+
+def array_sum_keepdims(arr, axis):
+    return arr.sum(axis=axis, keepdims=True)
+
+def array_mean_keepdims_global(arr, axis):
+    return np.mean(arr, axis=axis, keepdims=True)
+
+def array_max_keepdims_global(arr, axis):
+    return np.max(arr, axis=axis, keepdims=True)
+
+def array_sum_keepdims_none(arr):
+    return arr.sum(axis=None, keepdims=True)
+
+def array_sum_keepdims_false(arr):
+    return arr.sum(keepdims=False)
+
+def array_sum_keepdims_variable(arr, keepdims):
+    return arr.sum(axis=0, keepdims=keepdims)
+
 def array_nanmin(arr):
     return np.nanmin(arr)
 
@@ -348,6 +415,166 @@ class TestArrayReductions(MemoryLeakMixin, TestCase):
 
         self.check_median_basic(pyfunc, variations)
 
+    def check_quantiles(self, pyfunc, qs):
+        cfunc = jit(nopython=True)(pyfunc)
+        def check(arr, q):
+            expected = pyfunc(arr, q)
+            got = cfunc(arr, q)
+            np.testing.assert_allclose(got, expected, rtol=1e-14)
+            self.assertEqual(np.shape(got), np.shape(expected))
+
+        np.random.seed(42)
+        arrays = [np.arange(63) + 10.5, np.random.random(64),
+                  np.random.randint(100, size=(9, 11)),
+                  np.random.random((4, 16)).T,
+                  # Many duplicates
+                  np.random.randint(3, size=1000).astype(np.float64),
+                  np.full(200, 2.5), np.array([4.0])]
+        for arr in arrays:
+            for q in qs:
+                check(arr, q)
+            # Several quantiles at once, as tuples, lists and arrays
+            check(arr, tuple(qs))
+            check(arr, list(qs))
+            check(arr, np.array(qs).reshape((len(qs), 1)))
+
+        # NaNs propagate
+        arr = np.random.random(50)
+        arr[7] = np.nan
+        self.assertTrue(np.isnan(cfunc(arr, qs[1])))
+
+        for q in (-qs[1], 2 * qs[-1] + 1, np.nan):
+            with self.assertRaises(ValueError) as raises:
+                cfunc(arrays[0], q)
+            self.assertIn("must be in the range", str(raises.exception))
+
+    def test_percentile_basic(self):
+        self.check_quantiles(array_percentile_global,
+                             [0.0, 10.0, 50.0, 62.5, 100.0])
+
+    @unittest.skipUnless(np_version >= (1, 15), "quantile needs Numpy 1.15+")
+    def test_quantile_basic(self):
+        self.check_quantiles(array_quantile_global,
+                             [0.0, 0.1, 0.5, 0.625, 1.0])
+
+    def axis_test_arrays(self, dtype):
+        # Distinct layouts: C, F, non-contiguous with negative strides
+        a = np.random.permutation(60) % 7 + 1
+        if dtype == np.bool_:
+            a = a % 2
+        a = a.astype(dtype)
+        a2 = a[:12].reshape((3, 4))
+        a3 = a.reshape((3, 4, 5))
+        return [a2, a2.T, a3, np.asfortranarray(a3), a3[:, ::2, ::-1],
+                a3.transpose((1, 2, 0))]
+
+    def check_reduce_axis(self, pyfunc, dtypes):
+        cfunc = jit(nopython=True)(pyfunc)
+        for dtype in dtypes:
+            for arr in self.axis_test_arrays(dtype):
+                for axis in range(-arr.ndim, arr.ndim):
+                    expected = pyfunc(arr, axis)
+                    got = cfunc(arr, axis)
+                    self.assertPreciseEqual(got, expected)
+                    self.assertTrue(got.flags.c_contiguous)
+
+        arr = np.arange(10, dtype=dtypes[0])
+        self.assertPreciseEqual(cfunc(arr, 0), pyfunc(arr, 0))
+        self.assertPreciseEqual(cfunc(arr, -1), pyfunc(arr, -1))
+
+        for axis in (2, -3):
+            with self.assertRaises(ValueError) as raises:
+                cfunc(np.ones((2, 3), dtype=dtypes[0]), axis)
+            self.assertIn("axis is out of bounds", str(raises.exception))
+
+    def test_sum_axis(self):
+        dtypes = [np.int64, np.int8, np.uint16, np.float64, np.bool_]
+        self.check_reduce_axis(array_sum_axis, dtypes)
+        self.check_reduce_axis(array_sum_axis_global, dtypes)
+        # Empty axis
+        cfunc = jit(nopython=True)(array_sum_axis)
+        arr = np.ones((3, 0, 2))
+        self.assertPreciseEqual(cfunc(arr, 1), arr.sum(1))
+        self.assertPreciseEqual(cfunc(arr, 2), arr.sum(2))
+
+    def test_prod_axis(self):
+        dtypes = [np.int64, np.int32, np.float64]
+        self.check_reduce_axis(array_prod_axis, dtypes)
+        self.check_reduce_axis(array_prod_axis_global, dtypes)
+
+    def test_mean_axis(self):
+        dtypes = [np.int64, np.float64, np.float32, np.bool_]
+        self.check_reduce_axis(array_mean_axis, dtypes)
+        self.check_reduce_axis(array_mean_axis_global, dtypes)
+
+    def check_reduce_axis_nans(self, pyfunc):
+        cfunc = jit(nopython=True)(pyfunc)
+        arr = np.random.random((4, 5, 6))
+        arr[1, 2, 3] = np.nan
+        arr[1, 4, 3] = np.nan
+        arr[3, :, 0] = np.nan
+        for a in (arr, np.asfortranarray(arr), arr[::-1, 1:]):
+            for axis in range(a.ndim):
+                self.assertPreciseEqual(cfunc(a, axis), pyfunc(a, axis))
+
+    def check_reduce_axis_empty(self, pyfunc, msg):
+        cfunc = jit(nopython=True)(pyfunc)
+        with self.assertRaises(ValueError) as raises:
+            cfunc(np.ones((3, 0)), 1)
+        self.assertIn(msg, str(raises.exception))
+        self.assertPreciseEqual(cfunc(np.ones((0, 3)), 1),
+                                pyfunc(np.ones((0, 3)), 1))
+
+    def test_min_axis(self):
+        dtypes = [np.int64, np.int8, np.float64, np.bool_]
+        self.check_reduce_axis(array_min_axis, dtypes)
+        self.check_reduce_axis(array_min_axis_global, dtypes)
+        self.check_reduce_axis_nans(array_min_axis)
+        self.check_reduce_axis_empty(array_min_axis, "zero-size array")
+
+    def test_max_axis(self):
+        dtypes = [np.int64, np.uint8, np.float32, np.bool_]
+        self.check_reduce_axis(array_max_axis, dtypes)
+        self.check_reduce_axis(array_max_axis_global, dtypes)
+        self.check_reduce_axis_nans(array_max_axis_global)
+        self.check_reduce_axis_empty(array_max_axis, "zero-size array")
+
+    def test_argmin_axis(self):
+        dtypes = [np.int64, np.float64, np.int16]
+        self.check_reduce_axis(array_argmin_axis, dtypes)
+        self.check_reduce_axis(array_argmin_axis_global, dtypes)
+        self.check_reduce_axis_nans(array_argmin_axis)
+        self.check_reduce_axis_empty(array_argmin_axis, "empty sequence")
+
+    def test_argmax_axis(self):
+        dtypes = [np.int64, np.float64, np.uint32]
+        self.check_reduce_axis(array_argmax_axis, dtypes)
+        self.check_reduce_axis(array_argmax_axis_global, dtypes)
+        self.check_reduce_axis_nans(array_argmax_axis_global)
+        self.check_reduce_axis_empty(array_argmax_axis, "empty sequence")
+
+    def test_reduce_keepdims(self):
+        for pyfunc in (array_sum_keepdims, array_mean_keepdims_global,
+                       array_max_keepdims_global):
+            cfunc = jit(nopython=True)(pyfunc)
+            arrays = self.axis_test_arrays(np.int64)
+            arrays.append(np.arange(5.0))
+            for arr in arrays:
+                for axis in range(-arr.ndim, arr.ndim):
+                    self.assertPreciseEqual(cfunc(arr, axis), pyfunc(arr, axis))
+
+        arr = np.arange(12).reshape((3, 4))
+        cfunc = jit(nopython=True)(array_sum_keepdims_none)
+        self.assertPreciseEqual(cfunc(arr), array_sum_keepdims_none(arr))
+        cfunc = jit(nopython=True)(array_sum_keepdims_false)
+        self.assertPreciseEqual(cfunc(arr), array_sum_keepdims_false(arr))
+
+        cfunc = jit(nopython=True)(array_sum_keepdims_variable)
+        with self.assertRaises(TypingError) as raises:
+            cfunc(arr, True)
+        self.assertIn("keepdims must be a constant boolean",
+                      str(raises.exception))
+
     def test_array_sum_global(self):
         arr = np.arange(10, dtype=np.int32)
         arrty = typeof(arr)
@@ -464,6 +691,51 @@ class TestArrayReductions(MemoryLeakMixin, TestCase):
         self.check_aggregation_magnitude(array_std)
         self.check_aggregation_magnitude(array_std_global)
 
+    def check_pairwise_sum(self, pyfunc):
+        """
+        Check that float sums match Numpy's pairwise summation.
+        """
+        cfunc = jit(nopython=True)(pyfunc)
+        np.random.seed(42)
+        # Sizes around the block size and the unrolling factor
+        for n in (1, 7, 8, 9, 127, 128, 129, 130, 1000, 10001):
+            arr = np.random.random(n) * 10.0 ** np.random.randint(-8, 8, n)
+            self.assertPreciseEqual(cfunc(arr), pyfunc(arr))
+            # Numpy sums the real and imaginary parts in another order
+            carr = arr + 1j * arr[::-1]
+            self.assertPreciseEqual(cfunc(carr), pyfunc(carr), prec='double')
+        arr = np.random.random(3000).reshape((30, 100))
+        self.assertPreciseEqual(cfunc(arr), pyfunc(arr))
+        # Non-contiguous arrays are summed pairwise row by row
+        for arr in (arr.T, arr[:, ::2], arr[::-1]):
+            self.assertPreciseEqual(cfunc(arr), pyfunc(arr), prec='double')
+
+    def test_sum_pairwise(self):
+        self.check_pairwise_sum(array_sum)
+        # The rounding error doesn't grow linearly with the size
+        cfunc = jit(nopython=True)(array_sum)
+        arr = np.full(10 ** 6, 0.1)
+        self.assertPreciseEqual(cfunc(arr), 1e5, prec='double', ulps=16)
+
+    def test_mean_pairwise(self):
+        self.check_pairwise_sum(array_mean)
+
+    def test_var_pairwise(self):
+        self.check_pairwise_sum(array_var)
+
+    def test_nansum_pairwise(self):
+        self.check_pairwise_sum(array_nansum)
+        cfunc = jit(nopython=True)(array_nansum)
+        arr = np.random.random(1000)
+        arr[::7] = np.nan
+        self.assertPreciseEqual(cfunc(arr), np.nansum(arr))
+
+    def test_sum_axis_pairwise(self):
+        cfunc = jit(nopython=True)(array_sum_axis)
+        arr = np.random.random((5, 1000))
+        self.assertPreciseEqual(cfunc(arr, 1), arr.sum(1))
+        self.assertPreciseEqual(cfunc(arr.T, 0), arr.T.sum(0), prec='double')
+
     def _do_check_nptimedelta(self, pyfunc, arr):
         arrty = typeof(arr)
         cfunc = jit(nopython=True)(pyfunc)
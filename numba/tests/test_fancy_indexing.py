@@ -53,8 +53,6 @@ class TestFancyIndexing(MemoryLeakMixin, TestCase):
         Generate advanced index tuples by generating basic index tuples
         and adding a single advanced index item.
         """
-        # (Note Numba doesn't support advanced indices with more than
-        #  one advanced index array at the moment)
         choices = list(self.generate_advanced_indices(N, many=many))
         for i in range(maxdim + 1):
             for tup in self.generate_basic_index_tuples(N, maxdim - 1, many):
@@ -70,6 +68,27 @@ class TestFancyIndexing(MemoryLeakMixin, TestCase):
             for i in range(len(tup) + 1):
                 yield tup[:i] + (Ellipsis,) + tup[i:]
 
+    def generate_multi_advanced_index_tuples(self, N, maxdim):
+        """
+        Generate index tuples with several advanced indices broadcast
+        together (integer arrays of various shapes, boolean arrays and
+        integers), next to each other or separated by slices.
+        """
+        arrays = [np.int16([0, N - 1, -2]),
+                  np.intp([[1], [-1]]),
+                  np.bool_([1, 0, 1, 1])]
+        choices = arrays + [slice(1, None, None), slice(None, None, -2), 1]
+        for ndim in range(1, maxdim + 1):
+            for tup in itertools.product(choices, repeat=ndim):
+                n_arrays = sum(isinstance(idx, np.ndarray) for idx in tup)
+                if n_arrays == 0:
+                    continue
+                if (n_arrays > 1
+                    or any(isinstance(idx, int) for idx in tup)
+                    or any(isinstance(idx, np.ndarray) and idx.ndim > 1
+                           for idx in tup)):
+                    yield tup
+
     def check_getitem_indices(self, arr, indices):
         pyfunc = getitem_usecase
         cfunc = jit(nopython=True)(pyfunc)
@@ -120,6 +139,41 @@ class TestFancyIndexing(MemoryLeakMixin, TestCase):
         indices = self.generate_advanced_indices(N)
         self.check_getitem_indices(arr, indices)
 
+    def test_getitem_multi_advanced(self):
+        # Test several advanced indices broadcast together
+        N = 4
+        ndim = 3
+        arr = np.arange(N ** ndim).reshape((N,) * ndim).astype(np.int32)
+        indices = self.generate_multi_advanced_index_tuples(N, ndim)
+        self.check_getitem_indices(arr, indices)
+        # With an ellipsis, and as a single array index
+        indices = [(Ellipsis, np.intp([1, 2]), np.intp([[0], [3]])),
+                   (np.intp([1, 2]), Ellipsis, np.intp([0, 3])),
+                   np.intp([[1, 2], [3, 0]])]
+        self.check_getitem_indices(arr, indices)
+
+    def test_getitem_multi_advanced_errors(self):
+        cfunc = jit(nopython=True)(getitem_usecase)
+        arr = np.arange(16).reshape((4, 4))
+        with self.assertRaises(IndexError) as raises:
+            cfunc(arr, (np.intp([0, 1, 2]), np.intp([0, 1])))
+        self.assertIn("shape mismatch: indexing arrays could not be "
+                      "broadcast together", str(raises.exception))
+        # The nonzero() positions of boolean indices are released on errors
+        with self.assertRaises(IndexError) as raises:
+            cfunc(arr, (np.bool_([1, 1, 1, 0]), np.intp([0, 1])))
+        self.assertIn("shape mismatch: indexing arrays could not be "
+                      "broadcast together", str(raises.exception))
+        # Boolean indices must have the length of their dimension
+        with self.assertRaises(IndexError) as raises:
+            cfunc(arr, (np.intp([0, 1]), np.bool_([1, 0, 1])))
+        self.assertIn("boolean index did not match indexed array along "
+                      "dimension 1", str(raises.exception))
+        with self.assertRaises(IndexError) as raises:
+            cfunc(arr, (np.bool_([0, 1, 1, 0]), np.bool_([1, 0, 1, 0, 0])))
+        self.assertIn("boolean index did not match indexed array along "
+                      "dimension 1", str(raises.exception))
+
     def check_setitem_indices(self, arr, indices):
         pyfunc = setitem_usecase
         cfunc = jit(nopython=True)(pyfunc)
@@ -154,6 +208,14 @@ class TestFancyIndexing(MemoryLeakMixin, TestCase):
 
         self.check_setitem_indices(arr, indices)
 
+    def test_setitem_multi_advanced(self):
+        # Test several advanced indices broadcast together
+        N = 4
+        ndim = 3
+        arr = np.arange(N ** ndim).reshape((N,) * ndim).astype(np.int32)
+        indices = self.generate_multi_advanced_index_tuples(N, ndim)
+        self.check_setitem_indices(arr, indices)
+
     def test_setitem_array(self):
         # Test advanced indexing with a single array index
         N = 4
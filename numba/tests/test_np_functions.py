@@ -7,6 +7,7 @@ import sys
 
 import numpy as np
 
+import numba
 from numba import unittest_support as unittest
 from numba.compiler import compile_isolated, Flags, utils
 from numba import jit, typeof, types
@@ -47,6 +48,97 @@ def digitize(*args):
 def histogram(*args):
     return np.histogram(*args)
 
+def unique(a):
+    return np.unique(a)
+
+def unique_index(a):
+    return np.unique(a, return_index=True)
+
+def unique_inverse_counts(a):
+    return np.unique(a, return_inverse=True, return_counts=True)
+
+def unique_all(a):
+    return np.unique(a, True, True, True)
+
+def unique_flag(a, flag):
+    return np.unique(a, return_counts=flag)
+
+def in1d(a, b):
+    return np.in1d(a, b)
+
+def in1d_invert(a, b):
+    return np.in1d(a, b, invert=True)
+
+def intersect1d(a, b):
+    return np.intersect1d(a, b)
+
+def union1d(a, b):
+    return np.union1d(a, b)
+
+
+def take(a, indices):
+    return np.take(a, indices)
+
+def take_axis(a, indices, axis):
+    return np.take(a, indices, axis)
+
+def take_method(a, indices, axis):
+    return a.take(indices, axis=axis)
+
+def take_along_axis(arr, indices, axis):
+    return np.take_along_axis(arr, indices, axis)
+
+def put(a, ind, v):
+    np.put(a, ind, v)
+
+def compress(condition, a):
+    return np.compress(condition, a)
+
+def compress_axis(condition, a, axis):
+    return np.compress(condition, a, axis)
+
+def extract(condition, arr):
+    return np.extract(condition, arr)
+
+
+def convolve(a, v):
+    return np.convolve(a, v)
+
+def convolve_same(a, v):
+    return np.convolve(a, v, 'same')
+
+def convolve_valid(a, v):
+    return np.convolve(a, v, mode='valid')
+
+def correlate(a, v):
+    return np.correlate(a, v)
+
+def correlate_same(a, v):
+    return np.correlate(a, v, mode='s')
+
+def correlate_full(a, v):
+    return np.correlate(a, v, 'full')
+
+def correlate_bad_mode(a, v):
+    return np.correlate(a, v, 'diagonal')
+
+def rolling_sum(a, window):
+    return numba.special.rolling_sum(a, window)
+
+def rolling_mean(a, window):
+    return numba.special.rolling_mean(a, window)
+
+def rolling_std(a, window):
+    return numba.special.rolling_std(a, window)
+
+def rolling_std_ddof(a, window, ddof):
+    return numba.special.rolling_std(a, window, ddof)
+
+def rolling_min(a, window):
+    return numba.special.rolling_min(a, window)
+
+def rolling_max(a, window):
+    return numba.special.rolling_max(a, window)
 
 class TestNPFunctions(TestCase):
     """
@@ -410,3 +502,472 @@ class TestNPFunctions(TestCase):
         self.rnd.shuffle(values)
 
         check_values(values)
+
+    def set_arrays(self):
+        """
+        Arrays small enough to be sorted, and large arrays taking the
+        direct (small range of integers) and hashing strategies.
+        """
+        rnd = self.rnd
+        for n in (0, 1, 50, 10000):
+            yield rnd.randint(-20, 20, size=n)
+            yield rnd.randint(0, 1 << 40, size=n) * 1024
+            yield rnd.randint(0, 200, size=n).astype(np.uint64)
+            yield rnd.randint(0, 50, size=n) / 4.0
+            yield rnd.randint(0, 2, size=n).astype(np.bool_)
+        yield rnd.randint(-20, 20, size=(100, 70))[:, ::2]
+
+    def gather_arrays(self):
+        a = np.arange(2 * 3 * 4, dtype=np.float64).reshape((2, 3, 4))
+        yield a
+        yield np.asfortranarray(a)
+        yield a[:, ::-1, 1:]
+        yield a.astype(np.int16)
+        yield (a + 1j).ravel()
+
+    def test_take(self):
+        def check(pyfunc, *args):
+            cfunc = jit(nopython=True)(pyfunc)
+            self.assertPreciseEqual(cfunc(*args), pyfunc(*args))
+
+        for a in self.gather_arrays():
+            n = a.size
+            for indices in (np.int64([0, n - 1, -1, 2, 2]),
+                            np.int32([[1, -n], [3, 0]]), np.intp([]), 3, -2):
+                check(take, a, indices)
+            for axis in range(-a.ndim, a.ndim):
+                m = a.shape[axis]
+                for indices in (np.intp([m - 1, 0, -1, 0]),
+                                np.int16([[0], [-m]]), 0, -1):
+                    check(take_axis, a, indices, axis)
+                    check(take_method, a, indices, axis)
+        # Large enough for the prefetching kernel
+        from numba.targets.arraymath import PREFETCH_MIN_SIZE
+        a = self.rnd.random_sample(PREFETCH_MIN_SIZE * 2)
+        indices = self.rnd.randint(-len(a), len(a), 1000)
+        check(take, a, indices)
+        check(take_axis, a.reshape((-1, 4)), indices[:50] // 4, 0)
+        check(take_axis, a.reshape((4, -1)), indices, 1)
+
+    def test_take_errors(self):
+        cfunc = jit(nopython=True)(take_axis)
+        a = np.arange(6).reshape((2, 3))
+        for indices, axis in ((np.intp([0, 3]), 1), (np.intp([-3]), 0),
+                              (2, 0), (6, None)):
+            with self.assertRaises(IndexError) as raises:
+                cfunc(a, indices, axis)
+            self.assertIn("index out of bounds", str(raises.exception))
+        with self.assertRaises(ValueError):
+            cfunc(a, np.intp([0]), 2)
+        with self.assertTypingError() as raises:
+            cfunc(a, np.float64([0]), 0)
+        self.assertIn("indices must be an integer or an array of integers",
+                      str(raises.exception))
+
+    @unittest.skipIf(np_version < (1, 15), "needs Numpy 1.15+")
+    def test_take_along_axis(self):
+        cfunc = jit(nopython=True)(take_along_axis)
+
+        def check(arr, indices, axis):
+            expected = take_along_axis(arr, indices, axis)
+            self.assertPreciseEqual(cfunc(arr, indices, axis), expected)
+
+        for a in self.gather_arrays():
+            check(a, np.intp([3, -1, 0]), None)
+            for axis in range(-a.ndim, a.ndim):
+                # Sorting indices, and indices broadcast along other axes
+                check(a, np.argsort(-a.real, axis=axis), axis)
+                shape = [1] * a.ndim
+                shape[axis] = 2
+                check(a, np.intp([-1, 0]).reshape(shape), axis)
+
+        cfunc = jit(nopython=True)(take_along_axis)
+        a = np.arange(6).reshape((2, 3))
+        with self.assertRaises(ValueError) as raises:
+            cfunc(a, np.zeros((3, 1), np.intp), 1)
+        self.assertIn("shape mismatch", str(raises.exception))
+        with self.assertRaises(IndexError):
+            cfunc(a, np.intp([[3]]), 1)
+        with self.assertTypingError() as raises:
+            cfunc(a, np.intp([0]), 1)
+        self.assertIn("indices and arr must have the same number of "
+                      "dimensions", str(raises.exception))
+
+    def test_put(self):
+        cfunc = jit(nopython=True)(put)
+
+        def check(a, ind, v):
+            expected = np.copy(a)
+            got = np.copy(a)
+            put(expected, ind, v)
+            cfunc(got, ind, v)
+            self.assertPreciseEqual(got, expected)
+
+        for a in self.gather_arrays():
+            n = a.size
+            check(a, np.intp([0, n - 1, -2, 3]), np.arange(4).astype(a.dtype))
+            # Values are cycled, and the last write to an index wins
+            check(a, np.int32([[1, 5], [-1, 1]]), np.ones(3, a.dtype))
+            check(a, np.intp([2, 4, 2]), np.arange(5).astype(a.dtype))
+            check(a, 3, a.dtype.type(7))
+            check(a, np.intp([1]), np.empty(0, a.dtype))
+        # F-ordered arrays are written in C order
+        a = np.asfortranarray(np.zeros((3, 4)))
+        check(a, np.arange(6), np.arange(6.0))
+
+        from numba.targets.arraymath import PREFETCH_MIN_SIZE
+        a = np.zeros(PREFETCH_MIN_SIZE * 2)
+        check(a, self.rnd.randint(-len(a), len(a), 1000),
+              self.rnd.random_sample(1000))
+
+        # The array is left unchanged when an index is out of bounds
+        for a in (np.zeros(3), np.zeros((3, 2)).T):
+            with self.assertRaises(IndexError) as raises:
+                cfunc(a, np.intp([0, 1, a.size]), np.ones(3))
+            self.assertIn("index out of bounds", str(raises.exception))
+            self.assertPreciseEqual(a, np.zeros_like(a))
+
+    def test_compress_extract(self):
+        def check(pyfunc, *args):
+            cfunc = jit(nopython=True)(pyfunc)
+            self.assertPreciseEqual(cfunc(*args), pyfunc(*args))
+
+        for a in self.gather_arrays():
+            cond = self.rnd.randint(0, 2, a.size).astype(np.bool_)
+            check(compress, cond[:5], a)
+            check(compress, cond.astype(np.int32), a)
+            check(extract, cond.reshape(a.shape), a)
+            check(extract, cond.astype(np.float64), a)
+            for axis in range(-a.ndim, a.ndim):
+                check(compress_axis, cond[:a.shape[axis]], a, axis)
+                check(compress_axis, cond[:max(a.shape[axis] - 1, 0)], a,
+                      axis)
+
+        cfunc = jit(nopython=True)(compress_axis)
+        with self.assertRaises(IndexError) as raises:
+            cfunc(np.bool_([0, 0, 1]), np.zeros((2, 2)), 0)
+        self.assertIn("index out of bounds", str(raises.exception))
+
+    def test_convolve_correlate(self):
+        funcs = (convolve, convolve_same, convolve_valid,
+                 correlate, correlate_same, correlate_full)
+        rnd = self.rnd
+        for n, m in ((10, 3), (3, 10), (7, 7), (1, 5), (6, 1), (8, 4)):
+            int_pairs = [(rnd.randint(-10, 10, n), rnd.randint(-10, 10, m)),
+                         (rnd.randint(-10, 10, n).astype(np.int8),
+                          rnd.randint(0, 10, m).astype(np.uint32))]
+            float_pairs = [(rnd.random_sample(n), rnd.random_sample(m)),
+                           (rnd.random_sample(2 * n)[::-2],
+                            rnd.random_sample(m).astype(np.float32)),
+                           (rnd.random_sample(n) + 1j * rnd.random_sample(n),
+                            rnd.random_sample(m) - 2j)]
+            for pyfunc in funcs:
+                cfunc = jit(nopython=True)(pyfunc)
+                for a, v in int_pairs:
+                    self.assertPreciseEqual(cfunc(a, v), pyfunc(a, v))
+                for a, v in float_pairs:
+                    expected = pyfunc(a, v)
+                    got = cfunc(a, v)
+                    self.assertEqual(got.dtype, expected.dtype)
+                    np.testing.assert_allclose(got, expected, rtol=1e-6)
+
+    def test_convolve_correlate_errors(self):
+        for pyfunc in (convolve, correlate):
+            cfunc = jit(nopython=True)(pyfunc)
+            with self.assertRaises(ValueError) as raises:
+                cfunc(np.arange(3.0), np.arange(0.0))
+            self.assertIn("v cannot be empty", str(raises.exception))
+            with self.assertRaises(ValueError) as raises:
+                cfunc(np.arange(0.0), np.arange(3.0))
+            self.assertIn("a cannot be empty", str(raises.exception))
+
+        cfunc = jit(nopython=True)(correlate_bad_mode)
+        with self.assertTypingError() as raises:
+            cfunc(np.arange(3.0), np.arange(2.0))
+        self.assertIn("mode must be one of 'valid', 'same' or 'full'",
+                      str(raises.exception))
+
+    def test_rolling(self):
+        rnd = self.rnd
+        floats = rnd.random_sample(200) * 100 - 50
+        floats[50:60] = 3.0
+        with_nonfinite = floats.copy()
+        with_nonfinite[[17, 90, 91]] = np.nan
+        with_nonfinite[[120, 150]] = np.inf
+        with_nonfinite[153] = -np.inf
+        arrays = [floats, floats[::-3], floats.astype(np.float32),
+                  with_nonfinite, rnd.randint(-100, 100, 200),
+                  rnd.randint(0, 100, 200).astype(np.uint8),
+                  np.sort(floats), np.sort(floats)[::-1]]
+
+        def check(pyfunc, a, *args):
+            cfunc = jit(nopython=True)(pyfunc)
+            # The Python versions compute each window separately
+            expected = pyfunc(a, *args)
+            got = cfunc(a, *args)
+            self.assertEqual(got.dtype, expected.dtype)
+            if got.dtype.kind == 'f':
+                # float32 windows are summed in float64
+                atol = 1e-9 if got.dtype == np.float64 else 1e-2
+                np.testing.assert_allclose(got, expected, rtol=1e-5,
+                                           atol=atol)
+            else:
+                self.assertPreciseEqual(got, expected)
+
+        for a in arrays:
+            for window in (1, 2, 7, 64, len(a), len(a) + 1):
+                for pyfunc in (rolling_sum, rolling_mean, rolling_std,
+                               rolling_min, rolling_max):
+                    check(pyfunc, a, window)
+                check(rolling_std_ddof, a, window, 1)
+
+        # Windows of equal values have a zero deviation
+        cfunc = jit(nopython=True)(rolling_std)
+        self.assertPreciseEqual(cfunc(floats, 5)[50:56], np.zeros(6))
+
+        with self.assertRaises(ValueError) as raises:
+            cfunc(floats, 0)
+        self.assertIn("window must be at least 1", str(raises.exception))
+
+    def test_unique(self):
+        def check(pyfunc, a):
+            cfunc = jit(nopython=True)(pyfunc)
+            expected = pyfunc(a)
+            got = cfunc(a)
+            if isinstance(expected, tuple):
+                self.assertEqual(len(got), len(expected))
+                for x, y in zip(got, expected):
+                    # Numpy 2 gives the inverse the shape of the input
+                    self.assertPreciseEqual(x, y.ravel())
+            else:
+                self.assertPreciseEqual(got, expected)
+
+        for a in self.set_arrays():
+            for pyfunc in (unique, unique_index, unique_inverse_counts,
+                           unique_all):
+                check(pyfunc, a)
+
+    def test_unique_signed_zeros(self):
+        cfunc = jit(nopython=True)(unique_inverse_counts)
+        for n in (50, 10000):
+            a = self.rnd.random_sample(n)
+            a[::3] = -0.0
+            a[1::3] = 0.0
+            uniq, inverse, counts = cfunc(a)
+            expected = np.unique(a, return_counts=True)
+            # The zeros are counted together, whatever their sign
+            np.testing.assert_array_equal(uniq, expected[0])
+            self.assertPreciseEqual(counts, expected[1])
+            np.testing.assert_array_equal(uniq[inverse], a)
+
+    def test_unique_flag_not_constant(self):
+        cfunc = jit(nopython=True)(unique_flag)
+        with self.assertTypingError() as raises:
+            cfunc(np.arange(3), True)
+        self.assertIn("return_counts must be a constant boolean",
+                      str(raises.exception))
+
+    def test_set_operations(self):
+        def check(pyfunc, a, b):
+            cfunc = jit(nopython=True)(pyfunc)
+            self.assertPreciseEqual(cfunc(a, b), pyfunc(a, b))
+
+        arrays = list(self.set_arrays())
+        rnd = self.rnd
+        for a in arrays:
+            b = rnd.permutation(a.ravel())[:len(a) // 2]
+            others = [b, np.concatenate((b, b + 1)),
+                      a.ravel()[::-1].astype(np.float64) + 0.5]
+            for other in others:
+                for pyfunc in (in1d, in1d_invert, intersect1d, union1d):
+                    check(pyfunc, a, other)
+                    check(pyfunc, other, a)
+
+
+def cumsum(a):
+    return np.cumsum(a)
+
+def cumprod_method(a):
+    return a.cumprod()
+
+@jit(nopython=True)
+def scan_max(x, y):
+    return max(x, y)
+
+@jit(nopython=True)
+def scan_first(x, y):
+    return x
+
+def parallel_scan_max(a):
+    return numba.parallel_scan(scan_max, a)
+
+def parallel_scan_first_out(a, out):
+    return numba.parallel_scan(scan_first, a, out)
+
+def sum_axis(a, axis):
+    return np.sum(a, axis=axis)
+
+def mean_axis_keepdims(a, axis):
+    return a.mean(axis, keepdims=True)
+
+def max_axis(a, axis):
+    return a.max(axis)
+
+def argmin_axis(a, axis):
+    return np.argmin(a, axis)
+
+def histogram_kws(a):
+    return np.histogram(a, range=(0.1, 0.8))
+
+def digitize_right(x, bins):
+    return np.digitize(x, bins, right=True)
+
+
+class TestParallelNPFunctions(TestCase):
+    """
+    Tests for the parallel implementations of Numpy functions used in
+    functions compiled with parallel=True.
+    """
+
+    def setUp(self):
+        from numba.targets.parallel_arraymath import PARALLEL_HISTOGRAM_THRESHOLD
+        self.n = 2 * PARALLEL_HISTOGRAM_THRESHOLD + 17
+        self.rnd = np.random.RandomState(42)
+
+    def check(self, pyfunc, *args):
+        # the results are the same as the sequential implementations'
+        cfunc = jit(nopython=True, parallel=True)(pyfunc)
+        expected = jit(nopython=True)(pyfunc)(*args)
+        got = cfunc(*args)
+        if isinstance(expected, tuple):
+            self.assertPreciseEqual(got[0], expected[0])
+            self.assertPreciseEqual(got[1], expected[1], prec='double',
+                                    ulps=2)
+        else:
+            self.assertPreciseEqual(got, expected)
+
+    def test_histogram(self):
+        values = self.rnd.random_sample(self.n)
+        values[::1000] = float('nan')
+        self.check(histogram, values, np.float64([0.1, 0.3, 0.45, 0.8]))
+        self.check(histogram, values, 7, (0.2, 0.7))
+        self.check(histogram, values[::-1], 7)
+        self.check(histogram, values[values == values])
+        self.check(histogram_kws, values)
+        self.check(histogram, self.rnd.randint(0, 50, self.n), 5)
+
+    def test_bincount(self):
+        a = self.rnd.randint(0, 300, self.n)
+        self.check(bincount1, a)
+        self.check(bincount1, a.astype(np.uint8))
+        self.check(bincount2, a, self.rnd.random_sample(self.n))
+        # Few bins updated by all the threads
+        few = self.rnd.randint(0, 3, 8 * self.n)
+        for _ in range(3):
+            self.check(bincount1, few)
+            self.check(bincount2, few, np.ones(len(few)))
+        # Values spread over a range much larger than the array, counted
+        # sequentially rather than into per-thread rows
+        from numba.targets.parallel_arraymath import NUM_CHUNKS
+        sparse = a.copy()
+        sparse[::1000] = 10 * NUM_CHUNKS * self.n
+        self.check(bincount1, sparse)
+        self.check(bincount2, sparse, self.rnd.random_sample(self.n))
+
+        cfunc = jit(nopython=True, parallel=True)(bincount1)
+        a[-1] = -1
+        with self.assertRaises(ValueError) as raises:
+            cfunc(a)
+        self.assertIn("first argument must be non-negative",
+                      str(raises.exception))
+
+    def test_digitize(self):
+        x = self.rnd.random_sample(self.n) * 10
+        x[::1000] = float('nan')
+        bins = np.float64([1, 3, 4.5, 8])
+        self.check(digitize, x, bins)
+        self.check(digitize, x, bins[::-1])
+        self.check(digitize_right, x, bins)
+
+    def test_searchsorted(self):
+        a = np.sort(self.rnd.random_sample(1000))
+        v = self.rnd.random_sample(self.n)
+        self.check(searchsorted, a, v)
+        # below the threshold
+        self.check(searchsorted, a, v[:100])
+
+    def test_take(self):
+        a = self.rnd.random_sample(self.n)
+        indices = self.rnd.randint(-self.n, self.n, self.n)
+        self.check(take, a, indices)
+        self.check(take, a.reshape((-1, 1)), indices[::-1])
+        self.check(take, a.astype(np.int32), indices.astype(np.int32))
+        # below the threshold
+        self.check(take, a, indices[:100])
+
+        cfunc = jit(nopython=True, parallel=True)(take)
+        indices[-1] = self.n
+        with self.assertRaises(IndexError) as raises:
+            cfunc(a, indices)
+        self.assertIn("index out of bounds", str(raises.exception))
+
+    def test_cumulative(self):
+        a = self.rnd.randint(-100, 100, self.n)
+        self.check(cumsum, a)
+        self.check(cumsum, a.astype(np.int8))
+        self.check(cumsum, a[::-3])
+        self.check(cumsum, a[:100])
+        b = 1.0 + self.rnd.random_sample(self.n) * 1e-5
+        cfunc = jit(nopython=True, parallel=True)(cumsum)
+        np.testing.assert_allclose(cfunc(b), np.cumsum(b))
+        cfunc = jit(nopython=True, parallel=True)(cumprod_method)
+        np.testing.assert_allclose(cfunc(b), np.cumprod(b))
+        self.check(cumprod_method, self.rnd.randint(0, 2, self.n) * 2 - 1)
+
+    def test_axis_reductions(self):
+        # Tall, wide and 3D arrays, so that both the output and the reduced
+        # axis are divided among threads
+        a = self.rnd.randint(-100, 100, 3 * 32 * 64 * 22)
+        arrays = [a.reshape((-1, 3)), a.reshape((3, -1)),
+                  a.reshape((32, 64, -1))]
+        arrays += [np.asfortranarray(arr) for arr in arrays]
+        arrays.append(arrays[-1][::-1])
+        for arr in arrays:
+            for axis in range(-1, arr.ndim):
+                self.check(sum_axis, arr, axis)
+                self.check(max_axis, arr, axis)
+                self.check(argmin_axis, arr, axis)
+                self.check(mean_axis_keepdims, arr, axis)
+                self.check(argmin_axis, arr.astype(np.float64), axis)
+        # below the threshold
+        self.check(sum_axis, arrays[0][:100], 0)
+        b = self.rnd.random_sample((self.n, 2))
+        b[::1000, 1] = float('nan')
+        self.check(max_axis, b, 0)
+        self.check(argmin_axis, b, 0)
+        self.check(argmin_axis, b.T, 1)
+
+    def test_parallel_scan(self):
+        a = self.rnd.randint(-1000, 1000, self.n)
+        expected = np.maximum.accumulate(a)
+        cfunc = jit(nopython=True, parallel=True)(parallel_scan_max)
+        self.assertPreciseEqual(cfunc(a), expected)
+        self.assertPreciseEqual(cfunc(a.reshape((-1, 1))), expected)
+        self.assertPreciseEqual(parallel_scan_max(a[:50]), expected[:50])
+
+        cfunc = jit(nopython=True, parallel=True)(parallel_scan_first_out)
+        out = np.empty(self.n)
+        self.assertIs(cfunc(a, out), out)
+        self.assertPreciseEqual(out, np.full(self.n, float(a[0])))
+        with self.assertRaises(ValueError):
+            cfunc(a, out[1:])
+
+    def test_scan_chunks(self):
+        from numba.targets.parallel_arraymath import make_parallel_scan
+        # a zero threshold and many chunks exercise the parallel path on
+        # small arrays
+        run_scan = make_parallel_scan(scan_max, threshold=0, nchunks=7)
+        for n in (0, 1, 13, 14, 100, 1001):
+            a = self.rnd.randint(-1000, 1000, n)
+            out = run_scan(a, np.empty_like(a))
+            self.assertPreciseEqual(out, np.maximum.accumulate(a))
@@ -0,0 +1,129 @@
+"""
+Tests parallel ufuncs and parfors in child processes created by
+multiprocessing and concurrent.futures, after the parent process has
+already launched its thread pool.
+"""
+from __future__ import print_function, division, absolute_import
+
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+import numba
+from numba import unittest_support as unittest
+from numba import njit, prange, vectorize
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+
+_TIMEOUT = 120
+
+
+@vectorize(['float64(float64, float64)'], target='parallel')
+def parallel_add(a, b):
+    return a + b
+
+@njit(parallel=True)
+def parallel_sum(n):
+    s = 0.0
+    for i in prange(n):
+        s += i
+    return s
+
+@njit(parallel=True)
+def parallel_map(X):
+    return np.sqrt(X) + 1.0
+
+
+def run_parallel(n):
+    """
+    Run parallel code in the current process, return whether the results
+    are right and the thread pool information.
+    """
+    X = np.arange(float(n))
+    ok = (np.allclose(parallel_add(X, X), X + X)
+          and parallel_sum(n) == n * (n - 1) / 2
+          and np.allclose(parallel_map(X), np.sqrt(X) + 1.0))
+    return ok, numba.parallel_pool_info()
+
+
+def _get_context(method):
+    if not hasattr(multiprocessing, 'get_context'):
+        if method != 'fork' or sys.platform.startswith('win'):
+            raise unittest.SkipTest("%s start method not supported" % method)
+        return multiprocessing
+    if method not in multiprocessing.get_all_start_methods():
+        raise unittest.SkipTest("%s start method not supported" % method)
+    return multiprocessing.get_context(method)
+
+
+class TestParallelMultiprocessing(unittest.TestCase):
+
+    sizes = [10, 10000, 100000, 37]
+
+    def setUp(self):
+        # launch the thread pool in the parent first
+        ok, info = run_parallel(1000)
+        self.assertTrue(ok)
+        self.assertTrue(info['launched'])
+
+    def check_children(self, results):
+        for ok, info in results:
+            self.assertTrue(ok)
+            self.assertNotEqual(info['pid'], os.getpid())
+            self.assertEqual(info['num_threads'], numba.config.NUMBA_NUM_THREADS)
+        self.assertTrue(run_parallel(1000)[0])
+
+    def run_pool(self, method):
+        ctx = _get_context(method)
+        pool = ctx.Pool(2)
+        try:
+            results = pool.map_async(run_parallel, self.sizes).get(_TIMEOUT)
+        finally:
+            pool.terminate()
+            pool.join()
+        return results
+
+    def test_fork_pool(self):
+        results = self.run_pool('fork')
+        self.check_children(results)
+        # forked children inherit the threading layer chosen by the parent
+        layer = numba.threading_layer()
+        for ok, info in results:
+            self.assertEqual(info['threading_layer'], layer)
+            self.assertEqual(info['launch_pid'], os.getpid())
+            if layer != 'omp':
+                self.assertTrue(info['launched'])
+
+    def test_spawn_pool(self):
+        results = self.run_pool('spawn')
+        self.check_children(results)
+        for ok, info in results:
+            self.assertEqual(info['launch_pid'], info['pid'])
+
+    def test_forkserver_pool(self):
+        self.check_children(self.run_pool('forkserver'))
+
+    @unittest.skipIf(ProcessPoolExecutor is None,
+                     "concurrent.futures not available")
+    def test_process_pool_executor(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(run_parallel, self.sizes,
+                                        timeout=_TIMEOUT))
+        self.check_children(results)
+
+    def test_pool_info(self):
+        info = numba.parallel_pool_info()
+        self.assertEqual(info['threading_layer'], numba.threading_layer())
+        self.assertEqual(info['pid'], os.getpid())
+        self.assertEqual(info['launch_pid'], os.getpid())
+        self.assertEqual(info['num_threads'], numba.config.NUMBA_NUM_THREADS)
+
+
+if __name__ == '__main__':
+    unittest.main()
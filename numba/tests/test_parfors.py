@@ -13,6 +13,9 @@ from numba import config
 from numba.annotations import type_annotations
 from numba.ir_utils import copy_propagate, apply_copy_propagate, get_name_var_table, remove_dels, remove_dead
 from numba import ir
+from numba.inline_closurecall import InlineClosureCallPass
+from numba.io_support import StringIO
+from numba.tests.support import override_config
 
 import math
 
@@ -45,6 +48,36 @@ def countParfors(func_ir):
 
     return ret_count
 
+def get_parfors(func_ir):
+    return [inst for block in func_ir.blocks.values()
+            for inst in block.body if isinstance(inst, numba.parfor.Parfor)]
+
+def countArrayAllocs(func_ir):
+    return sum(len(numba.parfor.get_parfor_allocs(parfor))
+               for parfor in get_parfors(func_ir))
+
+def run_parfor_pass(func, args, typingctx=None):
+    """run the parfor pass on func's IR for the given argument types and
+    return the resulting function IR
+    """
+    if typingctx is None:
+        typingctx = typing.Context()
+    targetctx = cpu.CPUContext(typingctx)
+    test_ir = compiler.run_frontend(func)
+    # inline closures such as list comprehensions like the compiler pipeline
+    InlineClosureCallPass(test_ir, compiler.run_frontend).run()
+    with cpu_target.nested_context(typingctx, targetctx):
+        tp = TestPipeline(typingctx, targetctx, args, test_ir)
+        numba.rewrites.rewrite_registry.apply('before-inference', tp, tp.func_ir)
+        tp.typemap, tp.return_type, tp.calltypes = compiler.type_inference_stage(
+            tp.typingctx, tp.func_ir, tp.args, None)
+        numba.rewrites.rewrite_registry.apply('after-inference', tp, tp.func_ir)
+        parfor_pass = numba.parfor.ParforPass(tp.func_ir, tp.typemap,
+                                              tp.calltypes, tp.return_type,
+                                              tp.typingctx)
+        parfor_pass.run()
+    return test_ir
+
 class TestPipeline(object):
     def __init__(self, typingctx, targetctx, args, test_ir):
         typingctx.refresh()
@@ -183,5 +216,513 @@ class TestParfors(unittest.TestCase):
             #print(countParfors(tp.func_ir) == 1)
             self.assertTrue(countParfors(test_ir) == 1)
 
+
+class TestParforNumpyCalls(unittest.TestCase):
+
+    def check(self, test_impl, *args):
+        cfunc = njit(parallel=True)(test_impl)
+        np.testing.assert_almost_equal(cfunc(*args), test_impl(*args))
+        self.assertIn('@do_scheduling', cfunc.inspect_llvm(cfunc.signatures[0]))
+
+    def test_arange(self):
+        def test_impl(n):
+            return np.arange(n) * 2
+        self.check(test_impl, 13)
+        self.check(test_impl, 0)
+        def test_impl_step(a, b):
+            return np.arange(a, b, 0.3)
+        self.check(test_impl_step, 1.0, 7.5)
+        self.check(test_impl_step, 7.5, 1.0)
+        argtys = (types.intp,)
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, argtys)), 1)
+
+    def test_linspace(self):
+        def test_impl(a, b, n):
+            return np.linspace(a, b, n)
+        self.check(test_impl, 1.0, 3.0, 7)
+        self.check(test_impl, 1, 3, 1)
+        # the last element is exactly stop, like in Numpy
+        for args in ((0.1, 0.7, 7), (-1.3, 2.9, 10001), (3, 1, 13)):
+            for cfunc in (njit(test_impl), njit(parallel=True)(test_impl)):
+                got = cfunc(*args)
+                self.assertEqual(got[-1], args[1])
+                np.testing.assert_array_equal(got[[0, -1]],
+                                              test_impl(*args)[[0, -1]])
+        argtys = (types.float64, types.float64, types.intp)
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, argtys)), 1)
+
+    def test_full(self):
+        def test_impl(n, v):
+            return np.full((n, 3), v)
+        self.check(test_impl, 5, 2.5)
+        argtys = (types.intp, types.float64)
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, argtys)), 1)
+
+    def test_where(self):
+        def test_impl(A, B):
+            return np.where(A > 10.0, A, B)
+        A = np.arange(20.0)
+        B = -np.arange(20.0)
+        self.check(test_impl, A, B)
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        self.assertEqual(countParfors(run_parfor_pass(test_impl,
+            (oneD_arg, oneD_arg))), 1)
+
+    def test_vvdot(self):
+        def test_impl(a, b):
+            return np.dot(a, b)
+        a = np.linspace(0, 1, 30)
+        b = np.linspace(2, 1, 30)
+        self.check(test_impl, a, b)
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        self.assertEqual(countParfors(run_parfor_pass(test_impl,
+            (oneD_arg, oneD_arg))), 1)
+        with self.assertRaises(ValueError):
+            njit(parallel=True)(test_impl)(a, b[:10])
+
+    def test_list_comprehension(self):
+        def test_impl(A):
+            n = A.shape[0]
+            B = np.array([A[i] * i for i in range(n)])
+            return B.sum()
+        A = np.arange(20.0)
+        self.check(test_impl, A)
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, (oneD_arg,))), 1)
+
+    def test_list_comprehension_used_list(self):
+        # the list itself is returned, so it can't be replaced by an array
+        def test_impl(n):
+            l = [i * 2 for i in range(n)]
+            return np.array(l), len(l)
+        cfunc = njit(parallel=True)(test_impl)
+        res = cfunc(10)
+        np.testing.assert_equal(res[0], test_impl(10)[0])
+        self.assertEqual(res[1], 10)
+        self.assertEqual(countParfors(run_parfor_pass(test_impl,
+            (types.intp,))), 0)
+
+
+class TestParforFusion(unittest.TestCase):
+
+    def test_map_reduction_fusion(self):
+        def test_impl(X):
+            A = X * 2
+            return A.sum()
+        X = np.arange(20.0)
+        cfunc = njit(parallel=True)(test_impl)
+        np.testing.assert_almost_equal(cfunc(X), test_impl(X))
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, (oneD_arg,))), 1)
+
+    def test_equivalent_shape_fusion(self):
+        def test_impl(A):
+            n = A.shape[0]
+            B = np.empty(n)
+            for i in numba.prange(n):
+                B[i] = A[i] * 2
+            return np.sum(B)
+        A = np.arange(20.0)
+        cfunc = njit(parallel=True)(test_impl)
+        np.testing.assert_almost_equal(cfunc(A), test_impl(A))
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, (oneD_arg,))), 1)
+
+    def test_reduction_use_no_fusion(self):
+        def test_impl(A):
+            s = A.sum()
+            return A / s
+        A = np.arange(1.0, 21.0)
+        cfunc = njit(parallel=True)(test_impl)
+        np.testing.assert_almost_equal(cfunc(A), test_impl(A))
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        self.assertEqual(countParfors(run_parfor_pass(test_impl, (oneD_arg,))), 2)
+
+    def test_array_contraction(self):
+        def test_impl(X):
+            A = X + 1
+            B = A * 2
+            return B.sum() + A.sum()
+        X = np.arange(20.0)
+        cfunc = njit(parallel=True)(test_impl)
+        np.testing.assert_almost_equal(cfunc(X), test_impl(X))
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        func_ir = run_parfor_pass(test_impl, (oneD_arg,))
+        self.assertEqual(countParfors(func_ir), 1)
+        # temporary arrays A and B are not allocated
+        self.assertEqual(countArrayAllocs(func_ir), 0)
+
+    def test_live_array_no_contraction(self):
+        def test_impl(X):
+            A = X + 1
+            s = A.sum()
+            return A, s
+        X = np.arange(20.0)
+        cfunc = njit(parallel=True)(test_impl)
+        A, s = cfunc(X)
+        np.testing.assert_almost_equal(A, X + 1)
+        self.assertEqual(s, (X + 1).sum())
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        func_ir = run_parfor_pass(test_impl, (oneD_arg,))
+        self.assertEqual(countArrayAllocs(func_ir), 1)
+
+    def test_assert_equiv(self):
+        def test_impl(A, B):
+            return A + B
+        cfunc = njit(parallel=True)(test_impl)
+        A = np.arange(5.0)
+        np.testing.assert_almost_equal(cfunc(A, A), test_impl(A, A))
+        with self.assertRaises(AssertionError):
+            cfunc(A, np.ones(1))
+
+
+def prange_scratch(A):
+    n = A.shape[0]
+    B = np.empty(n)
+    for i in numba.prange(n):
+        tmp = np.empty(3)
+        for j in range(3):
+            tmp[j] = A[i] * j
+        B[i] = tmp[0] + tmp[1] + tmp[2]
+    return B
+
+def prange_invariant(A, k):
+    n = A.shape[0]
+    B = np.empty(n)
+    for i in numba.prange(n):
+        c = np.ones(3)
+        m = k * 2 + 1
+        B[i] = A[i] * m + c[1]
+    return B
+
+def prange_written_alloc(n):
+    B = np.empty(n)
+    for i in numba.prange(n):
+        c = np.zeros(4)
+        c.fill(i)
+        d = np.ones((3, 2))
+        col = d[:, 0]
+        col[:] = i
+        B[i] = c[0] + c[3] + d[2, 0] + d[2, 1]
+    return B
+
+class TestParforHoisting(unittest.TestCase):
+
+    def get_parfor(self, func, args):
+        parfors = get_parfors(run_parfor_pass(func, args))
+        self.assertEqual(len(parfors), 1)
+        return parfors[0]
+
+    def test_hoist_invariants(self):
+        A = np.arange(10.0)
+        cfunc = njit(parallel=True)(prange_invariant)
+        np.testing.assert_almost_equal(cfunc(A, 3), prange_invariant(A, 3))
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        parfor = self.get_parfor(prange_invariant, (oneD_arg, types.intp))
+        init_defs = {stmt.target.name for stmt in parfor.init_block.body
+                     if isinstance(stmt, ir.Assign)}
+        self.assertIn('c', init_defs)
+        self.assertIn('m', init_defs)
+        self.assertFalse(parfor.private_allocs)
+
+    def test_no_hoist_written_alloc(self):
+        # arrays written through methods or views are not shared between
+        # threads
+        cfunc = njit(parallel=True)(prange_written_alloc)
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 0):
+            for _ in range(3):
+                np.testing.assert_almost_equal(cfunc(100000),
+                                               prange_written_alloc(100000))
+        parfor = self.get_parfor(prange_written_alloc, (types.intp,))
+        init_defs = {stmt.target.name for stmt in parfor.init_block.body
+                     if isinstance(stmt, ir.Assign)}
+        self.assertNotIn('c', init_defs)
+        self.assertNotIn('d', init_defs)
+
+    def test_hoist_scratch_per_thread(self):
+        A = np.arange(10.0)
+        cfunc = njit(parallel=True)(prange_scratch)
+        np.testing.assert_almost_equal(cfunc(A), prange_scratch(A))
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        parfor = self.get_parfor(prange_scratch, (oneD_arg,))
+        self.assertEqual(parfor.private_allocs, {'tmp'})
+        init_defs = {stmt.target.name for stmt in parfor.init_block.body
+                     if isinstance(stmt, ir.Assign)}
+        # scratch arrays are not shared between threads
+        self.assertNotIn('tmp', init_defs)
+
+    def test_hoist_diagnostics(self):
+        cfunc = njit(parallel=True)(prange_scratch)
+        cfunc(np.arange(10.0))
+        out = StringIO()
+        cfunc.parallel_diagnostics(level=2, file=out)
+        self.assertIn("(per thread)", out.getvalue())
+
+
+class TestParforDiagnostics(unittest.TestCase):
+
+    def get_report(self, cfunc, level):
+        out = StringIO()
+        cfunc.parallel_diagnostics(level=level, file=out)
+        return out.getvalue()
+
+    def test_fusion_report(self):
+        def test_impl(X):
+            A = X * 2
+            return A.sum()
+        cfunc = njit(parallel=True)(test_impl)
+        cfunc(np.arange(10.0))
+        report = self.get_report(cfunc, 2)
+        self.assertIn("array expression", report)
+        self.assertIn("sum reduction", report)
+        self.assertIn("fused into", report)
+        self.assertIn("reduction:", report)
+
+    def test_fusion_failure_reason(self):
+        def test_impl(A):
+            s = A.sum()
+            return A / s
+        cfunc = njit(parallel=True)(test_impl)
+        cfunc(np.arange(1.0, 11.0))
+        self.assertNotIn("not fused", self.get_report(cfunc, 1))
+        report = self.get_report(cfunc, 2)
+        self.assertIn("not fused into", report)
+        self.assertIn("cross iteration dependency", report)
+
+    def test_prange_report(self):
+        cfunc = njit(parallel=True)(prange_2d)
+        cfunc(np.zeros((3, 4)))
+        report = self.get_report(cfunc, 3)
+        self.assertIn("prange loop", report)
+        self.assertIn("collapsed into", report)
+        self.assertIn("begin parfor", report)
+
+    def test_instrumentation(self):
+        def test_impl(X):
+            A = X * 2
+            return A.sum()
+        with override_config('PARALLEL_DIAGNOSTICS_INSTRUMENT', 1):
+            cfunc = njit(parallel=True)(test_impl)
+            cfunc(np.arange(10.0))
+        cfunc(np.arange(10.0))
+        self.assertIn("launches: 2, iterations: 20", self.get_report(cfunc, 1))
+
+    def test_not_parallel(self):
+        cfunc = njit(prange_sum)
+        cfunc(np.arange(10.0))
+        self.assertIn("not compiled with parallel=True",
+                      self.get_report(cfunc, 1))
+
+
+class TestParforSequentialFallback(unittest.TestCase):
+
+    def test_small_loops_sequential(self):
+        def test_impl(X):
+            A = X * 2
+            return A.sum()
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 1000):
+            cfunc = njit(parallel=True)(test_impl)
+            # both the small and the large iteration space paths
+            for n in (0, 5, 10000):
+                X = np.arange(float(n))
+                np.testing.assert_almost_equal(cfunc(X), test_impl(X))
+        llvm = cfunc.inspect_llvm(cfunc.signatures[0])
+        self.assertIn('@do_scheduling', llvm)
+        self.assertIn('__gufunc__', llvm)
+
+    def test_reduction_sequential(self):
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 10**6):
+            cfunc = njit(parallel=True)(prange_sum)
+            A = np.arange(10.0)
+            np.testing.assert_almost_equal(cfunc(A), prange_sum(A))
+
+    def test_threshold_disabled(self):
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 0):
+            cfunc = njit(parallel=True)(prange_sum)
+            A = np.arange(10.0)
+            np.testing.assert_almost_equal(cfunc(A), prange_sum(A))
+        self.assertNotIn('__gufunc__', cfunc.inspect_llvm(cfunc.signatures[0]))
+
+    def test_cost_estimate(self):
+        def test_impl(X):
+            return X * 2 + 1
+        oneD_arg = types.Array(types.float64, 1, 'C')
+        parfor, = get_parfors(run_parfor_pass(test_impl, (oneD_arg,)))
+        self.assertGreater(numba.parfor.estimate_parfor_cost(parfor), 1)
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 1000):
+            threshold = numba.parfor.get_sequential_threshold(parfor)
+            self.assertGreater(threshold, 1)
+            self.assertLess(threshold, 1000)
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 0):
+            self.assertEqual(numba.parfor.get_sequential_threshold(parfor), 0)
+
+    def test_diagnostics_threshold(self):
+        def test_impl(X):
+            return X * 2
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 1000):
+            cfunc = njit(parallel=True)(test_impl)
+            cfunc(np.arange(10.0))
+        out = StringIO()
+        cfunc.parallel_diagnostics(level=2, file=out)
+        self.assertIn("sequential below", out.getvalue())
+
+
+def prange_sum(A):
+    s = 10.0
+    for i in numba.prange(A.shape[0]):
+        s += A[i]
+    return s
+
+def prange_2d(A):
+    m, n = A.shape
+    for i in numba.prange(m):
+        for j in numba.prange(n):
+            A[i, j] = i + 2 * j
+    return A
+
+def prange_nested_seq(A):
+    m, n = A.shape
+    s = 0.0
+    for i in numba.prange(m):
+        t = 0.0
+        for j in numba.prange(n):
+            t += A[i, j]
+        s += t
+    return s
+
+def prange_histogram(X, nbins):
+    hist = np.zeros(nbins, np.int64)
+    for i in numba.prange(X.shape[0]):
+        hist[int(X[i] * nbins)] += 1
+    return hist
+
+def prange_indirect_histogram(idx, nbins):
+    hist = np.zeros(nbins, np.int64)
+    for i in numba.prange(idx.shape[0]):
+        hist[idx[i]] += 1
+    return hist
+
+def prange_group_sum(keys, values, ngroups):
+    sums = np.ones((ngroups, 2))
+    for i in numba.prange(keys.shape[0]):
+        sums[keys[i], 0] = sums[keys[i], 0] + values[i]
+        sums[keys[i], 1] -= 1.0
+    return sums
+
+def prange_scatter_read(A, idx):
+    # B is read at other indices, which isn't a reduction
+    B = A.copy()
+    for i in numba.prange(idx.shape[0]):
+        B[idx[i]] += B[0]
+    return B
+
+class TestPrange(unittest.TestCase):
+
+    def test_prange_reduction(self):
+        A = np.arange(100.0)
+        cfunc = njit(parallel=True)(prange_sum)
+        np.testing.assert_almost_equal(cfunc(A), prange_sum(A))
+        self.assertIn('@do_scheduling', cfunc.inspect_llvm(cfunc.signatures[0]))
+
+    def test_prange_sub_reduction(self):
+        def test_impl(A):
+            s = 100.0
+            for i in numba.prange(A.shape[0]):
+                s -= A[i]
+            return s
+        A = np.arange(20.0)
+        cfunc = njit(parallel=True)(test_impl)
+        np.testing.assert_almost_equal(cfunc(A), test_impl(A))
+
+    def test_prange_2d_collapse(self):
+        A = np.zeros((13, 17))
+        cfunc = njit(parallel=True)(prange_2d)
+        np.testing.assert_array_equal(cfunc(A.copy()), prange_2d(A.copy()))
+        self.assertIn('@do_scheduling', cfunc.inspect_llvm(cfunc.signatures[0]))
+        twoD_arg = types.Array(types.float64, 2, 'C')
+        func_ir = run_parfor_pass(prange_2d, (twoD_arg,))
+        parfors = get_parfors(func_ir)
+        self.assertEqual(len(parfors), 1)
+        self.assertEqual(len(parfors[0].loop_nests), 2)
+
+    def test_prange_nested_sequential(self):
+        A = np.arange(60.0).reshape(6, 10)
+        cfunc = njit(parallel=True)(prange_nested_seq)
+        np.testing.assert_almost_equal(cfunc(A), prange_nested_seq(A))
+
+    def test_prange_array_reduction(self):
+        cfunc = njit(parallel=True)(prange_histogram)
+        np.random.seed(0)
+        for n in (10, 100000):
+            X = np.random.random(n)
+            with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 0):
+                got = njit(parallel=True)(prange_histogram)(X, 7)
+            np.testing.assert_array_equal(got, prange_histogram(X, 7))
+            np.testing.assert_array_equal(cfunc(X, 7), prange_histogram(X, 7))
+        self.assertEqual(cfunc(X, 7).sum(), X.size)
+
+    def test_prange_array_reduction_2d(self):
+        np.random.seed(0)
+        keys = np.random.randint(0, 5, 50000)
+        values = np.random.random(50000)
+        cfunc = njit(parallel=True)(prange_group_sum)
+        np.testing.assert_almost_equal(cfunc(keys, values, 5),
+                                       prange_group_sum(keys, values, 5))
+
+    def test_prange_indirect_array_reduction(self):
+        # the bins are looked up with the parfor index: a few bins updated by
+        # all the threads lose counts unless the histogram is privatized
+        np.random.seed(0)
+        idx = np.random.randint(0, 4, 2000000)
+        cfunc = njit(parallel=True)(prange_indirect_histogram)
+        with override_config('PARALLEL_SEQUENTIAL_THRESHOLD', 0):
+            for _ in range(5):
+                np.testing.assert_array_equal(cfunc(idx, 4),
+                                              np.bincount(idx, minlength=4))
+
+    def test_array_reduction_detection(self):
+        arr_arg = types.Array(types.float64, 1, 'C')
+        func_ir = run_parfor_pass(prange_histogram, (arr_arg, types.intp))
+        reductions = {}
+        for parfor in get_parfors(func_ir):
+            reductions.update(numba.parfor.get_parfor_reductions(parfor)[1])
+        self.assertEqual(len(reductions), 1)
+        name, ops = reductions.popitem()
+        self.assertTrue(name.startswith('hist'))
+        self.assertEqual(ops, ('+=', '+'))
+
+        idx_arg = types.Array(types.intp, 1, 'C')
+        func_ir = run_parfor_pass(prange_indirect_histogram,
+                                  (idx_arg, types.intp))
+        reductions = {}
+        for parfor in get_parfors(func_ir):
+            reductions.update(numba.parfor.get_parfor_array_reductions(parfor))
+        self.assertEqual(len(reductions), 1)
+        name, ops = reductions.popitem()
+        self.assertTrue(name.startswith('hist'))
+
+        # += and -= updates of the same array are both combined with +
+        func_ir = run_parfor_pass(prange_group_sum,
+                                  (idx_arg, arr_arg, types.intp))
+        reductions = {}
+        for parfor in get_parfors(func_ir):
+            reductions.update(numba.parfor.get_parfor_array_reductions(parfor))
+        self.assertEqual(len(reductions), 1)
+        name, ops = reductions.popitem()
+        self.assertTrue(name.startswith('sums'))
+        self.assertEqual(ops, ('+=', '+'))
+
+        func_ir = run_parfor_pass(prange_scatter_read, (arr_arg, idx_arg))
+        for parfor in get_parfors(func_ir):
+            self.assertEqual(numba.parfor.get_parfor_array_reductions(parfor),
+                             {})
+
+    def test_prange_no_parallel(self):
+        # without parallel=True, prange is compiled as range
+        A = np.arange(10.0)
+        cfunc = njit(prange_sum)
+        np.testing.assert_almost_equal(cfunc(A), prange_sum(A))
+        self.assertEqual(list(numba.prange(1, 5)), list(range(1, 5)))
+
 if __name__ == "__main__":
     unittest.main()
@@ -9,20 +9,19 @@ import sys
 import numpy as np
 
 from numba.compiler import compile_isolated, Flags
-from numba import jit, types, utils
+from numba import errors, jit, types, utils
 import numba.unittest_support as unittest
 from numba import testing
 from .support import TestCase, MemoryLeakMixin, tag
 
 from numba.targets.quicksort import make_py_quicksort, make_jit_quicksort
-from .timsort import make_py_timsort, make_jit_timsort, MergeRun
-
-
-def make_temp_list(keys, n):
-    return [keys[0]] * n
-
-def make_temp_array(keys, n):
-    return np.empty(n, keys.dtype)
+from numba.targets.mergesort import (make_py_mergesort, make_jit_mergesort,
+                                     make_parallel_sort)
+from numba.targets.radixsort import (make_py_radixsort, make_jit_radixsort,
+                                     RADIX_SORT_THRESHOLD)
+from numba.targets.selection import make_py_selection, make_jit_selection
+from numba.targets.timsort import (make_py_timsort, make_jit_timsort,
+                                   make_temp_list, make_temp_array, MergeRun)
 
 
 py_list_timsort = make_py_timsort(make_temp_list)
@@ -37,6 +36,14 @@ py_quicksort = make_py_quicksort()
 
 jit_quicksort = make_jit_quicksort()
 
+py_mergesort = make_py_mergesort()
+
+jit_mergesort = make_jit_mergesort()
+
+py_selection = make_py_selection()
+
+jit_selection = make_jit_selection()
+
 
 def sort_usecase(val):
     val.sort()
@@ -56,6 +63,45 @@ def np_sort_usecase(val):
 def np_argsort_usecase(val):
     return np.argsort(val)
 
+def sort_kind_usecase(val):
+    val.sort(kind='mergesort')
+
+def argsort_kind_usecase(val):
+    return val.argsort(kind='mergesort')
+
+def np_sort_kind_usecase(val):
+    return np.sort(val, kind='mergesort')
+
+def np_argsort_kind_usecase(val):
+    return np.argsort(val, kind='mergesort')
+
+def np_argsort_quicksort_usecase(val):
+    return np.argsort(val, 'quicksort')
+
+def np_sort_order_usecase(val):
+    return np.sort(val, order='b')
+
+def sort_order_usecase(val):
+    val.sort(order=('b', 'a'))
+
+def np_argsort_order_usecase(val):
+    return np.argsort(val, order=('b', 'a'))
+
+def argsort_order_usecase(val):
+    return val.argsort()
+
+def np_argsort_order_kind_usecase(val):
+    return np.argsort(val, kind='mergesort', order=('c', 'b'))
+
+def np_lexsort_usecase(keys):
+    return np.lexsort(keys)
+
+def np_partition_usecase(val, kth):
+    return np.partition(val, kth)
+
+def np_argpartition_usecase(val, kth):
+    return np.argpartition(val, kth)
+
 def list_sort_usecase(n):
     np.random.seed(42)
     l = []
@@ -74,6 +120,19 @@ def list_sort_reverse_usecase(n, b):
     ll.sort(reverse=b)
     return l, ll
 
+@jit(nopython=True)
+def mod_key(x):
+    return x % 10
+
+def list_sort_key_usecase(lst, b):
+    lst.sort(key=mod_key, reverse=b)
+
+def sorted_key_usecase(val, key):
+    return sorted(val, key=key)
+
+def sorted_key_reverse_usecase(val, b):
+    return sorted(val, reverse=b, key=mod_key)
+
 
 class BaseSortingTest(object):
 
@@ -707,6 +766,252 @@ class TestQuicksortArrays(BaseQuicksortTest, TestCase):
         return np.array(lst, dtype=np.float64)
 
 
+class BaseMergesortTest(BaseSortingTest):
+
+    def test_merge(self):
+        f = self.mergesort.merge
+        for a, b in [([1, 3, 5], [2, 4, 6]), ([], [1, 2]), ([1, 2], []),
+                     ([1, 1, 2], [1, 2, 2])]:
+            src = self.array_factory(a + b)
+            dst = self.array_factory([-1] * (len(a) + len(b) + 2))
+            f(src, src, dst, 0, len(a), len(a), len(a) + len(b), 1)
+            self.assertEqual(dst[0], -1)
+            self.assertEqual(dst[-1], -1)
+            self.assertSorted(a + b, dst[1:-1])
+
+    def test_corank(self):
+        f = self.mergesort.corank
+        a = [1, 2, 2, 5, 7]
+        b = [2, 3, 5, 8]
+        src = self.array_factory(a + b)
+        merged = sorted([(x, 0, i) for i, x in enumerate(a)] +
+                        [(x, 1, i) for i, x in enumerate(b)])
+        for k in range(len(merged) + 1):
+            expected = len([m for m in merged[:k] if m[1] == 0])
+            self.assertEqual(f(src, src, k, 0, len(a), len(a) + len(b)),
+                             expected)
+
+    @tag('important')
+    def test_run_mergesort(self):
+        f = self.mergesort.run_mergesort
+
+        for size_factor in (1, 5):
+            sizes = (15, 20)
+
+            all_lists = [self.make_sample_lists(n * size_factor) for n in sizes]
+            for chunks in itertools.product(*all_lists):
+                orig_keys = sum(chunks, [])
+                keys = self.array_factory(orig_keys)
+                f(keys)
+                self.assertSorted(orig_keys, keys)
+
+    def test_run_mergesort_stable(self):
+        f = self.make_mergesort(is_argsort=True).run_mergesort
+
+        for n in (5, 20, 100):
+            orig_keys = self.duprandom_list(n, factor=4)
+            keys = self.array_factory(orig_keys)
+            res = f(keys)
+            # argsort of a stable sort orders equal keys by index
+            got = [(orig_keys[i], i) for i in res]
+            self.assertEqual(got, sorted(got))
+
+
+class TestMergesortPurePython(BaseMergesortTest, TestCase):
+
+    mergesort = py_mergesort
+    make_mergesort = staticmethod(make_py_mergesort)
+
+    def array_factory(self, lst):
+        return np.array(lst, dtype=np.float64)
+
+
+class TestMergesortArrays(BaseMergesortTest, TestCase):
+
+    mergesort = jit_mergesort
+    make_mergesort = staticmethod(make_jit_mergesort)
+
+    def array_factory(self, lst):
+        return np.array(lst, dtype=np.float64)
+
+
+class BaseRadixsortTest(BaseSortingTest):
+
+    dtypes = (np.int8, np.int32, np.int64, np.uint16, np.uint64,
+              np.float32, np.float64)
+
+    def sample_arrays(self, dtype, n=300):
+        np.random.seed(42)
+        if np.dtype(dtype).kind == 'f':
+            arr = np.random.random(n) - 0.5
+            arr *= 10.0 ** np.random.randint(-3, 4, n)
+            arr[::17] = np.nan
+            arr[::19] = np.inf
+            arr[::23] = -np.inf
+            arr[::29] = 0.0
+            yield arr.astype(dtype)
+        else:
+            # The conversion wraps around for the smaller types
+            yield np.random.randint(-2 ** 62, 2 ** 62, n).astype(dtype)
+            # Only the low bytes differ
+            yield np.random.randint(0, 50, n).astype(dtype)
+        yield np.zeros(n, dtype)
+
+    def test_make_keys(self):
+        for dtype in self.dtypes:
+            f = self.make_radixsort(dtype).make_keys
+            for orig in self.sample_arrays(dtype):
+                keys = f(orig)
+                self.assertEqual(keys.dtype.kind, 'u')
+                self.assertEqual(keys.itemsize, orig.itemsize)
+                # Keys are ordered like the elements, NaNs last
+                keys = keys[np.argsort(orig, kind='mergesort')]
+                self.assertTrue(np.all(keys[:-1] <= keys[1:]))
+
+    def test_radix_sort(self):
+        for dtype in self.dtypes:
+            f = self.make_radixsort(dtype).radix_sort
+            for orig in self.sample_arrays(dtype):
+                keys = orig.view('u%d' % orig.itemsize).copy()
+                values = np.arange(len(keys))
+                got_keys, got_values = f(keys.copy(), values)
+                expected = np.argsort(keys, kind='mergesort')
+                self.assertPreciseEqual(got_keys, keys[expected])
+                # This checks sort stability
+                self.assertPreciseEqual(got_values, expected)
+
+    def test_run_radixsort(self):
+        for dtype in self.dtypes:
+            f = self.make_radixsort(dtype).run_radixsort
+            for orig in self.sample_arrays(dtype):
+                got = orig.copy()
+                f(got)
+                self.assertPreciseEqual(got, np.sort(orig))
+
+    def test_run_radixsort_argsort(self):
+        for dtype in self.dtypes:
+            f = self.make_radixsort(dtype, is_argsort=True).run_radixsort
+            for orig in self.sample_arrays(dtype):
+                got = f(orig)
+                # The radix sort is stable
+                self.assertPreciseEqual(got, np.argsort(orig, kind='mergesort'))
+
+
+class TestRadixsortPurePython(BaseRadixsortTest, TestCase):
+
+    make_radixsort = staticmethod(make_py_radixsort)
+
+
+class TestRadixsortArrays(BaseRadixsortTest, TestCase):
+
+    make_radixsort = staticmethod(make_jit_radixsort)
+
+
+class BaseSelectionTest(BaseSortingTest):
+
+    def make_adversarial_lists(self, n):
+        """
+        Lists that make median-of-three partitions degenerate, so that
+        the median-of-medians fallback is exercised.
+        """
+        lists = [[7] * n, [1, 2] * (n // 2)]
+        # Organ pipe: the median of three is always next to the extremes
+        k = n // 2
+        lists.append(list(range(k)) + list(range(n - k, 0, -1)))
+        return lists
+
+    def assertSelected(self, orig, result, k):
+        self.assertSorted(orig, sorted(result))
+        expected = sorted(orig)[k]
+        self.assertEqual(result[k], expected)
+        for i in range(k):
+            self.assertLessEqual(result[i], expected)
+        for i in range(k + 1, len(result)):
+            self.assertGreaterEqual(result[i], expected)
+
+    def test_partition3(self):
+        n = 20
+        f = self.selection.partition3
+        for l in (self.random_list(n), self.duprandom_list(n)):
+            for p in (1, n // 2, n):
+                res = self.array_factory([9999] + l + [-9999])
+                pivot = res[p]
+                lt, gt = f(res, res, 1, n, p)
+                self.assertEqual(res[0], 9999)
+                self.assertEqual(res[-1], -9999)
+                for i in range(1, lt):
+                    self.assertLess(res[i], pivot)
+                for i in range(lt, gt + 1):
+                    self.assertEqual(res[i], pivot)
+                for i in range(gt + 1, n + 1):
+                    self.assertGreater(res[i], pivot)
+
+    def test_select_mom(self):
+        f = self.selection.select_mom
+        for n in (1, 9, 57, 300):
+            for l in (self.random_list(n), self.duprandom_list(n)):
+                for k in (0, n // 3, n - 1):
+                    res = self.array_factory(l)
+                    f(res, res, k, 0, n - 1)
+                    self.assertSelected(l, res, k)
+
+    @tag('important')
+    def test_select(self):
+        f = self.selection.select
+        for n in (2, 20, 100, 1000):
+            lists = self.make_sample_lists(n) + self.make_adversarial_lists(n)
+            for l in lists:
+                for k in (0, n // 2, n - 1):
+                    res = self.array_factory(l)
+                    self.assertEqual(f(res, res, k, 0, n - 1), sorted(l)[k])
+                    self.assertSelected(l, res, k)
+
+    def test_select_two(self):
+        f = self.selection.select_two
+        for n in (2, 20, 1000):
+            for l in self.make_sample_lists(n) + self.make_adversarial_lists(n):
+                for k in (0, n // 2 - 1, n - 2):
+                    res = self.array_factory(l)
+                    self.assertEqual(f(res, res, k, 0, n - 1),
+                                     tuple(sorted(l)[k:k + 2]))
+                    self.assertSelected(l, res, k)
+                    self.assertSelected(l, res, k + 1)
+
+    def test_select_multiple(self):
+        f = self.selection.select_multiple
+        n = 500
+        kth = np.array([0, 3, 100, 101, 250, 499], dtype=np.intp)
+        for l in self.make_sample_lists(n) + self.make_adversarial_lists(n):
+            res = self.array_factory(l)
+            f(res, res, kth, 0, n - 1)
+            for k in kth:
+                self.assertSelected(l, res, k)
+
+    def test_move_nans(self):
+        f = self.selection.move_nans
+        l = [1.0, float('nan'), 2.0, float('nan'), 0.5]
+        res = self.array_factory(l)
+        self.assertEqual(f(res, res, 0, 4), 3)
+        self.assertEqual(sorted(res[:3]), [0.5, 1.0, 2.0])
+        self.assertTrue(all(math.isnan(v) for v in res[3:]))
+
+
+class TestSelectionPurePython(BaseSelectionTest, TestCase):
+
+    selection = py_selection
+
+    # Much faster than a Numpy array in pure Python
+    array_factory = list
+
+
+class TestSelectionArrays(BaseSelectionTest, TestCase):
+
+    selection = jit_selection
+
+    def array_factory(self, lst):
+        return np.array(lst, dtype=np.float64)
+
+
 class TestNumpySort(TestCase):
 
     def setUp(self):
@@ -814,6 +1119,301 @@ class TestNumpySort(TestCase):
         check(np_argsort_usecase)
 
 
+    def test_sort_radix(self):
+        # Large arrays of integers and floats are radix-sorted
+        n = 2 * RADIX_SORT_THRESHOLD + 1
+        arrays = [np.random.randint(-1000, 1000, n).astype(np.int32),
+                  np.random.randint(-2 ** 62, 2 ** 62, n),
+                  np.random.randint(1000, size=n).astype(np.uint64),
+                  np.random.random(n).astype(np.float32) - 0.5]
+        orig = np.random.random(n) - 0.5
+        orig[::7] = np.nan
+        orig[::11] = -np.inf
+        arrays.append(orig)
+        for orig in arrays:
+            pyfunc = np_sort_usecase
+            self.check_sort_copy(pyfunc, jit(nopython=True)(pyfunc), orig)
+            pyfunc = sort_usecase
+            self.check_sort_inplace(pyfunc, jit(nopython=True)(pyfunc), orig)
+            for pyfunc in (argsort_usecase, np_argsort_usecase):
+                self.check_argsort(pyfunc, jit(nopython=True)(pyfunc), orig)
+
+    def test_sort_kind(self):
+        pyfunc = sort_kind_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in itertools.chain(self.int_arrays(), self.float_arrays()):
+            self.check_sort_inplace(pyfunc, cfunc, orig)
+        pyfunc = np_sort_kind_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in itertools.chain(self.int_arrays(), self.float_arrays()):
+            self.check_sort_copy(pyfunc, cfunc, orig)
+
+    def test_argsort_kind(self):
+        # mergesort is stable, so results match Numpy even with duplicates
+        for pyfunc in (argsort_kind_usecase, np_argsort_kind_usecase):
+            cfunc = jit(nopython=True)(pyfunc)
+            for orig in itertools.chain(self.int_arrays(),
+                                        self.float_arrays()):
+                self.assertPreciseEqual(cfunc(orig), pyfunc(orig))
+        pyfunc = np_argsort_quicksort_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in self.int_arrays():
+            self.check_argsort(pyfunc, cfunc, orig)
+
+    def test_argsort_kind_runs(self):
+        # Stable sorts merge the runs already in the data, ascending or
+        # descending, and keep equal keys (including NaNs) in order
+        n = 1000
+        arrays = [np.arange(n), np.arange(n)[::-1],
+                  np.repeat(np.arange(10), 100),
+                  np.concatenate([np.arange(n), np.arange(n) // 2]),
+                  np.array([np.nan, 1.0, np.nan, 0.0, np.nan, 1.0])]
+        for pyfunc in (np_argsort_kind_usecase, np_sort_kind_usecase):
+            cfunc = jit(nopython=True)(pyfunc)
+            for orig in arrays:
+                self.assertPreciseEqual(cfunc(orig), pyfunc(orig))
+
+    def record_arrays(self):
+        dtype = np.dtype([('a', np.int32), ('b', np.float64),
+                          ('c', np.complex128)])
+        for size in (5, 50, 500):
+            orig = np.empty(size, dtype)
+            orig['a'] = np.random.randint(5, size=size)
+            orig['b'] = np.random.randint(10, size=size) / 2.0
+            orig['b'][np.random.random(size=size) < 0.1] = float('nan')
+            orig['c'] = (np.random.randint(3, size=size)
+                         + 1j * np.random.randint(3, size=size))
+            yield orig
+
+    def check_records(self, got, expected):
+        self.assertEqual(got.dtype, expected.dtype)
+        for name in expected.dtype.names:
+            self.assertPreciseEqual(got[name], expected[name])
+
+    def test_sort_order(self):
+        pyfunc = np_sort_order_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in self.record_arrays():
+            val = orig.copy()
+            self.check_records(cfunc(val), pyfunc(orig))
+            self.check_records(val, orig)
+        pyfunc = sort_order_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in self.record_arrays():
+            expected = orig.copy()
+            got = orig.copy()
+            pyfunc(expected)
+            cfunc(got)
+            self.check_records(got, expected)
+
+    def test_argsort_order(self):
+        for pyfunc in (np_argsort_order_usecase, argsort_order_usecase):
+            cfunc = jit(nopython=True)(pyfunc)
+            for orig in self.record_arrays():
+                got = cfunc(orig)
+                self.assertPreciseEqual(np.sort(got), np.arange(len(orig)))
+                # Equal records may be permuted
+                self.check_records(orig[got], orig[pyfunc(orig)])
+        # Stable sorts match Numpy
+        pyfunc = np_argsort_order_kind_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for orig in self.record_arrays():
+            self.assertPreciseEqual(cfunc(orig), pyfunc(orig))
+
+    def test_sort_order_errors(self):
+        def no_fields(val):
+            return np.argsort(val, order='a')
+
+        def unknown_field(val):
+            return np.sort(val, order=('b', 'z'))
+
+        with self.assertRaises(errors.TypingError) as raises:
+            jit(nopython=True)(no_fields)(np.arange(3))
+        self.assertIn("cannot specify order when the array has no fields",
+                      str(raises.exception))
+        rec = np.zeros(3, [('a', np.int32), ('b', np.float64)])
+        with self.assertRaises(errors.TypingError) as raises:
+            jit(nopython=True)(unknown_field)(rec)
+        self.assertIn("unknown field 'z' in sort order",
+                      str(raises.exception))
+
+    def test_lexsort(self):
+        pyfunc = np_lexsort_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        n = 500
+        a = np.random.randint(5, size=n)
+        b = np.random.randint(10, size=n) / 2.0
+        b[np.random.random(size=n) < 0.1] = float('nan')
+        c = np.random.random(size=n) < 0.5
+        for keys in [(a,), (a, b), (b, a), (a, b, c), (c, b[::2], a[:250]),
+                     a, np.random.randint(3, size=(3, n)),
+                     np.random.randint(3, size=(n, 4)).T,
+                     (a[:0], b[:0])]:
+            self.assertPreciseEqual(cfunc(keys), pyfunc(keys))
+
+    def test_lexsort_errors(self):
+        cfunc = jit(nopython=True)(np_lexsort_usecase)
+        with self.assertRaises(ValueError) as raises:
+            cfunc((np.arange(3), np.arange(4)))
+        self.assertIn("all keys need to be the same shape",
+                      str(raises.exception))
+        with self.assertRaises(TypeError) as raises:
+            cfunc(np.zeros((0, 3)))
+        self.assertIn("need sequence of keys with len > 0",
+                      str(raises.exception))
+
+    def check_partition(self, orig, got, kth):
+        expected = np.sort(orig, axis=-1)
+        for k in np.atleast_1d(kth):
+            self.assertPreciseEqual(got[..., k], expected[..., k])
+            self.assertTrue(np.all(got[..., :k] <= got[..., k:k + 1]) or
+                            np.isnan(got[..., k]).all())
+            self.assertFalse(np.any(got[..., k + 1:] < got[..., k:k + 1]))
+        self.assertPreciseEqual(np.sort(got, axis=-1), expected)
+
+    def test_np_partition(self):
+        pyfunc = np_partition_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        arrays = itertools.chain(self.int_arrays(), self.float_arrays())
+        for orig in arrays:
+            n = orig.size
+            for kth in (0, n // 2, -1, [1, n // 3, n - 2], (n - 1, 0, 0)):
+                val = orig.copy()
+                got = cfunc(val, kth)
+                self.check_partition(orig, got, kth if kth != -1 else n - 1)
+                self.assertPreciseEqual(val, orig)
+        # 2D arrays are partitioned along the last axis
+        orig = np.random.random((7, 40))
+        got = cfunc(orig, np.array([3, 20]))
+        self.check_partition(orig, got, [3, 20])
+        got = cfunc(orig.T, 2)
+        self.check_partition(orig.T, got, 2)
+
+    def test_np_partition_adversarial(self):
+        cfunc = jit(nopython=True)(np_partition_usecase)
+        n = 5000
+        for orig in (np.full(n, 7.0), np.tile([1, 2], n // 2),
+                     np.concatenate([np.arange(n // 2),
+                                     np.arange(n // 2, 0, -1)])):
+            kth = [0, n // 2, n - 1]
+            self.check_partition(orig, cfunc(orig, kth), kth)
+
+    def test_np_argpartition(self):
+        pyfunc = np_argpartition_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        arrays = itertools.chain(self.int_arrays(), self.float_arrays())
+        for orig in arrays:
+            n = orig.size
+            for kth in (0, n // 2, [1, n // 3, n - 2]):
+                got = cfunc(orig, kth)
+                self.assertPreciseEqual(np.sort(got), np.arange(n))
+                self.check_partition(orig, orig[got], kth)
+        orig = np.random.random((7, 40))
+        got = cfunc(orig, 10)
+        self.check_partition(orig, np.take_along_axis(orig, got, axis=-1)
+                             if hasattr(np, 'take_along_axis')
+                             else orig[np.arange(7)[:, None], got], 10)
+
+    def test_np_partition_errors(self):
+        cfunc = jit(nopython=True)(np_partition_usecase)
+        for kth in (5, -6, [0, 5]):
+            with self.assertRaises(ValueError) as raises:
+                cfunc(np.arange(5), kth)
+            self.assertIn("kth out of bounds", str(raises.exception))
+
+    def test_sort_kind_errors(self):
+        def bad_kind(val):
+            return np.sort(val, kind='bogosort')
+
+        with self.assertRaises(errors.TypingError) as raises:
+            jit(nopython=True)(bad_kind)(np.arange(3))
+        self.assertIn("sort kind must be a constant string",
+                      str(raises.exception))
+
+    def test_sort_bad_arguments(self):
+        # Arguments not matching np.sort()'s signature fail typing instead
+        # of raising TypeError from the typing template
+        def bad_keyword(val):
+            return np.sort(val, bogus=1)
+
+        def too_many(val):
+            return np.argsort(val, -1, 'quicksort', None, 1)
+
+        for pyfunc in (bad_keyword, too_many):
+            with self.assertRaises(errors.TypingError) as raises:
+                jit(nopython=True)(pyfunc)(np.arange(3))
+            self.assertIn("Invalid usage of", str(raises.exception))
+
+
+class TestParallelSort(TestCase):
+
+    def setUp(self):
+        np.random.seed(42)
+
+    def arrays(self):
+        for size in (0, 1, 7, 100, 1001, 5000):
+            yield np.random.randint(50, size=size)
+            yield np.random.random(size=size) * 100
+            orig = np.random.random(size=size) * 100
+            orig[np.random.random(size=size) < 0.1] = float('nan')
+            yield orig
+
+    def check_parallel_sort(self, kind, is_argsort):
+        from numba.targets.arrayobj import get_sort_func, lt_floats
+        for orig in self.arrays():
+            is_float = orig.dtype.kind == 'f'
+            run_sort = get_sort_func(is_float, is_argsort, kind)
+            # a zero threshold and many chunks exercise the parallel path
+            # on small arrays
+            impl = make_parallel_sort(run_sort,
+                                      lt=lt_floats if is_float else None,
+                                      is_argsort=is_argsort, threshold=0,
+                                      nchunks=5)
+            if is_argsort:
+                got = impl.run_parallel_sort(orig)
+                expected = np.argsort(orig, kind='mergesort')
+                self.assertPreciseEqual(orig[got], orig[expected])
+                if kind == 'mergesort':
+                    self.assertPreciseEqual(got, expected)
+            else:
+                got = impl.run_parallel_sort_copy(orig)
+                self.assertPreciseEqual(got, np.sort(orig))
+                val = orig.copy()
+                impl.run_parallel_sort(val)
+                self.assertPreciseEqual(val, np.sort(orig))
+
+    def test_parallel_sort(self):
+        self.check_parallel_sort('quicksort', False)
+
+    def test_parallel_mergesort(self):
+        self.check_parallel_sort('mergesort', False)
+
+    def test_parallel_argsort(self):
+        self.check_parallel_sort('quicksort', True)
+
+    def test_parallel_argsort_mergesort(self):
+        self.check_parallel_sort('mergesort', True)
+
+    @tag('important')
+    def test_parallel_jit(self):
+        from numba.targets.mergesort import PARALLEL_SORT_THRESHOLD
+        n = 2 * PARALLEL_SORT_THRESHOLD + 17
+        arrays = [np.random.random(n), np.random.randint(1000, size=n)]
+        for pyfunc in (np_sort_usecase, np_sort_kind_usecase):
+            cfunc = jit(nopython=True, parallel=True)(pyfunc)
+            for orig in arrays:
+                self.assertPreciseEqual(cfunc(orig), pyfunc(orig))
+        for pyfunc in (np_argsort_kind_usecase, argsort_kind_usecase):
+            cfunc = jit(nopython=True, parallel=True)(pyfunc)
+            for orig in arrays:
+                self.assertPreciseEqual(cfunc(orig), pyfunc(orig))
+        cfunc = jit(nopython=True, parallel=True)(sort_usecase)
+        for orig in arrays:
+            got = orig.copy()
+            cfunc(got)
+            self.assertPreciseEqual(got, np.sort(orig))
+
+
 class TestPythonSort(TestCase):
 
     @tag('important')
@@ -847,6 +1447,40 @@ class TestPythonSort(TestCase):
             self.assertPreciseEqual(got, expected)
             self.assertNotEqual(list(orig), got)   # sanity check
 
+    def test_list_sort_key(self):
+        pyfunc = list_sort_key_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+
+        random.seed(42)
+        orig = [random.randint(0, 100) for i in range(500)]
+        for b in (False, True):
+            got = orig[:]
+            cfunc(got, b)
+            # The sort is stable, also in reverse
+            self.assertEqual(got, sorted(orig, key=mod_key.py_func,
+                                         reverse=b))
+
+    def test_sorted_key(self):
+        pyfunc = sorted_key_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+
+        orig = np.random.random(size=100) * 100
+        self.assertPreciseEqual(cfunc(orig, mod_key),
+                                sorted(orig, key=mod_key.py_func))
+        pyfunc = sorted_key_reverse_usecase
+        cfunc = jit(nopython=True)(pyfunc)
+        for b in (False, True):
+            self.assertPreciseEqual(cfunc(orig, b),
+                                    sorted(orig, key=mod_key.py_func,
+                                           reverse=b))
+
+    def test_sorted_key_errors(self):
+        def bad_key(val):
+            return sorted(val, key=1)
+
+        with self.assertRaises(errors.TypingError):
+            jit(nopython=True)(bad_key)(np.arange(3))
+
     def test_sorted_reverse(self):
         pyfunc = sorted_reverse_usecase
         cfunc = jit(nopython=True)(pyfunc)
@@ -0,0 +1,118 @@
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+import numba
+from numba import unittest_support as unittest
+from numba import njit, stencil, types
+from numba.tests.test_parfors import countParfors, run_parfor_pass
+
+
+@stencil
+def stencil1_kernel(a):
+    return 0.25 * (a[0, 1] + a[1, 0] + a[0, -1] + a[-1, 0])
+
+@stencil(neighborhood=((-2, 2),), cval=-1.0)
+def moving_avg_kernel(a):
+    s = 0.0
+    for i in range(-2, 3):
+        s += a[i]
+    return s / 5
+
+@stencil('skip')
+def jacobi_kernel(a):
+    return 0.25 * (a[0, 1] + a[1, 0] + a[0, -1] + a[-1, 0])
+
+@stencil(standard_indexing=("c",))
+def weighted_kernel(a, c):
+    return c[0] * a[-1] + c[1] * a[0] + c[2] * a[1]
+
+@stencil
+def add_kernel(a, b):
+    return a[-1] + b[1]
+
+def stencil1_expected(a):
+    out = np.zeros_like(a)
+    out[1:-1, 1:-1] = 0.25 * (a[1:-1, 2:] + a[2:, 1:-1] + a[1:-1, :-2]
+                              + a[:-2, 1:-1])
+    return out
+
+def stencil_call(a):
+    return stencil1_kernel(a)
+
+
+class TestStencil(unittest.TestCase):
+
+    def test_stencil1(self):
+        A = np.arange(42.0).reshape(6, 7) ** 2
+        np.testing.assert_almost_equal(stencil1_kernel(A),
+                                       stencil1_expected(A))
+
+    def test_stencil_jit(self):
+        A = np.arange(42.0).reshape(6, 7) ** 2
+        cfunc = njit(stencil_call)
+        np.testing.assert_almost_equal(cfunc(A), stencil1_expected(A))
+
+    def test_stencil_parallel(self):
+        A = np.arange(42.0).reshape(6, 7) ** 2
+        cfunc = njit(parallel=True)(stencil_call)
+        np.testing.assert_almost_equal(cfunc(A), stencil1_expected(A))
+        self.assertIn('@do_scheduling', cfunc.inspect_llvm(cfunc.signatures[0]))
+
+    def test_stencil_parfor(self):
+        from numba.targets.registry import cpu_target
+        twoD_arg = types.Array(types.float64, 2, 'C')
+        func_ir = run_parfor_pass(stencil_call, (twoD_arg,),
+                                  cpu_target.typing_context)
+        self.assertEqual(countParfors(func_ir), 1)
+
+    def test_stencil_neighborhood_cval(self):
+        A = np.arange(10.0)
+        expected = np.full(10, -1.0)
+        for i in range(2, 8):
+            expected[i] = A[i-2:i+3].sum() / 5
+        np.testing.assert_almost_equal(moving_avg_kernel(A), expected)
+
+    def test_stencil_skip_out(self):
+        A = np.zeros((5, 5))
+        A[:, 0] = 1.0
+        Anew = np.full((5, 5), 7.0)
+        res = jacobi_kernel(A, out=Anew)
+        self.assertIs(res, Anew)
+        expected = np.full((5, 5), 7.0)
+        expected[1:-1, 1:-1] = stencil1_expected(A)[1:-1, 1:-1]
+        np.testing.assert_almost_equal(Anew, expected)
+        # without out, border elements are taken from the input
+        np.testing.assert_almost_equal(jacobi_kernel(A)[:, 0], A[:, 0])
+
+    def test_stencil_standard_indexing(self):
+        A = np.arange(8.0)
+        c = np.array([1.0, -2.0, 1.0])
+        res = weighted_kernel(A, c)
+        self.assertEqual(res[0], 0)
+        np.testing.assert_almost_equal(res[1:-1], A[:-2] - 2*A[1:-1] + A[2:])
+
+    def test_stencil_shape_mismatch(self):
+        A = np.arange(8.0)
+        np.testing.assert_almost_equal(add_kernel(A, A)[1:-1],
+                                       A[:-2] + A[2:])
+        for args, kwargs in (((A, np.arange(5.0)), {}),
+                             ((A, A), {'out': np.zeros(5)})):
+            with self.assertRaises(ValueError) as raises:
+                add_kernel(*args, **kwargs)
+            self.assertIn("should have the shape of a", str(raises.exception))
+        cfunc = njit(lambda a, b: add_kernel(a, b))
+        with self.assertRaises(ValueError):
+            cfunc(A, np.arange(20.0))
+
+    def test_stencil_errors(self):
+        def kernel(a, i):
+            return a[i]
+        with self.assertRaises(ValueError):
+            stencil(kernel)
+        with self.assertRaises(ValueError):
+            stencil('wrap')(lambda a: a[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
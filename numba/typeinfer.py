@@ -387,6 +387,8 @@ class CallConstraint(object):
             # Cannot resolve call type until all argument types are known
             return
         pos_args, kw_args = r
+        pos_args, kw_args = self._fold_constant_args(typeinfer, fnty,
+                                                     pos_args, kw_args)
 
         # Resolve call type
         sig = typeinfer.resolve_call(fnty, pos_args, kw_args)
@@ -430,6 +432,40 @@ class CallConstraint(object):
     def get_call_signature(self):
         return self.signature
 
+    def _fold_constant_args(self, typeinfer, fnty, pos_args, kw_args):
+        """
+        Type the arguments that are constants given for the parameters of
+        typing.templates.constant_parameters as types.Omitted(value).
+        """
+        try:
+            params = typing.templates.constant_parameters.get(
+                getattr(fnty, 'typing_key', None), {})
+        except TypeError:
+            # Unhashable typing key
+            return pos_args, kw_args
+        if not params:
+            return pos_args, kw_args
+
+        def constant_type(var, ty):
+            try:
+                defn = typeinfer.func_ir.get_definition(var)
+            except KeyError:
+                return ty
+            if isinstance(defn, (ir.Const, ir.Global, ir.FreeVar)):
+                return types.Omitted(defn.value)
+            return ty
+
+        pos_args = list(pos_args)
+        kw_args = dict(kw_args)
+        kw_vars = dict(self.kws)
+        for name, index in params.items():
+            if name in kw_vars:
+                kw_args[name] = constant_type(kw_vars[name], kw_args[name])
+            elif index < len(self.args):
+                pos_args[index] = constant_type(self.args[index],
+                                                pos_args[index])
+        return tuple(pos_args), kw_args
+
 
 class IntrinsicCallConstraint(CallConstraint):
     def __call__(self, typeinfer):
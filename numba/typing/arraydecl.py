@@ -2,10 +2,11 @@ from __future__ import print_function, division, absolute_import
 
 from collections import namedtuple
 
-from numba import types
+from numba import types, utils
 from numba.typing.templates import (AttributeTemplate, AbstractTemplate,
                                     infer, infer_getattr, signature,
-                                    bound_function)
+                                    bound_function,
+                                    register_constant_parameters)
 # import time side effect: array operations requires typing support of sequence
 # defined in collections: e.g. array.shape[i]
 from numba.typing import collections
@@ -30,7 +31,8 @@ def get_array_index_type(ary, idx):
     right_indices = []
     ellipsis_met = False
     advanced = False
-    has_integer = False
+    # Number of dimensions of the broadcast advanced indices
+    advanced_ndim = 0
 
     if not isinstance(idx, types.BaseTuple):
         idx = [idx]
@@ -49,21 +51,20 @@ def get_array_index_type(ary, idx):
             ty = types.intp if ty.signed else types.uintp
             # Integer indexing removes the given dimension
             ndim -= 1
-            has_integer = True
         elif (isinstance(ty, types.Array) and ty.ndim == 0
               and isinstance(ty.dtype, types.Integer)):
             # 0-d array used as integer index
             ndim -= 1
-            has_integer = True
-        elif (isinstance(ty, types.Array)
-              and ty.ndim == 1
-              and isinstance(ty.dtype, (types.Integer, types.Boolean))):
-            if advanced or has_integer:
-                # We don't support the complicated combination of
-                # advanced indices (and integers are considered part
-                # of them by Numpy).
-                raise NotImplementedError("only one advanced index supported")
+        elif (isinstance(ty, types.Array) and ty.ndim >= 1
+              and (isinstance(ty.dtype, types.Integer)
+                   or (isinstance(ty.dtype, types.Boolean)
+                       and ty.ndim == 1))):
+            # Advanced indices (and the integers mixed with them) are
+            # broadcast together, the resulting dimensions replace the
+            # indexed ones
+            ndim -= 1
             advanced = True
+            advanced_ndim = max(advanced_ndim, ty.ndim)
         else:
             raise TypeError("unsupported array index type %s in %s"
                             % (ty, idx))
@@ -72,6 +73,7 @@ def get_array_index_type(ary, idx):
     # Only Numpy arrays support advanced indexing
     if advanced and not isinstance(ary, types.Array):
         return
+    ndim += advanced_ndim
 
     # Check indices and result dimensionality
     all_indices = left_indices + right_indices
@@ -223,6 +225,18 @@ def normalize_shape(shape):
         return types.UniTuple(types.intp, 0)
 
 
+def _sort_stub(kind=None, order=None):
+    pass
+
+
+def _reduction_stub(axis=None, keepdims=False):
+    pass
+
+
+def _arg_reduction_stub(axis=None):
+    pass
+
+
 @infer_getattr
 class ArrayAttribute(AttributeTemplate):
     key = types.Array
@@ -365,17 +379,14 @@ class ArrayAttribute(AttributeTemplate):
 
     @bound_function("array.sort")
     def resolve_sort(self, ary, args, kws):
-        assert not args
-        assert not kws
-        if ary.ndim == 1:
-            return signature(types.none)
+        from .npydecl import _sort_signature
+        return _sort_signature(ary, types.none, args, kws, _sort_stub)
 
     @bound_function("array.argsort")
     def resolve_argsort(self, ary, args, kws):
-        assert not args
-        assert not kws
-        if ary.ndim == 1:
-            return signature(types.Array(types.intp, 1, 'C'))
+        from .npydecl import _sort_signature
+        return _sort_signature(ary, types.Array(types.intp, 1, 'C'),
+                               args, kws, _sort_stub)
 
     @bound_function("array.view")
     def resolve_view(self, ary, args, kws):
@@ -522,13 +533,58 @@ def _expand_integer(ty):
     else:
         return ty
 
+def _hetero_real(ty):
+    if isinstance(ty, (types.Integer, types.Boolean)):
+        return types.float64
+    return ty
+
+def _reduction_signature(self, dtype, args, kws, stub=_reduction_stub):
+    """
+    Signature of a reduction of the array to *dtype*, which takes the
+    optional arguments of *stub*: an integer *axis* and a constant
+    *keepdims*.
+    """
+    ary = self.this
+    if not args and not kws:
+        return signature(dtype, recvr=ary)
+    # Numpy's other positional arguments (dtype, out) aren't supported
+    if len(args) > 1:
+        return
+    if not isinstance(ary.dtype, (types.Number, types.Boolean)):
+        return
+    pysig = utils.pysignature(stub)
+    try:
+        bound = pysig.bind(*args, **kws)
+    except TypeError:
+        return
+    axis = bound.arguments.get('axis', types.none)
+    if not isinstance(axis, (types.Integer, types.NoneType)):
+        return
+    sig_args = [axis]
+    keepdims = False
+    if 'keepdims' in pysig.parameters:
+        keepdims_ty = bound.arguments.get('keepdims', types.Omitted(False))
+        if not isinstance(keepdims_ty, types.Omitted):
+            raise TypingError("%s(): keepdims must be a constant boolean"
+                              % (self.key.split('.')[-1],))
+        keepdims = bool(keepdims_ty.value)
+        sig_args.append(keepdims_ty)
+    if keepdims:
+        retty = types.Array(dtype, ary.ndim, 'C')
+    elif isinstance(axis, types.Integer) and ary.ndim > 1:
+        retty = types.Array(dtype, ary.ndim - 1, 'C')
+    else:
+        retty = dtype
+    sig = signature(retty, *sig_args, recvr=ary)
+    sig.pysig = pysig
+    return sig
+
 def generic_homog(self, args, kws):
-    assert not args
-    assert not kws
-    return signature(self.this.dtype, recvr=self.this)
+    return _reduction_signature(self, self.this.dtype, args, kws)
 
 def generic_expand(self, args, kws):
-    return signature(_expand_integer(self.this.dtype), recvr=self.this)
+    return _reduction_signature(self, _expand_integer(self.this.dtype),
+                                args, kws)
 
 def generic_expand_cumulative(self, args, kws):
     assert isinstance(self.this, types.Array)
@@ -539,14 +595,15 @@ def generic_expand_cumulative(self, args, kws):
 def generic_hetero_real(self, args, kws):
     assert not args
     assert not kws
-    if isinstance(self.this.dtype, (types.Integer, types.Boolean)):
-        return signature(types.float64, recvr=self.this)
-    return signature(self.this.dtype, recvr=self.this)
+    return signature(_hetero_real(self.this.dtype), recvr=self.this)
+
+def generic_hetero_real_reduction(self, args, kws):
+    return _reduction_signature(self, _hetero_real(self.this.dtype),
+                                args, kws)
 
 def generic_index(self, args, kws):
-    assert not args
-    assert not kws
-    return signature(types.intp, recvr=self.this)
+    return _reduction_signature(self, types.intp, args, kws,
+                                _arg_reduction_stub)
 
 def install_array_method(name, generic):
     my_attr = {"key": "array." + name, "generic": generic}
@@ -570,13 +627,23 @@ for fname in ["cumsum", "cumprod"]:
     install_array_method(fname, generic_expand_cumulative)
 
 # Functions that require integer arrays get promoted to float64 return
-for fName in ["mean", "var", "std"]:
+install_array_method("mean", generic_hetero_real_reduction)
+for fName in ["var", "std"]:
     install_array_method(fName, generic_hetero_real)
 
 # Functions that return an index (intp)
 install_array_method("argmin", generic_index)
 install_array_method("argmax", generic_index)
 
+# Reductions taking a keepdims argument, which selects the return type
+for fname in ["min", "max", "sum", "prod", "mean"]:
+    register_constant_parameters("array." + fname, ('keepdims',),
+                                 _reduction_stub)
+
+# The fields of record arrays to sort by are given as constants
+for fname in ["sort", "argsort"]:
+    register_constant_parameters("array." + fname, ('order',), _sort_stub)
+
 
 @infer
 class CmpOpEqArray(AbstractTemplate):
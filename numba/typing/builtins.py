@@ -7,6 +7,7 @@ import numpy as np
 from numba import types
 
 from numba.utils import PYVERSION, RANGE_ITER_OBJECTS, operator_map
+from numba.special import prange
 from numba.typing.templates import (AttributeTemplate, ConcreteTemplate,
                                     AbstractTemplate, infer_global, infer,
                                     infer_getattr, signature, bound_function,
@@ -85,6 +86,10 @@ class Range(ConcreteTemplate):
 for func in RANGE_ITER_OBJECTS:
     infer_global(func, typing_key=range)(Range)
 
+# prange is typed (and lowered) as range; the parfor pass recognizes it
+# separately to parallelize the loop.
+infer_global(prange, typing_key=range)(Range)
+
 
 @infer
 class GetIter(AbstractTemplate):
@@ -1,6 +1,6 @@
 from __future__ import absolute_import, print_function
 
-from .. import types
+from .. import types, utils
 from .templates import (ConcreteTemplate, AbstractTemplate, AttributeTemplate,
                         CallableTemplate,  Registry, signature, bound_function,
                         make_callable_template)
@@ -26,19 +26,50 @@ class ListBuiltin(AbstractTemplate):
                 return signature(types.List(dtype), iterable)
 
 
-@infer_global(sorted)
-class SortedBuiltin(CallableTemplate):
+def _sorted_stub(iterable, key=None, reverse=False):
+    pass
+
+
+def _sort_stub(key=None, reverse=False):
+    pass
+
+
+def _sort_signature(retty, args, kws, stub):
+    """
+    Signature of sorted() or list.sort(), which take the optional
+    arguments of *stub*: *key*, a jitted function, and a boolean
+    *reverse*.
+    """
+    pysig = utils.pysignature(stub)
+    try:
+        bound = pysig.bind(*args, **kws)
+    except TypeError:
+        return
+    key = bound.arguments.get('key', types.none)
+    reverse = bound.arguments.get('reverse', types.boolean)
+    if not isinstance(key, (types.NoneType, types.Dispatcher)):
+        return
+    if not isinstance(reverse, types.Boolean):
+        return
+    sig_args = list(args[:len(pysig.parameters) - 2]) + [key, reverse]
+    sig = signature(retty, *sig_args)
+    sig.pysig = pysig
+    return sig
+
 
-    def generic(self):
-        def typer(iterable, reverse=None):
-            if not isinstance(iterable, types.IterableType):
-                return
-            if (reverse is not None and
-                not isinstance(reverse, types.Boolean)):
-                return
-            return types.List(iterable.iterator_type.yield_type)
+@infer_global(sorted)
+class SortedBuiltin(AbstractTemplate):
 
-        return typer
+    def generic(self, args, kws):
+        if not args:
+            return
+        iterable = args[0]
+        if not isinstance(iterable, types.IterableType):
+            return
+        retty = types.List(iterable.iterator_type.yield_type)
+        if len(args) == 1 and not kws:
+            return signature(retty, iterable)
+        return _sort_signature(retty, args, kws, _sorted_stub)
 
 
 @infer_getattr
@@ -135,17 +166,11 @@ class ListAttribute(AttributeTemplate):
         assert not kws
         return signature(types.none)
 
-    def resolve_sort(self, list):
-        def typer(reverse=None):
-            if (reverse is not None and
-                not isinstance(reverse, types.Boolean)):
-                return
-            return types.none
-
-        return types.BoundFunction(make_callable_template(key="list.sort",
-                                                          typer=typer,
-                                                          recvr=list),
-                                   list)
+    @bound_function("list.sort")
+    def resolve_sort(self, list, args, kws):
+        if not args and not kws:
+            return signature(types.none)
+        return _sort_signature(types.none, args, kws, _sort_stub)
 
 
 @infer
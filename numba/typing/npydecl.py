@@ -6,7 +6,7 @@ import numpy as np
 
 from .. import types, utils
 from .templates import (AttributeTemplate, AbstractTemplate, CallableTemplate,
-                        Registry, signature)
+                        Registry, signature, register_constant_parameters)
 
 from ..numpy_support import (ufunc_find_matching_loop,
                              supported_ufunc_loop, as_dtype,
@@ -349,14 +349,29 @@ class Numpy_method_redirection(AbstractTemplate):
     """
 
     def generic(self, args, kws):
-        assert not kws
-        [arr] = args
+        arr = args[0]
         # This will return a BoundFunction
         meth_ty = self.context.resolve_getattr(arr, self.method_name)
         # Resolve arguments on the bound function
         meth_sig = self.context.resolve_function_type(meth_ty, args[1:], kws)
         if meth_sig is not None:
-            return meth_sig.as_function()
+            sig = meth_sig.as_function()
+            if meth_sig.pysig is not None:
+                # The array is passed as the first argument
+                params = list(meth_sig.pysig.parameters.values())
+                sig.pysig = meth_sig.pysig.replace(
+                    parameters=[_array_parameter] + params)
+            return sig
+
+
+def _array_stub(a):
+    pass
+
+_array_parameter, = utils.pysignature(_array_stub).parameters.values()
+
+
+def _reduction_stub(a, axis=None, keepdims=False):
+    pass
 
 
 # Function to glue attributes onto the numpy-esque object
@@ -367,10 +382,15 @@ def _numpy_redirect(fname):
     infer_global(numpy_function, types.Function(cls))
 
 for func in ['min', 'max', 'sum', 'prod', 'mean', 'var', 'std',
-             'cumsum', 'cumprod', 'argmin', 'argmax', 'argsort',
+             'cumsum', 'cumprod', 'argmin', 'argmax',
              'nonzero', 'ravel']:
     _numpy_redirect(func)
 
+# Reductions taking a keepdims argument, which selects the return type
+for func in ['min', 'max', 'sum', 'prod', 'mean']:
+    register_constant_parameters(getattr(np, func), ('keepdims',),
+                                 _reduction_stub)
+
 
 # -----------------------------------------------------------------------------
 # Numpy scalar constructors
@@ -662,13 +682,131 @@ class NdFromBuffer(CallableTemplate):
         return typer
 
 
+_sort_kinds = ('quicksort', 'heapsort', 'mergesort', 'stable')
+
+def _check_sort_kind(kind):
+    """
+    Check the *kind* argument of a sort function is a constant string
+    naming a supported sort kind.
+    """
+    if not (isinstance(kind, types.Const) and kind.value in _sort_kinds):
+        raise TypingError("sort kind must be a constant string, one of %s"
+                          % (', '.join(repr(k) for k in _sort_kinds)))
+
+
+# Types of the keys of np.lexsort(), and of the record fields that can
+# be compared when sorting record arrays
+_sortable_key_types = (types.Boolean, types.Integer, types.Float)
+_sortable_field_types = _sortable_key_types + (types.Complex,)
+
+def _sort_order_fields(dtype, order=types.none):
+    """
+    The names of the fields by which arrays of the Numba *dtype* are
+    sorted given the *order* argument of a sort function: the fields
+    named by *order* (a constant string or tuple of strings), then the
+    other fields of the record in the order of the dtype, which break
+    ties (numeric fields only).  Return None if *dtype* isn't a record.
+    """
+    if isinstance(order, (types.Const, types.Omitted)):
+        order = order.value
+    else:
+        order = None
+    if not isinstance(dtype, types.Record):
+        if order is not None:
+            raise TypingError("cannot specify order when the array has "
+                              "no fields")
+        return None
+
+    if order is None:
+        order = ()
+    elif isinstance(order, str):
+        order = (order,)
+    if not (isinstance(order, (tuple, list))
+            and all(isinstance(name, str) for name in order)):
+        raise TypingError("sort order must be a constant string or tuple "
+                          "of strings")
+    for name in order:
+        if name not in dtype.fields:
+            raise TypingError("unknown field %r in sort order" % (name,))
+        if not isinstance(dtype.typeof(name), _sortable_field_types):
+            raise TypingError("cannot sort by field %r of type %s"
+                              % (name, dtype.typeof(name)))
+    others = [name for name in dtype.dtype.names
+              if name not in order
+              and isinstance(dtype.typeof(name), _sortable_field_types)]
+    fields = tuple(order) + tuple(others)
+    if not fields:
+        raise TypingError("cannot sort records without numeric fields")
+    return fields
+
+def _sort_signature(ary, retty, args, kws, stub):
+    """
+    Signature of sort() or argsort() of the array *ary*, whose optional
+    *kind* and *order* arguments are bound with the signature of *stub*.
+    Both arguments are always part of the signature (typed as none when
+    omitted).
+    """
+    if not (isinstance(ary, types.Array) and ary.ndim == 1):
+        return
+    pysig = utils.pysignature(stub)
+    try:
+        bound = pysig.bind(*args, **kws).arguments
+    except TypeError:
+        return
+    kind = bound.get('kind', types.none)
+    order = bound.get('order', types.none)
+    if not isinstance(kind, types.NoneType):
+        _check_sort_kind(kind)
+    _sort_order_fields(ary.dtype, order)
+    args = [bound[name] for name in pysig.parameters
+            if name not in ('kind', 'order')]
+    sig = signature(retty, *(args + [kind, order]))
+    sig.pysig = pysig
+    return sig
+
+
+def _np_sort_stub(a, kind=None, order=None):
+    pass
+
+for func in [np.sort, np.argsort]:
+    register_constant_parameters(func, ('order',), _np_sort_stub)
+
+
 @infer_global(np.sort)
-class NdSort(CallableTemplate):
+class NdSort(AbstractTemplate):
+
+    def generic(self, args, kws):
+        if args:
+            return _sort_signature(args[0], args[0], args, kws,
+                                   _np_sort_stub)
+
+
+@infer_global(np.argsort)
+class NdArgSort(AbstractTemplate):
+
+    def generic(self, args, kws):
+        if args:
+            return _sort_signature(args[0], types.Array(types.intp, 1, 'C'),
+                                   args, kws, _np_sort_stub)
+
+
+@infer_global(np.lexsort)
+class NdLexSort(CallableTemplate):
 
     def generic(self):
-        def typer(a):
-            if isinstance(a, types.Array) and a.ndim == 1:
-                return a
+        def typer(keys):
+            if isinstance(keys, types.BaseTuple):
+                if len(keys) == 0:
+                    raise TypingError("need sequence of keys with len > 0 "
+                                      "in lexsort")
+                if not all(isinstance(key, types.Array) and key.ndim == 1
+                           and isinstance(key.dtype, _sortable_key_types)
+                           for key in keys):
+                    return
+            elif not (isinstance(keys, types.Array) and keys.ndim in (1, 2)
+                      and isinstance(keys.dtype, _sortable_key_types)):
+                return
+            return types.Array(types.intp, 1, 'C')
 
         return typer
 
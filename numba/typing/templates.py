@@ -332,6 +332,26 @@ def make_overload_template(func, overload_func, jit_options):
     return type(base)(name, (base,), dct)
 
 
+# Parameters of functions that are typed as types.Omitted(value) when a
+# constant is passed for them, so that the typing of the function can
+# depend on the value (e.g. the flags of np.unique() select what it
+# returns).  Maps functions to {parameter name: position}.
+constant_parameters = {}
+
+def register_constant_parameters(func, names, pyfunc=None):
+    """
+    Type the parameters *names* of *func* as types.Omitted of their value
+    when they are given constants, see constant_parameters.  The positions
+    of the parameters are taken from the Python function *pyfunc* if
+    given (e.g. when *func* is the typing key of an array method).
+    """
+    if pyfunc is None:
+        pyfunc = func
+    params = list(utils.pysignature(pyfunc).parameters)
+    constant_parameters[func] = dict((name, params.index(name))
+                                     for name in names)
+
+
 class _IntrinsicTemplate(AbstractTemplate):
     """
     A base class of templates for intrinsic definition
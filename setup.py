@@ -130,12 +130,21 @@ def get_ext_modules():
                                             "numba/_pymodule.h"],
                                    **np_compile_args)
 
+    ext_npyufunc_workqueue = Extension(
+        name='numba.npyufunc.workqueue',
+        sources=['numba/npyufunc/workqueue.c', 'numba/npyufunc/gufunc_scheduler.cpp'],
+        depends=['numba/npyufunc/workqueue.h'])
+
+    # Optional threading layers, selected at runtime with
+    # NUMBA_THREADING_LAYER (see numba/npyufunc/parallel.py)
+    ext_npyufunc_threading_layers = []
+
     tbb_root = os.getenv('TBBROOT')
 
     if tbb_root:
         print("Using TBBROOT=", tbb_root)
-        ext_npyufunc_workqueue = Extension(
-            name='numba.npyufunc.workqueue',
+        ext_npyufunc_tbbpool = Extension(
+            name='numba.npyufunc.tbbpool',
             sources=['numba/npyufunc/tbbpool.cpp', 'numba/npyufunc/gufunc_scheduler.cpp'],
             depends=['numba/npyufunc/workqueue.h'],
             include_dirs=[os.path.join(tbb_root, 'include')],
@@ -146,11 +155,24 @@ def get_ext_modules():
                           os.path.join(tbb_root, 'lib', 'intel64', 'vc_mt'),   # for Windows
                          ],
             )
-    else:
-        ext_npyufunc_workqueue = Extension(
-            name='numba.npyufunc.workqueue',
-            sources=['numba/npyufunc/workqueue.c', 'numba/npyufunc/gufunc_scheduler.cpp'],
-            depends=['numba/npyufunc/workqueue.h'])
+        ext_npyufunc_threading_layers.append(ext_npyufunc_tbbpool)
+
+    # The default compilers on OSX don't support OpenMP
+    if not os.getenv('NUMBA_NO_OPENMP') and sys.platform != 'darwin':
+        if sys.platform.startswith('win'):
+            omp_compile_args = ['/openmp']
+            omp_link_args = []
+        else:
+            omp_compile_args = ['-fopenmp', '-std=c++11']
+            omp_link_args = ['-fopenmp']
+        ext_npyufunc_omppool = Extension(
+            name='numba.npyufunc.omppool',
+            sources=['numba/npyufunc/omppool.cpp', 'numba/npyufunc/gufunc_scheduler.cpp'],
+            depends=['numba/npyufunc/workqueue.h'],
+            extra_compile_args=omp_compile_args,
+            extra_link_args=omp_link_args,
+            )
+        ext_npyufunc_threading_layers.append(ext_npyufunc_omppool)
 
     ext_mviewbuf = Extension(name='numba.mviewbuf',
                              extra_link_args=install_name_tool_fixer,
@@ -179,6 +201,8 @@ def get_ext_modules():
                    ext_npyufunc_ufunc, ext_npyufunc_workqueue, ext_mviewbuf,
                    ext_nrt_python, ext_jitclass_box, ext_cuda_extras]
 
+    ext_modules += ext_npyufunc_threading_layers
+
     return ext_modules
 
 